@@ -18,7 +18,9 @@
 from .handler import GemHandler
 from .equipmenthandler import GemEquipmentHandler, \
     ECID_ESTABLISH_COMMUNICATIONS_TIMEOUT, ECID_TIME_FORMAT, \
+    ECID_MAX_SPOOL_TRANSMIT, ECID_OVERWRITE_SPOOL, ECID_ENABLE_SPOOLING, \
     SVID_CLOCK, SVID_CONTROL_STATE, SVID_EVENTS_ENABLED, SVID_ALARMS_ENABLED, SVID_ALARMS_SET, \
+    SVID_SPOOL_COUNT_ACTUAL, SVID_SPOOL_COUNT_TOTAL, \
     CEID_EQUIPMENT_OFFLINE, CEID_CONTROL_STATE_LOCAL, CEID_CONTROL_STATE_REMOTE, CEID_CMD_START_DONE, \
     CEID_CMD_STOP_DONE, \
     RCMD_START, RCMD_STOP
@@ -31,15 +33,25 @@ from .collection_event_link import CollectionEventLink
 from .collection_event import CollectionEvent
 from .status_variable import StatusVariable
 from .data_value import DataValue
+from .event_queue import GemEventQueue
+from .report_plan import GemRegistry, GemReportPlan, GemReportPlans
+from .trace import GemTrace, GemTraceReport, GemTraceScheduler
+from .spool import GemSpool, GemSpoolMessage
 from .hosthandler import GemHostHandler
+from .async_handler import AsyncGemHandler
+from .async_hosthandler import AsyncGemHostHandler
 
 __all__ = [
-    "GemHandler", "GemEquipmentHandler", "GemHostHandler",
+    "GemHandler", "GemEquipmentHandler", "GemHostHandler", "AsyncGemHandler", "AsyncGemHostHandler",
     "ECID_ESTABLISH_COMMUNICATIONS_TIMEOUT", "ECID_TIME_FORMAT",
+    "ECID_MAX_SPOOL_TRANSMIT", "ECID_OVERWRITE_SPOOL", "ECID_ENABLE_SPOOLING",
     "SVID_CLOCK", "SVID_CONTROL_STATE", "SVID_EVENTS_ENABLED", "SVID_ALARMS_ENABLED", "SVID_ALARMS_SET",
+    "SVID_SPOOL_COUNT_ACTUAL", "SVID_SPOOL_COUNT_TOTAL",
     "CEID_EQUIPMENT_OFFLINE", "CEID_CONTROL_STATE_LOCAL", "CEID_CONTROL_STATE_REMOTE", "CEID_CMD_START_DONE",
     "CEID_CMD_STOP_DONE",
     "RCMD_START", "RCMD_STOP",
     "RemoteCommand", "Alarm", "EquipmentConstant", "CollectionEventReport", "CollectionEventLink",
-    "CollectionEvent", "StatusVariable", "DataValue",
+    "CollectionEvent", "StatusVariable", "DataValue", "GemEventQueue",
+    "GemRegistry", "GemReportPlan", "GemReportPlans", "GemTrace", "GemTraceScheduler",
+    "GemSpool", "GemSpoolMessage",
 ]
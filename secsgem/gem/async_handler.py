@@ -0,0 +1,84 @@
+#####################################################################
+# async_handler.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+"""Handler for GEM commands running in an asyncio event loop."""
+
+import asyncio
+
+import secsgem.secs
+
+from .handler import GemHandler
+
+
+class AsyncGemHandler(GemHandler, secsgem.secs.AsyncSecsHandler):
+    """
+    Baseclass for creating Host/Equipment models running in an asyncio event loop.
+
+    Works like :class:`secsgem.gem.GemHandler`, the functions waiting for a response are coroutines.
+    The communication state timers run in the event loop.
+    """
+
+    async def send_process_program(self, ppid, ppbody):
+        """
+        Send a process program.
+
+        :param ppid: Transferred process programs ID
+        :type ppid: string
+        :param ppbody: Content of process program
+        :type ppbody: string
+        """
+        # send remote command
+        self.logger.info("Send process program %s", ppid)
+
+        return self.secs_decode(await self.send_and_waitfor_response(self.stream_function(7, 3)(
+            {"PPID": ppid, "PPBODY": ppbody}))).get()
+
+    async def request_process_program(self, ppid):
+        """
+        Request a process program.
+
+        :param ppid: Transferred process programs ID
+        :type ppid: string
+        """
+        self.logger.info("Request process program %s", ppid)
+
+        # send remote command
+        s7f6 = self.secs_decode(await self.send_and_waitfor_response(self.stream_function(7, 5)(ppid)))
+        return s7f6.PPID.get(), s7f6.PPBODY.get()
+
+    async def waitfor_communicating(self, timeout=None):
+        """
+        Wait until connection gets into communicating state. Returns immediately if state is communicating.
+
+        :param timeout: seconds to wait before aborting
+        :type timeout: float
+        :returns: True if state is communicating, False if timed out
+        :rtype: bool
+        """
+        if self.communicationState.isstate("COMMUNICATING"):
+            return True
+
+        event = asyncio.Event()
+        self.waitEventList.append(event)
+
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            result = True
+        except asyncio.TimeoutError:
+            result = False
+        finally:
+            self.waitEventList.remove(event)
+
+        return result
@@ -0,0 +1,273 @@
+#####################################################################
+# async_hosthandler.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+"""Handler for GEM host running in an asyncio event loop."""
+
+import collections
+
+import secsgem.secs
+
+from .async_handler import AsyncGemHandler
+from .hosthandler import GemHostHandler
+
+
+class AsyncGemHostHandler(GemHostHandler, AsyncGemHandler):
+    """
+    Baseclass for creating host models running in an asyncio event loop.
+
+    Works like :class:`secsgem.gem.GemHostHandler`, the functions waiting for a response are coroutines.
+    Inherit from this class and override required functions.
+
+    **Example**::
+
+        import asyncio
+        import secsgem.gem
+
+        async def main():
+            host = secsgem.gem.AsyncGemHostHandler("10.211.55.33", 5000, False, 0, "test")
+            host.enable()
+
+            if await host.waitfor_communicating(30):
+                print(await host.request_svs([1, 2]))
+
+            host.disable()
+            await host.connection.wait_closed()
+
+        asyncio.get_event_loop().run_until_complete(main())
+
+    """
+
+    async def clear_collection_events(self):
+        """Clear all collection events."""
+        self.logger.info("Clearing collection events")
+
+        # clear subscribed reports
+        self.reportSubscriptions = {}
+        self.ce_report_subscriptions = {}
+
+        # disable all ceids
+        await self.disable_ceids()
+
+        # delete all reports
+        await self.disable_ceid_reports()
+
+    async def subscribe_collection_event(self, ceid, dvs, report_id=None):
+        """
+        Subscribe to a collection event.
+
+        :param ceid: ID of the collection event
+        :type ceid: integer
+        :param dvs: DV IDs to add for collection event
+        :type dvs: list of integers
+        :param report_id: optional - ID for report, autonumbering if None
+        :type report_id: integer
+        """
+        self.logger.info("Subscribing to collection event %s", ceid)
+
+        report_id = self._add_report_subscription(ceid, dvs, report_id)
+
+        # create report
+        await self.send_and_waitfor_response(self.stream_function(2, 33)(
+            {"DATAID": 0, "DATA": [{"RPTID": report_id, "VID": dvs}]}))
+
+        # link event report to collection event
+        await self.send_and_waitfor_response(self.stream_function(2, 35)(
+            {"DATAID": 0, "DATA": [{"CEID": ceid, "RPTID": [report_id]}]}))
+
+        # enable collection event
+        await self.send_and_waitfor_response(self.stream_function(2, 37)({"CEED": True, "CEID": [ceid]}))
+
+    async def list_events(self, ce_ids=None):
+        """
+        List events.
+
+        :param ce_ids: events to list details for
+        :type ce_ids: array of int/str
+        """
+        if ce_ids is None:
+            ce_ids = []
+        elif not isinstance(ce_ids, list):
+            ce_ids = [ce_ids]
+
+        self.logger.info("List events %s", ce_ids)
+
+        packet = await self.send_and_waitfor_response(self.stream_function(1, 23)(ce_ids))
+
+        return self.secs_decode(packet).get()
+
+    async def send_remote_command(self, rcmd, params):
+        """
+        Send a remote command.
+
+        :param rcmd: Name of command
+        :type rcmd: string
+        :param params: DV IDs to add for collection event
+        :type params: list of strings
+        """
+        self.logger.info("Send RCMD %s", rcmd)
+
+        s2f41 = self.stream_function(2, 41)()
+        s2f41.RCMD = rcmd
+        if isinstance(params, list):
+            for param in params:
+                s2f41.PARAMS.append({"CPNAME": param[0], "CPVAL": param[1]})
+        elif isinstance(params, collections.OrderedDict):
+            for param in params:
+                s2f41.PARAMS.append({"CPNAME": param, "CPVAL": params[param]})
+
+        # send remote command
+        return self.secs_decode(await self.send_and_waitfor_response(s2f41))
+
+    async def delete_process_programs(self, ppids):
+        """
+        Delete a list of process program.
+
+        :param ppids: Process programs to delete
+        :type ppids: list of strings
+        """
+        self.logger.info("Delete process programs %s", ppids)
+
+        # send remote command
+        return self.secs_decode(await self.send_and_waitfor_response(self.stream_function(7, 17)(ppids))).get()
+
+    async def get_process_program_list(self):
+        """Get process program list."""
+        self.logger.info("Get process program list")
+
+        # send remote command
+        return self.secs_decode(await self.send_and_waitfor_response(self.stream_function(7, 19)())).get()
+
+    async def go_online(self):
+        """Set control state to online."""
+        self.logger.info("Go online")
+
+        # send remote command
+        return self.secs_decode(await self.send_and_waitfor_response(self.stream_function(1, 17)())).get()
+
+    async def go_offline(self):
+        """Set control state to offline."""
+        self.logger.info("Go offline")
+
+        # send remote command
+        return self.secs_decode(await self.send_and_waitfor_response(self.stream_function(1, 15)())).get()
+
+    async def enable_alarm(self, alid):
+        """
+        Enable alarm.
+
+        :param alid: alarm id to enable, [] for all alarms
+        :type alid: :class:`secsgem.secs.dataitems.ALID`
+        """
+        self.logger.info("Enable alarm %s", str(alid) if alid != [] else 'ALL')
+
+        return self.secs_decode(await self.send_and_waitfor_response(self.stream_function(5, 3)(
+            {"ALED": secsgem.secs.data_items.ALED.ENABLE, "ALID": alid}))).get()
+
+    async def disable_alarm(self, alid):
+        """
+        Disable alarm.
+
+        :param alid: alarm id to disable, [] for all alarms
+        :type alid: :class:`secsgem.secs.dataitems.ALID`
+        """
+        self.logger.info("Disable alarm %s", str(alid) if alid != [] else 'ALL')
+
+        return self.secs_decode(await self.send_and_waitfor_response(self.stream_function(5, 3)(
+            {"ALED": secsgem.secs.data_items.ALED.DISABLE, "ALID": alid}))).get()
+
+    async def list_alarms(self, alids=None):
+        """
+        List alarms.
+
+        :param alids: alarms to list details for
+        :type alids: array of int/str
+        """
+        if alids is None:
+            alids = []
+            self.logger.info("List all alarms")
+        else:
+            self.logger.info("List alarms %s", alids)
+
+        return self.secs_decode(await self.send_and_waitfor_response(self.stream_function(5, 5)(alids))).get()
+
+    async def list_enabled_alarms(self):
+        """List enabled alarms."""
+        self.logger.info("List all enabled alarms")
+
+        return self.secs_decode(await self.send_and_waitfor_response(self.stream_function(5, 7)())).get()
+
+    async def request_event_report(self, ceid):
+        """
+        Request event report(s) for given 'ceid' (using the S6,F15 message).
+
+        :param ceid: id of collection event
+        :type ceid: int
+        """
+        packet = await self.send_and_waitfor_response(self.stream_function(6, 15)(ceid))
+
+        return self._preprocess_event_report(self.secs_decode_value(packet))
+
+    async def request_individual_report(self, rptid):
+        """
+        Request event report for given 'rptid' (using the S6,F19 message).
+
+        :param rptid: id of report
+        :type rptid: int
+        """
+        packet = await self.send_and_waitfor_response(self.stream_function(6, 19)(rptid))
+
+        return self._process_individual_report(rptid, packet)
+
+    async def clear_report(self, rptid):
+        """
+        Deletes report definition for given 'rptid' (using the S2,F33 message).
+
+        :param rptid: id of report
+        :type rptid: int
+        """
+        packet = await self.send_and_waitfor_response(self.stream_function(2, 33)(
+            {"DATAID": 0, "DATA": [{"RPTID": rptid, "VID": []}]}))
+
+        self._on_report_cleared(rptid, packet)
+
+    async def clear_event_report(self, ceid):
+        """
+        Deletes all report definitions linked to given 'ceid' (using the S2,F35 message).
+
+        :param ceid: id of collection event
+        :type ceid: int
+        """
+        packet = await self.send_and_waitfor_response(self.stream_function(2, 35)(
+            {"DATAID": 0, "DATA": [{"CEID": ceid, "RPTID": []}]}))
+
+        self._on_event_report_cleared(ceid, packet)
+
+    async def list_dvs(self, dvs=None):
+        """Get list of available Data Variables.
+
+        :returns: available data Variables
+        :rtype: list
+        """
+        self.logger.info("Get list of data variables")
+
+        if dvs is None:
+            dvs = []
+
+        if not isinstance(dvs, list):
+            dvs = [dvs]
+
+        packet = await self.send_and_waitfor_response(self.stream_function(1, 21)(dvs))
+
+        return self.secs_decode(packet)
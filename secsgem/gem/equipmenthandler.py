@@ -15,6 +15,9 @@
 #####################################################################
 """Handler for GEM equipment."""
 
+import collections
+import threading
+import time
 from datetime import datetime
 
 from dateutil.tz import tzlocal
@@ -29,17 +32,29 @@ from .collection_event_link import CollectionEventLink
 from .collection_event_report import CollectionEventReport
 from .equipment_constant import EquipmentConstant
 from .remote_command import RemoteCommand
+from .event_queue import GemEventQueue
+from .report_plan import GemRegistry, GemReportPlan, GemReportPlans
+from .trace import GemTrace, GemTraceReport, GemTraceScheduler, parse_dsper
 from .handler import GemHandler
 
 
 ECID_ESTABLISH_COMMUNICATIONS_TIMEOUT = 1
 ECID_TIME_FORMAT = 2
+ECID_MAX_SPOOL_TRANSMIT = 3
+ECID_OVERWRITE_SPOOL = 4
+ECID_ENABLE_SPOOLING = 5
 
 SVID_CLOCK = 1001
 SVID_CONTROL_STATE = 1002
 SVID_EVENTS_ENABLED = 1003
 SVID_ALARMS_ENABLED = 1004
 SVID_ALARMS_SET = 1005
+SVID_SPOOL_COUNT_ACTUAL = 1006
+SVID_SPOOL_COUNT_TOTAL = 1007
+
+# status variables with values provided by the handler
+_BUILTIN_SVIDS = frozenset([SVID_CLOCK, SVID_CONTROL_STATE, SVID_EVENTS_ENABLED, SVID_ALARMS_ENABLED, SVID_ALARMS_SET,
+                            SVID_SPOOL_COUNT_ACTUAL, SVID_SPOOL_COUNT_TOTAL])
 
 CEID_EQUIPMENT_OFFLINE = 1
 CEID_CONTROL_STATE_LOCAL = 2
@@ -52,9 +67,39 @@ RCMD_START = "START"
 RCMD_STOP = "STOP"
 
 
+def _get_variable_value(value_type, variable):
+    """Get the value of a variable without callback, used in report plans."""
+    return value_type(variable.value)
+
+
 class GemEquipmentHandler(GemHandler):
     """Baseclass for creating equipment models. Inherit from this class and override required functions."""
 
+    collection_event_window = 1
+    """ Maximum number of collection event reports (S6F11) waiting for their acknowledge ."""
+
+    collection_event_queue_size = 1000
+    """ Maximum number of collection event reports waiting for sending, further reports are dropped ."""
+
+    value_request_deadline = 0.5
+    """ Part of the reply timeout T3 the batched requests for variable values may take (deadline passed to
+    :func:`on_sv_values_request` and :func:`on_dv_values_request`) ."""
+
+    spool_transmit_window = 16
+    """ Maximum number of spooled messages waiting for their reply while transmitting the spool ."""
+
+    trace_limit = 100
+    """ Maximum number of traces (S2F23) running at the same time ."""
+
+    trace_svid_limit = 1000
+    """ Maximum number of status variables sampled by one trace ."""
+
+    trace_report_window = 16
+    """ Maximum number of trace reports (S6F1) waiting for their acknowledge ."""
+
+    trace_report_queue_size = 1000
+    """ Maximum number of trace reports waiting for sending, further reports are dropped ."""
+
     def __init__(self, address, port, active, session_id, name, custom_connection_handler=None,
                  initial_control_state="ATTEMPT_ONLINE", initial_online_control_state="REMOTE"):
         """
@@ -88,16 +133,20 @@ class GemEquipmentHandler(GemHandler):
 
         self._time_format = 1
 
-        self._data_values = {
-        }
+        self._data_values = GemRegistry({
+        })
 
-        self._status_variables = {
+        self._status_variables = GemRegistry({
             SVID_CLOCK: StatusVariable(SVID_CLOCK, "Clock", "", secsgem.secs.variables.String),
             SVID_CONTROL_STATE: StatusVariable(SVID_CONTROL_STATE, "ControlState", "", secsgem.secs.variables.Binary),
             SVID_EVENTS_ENABLED: StatusVariable(SVID_EVENTS_ENABLED, "EventsEnabled", "", secsgem.secs.variables.Array),
             SVID_ALARMS_ENABLED: StatusVariable(SVID_ALARMS_ENABLED, "AlarmsEnabled", "", secsgem.secs.variables.Array),
             SVID_ALARMS_SET: StatusVariable(SVID_ALARMS_SET, "AlarmsSet", "", secsgem.secs.variables.Array),
-        }
+            SVID_SPOOL_COUNT_ACTUAL: StatusVariable(SVID_SPOOL_COUNT_ACTUAL, "SpoolCountActual", "",
+                                                    secsgem.secs.variables.U4),
+            SVID_SPOOL_COUNT_TOTAL: StatusVariable(SVID_SPOOL_COUNT_TOTAL, "SpoolCountTotal", "",
+                                                   secsgem.secs.variables.U4),
+        })
 
         self._collection_events = {
             CEID_EQUIPMENT_OFFLINE: CollectionEvent(CEID_EQUIPMENT_OFFLINE, "EquipmentOffline", []),
@@ -112,6 +161,12 @@ class GemEquipmentHandler(GemHandler):
                                                                      "EstablishCommunicationsTimeout", 10, 120, 10,
                                                                      "sec", secsgem.secs.variables.I2),
             ECID_TIME_FORMAT: EquipmentConstant(ECID_TIME_FORMAT, "TimeFormat", 0, 2, 1, "", secsgem.secs.variables.I4),
+            ECID_MAX_SPOOL_TRANSMIT: EquipmentConstant(ECID_MAX_SPOOL_TRANSMIT, "MaxSpoolTransmit", 0, None, 0, "",
+                                                       secsgem.secs.variables.U4),
+            ECID_OVERWRITE_SPOOL: EquipmentConstant(ECID_OVERWRITE_SPOOL, "OverWriteSpool", None, None, False, "",
+                                                    secsgem.secs.variables.Boolean),
+            ECID_ENABLE_SPOOLING: EquipmentConstant(ECID_ENABLE_SPOOLING, "EnableSpooling", None, None, True, "",
+                                                    secsgem.secs.variables.Boolean),
         }
 
         self._alarms = {
@@ -122,8 +177,29 @@ class GemEquipmentHandler(GemHandler):
             RCMD_STOP: RemoteCommand(RCMD_STOP, "Stop", [], CEID_CMD_STOP_DONE),
         }
 
-        self._registered_reports = {}
-        self._registered_collection_events = {}
+        self._registered_reports = GemRegistry()
+        self._registered_collection_events = GemRegistry()
+
+        #: :class:`secsgem.gem.GemReportPlans` with the compiled reports of the linked collection events
+        self.reportPlans = GemReportPlans(self._compile_report_plan, [
+            self._status_variables, self._data_values, self._registered_reports, self._registered_collection_events])
+
+        #: :class:`secsgem.gem.GemEventQueue` for the collection event reports (S6F11) and alarm reports (S5F1)
+        self.eventQueue = GemEventQueue(self, self.collection_event_window, self.collection_event_queue_size)
+
+        #: :class:`secsgem.gem.GemTraceScheduler` sampling the traces requested by the host
+        self.traceScheduler = GemTraceScheduler(self._sample_trace, f"secsgem_gemTraceScheduler_{name}")
+        #: :class:`secsgem.gem.GemEventQueue` for the trace reports (S6F1)
+        self.traceQueue = GemEventQueue(self, self.trace_report_window, self.trace_report_queue_size)
+
+        self.spool = None  #: :class:`secsgem.gem.GemSpool` for messages to the host, no spooling if None
+        self.spooledStreams = {}  #: spooled functions by stream (configured with S2F43), all functions if empty
+        self.maxSpoolTransmit = 0
+        self._overwriteSpool = False
+        self.enableSpooling = True
+
+        self._spoolTransmitThread = None
+        self._spoolTransmitLock = threading.Lock()
 
         self.controlState = secsgem.common.Fysom({
             'initial': "INIT",
@@ -301,6 +377,26 @@ class GemEquipmentHandler(GemHandler):
 
         return dv.value_type(dv.value)
 
+    def on_dv_values_request(self, dvs, deadline):
+        """
+        Get the values of several data values with callback at once.
+
+        Called when building event reports with all data values using callbacks, each data value is passed once.
+        The default implementation calls :func:`on_dv_value_request` for each data value.
+        Override in inherited class to fetch the values with one request, e.g. from a PLC.
+
+        :param dvs: The data values requested
+        :type dvs: tuple of :class:`secsgem.gem.DataValue`
+        :param deadline: time (:func:`time.monotonic`) the values are required at, derived from the reply timeout T3
+        :type deadline: float
+        :returns: The values encoded in the corresponding type in the order of the data values,
+            None for values that are not available
+        :rtype: list of :class:`secsgem.secs.variables.Base`
+        """
+        del deadline  # unused variable
+
+        return [self.on_dv_value_request(dv.id_type(dv.dvid), dv) for dv in dvs]
+
     def _get_dv_value(self, dv):
         """
         Get the data value depending on its configuation.
@@ -315,6 +411,20 @@ class GemEquipmentHandler(GemHandler):
 
         return dv.value_type(dv.value)
 
+    def _request_dv_values(self, dvs, deadline):
+        """
+        Request the values of data values with callback with :func:`on_dv_values_request`.
+
+        :param dvs: The data values requested
+        :type dvs: tuple of :class:`secsgem.gem.DataValue`
+        :param deadline: time (:func:`time.monotonic`) the values are required at
+        :type deadline: float
+        :returns: The values encoded in the corresponding type, empty list for values not available
+        :rtype: list of :class:`secsgem.secs.variables.Base`
+        """
+        return self._check_requested_values(self.on_dv_values_request(dvs, deadline), dvs, deadline, "data values",
+                                            secsgem.secs.data_items.V)
+
     def _on_s01f21(self, handler, packet):
         """Callback handler for Stream 1, Function 21, DV namelist request
 
@@ -371,6 +481,79 @@ class GemEquipmentHandler(GemHandler):
 
         return sv.value_type(sv.value)
 
+    def on_sv_values_request(self, svs, deadline):
+        """
+        Get the values of several status variables with callback at once.
+
+        Called for status requests (S1F3) and when building event reports with all status variables using callbacks,
+        each status variable is passed once.
+        The default implementation calls :func:`on_sv_value_request` for each status variable.
+        Override in inherited class to fetch the values with one request, e.g. from a PLC.
+
+        :param svs: The status variables requested
+        :type svs: tuple of :class:`secsgem.gem.StatusVariable`
+        :param deadline: time (:func:`time.monotonic`) the values are required at, derived from the reply timeout T3
+        :type deadline: float
+        :returns: The values encoded in the corresponding type in the order of the status variables,
+            None for values that are not available
+        :rtype: list of :class:`secsgem.secs.variables.Base`
+        """
+        del deadline  # unused variable
+
+        return [self.on_sv_value_request(sv.id_type(sv.svid), sv) for sv in svs]
+
+    def _get_sv_values(self, svs, deadline=None):
+        """
+        Get the values of status variables, requesting the values of all status variables with callback at once.
+
+        :param svs: The status variables requested, None for unknown status variables
+        :type svs: list of :class:`secsgem.gem.StatusVariable`
+        :param deadline: time (:func:`time.monotonic`) the values are required at, derived from T3 if None
+        :type deadline: float
+        :returns: The values encoded in the corresponding type, empty list for unknown status variables
+        :rtype: list of :class:`secsgem.secs.variables.Base`
+        """
+        values = []
+
+        # status variables with callback, with the positions of their values
+        requested = {}
+
+        for position, sv in enumerate(svs):
+            if sv is None:
+                values.append(secsgem.secs.variables.Array(secsgem.secs.data_items.SV, []))
+            elif sv.use_callback and sv.svid not in _BUILTIN_SVIDS:
+                values.append(None)
+                requested.setdefault(id(sv), (sv, []))[1].append(position)
+            else:
+                values.append(self._get_sv_value(sv))
+
+        if requested:
+            requested = list(requested.values())
+            if deadline is None:
+                deadline = self._get_value_deadline()
+
+            results = self._request_sv_values(tuple(sv for (sv, _) in requested), deadline)
+
+            for ((_, positions), value) in zip(requested, results):
+                for position in positions:
+                    values[position] = value
+
+        return values
+
+    def _request_sv_values(self, svs, deadline):
+        """
+        Request the values of status variables with callback with :func:`on_sv_values_request`.
+
+        :param svs: The status variables requested
+        :type svs: tuple of :class:`secsgem.gem.StatusVariable`
+        :param deadline: time (:func:`time.monotonic`) the values are required at
+        :type deadline: float
+        :returns: The values encoded in the corresponding type, empty list for values not available
+        :rtype: list of :class:`secsgem.secs.variables.Base`
+        """
+        return self._check_requested_values(self.on_sv_values_request(svs, deadline), svs, deadline,
+                                            "status variables", secsgem.secs.data_items.SV)
+
     def _get_sv_value(self, sv):
         """
         Get the status variable value depending on its configuation.
@@ -393,6 +576,10 @@ class GemEquipmentHandler(GemHandler):
         if sv.svid == SVID_ALARMS_SET:
             alarms = self._get_alarms_set()
             return sv.value_type(secsgem.secs.data_items.SV, alarms)
+        if sv.svid == SVID_SPOOL_COUNT_ACTUAL:
+            return sv.value_type(len(self.spool) if self.spool is not None else 0)
+        if sv.svid == SVID_SPOOL_COUNT_TOTAL:
+            return sv.value_type(self.spool.total if self.spool is not None else 0)
 
         if sv.use_callback:
             return self.on_sv_value_request(sv.id_type(sv.svid), sv)
@@ -410,22 +597,14 @@ class GemEquipmentHandler(GemHandler):
         """
         del handler  # unused parameters
 
-        message = self.secs_decode(packet)
-
-        responses = []
+        svids = self.secs_decode_value(packet)
 
-        if len(message) == 0:
-            for svid, sv in self._status_variables.items():
-                responses.append(self._get_sv_value(sv))
+        if len(svids) == 0:
+            svs = list(self._status_variables.values())
         else:
-            for svid in message:
-                if svid not in self._status_variables:
-                    responses.append(secsgem.secs.variables.Array(secsgem.secs.data_items.SV, []))
-                else:
-                    sv = self._status_variables[svid]
-                    responses.append(self._get_sv_value(sv))
+            svs = [self._status_variables.get(svid) for svid in svids]
 
-        return self.stream_function(1, 4)(responses)
+        return self.stream_function(1, 4)(self._get_sv_values(svs))
 
     def _on_s01f11(self, handler, packet):
         """
@@ -492,19 +671,30 @@ class GemEquipmentHandler(GemHandler):
         """
         Triggers the supplied collection events.
 
+        The reports are built when the events are triggered and queued in :attr:`eventQueue`,
+        this function returns without waiting for the host to acknowledge them.
+        If the host is not communicating and S6F11 is spooled, the reports are put into the :attr:`spool` instead.
+
         :param ceids: List of collection events
         :type ceids: list of various
+        :returns: futures resolved with the S6F12 (None if the report was dropped) of the queued reports
+        :rtype: list of :class:`concurrent.futures.Future`
         """
         if not isinstance(ceids, list):
             ceids = [ceids]
 
+        futures = []
+
         for ceid in ceids:
             if ceid in self._registered_collection_events:
                 if self._registered_collection_events[ceid].enabled:
                     reports = self._build_collection_event(ceid)
+                    function = self.stream_function(6, 11)({"DATAID": 1, "CEID": ceid, "RPT": reports})
 
-                    self.send_and_waitfor_response(self.stream_function(6, 11)(
-                        {"DATAID": 1, "CEID": ceid, "RPT": reports}))
+                    if not self._spool_message(function):
+                        futures.append(self.eventQueue.put(function))
+
+        return futures
 
     def _on_s02f33(self, handler, packet):
         """
@@ -560,6 +750,9 @@ class GemEquipmentHandler(GemHandler):
                         # add report
                         self._registered_reports[report.RPTID] = CollectionEventReport(report.RPTID, report.VID)
 
+            # links were modified in place
+            self.reportPlans.invalidate()
+
         return self.stream_function(2, 34)(DRACK)
 
     def _on_s02f35(self, handler, packet):
@@ -612,6 +805,9 @@ class GemEquipmentHandler(GemHandler):
                         self._registered_collection_events[event.CEID.get()] = \
                             CollectionEventLink(self._collection_events[event.CEID.get()], event.RPTID.get())
 
+            # links were modified in place
+            self.reportPlans.invalidate()
+
         return self.stream_function(2, 36)(LRACK)
 
     def _on_s02f37(self, handler, packet):
@@ -687,27 +883,96 @@ class GemEquipmentHandler(GemHandler):
         """
         Build reports for a collection event.
 
+        The reports are built with the compiled plan of the collection event from :attr:`reportPlans`.
+
         :param ceid: collection event to build
         :type ceid: integer
         :returns: collection event data
         :rtype: array
         """
+        plan = self.reportPlans.get(ceid)
+        if plan is None:
+            raise KeyError(ceid)
+
+        return plan.build(self._get_value_deadline())
+
+    def _compile_report_plan(self, ceid):
+        """
+        Compile the plan building the reports for a collection event.
+
+        The variables are looked up once, each is resolved to the function providing its value.
+        Variables with callback are requested together with :func:`on_sv_values_request` and
+        :func:`on_dv_values_request`.
+        Variables used in several reports are read once.
+        Variables not defined anymore are left out, as when building the reports without plan.
+
+        :param ceid: collection event to compile
+        :type ceid: integer
+        :returns: plan, None if the collection event is not linked
+        :rtype: :class:`secsgem.gem.GemReportPlan`
+        """
+        link = self._registered_collection_events.get(ceid)
+        if link is None:
+            return None
+
+        getters = []
+        svs = []
+        dvs = []
+
+        # value of each variable, as list it is stored in and position
+        values = {}
         reports = []
 
-        for rptid in self._registered_collection_events[ceid].reports:
-            report = self._registered_reports[rptid]
-            variables = []
-            for var in report.vars:
+        for rptid in link.reports:
+            report_values = []
+            for var in self._registered_reports[rptid].vars:
                 if var in self._status_variables:
-                    v = self._get_sv_value(self._status_variables[var])
-                    variables.append(v)
+                    variable = self._status_variables[var]
+                    batch = svs if variable.use_callback and variable.svid not in _BUILTIN_SVIDS else None
                 elif var in self._data_values:
-                    v = self._get_dv_value(self._data_values[var])
-                    variables.append(v)
+                    variable = self._data_values[var]
+                    batch = dvs if variable.use_callback else None
+                else:
+                    continue
+
+                value = values.get(id(variable))
+                if value is None:
+                    if batch is None:
+                        batch = getters
+                        batch.append(self._get_variable_getter(variable))
+                    else:
+                        batch.append(variable)
 
-            reports.append({"RPTID": rptid, "V": variables})
+                    value = values[id(variable)] = (batch, len(batch) - 1)
 
-        return reports
+                report_values.append(value)
+
+            reports.append((rptid, report_values))
+
+        offsets = {id(getters): 0, id(svs): len(getters), id(dvs): len(getters) + len(svs)}
+
+        batches = []
+        if svs:
+            batches.append((self._request_sv_values, tuple(svs)))
+        if dvs:
+            batches.append((self._request_dv_values, tuple(dvs)))
+
+        return GemReportPlan(ceid, tuple((rptid, tuple(offsets[id(batch)] + position for (batch, position) in indexes))
+                                         for (rptid, indexes) in reports), tuple(getters), tuple(batches))
+
+    def _get_variable_getter(self, variable):
+        """
+        Get the function providing the value of a variable without batched callback for a report plan.
+
+        :param variable: The status variable or data value
+        :type variable: :class:`secsgem.gem.StatusVariable` or :class:`secsgem.gem.DataValue`
+        :returns: function and its arguments
+        :rtype: tuple
+        """
+        if isinstance(variable, StatusVariable) and variable.svid in _BUILTIN_SVIDS:
+            return (self._get_sv_value, (variable, ))
+
+        return (_get_variable_value, (variable.value_type, variable))
 
     def _on_s01f23(self, handler, packet):
         message = self.secs_decode(packet)
@@ -787,6 +1052,12 @@ class GemEquipmentHandler(GemHandler):
             return ec.value_type(self.establishCommunicationTimeout)
         if ec.ecid == ECID_TIME_FORMAT:
             return ec.value_type(self._time_format)
+        if ec.ecid == ECID_MAX_SPOOL_TRANSMIT:
+            return ec.value_type(self.maxSpoolTransmit)
+        if ec.ecid == ECID_OVERWRITE_SPOOL:
+            return ec.value_type(self.overwriteSpool)
+        if ec.ecid == ECID_ENABLE_SPOOLING:
+            return ec.value_type(self.enableSpooling)
 
         if ec.use_callback:
             return self.on_ec_value_request(ec.id_type(ec.ecid), ec)
@@ -805,6 +1076,12 @@ class GemEquipmentHandler(GemHandler):
             self.establishCommunicationTimeout = value
         if ec.ecid == ECID_TIME_FORMAT:
             self._time_format = value
+        if ec.ecid == ECID_MAX_SPOOL_TRANSMIT:
+            self.maxSpoolTransmit = value.get()
+        if ec.ecid == ECID_OVERWRITE_SPOOL:
+            self.overwriteSpool = value.get()
+        if ec.ecid == ECID_ENABLE_SPOOLING:
+            self.enableSpooling = value.get()
 
         if ec.use_callback:
             self.on_ec_value_update(ec.id_type(ec.ecid), ec, value)
@@ -924,48 +1201,76 @@ class GemEquipmentHandler(GemHandler):
         """
         Set the list of the alarms.
 
+        The alarm report (S5F1) is queued in :attr:`eventQueue` before the report of the collection event,
+        so the host receives them in this order.
+        This function returns without waiting for the host to acknowledge the alarm report.
+
         :param alid: Alarm id
         :type alid: str/int
+        :returns: future resolved with the S5F2, None if no alarm report was queued (alarm disabled, unchanged or
+            spooled)
+        :rtype: :class:`concurrent.futures.Future`
         """
         if alid not in self.alarms:
             raise ValueError(f"Unknown alarm id {alid}")
 
         if self.alarms[alid].set:
-            return
+            return None
+
+        future = None
 
         if self.alarms[alid].enabled:
-            self.send_and_waitfor_response(self.stream_function(5, 1)(
+            function = self.stream_function(5, 1)(
                 {
                     "ALCD": self.alarms[alid].code | secsgem.secs.data_items.ALCD.ALARM_SET,
                     "ALID": alid,
                     "ALTX": self.alarms[alid].text
-                }))
+                })
+
+            if not self._spool_message(function):
+                future = self.eventQueue.put(function)
 
         self.alarms[alid].set = True
 
         self.trigger_collection_events([self.alarms[alid].ce_on])
 
+        return future
+
     def clear_alarm(self, alid):
         """
         Clear the list of the alarms.
 
+        The alarm report (S5F1) is queued in :attr:`eventQueue` before the report of the collection event,
+        so the host receives them in this order.
+        This function returns without waiting for the host to acknowledge the alarm report.
+
         :param alid: Alarm id
         :type alid: str/int
+        :returns: future resolved with the S5F2, None if no alarm report was queued (alarm disabled, unchanged or
+            spooled)
+        :rtype: :class:`concurrent.futures.Future`
         """
         if alid not in self.alarms:
             raise ValueError(f"Unknown alarm id {alid}")
 
         if not self.alarms[alid].set:
-            return
+            return None
+
+        future = None
 
         if self.alarms[alid].enabled:
-            self.send_and_waitfor_response(self.stream_function(5, 1)({"ALCD": self.alarms[alid].code,
-                                                                       "ALID": alid, "ALTX": self.alarms[alid].text}))
+            function = self.stream_function(5, 1)({"ALCD": self.alarms[alid].code,
+                                                   "ALID": alid, "ALTX": self.alarms[alid].text})
+
+            if not self._spool_message(function):
+                future = self.eventQueue.put(function)
 
         self.alarms[alid].set = False
 
         self.trigger_collection_events([self.alarms[alid].ce_off])
 
+        return future
+
     def _on_s05f03(self, handler, packet):
         """
         Handle Stream 5, Function 3, Alarm en-/disabled.
@@ -1108,8 +1413,302 @@ class GemEquipmentHandler(GemHandler):
     def _on_rcmd_STOP(self):
         self.logger.warning("remote command STOP not implemented, this is required for GEM compliance")
 
+    # trace data collection
+
+    def _on_s02f23(self, handler, packet):
+        """
+        Handle Stream 2, Function 23, Trace initialize send.
+
+        :param handler: handler the message was received on
+        :type handler: :class:`secsgem.hsms.handler.HsmsHandler`
+        :param packet: complete message received
+        :type packet: :class:`secsgem.hsms.HsmsPacket`
+        """
+        del handler  # unused parameters
+
+        message = self.secs_decode(packet)
+
+        trid = message.TRID.get()
+
+        try:
+            totsmp = int(message.TOTSMP.get())
+            repgsz = int(message.REPGSZ.get())
+        except ValueError:
+            return self.stream_function(2, 24)(secsgem.secs.data_items.TIAACK.INVALID_REPGSZ)
+
+        # no samples -> stop the trace
+        if totsmp == 0:
+            self.traceScheduler.stop(trid)
+            return self.stream_function(2, 24)(secsgem.secs.data_items.TIAACK.ACCEPTED)
+
+        tiaack = secsgem.secs.data_items.TIAACK.ACCEPTED
+        period = parse_dsper(message.DSPER.get())
+        svids = message.SVID.get()
+
+        if len(svids) > self.trace_svid_limit:
+            tiaack = secsgem.secs.data_items.TIAACK.TOO_MANY_SVIDS
+        elif trid not in self.traceScheduler and len(self.traceScheduler) >= self.trace_limit:
+            tiaack = secsgem.secs.data_items.TIAACK.NO_MORE_TRACE_ALLOWED
+        elif not period:
+            tiaack = secsgem.secs.data_items.TIAACK.INVALID_PERIOD
+        elif not svids or any(svid not in self._status_variables for svid in svids):
+            tiaack = secsgem.secs.data_items.TIAACK.UNKNOWN_SVID
+        elif repgsz < 1 or totsmp < 0:
+            # a last group with less than REPGSZ samples is sent when the trace is done
+            tiaack = secsgem.secs.data_items.TIAACK.INVALID_REPGSZ
+
+        if tiaack == secsgem.secs.data_items.TIAACK.ACCEPTED:
+            self.traceScheduler.start(GemTrace(trid, period, totsmp, repgsz,
+                                               [self._status_variables[svid] for svid in svids],
+                                               type(message.TRID.value)))
+
+        return self.stream_function(2, 24)(tiaack)
+
+    def _sample_trace(self, trace, scheduled):
+        """
+        Take a sample of a trace, called by the :attr:`traceScheduler` thread.
+
+        The values are requested with :func:`on_sv_values_request`, the deadline is the next sample.
+        They are encoded right away, so a complete group is sent as :class:`secsgem.gem.GemTraceReport`
+        without encoding all its values at once.
+        Complete groups are queued in :attr:`traceQueue` (or spooled) without waiting for the host.
+
+        :param trace: trace to sample
+        :type trace: :class:`secsgem.gem.GemTrace`
+        :param scheduled: time (:func:`time.monotonic`) the sample was scheduled for
+        :type scheduled: float
+        """
+        values = self._get_sv_values(trace.svs, scheduled + trace.period)
+        report = trace.add_sample([value.encode() for value in values], self._get_clock())
+
+        if report is not None:
+            function = GemTraceReport(report)
+
+            if not self._spool_message(function):
+                self.traceQueue.put(function)
+
+    # spooling
+
+    @property
+    def overwriteSpool(self):  # pylint: disable=invalid-name
+        """
+        Overwrite the oldest spooled messages if the spool is full (equipment constant `OverWriteSpool`).
+
+        This is the :attr:`secsgem.gem.GemSpool.overwrite` setting of the attached :attr:`spool`,
+        so a spool attached later keeps the setting it was created with.
+        Changing the equipment constant changes the setting of the attached spool.
+        """
+        if self.spool is not None:
+            return self.spool.overwrite
+
+        return self._overwriteSpool
+
+    @overwriteSpool.setter
+    def overwriteSpool(self, value):  # pylint: disable=invalid-name
+        self._overwriteSpool = value
+
+        if self.spool is not None:
+            self.spool.overwrite = value
+
+    def _spool_message(self, function):
+        """
+        Put a message to the host into the spool, if the host is not communicating and the message is spooled.
+
+        :param function: message to the host
+        :type function: :class:`secsgem.secs.functions.base.SecsStreamFunction`
+        :returns: True if the message was handled by the spool, even if the full spool rejected it
+        :rtype: boolean
+        """
+        if self.spool is None or not self.enableSpooling or self.communicationState.isstate("COMMUNICATING"):
+            return False
+
+        functions = self.spooledStreams.get(function.stream)
+        if functions is None or (functions and function.function not in functions):
+            return False
+
+        if not self.spool.append(function.stream, function.function, function.encode()):
+            self.logger.warning("spool full, discarding %s", function.__class__.__name__)
+
+        return True
+
+    def _on_s02f43(self, handler, packet):
+        """
+        Handle Stream 2, Function 43, Reset spooling streams and functions.
+
+        :param handler: handler the message was received on
+        :type handler: :class:`secsgem.hsms.handler.HsmsHandler`
+        :param packet: complete message received
+        :type packet: :class:`secsgem.hsms.HsmsPacket`
+        """
+        del handler  # unused parameters
+
+        message = self.secs_decode(packet)
+
+        streams = {}
+        errors = []
+
+        for stream in message:
+            strid = stream.STRID.get()
+            fcnids = stream.FCNID.get()
+
+            strack = None
+            invalid_functions = []
+
+            if strid == 1:
+                strack = secsgem.secs.data_items.STRACK.STREAM_NOT_ALLOWED
+            elif strid not in self.secs_streams_functions:
+                strack = secsgem.secs.data_items.STRACK.UNKNOWN_STREAM
+            else:
+                for fcnid in fcnids:
+                    if fcnid not in self.secs_streams_functions[strid]:
+                        strack = secsgem.secs.data_items.STRACK.UNKNOWN_FUNCTION
+                        invalid_functions.append(fcnid)
+                    elif fcnid % 2 == 0:
+                        strack = secsgem.secs.data_items.STRACK.SECONDARY_FUNCTION
+                        invalid_functions.append(fcnid)
+
+            if strack is not None:
+                errors.append({"STRID": strid, "STRACK": strack, "FCNID": invalid_functions})
+            else:
+                streams[strid] = fcnids
+
+        if errors:
+            return self.stream_function(2, 44)({"RSPACK": secsgem.secs.data_items.RSPACK.REJECTED, "DATA": errors})
+
+        # the configuration is replaced, an empty list disables spooling
+        self.spooledStreams = streams
+
+        return self.stream_function(2, 44)({"RSPACK": secsgem.secs.data_items.RSPACK.OK, "DATA": []})
+
+    def _on_s06f23(self, handler, packet):
+        """
+        Handle Stream 6, Function 23, Request spooled data.
+
+        The spooled messages are transmitted in a thread of their own, after the acknowledge was sent.
+
+        :param handler: handler the message was received on
+        :type handler: :class:`secsgem.hsms.handler.HsmsHandler`
+        :param packet: complete message received
+        :type packet: :class:`secsgem.hsms.HsmsPacket`
+        """
+        del handler  # unused parameters
+
+        rsdc = self.secs_decode(packet).get()
+
+        if self.spool is None or len(self.spool) == 0:
+            return self.stream_function(6, 24)(secsgem.secs.data_items.RSDA.NO_SPOOL_DATA)
+
+        with self._spoolTransmitLock:
+            if self._spoolTransmitThread is not None and self._spoolTransmitThread.is_alive():
+                return self.stream_function(6, 24)(secsgem.secs.data_items.RSDA.RETRYABLE_BUSY)
+
+            if rsdc == secsgem.secs.data_items.RSDC.PURGE:
+                self.spool.purge()
+            else:
+                self._spoolTransmitThread = threading.Thread(target=self._transmit_spool,
+                                                             name="secsgem_gemEquipmentHandler_transmitSpool")
+                self._spoolTransmitThread.daemon = True  # kill thread automatically on main program termination
+                self._spoolTransmitThread.start()
+
+        return self.stream_function(6, 24)(secsgem.secs.data_items.RSDA.OK)
+
+    def _transmit_spool(self):
+        """
+        Send the spooled messages to the host, at most :attr:`maxSpoolTransmit` (0 for all).
+
+        The messages are sent in order, at most :attr:`spool_transmit_window` wait for their reply at the same time.
+        A message is removed from the spool when it and all messages before were replied,
+        transmitting stops at the first message without reply.
+        """
+        window = threading.BoundedSemaphore(self.spool_transmit_window)
+        pending = collections.deque()
+        lock = threading.Lock()
+
+        def on_reply(_):
+            with lock:
+                self._remove_transmitted(pending)
+
+            window.release()
+
+        for message in self.spool.messages(self.maxSpoolTransmit or None):
+            window.acquire()  # pylint: disable=consider-using-with
+
+            with lock:
+                if not self._remove_transmitted(pending):
+                    window.release()
+                    break
+
+                future = self.send_async(message)
+                pending.append(future)
+
+            future.add_done_callback(on_reply)
+
+        with lock:
+            sent = list(pending)
+
+        for future in sent:
+            future.result()
+
+        with lock:
+            if not self._remove_transmitted(pending):
+                self.logger.warning("transmitting spool failed, %d messages remaining", len(self.spool))
+
+    def _remove_transmitted(self, pending):
+        """
+        Remove the replied messages at the start of the spool.
+
+        :param pending: futures of the sent messages, in the order of the spool
+        :type pending: :class:`collections.deque`
+        :returns: False if a message was not replied
+        :rtype: boolean
+        """
+        while pending and pending[0].done():
+            if pending[0].result() is None:
+                return False
+
+            pending.popleft()
+            self.spool.pop()
+
+        return True
+
     # helpers
 
+    def _get_value_deadline(self):
+        """
+        Get the deadline for requesting variable values.
+
+        :returns: time (:func:`time.monotonic`) the values are required at
+        :rtype: float
+        """
+        return time.monotonic() + self.connection.T3 * self.value_request_deadline
+
+    def _check_requested_values(self, values, variables, deadline, name, data_item):
+        """
+        Check the values returned for a batched request.
+
+        :param values: returned values
+        :type values: list
+        :param variables: requested variables
+        :type variables: tuple
+        :param deadline: time (:func:`time.monotonic`) the values were required at
+        :type deadline: float
+        :param name: name of the variables for messages
+        :type name: string
+        :param data_item: data item of the empty list used for values that are not available
+        :type data_item: :class:`secsgem.secs.data_items.DataItemBase`
+        :returns: values, with empty lists for values that are not available
+        :rtype: list of :class:`secsgem.secs.variables.Base`
+        """
+        values = list(values)
+
+        if len(values) != len(variables):
+            raise ValueError(f"{len(values)} values returned for {len(variables)} {name}")
+
+        if time.monotonic() > deadline:
+            self.logger.warning("requesting %d %s took longer than the deadline", len(variables), name)
+
+        return [secsgem.secs.variables.Array(data_item, []) if value is None else value for value in values]
+
     def _get_clock(self):
         """
         Get the clock depending on configured time format.
@@ -1191,6 +1790,12 @@ class GemEquipmentHandler(GemHandler):
 
         return set_alarms
 
+    def disable(self):
+        """Disable the connection, the running traces are stopped."""
+        self.traceScheduler.clear()
+
+        super().disable()
+
     def on_connection_closed(self, connection):
         """Handle connection was closed event."""
         # call parent handlers
@@ -0,0 +1,182 @@
+#####################################################################
+# event_queue.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+"""Contains the queue delivering collection event reports to the host."""
+
+import collections
+import concurrent.futures
+import threading
+import time
+
+
+class GemEventQueue:
+    """
+    Outbound queue for collection event reports (S6F11) and alarm reports (S5F1) of a gem equipment handler.
+
+    The reports are queued with :func:`put`, which returns without waiting for the host.
+    They are sent in the order they were queued, at most :attr:`window` reports wait for their
+    acknowledge (S6F12 or S5F2) at the same time.
+    Other primary messages sent directly by the handler are not ordered relative to the queued reports.
+
+    Each queued report gets a :class:`concurrent.futures.Future`, which is resolved with the decoded acknowledge,
+    or with None if the report was dropped.
+    Reports are dropped if the queue is full, or if they were not acknowledged
+    (sending failed, the reply timeout T3 elapsed or the connection was closed).
+
+    **Example**::
+
+        queue = secsgem.gem.GemEventQueue(handler, window=4)
+
+        future = queue.put(secsgem.secs.functions.SecsS06F11({"DATAID": 1, "CEID": 50, "RPT": []}))
+        future.add_done_callback(lambda f: print(f.result()))
+    """
+
+    def __init__(self, handler, window=1, max_depth=1000):
+        """
+        Initialize an event queue.
+
+        :param handler: handler used for sending the reports
+        :type handler: :class:`secsgem.secs.SecsHandler`
+        :param window: maximum number of reports waiting for their acknowledge
+        :type window: integer
+        :param max_depth: maximum number of reports waiting for sending, further reports are dropped
+        :type max_depth: integer
+        """
+        if window < 1:
+            raise ValueError(f"window must be at least 1, got {window}")
+
+        self.handler = handler
+        self.window = window
+        self.max_depth = max_depth
+
+        self._lock = threading.Lock()
+        self._queue = collections.deque()
+        self._inFlight = 0
+        self._sending = False
+
+        self.delivered = 0
+        """ Number of acknowledged reports ."""
+
+        self.dropped = 0
+        """ Number of dropped reports ."""
+
+        self.latency_last = None
+        """ Time in seconds between sending the last acknowledged report and receiving its S6F12 ."""
+
+        self.latency_max = 0.0
+        """ Maximum time in seconds between sending a report and receiving its S6F12 ."""
+
+        self._latencyTotal = 0.0
+
+    @property
+    def depth(self):
+        """Get the number of reports waiting for sending."""
+        return len(self._queue)
+
+    @property
+    def in_flight(self):
+        """Get the number of sent reports waiting for their acknowledge."""
+        return self._inFlight
+
+    @property
+    def latency_average(self):
+        """Get the average time in seconds between sending a report and receiving its S6F12."""
+        if self.delivered == 0:
+            return None
+
+        return self._latencyTotal / self.delivered
+
+    def put(self, function):
+        """
+        Queue a report for sending.
+
+        The report is sent from the calling thread if the window has a free slot,
+        otherwise from the send thread of the handler when an acknowledge released a slot.
+
+        :param function: report to send
+        :type function: :class:`secsgem.secs.functions.SecsS06F11` or :class:`secsgem.secs.functions.SecsS05F01`
+        :returns: future resolved with the acknowledge, None if the report was dropped
+        :rtype: :class:`concurrent.futures.Future`
+        """
+        future = concurrent.futures.Future()
+
+        with self._lock:
+            full = len(self._queue) >= self.max_depth
+            if full:
+                self.dropped += 1
+            else:
+                self._queue.append((function, future))
+
+        if full:
+            self.handler.logger.warning("event queue full, dropping %s", function.__class__.__name__)
+            future.set_result(None)
+            return future
+
+        self._send_queued()
+
+        return future
+
+    def clear(self):
+        """Drop all reports waiting for sending."""
+        with self._lock:
+            entries = list(self._queue)
+            self._queue.clear()
+            self.dropped += len(entries)
+
+        for (_, future) in entries:
+            future.set_result(None)
+
+    def _send_queued(self):
+        # only one thread sends at a time, others just leave the queued reports to it.
+        # reports failing immediately release their slot while sending, so this can't recurse.
+        with self._lock:
+            if self._sending:
+                return
+
+            self._sending = True
+
+        while True:
+            with self._lock:
+                if not self._queue or self._inFlight >= self.window:
+                    self._sending = False
+                    return
+
+                (function, future) = self._queue.popleft()
+                self._inFlight += 1
+
+            sent = time.monotonic()
+            response = self.handler.send_async(function)
+            response.add_done_callback(lambda response, future=future, sent=sent:
+                                       self._on_response(response, future, sent))
+
+    def _on_response(self, response, future, sent):
+        packet = response.result() if not response.cancelled() else None
+        latency = time.monotonic() - sent
+
+        with self._lock:
+            self._inFlight -= 1
+
+            if packet is None:
+                self.dropped += 1
+            else:
+                self.delivered += 1
+                self.latency_last = latency
+                self.latency_max = max(self.latency_max, latency)
+                self._latencyTotal += latency
+
+        future.set_result(None if packet is None else self.handler.secs_decode(packet))
+
+        # called from the receiving or timer thread, which must not block while sending the next report
+        self.handler.send_in_background(self._send_queued)
@@ -151,9 +151,7 @@ class GemHandler(secsgem.secs.SecsHandler):
         elif self.communicationState.isstate('WAIT_DELAY'):
             pass
         elif self.communicationState.isstate('COMMUNICATING'):
-            threading.Thread(target=self._handle_stream_function, args=(packet, ),
-                             name=f"secsgem_gemHandler_callback_S{packet.header.stream}F{packet.header.function}"
-                             ).start()
+            self._dispatch_stream_function(packet)
 
     def _on_hsms_select(self):
         """Selected received from hsms layer."""
@@ -176,13 +174,13 @@ class GemHandler(secsgem.secs.SecsHandler):
         """
         self.logger.debug("connectionState -> WAIT_CRA")
 
-        self.waitCRATimer = threading.Timer(self.connection.T3, self._on_wait_cra_timeout)
-        self.waitCRATimer.start()
+        self.waitCRATimer = self._start_timer(self.connection.T3, self._on_wait_cra_timeout)
 
+        # entered from the communication delay timer too, which must not block while sending
         if self.isHost:
-            self.send_stream_function(self.stream_function(1, 13)())
+            self.send_in_background(self.send_stream_function, self.stream_function(1, 13)())
         else:
-            self.send_stream_function(self.stream_function(1, 13)([self.MDLN, self.SOFTREV]))
+            self.send_in_background(self.send_stream_function, self.stream_function(1, 13)([self.MDLN, self.SOFTREV]))
 
     def _on_state_wait_delay(self, _):
         """
@@ -193,8 +191,7 @@ class GemHandler(secsgem.secs.SecsHandler):
         """
         self.logger.debug("connectionState -> WAIT_DELAY")
 
-        self.commDelayTimer = threading.Timer(self.establishCommunicationTimeout, self._on_wait_comm_delay_timeout)
-        self.commDelayTimer.start()
+        self.commDelayTimer = self._start_timer(self.establishCommunicationTimeout, self._on_wait_comm_delay_timeout)
 
     def _on_state_leave_wait_cra(self, _):
         """
@@ -76,16 +76,7 @@ class GemHostHandler(GemHandler):
         """
         self.logger.info("Subscribing to collection event %s", ceid)
 
-        if report_id is None:
-            report_id = self.reportIDCounter
-            self.reportIDCounter += 1
-
-        # note subscribed reports
-        self.reportSubscriptions[report_id] = dvs
-        if ceid in self.ce_report_subscriptions:
-            self.ce_report_subscriptions[ceid].add(report_id)
-        else:
-            self.ce_report_subscriptions[ceid] = set([report_id])
+        report_id = self._add_report_subscription(ceid, dvs, report_id)
 
         # create report
         self.send_and_waitfor_response(self.stream_function(2, 33)(
@@ -98,6 +89,31 @@ class GemHostHandler(GemHandler):
         # enable collection event
         self.send_and_waitfor_response(self.stream_function(2, 37)({"CEED": True, "CEID": [ceid]}))
 
+    def _add_report_subscription(self, ceid, dvs, report_id):
+        """
+        Note a report subscribed for a collection event.
+
+        :param ceid: ID of the collection event
+        :type ceid: integer
+        :param dvs: DV IDs of the report
+        :type dvs: list of integers
+        :param report_id: ID for report, autonumbering if None
+        :type report_id: integer
+        :returns: ID of the report
+        :rtype: integer
+        """
+        if report_id is None:
+            report_id = self.reportIDCounter
+            self.reportIDCounter += 1
+
+        self.reportSubscriptions[report_id] = dvs
+        if ceid in self.ce_report_subscriptions:
+            self.ce_report_subscriptions[ceid].add(report_id)
+        else:
+            self.ce_report_subscriptions[ceid] = set([report_id])
+
+        return report_id
+
     def list_events(self, ce_ids=[]):
         """
         List events.
@@ -250,7 +266,7 @@ class GemHostHandler(GemHandler):
         """
         del handler  # unused parameters
 
-        message = self.secs_decode(packet)
+        message = self.secs_decode_value(packet)
 
         reports = self._preprocess_event_report(message)
 
@@ -264,13 +280,13 @@ class GemHostHandler(GemHandler):
         """
         Common code for preprocessing the data received by S6,F11 and S6,F15/16
 
-        :param message: decoded hsms packet (S6,F11 or S6,F16 message)
+        :param message: decoded value of the hsms packet (S6,F11 or S6,F16 message)
         """
         reports = []
 
-        for report in message.RPT:
-            report_values = report.V.get()
-            report_dvs = self._get_report_dvs(report.RPTID.get(), 
+        for report in message["RPT"]:
+            report_values = report["V"]
+            report_dvs = self._get_report_dvs(report["RPTID"], 
                                                 len(report_values))
 
             values = []
@@ -280,11 +296,11 @@ class GemHostHandler(GemHandler):
                                "value": report_values[i], 
                                "name": self.get_dvid_name(s)})
 
-            data = {"dataid" : message.DATAID.get(),
-                    "ceid": message.CEID.get(), 
-                    "rptid": report.RPTID.get(), 
+            data = {"dataid" : message["DATAID"],
+                    "ceid": message["CEID"], 
+                    "rptid": report["RPTID"], 
                     "values": values,
-                    "name": self.get_ceid_name(message.CEID.get()), 
+                    "name": self.get_ceid_name(message["CEID"]), 
                     "handler": self.connection, 'peer': self}
 
             reports.append(data)
@@ -320,7 +336,7 @@ class GemHostHandler(GemHandler):
         """
         packet = self.send_and_waitfor_response(
                         self.stream_function(6, 15)(ceid))
-        message = self.secs_decode(packet)
+        message = self.secs_decode_value(packet)
 
         return self._preprocess_event_report(message)
 
@@ -334,6 +350,18 @@ class GemHostHandler(GemHandler):
         """
         packet = self.send_and_waitfor_response(
                         self.stream_function(6, 19)(rptid))
+
+        return self._process_individual_report(rptid, packet)
+
+    def _process_individual_report(self, rptid, packet):
+        """
+        Create the report data from the S6,F20 response.
+
+        :param rptid: id of report
+        :type rptid: int
+        :param packet: received S6,F20 packet
+        :type packet: :class:`secsgem.hsms.HsmsPacket`
+        """
         msg = self.secs_decode(packet)
 
         report_values = msg.get()
@@ -364,9 +392,21 @@ class GemHostHandler(GemHandler):
                 {"DATAID" : 0, 
                  "DATA" : [{"RPTID" : rptid, "VID" : []}]})
         packet = self.send_and_waitfor_response(msg)
+
+        self._on_report_cleared(rptid, packet)
+
+    def _on_report_cleared(self, rptid, packet):
+        """
+        Remove the report subscription if the S2,F34 response acknowledged deleting the report.
+
+        :param rptid: id of report
+        :type rptid: int
+        :param packet: received S2,F34 packet
+        :type packet: :class:`secsgem.hsms.HsmsPacket`
+        """
         ack = self.secs_decode(packet).get()
         if not ack == secsgem.secs.data_items.DRACK.ACK:
-            self.logger.error("Operation failed: error code={}".format(DRACK))
+            self.logger.error("Operation failed: error code={}".format(ack))
         else:
             self.reportSubscriptions.pop(rptid, None)
             for ce in self.ce_report_subscriptions.values():
@@ -385,9 +425,21 @@ class GemHostHandler(GemHandler):
                 {"DATAID" : 0, 
                  "DATA" : [{"CEID" : ceid, "RPTID" : []}]})
         packet = self.send_and_waitfor_response(msg)
+
+        self._on_event_report_cleared(ceid, packet)
+
+    def _on_event_report_cleared(self, ceid, packet):
+        """
+        Remove the report subscriptions if the S2,F36 response acknowledged unlinking the reports.
+
+        :param ceid: id of collection event
+        :type ceid: int
+        :param packet: received S2,F36 packet
+        :type packet: :class:`secsgem.hsms.HsmsPacket`
+        """
         ack = self.secs_decode(packet).get()
         if not ack == secsgem.secs.data_items.LRACK.ACK:
-            self.logger.error("Operation failed: error code={}".format(DRACK))
+            self.logger.error("Operation failed: error code={}".format(ack))
         else:
             rptids = self.ce_report_subscriptions.pop(ceid,[])
             for report_id in rptids:
@@ -0,0 +1,239 @@
+#####################################################################
+# report_plan.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+"""Contains the compiled report plans of collection events."""
+
+import threading
+
+
+class GemRegistry(dict):
+    """
+    Dictionary counting its modifications.
+
+    Used for the variables, reports and links of a gem equipment handler,
+    so :class:`GemReportPlans` notices if an entry was added, replaced or removed.
+    Changes of the stored objects themselves are not counted.
+
+    **Example**::
+
+        >>> import secsgem.gem
+        >>>
+        >>> registry = secsgem.gem.GemRegistry()
+        >>> registry[1] = "value"
+        >>> registry.update({2: "other"})
+        >>> registry.version
+        2
+    """
+
+    __slots__ = ("version", )
+
+    def __init__(self, *args, **kwargs):
+        """Initialize a registry, the arguments are passed to :class:`dict`."""
+        super().__init__(*args, **kwargs)
+
+        self.version = 0
+
+    def __setitem__(self, key, value):
+        """Set an entry."""
+        super().__setitem__(key, value)
+        self.version += 1
+
+    def __delitem__(self, key):
+        """Remove an entry."""
+        super().__delitem__(key)
+        self.version += 1
+
+    def clear(self):
+        """Remove all entries."""
+        super().clear()
+        self.version += 1
+
+    def pop(self, *args):
+        """Remove an entry and return its value."""
+        result = super().pop(*args)
+        self.version += 1
+        return result
+
+    def popitem(self):
+        """Remove the last entry and return its key and value."""
+        result = super().popitem()
+        self.version += 1
+        return result
+
+    def setdefault(self, key, default=None):
+        """Get an entry, setting it to default if it is missing."""
+        result = super().setdefault(key, default)
+        self.version += 1
+        return result
+
+    def update(self, *args, **kwargs):
+        """Set the entries from another mapping or iterable and keyword arguments."""
+        super().update(*args, **kwargs)
+        self.version += 1
+
+
+class GemReportPlan:
+    """
+    Immutable plan building the reports of a collection event.
+
+    The variables of the reports are resolved when the plan is compiled.
+    Variables read one by one are stored as function and arguments returning the secs encoded value,
+    variables requested together as function and tuple of the variables, returning all values with one call.
+    Each variable is read once per build, even if it is used in several reports.
+    The reports reference the values by index, first the single values then the values of the batches in order.
+    """
+
+    __slots__ = ("ceid", "getters", "batches", "reports", "value_count", "variable_count")
+
+    def __init__(self, ceid, reports, getters=(), batches=()):
+        """
+        Initialize a report plan.
+
+        :param ceid: collection event of the plan
+        :type ceid: various
+        :param reports: tuples of report id and tuple of the indexes of the report values
+        :type reports: tuple
+        :param getters: tuples of function and arguments for each single value
+        :type getters: tuple
+        :param batches: tuples of function and the variables it returns the values for
+        :type batches: tuple
+        """
+        self.ceid = ceid
+        self.reports = reports
+        self.getters = getters
+        self.batches = batches
+        self.value_count = len(getters) + sum(len(variables) for (_, variables) in batches)
+        self.variable_count = sum(len(indexes) for (_, indexes) in reports)
+
+    def build(self, *args):
+        """
+        Build the reports for the current values of the variables.
+
+        :param args: arguments passed to the batch functions after the variables
+        :returns: reports as passed to the RPT field of S6F11
+        :rtype: list of dict
+        """
+        values = [getter(*getter_args) for (getter, getter_args) in self.getters]
+
+        for (getter, variables) in self.batches:
+            values.extend(getter(variables, *args))
+
+        return [{"RPTID": rptid, "V": [values[index] for index in indexes]} for (rptid, indexes) in self.reports]
+
+
+class GemReportPlans:
+    """
+    Cache of the compiled :class:`GemReportPlan` of the collection events.
+
+    A plan is compiled when its collection event is triggered the first time.
+    All plans are dropped if one of the registries was modified, or if :func:`invalidate` was called,
+    and are compiled again on their next use.
+    Plans are not cached while one of the registries is modified during compiling.
+    """
+
+    def __init__(self, compiler, registries):
+        """
+        Initialize a report plan cache.
+
+        :param compiler: function compiling the plan for a collection event, returns None if it has no reports
+        :type compiler: callable
+        :param registries: registries the plans depend on
+        :type registries: list of :class:`GemRegistry`
+        """
+        self._compiler = compiler
+        self._registries = tuple(registries)
+
+        self._lock = threading.Lock()
+        self._plans = {}
+        self._versions = None
+
+        self.compiled = 0
+        """ Number of compiled plans ."""
+
+        self.hits = 0
+        """ Number of plans used without compiling them ."""
+
+        self.invalidations = 0
+        """ Number of times compiled plans were dropped ."""
+
+    def __len__(self):
+        """Get the number of compiled plans."""
+        return len(self._plans)
+
+    @property
+    def statistics(self):
+        """
+        Get the statistics of the plans.
+
+        :returns: number of plans, their reports, variables and distinct values and the counters
+        :rtype: dict
+        """
+        plans = list(self._plans.values())
+
+        return {
+            "plans": len(plans),
+            "reports": sum(len(plan.reports) for plan in plans),
+            "variables": sum(plan.variable_count for plan in plans),
+            "values": sum(plan.value_count for plan in plans),
+            "compiled": self.compiled,
+            "hits": self.hits,
+            "invalidations": self.invalidations,
+        }
+
+    def invalidate(self):
+        """Drop all plans, required if objects in the registries were changed."""
+        with self._lock:
+            if self._plans:
+                self.invalidations += 1
+
+            self._plans = {}
+            self._versions = None
+
+    def get(self, ceid):
+        """
+        Get the plan for a collection event, compiling it if required.
+
+        :param ceid: collection event
+        :type ceid: various
+        :returns: plan, None if the collection event has no reports
+        :rtype: :class:`GemReportPlan`
+        """
+        versions = self._get_versions()
+
+        if versions == self._versions:
+            plan = self._plans.get(ceid)
+            if plan is not None:
+                self.hits += 1
+                return plan
+
+        with self._lock:
+            if versions != self._versions:
+                if self._plans:
+                    self.invalidations += 1
+
+                self._plans = {}
+                self._versions = versions
+
+            plan = self._compiler(ceid)
+            self.compiled += 1
+
+            # registries changed while compiling, the plan is used this time but not cached
+            if plan is not None and self._get_versions() == versions:
+                self._plans[ceid] = plan
+
+        return plan
+
+    def _get_versions(self):
+        return tuple(registry.version for registry in self._registries)
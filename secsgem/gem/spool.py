@@ -0,0 +1,449 @@
+#####################################################################
+# spool.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+"""Contains the persistent spool for messages that couldn't be sent to the host."""
+
+import glob
+import mmap
+import os
+import struct
+import threading
+
+_MAGIC = b"SGSP"
+_VERSION = 1
+
+# magic, version, generation of the data file, first and end entry, messages spooled since the spool was empty
+_INDEX_HEADER = struct.Struct(">4sBxxxLQQQ")
+
+# offset and length of the data, stream, function
+_INDEX_ENTRY = struct.Struct(">QLBBxx")
+
+_ENTRIES_OFFSET = 64
+
+
+class GemSpoolMessage:
+    """
+    Message read from the spool.
+
+    The message contains the encoded data, it can be sent like a stream/function without encoding it again.
+    """
+
+    __slots__ = ("stream", "function", "data")
+
+    def __init__(self, stream, function, data):
+        """
+        Initialize a spooled message.
+
+        :param stream: stream of the message
+        :type stream: integer
+        :param function: function of the message
+        :type function: integer
+        :param data: encoded data of the message
+        :type data: bytes
+        """
+        self.stream = stream
+        self.function = function
+        self.data = data
+
+    def __repr__(self):
+        """Generate textual representation for an object of this class."""
+        return f"{self.__class__.__name__}(S{self.stream}F{self.function}, {len(self.data)} bytes)"
+
+    def __str__(self):
+        """Generate string representation for an object of this class."""
+        return f"S{self.stream}F{self.function} W <spooled, {len(self.data)} bytes> ."
+
+    def encode(self):
+        """
+        Get the encoded data of the message.
+
+        :returns: encoded data
+        :rtype: bytes
+        """
+        return self.data
+
+    def encode_into(self, buffer):
+        """
+        Append the encoded data of the message to a buffer.
+
+        :param buffer: buffer to append the encoded data to
+        :type buffer: bytearray
+        """
+        buffer += self.data
+
+
+class GemSpool:
+    """
+    Persistent spool for messages, stored in an append-only data file and an index file.
+
+    The encoded messages are appended to the data file (`<path>.<generation>.dat`).
+    The index file (`<path>.idx`) is memory mapped, it contains the position of each message in the data file
+    and the range of the messages still in the spool.
+    Messages are only read from the data file when they are transmitted, the spool is never loaded as a whole.
+
+    A message is written to the data file before it is added to the index,
+    so messages partly written by a crashed process are discarded when the spool is opened again.
+    Messages that were transmitted or purged are removed from the index, the data file is truncated when the spool
+    is empty. If the removed messages take more space than the remaining ones (e.g. when overwriting),
+    the remaining messages are copied to a new data file with the next generation.
+
+    If the size of the spooled messages would exceed :attr:`max_size`, the oldest messages are overwritten if
+    :attr:`overwrite` is set, otherwise the new message is rejected.
+
+    **Example**::
+
+        spool = secsgem.gem.GemSpool("/var/lib/tool/spool")
+
+        spool.append(6, 11, secsgem.secs.functions.SecsS06F11({"DATAID": 1, "CEID": 50, "RPT": []}).encode())
+
+        for message in spool.messages():
+            handler.send_and_waitfor_response(message)
+            spool.pop()
+    """
+
+    index_growth = 4096
+    """ Number of entries the index file is enlarged by ."""
+
+    compact_size = 1024 * 1024
+    """ Minimum number of bytes of removed messages before the data file is compacted ."""
+
+    copy_block_size = 1024 * 1024
+    """ Number of bytes copied at once when compacting ."""
+
+    def __init__(self, path, max_size=16 * 1024 * 1024, overwrite=False, sync=False):
+        """
+        Initialize a spool, the messages of an existing spool at the path are loaded.
+
+        :param path: path and base name of the spool files
+        :type path: string
+        :param max_size: maximum number of bytes of the spooled messages
+        :type max_size: integer
+        :param overwrite: overwrite the oldest messages if the spool is full (*True*) or reject new ones (*False*)
+        :type overwrite: boolean
+        :param sync: flush each message to the disk, so it is kept on power loss (slow)
+        :type sync: boolean
+        """
+        self.path = path
+        self.max_size = max_size
+        self.overwrite = overwrite
+        self.sync = sync
+
+        self.overwritten = 0
+        """ Number of messages overwritten, because the spool was full ."""
+
+        self.rejected = 0
+        """ Number of messages rejected, because the spool was full ."""
+
+        self._lock = threading.RLock()
+
+        # number of entries removed from the start of the index by resetting or compacting,
+        # used to keep the positions of iterators valid
+        self._removedEntries = 0
+
+        self._indexFile = None
+        self._index = None
+        self._dataFile = None
+
+        self._open()
+
+    @property
+    def index_path(self):
+        """Get the path of the index file."""
+        return self.path + ".idx"
+
+    def _data_path(self, generation):
+        return f"{self.path}.{generation}.dat"
+
+    def __len__(self):
+        """Get the number of spooled messages."""
+        return self._tail - self._head
+
+    @property
+    def size(self):
+        """Get the number of bytes of the spooled messages."""
+        with self._lock:
+            if self._head == self._tail:
+                return 0
+
+            return self._dataEnd - self._entry(self._head)[0]
+
+    @property
+    def total(self):
+        """Get the number of messages spooled since the spool was empty, including the removed ones."""
+        return self._total
+
+    @property
+    def full(self):
+        """Check if the spool has reached its maximum size."""
+        return self.size >= self.max_size
+
+    def close(self):
+        """Close the files of the spool."""
+        with self._lock:
+            if self._index is not None:
+                self._index.close()
+                self._index = None
+            if self._indexFile is not None:
+                self._indexFile.close()
+                self._indexFile = None
+            if self._dataFile is not None:
+                self._dataFile.close()
+                self._dataFile = None
+
+    def append(self, stream, function, data):
+        """
+        Add a message to the spool.
+
+        :param stream: stream of the message
+        :type stream: integer
+        :param function: function of the message
+        :type function: integer
+        :param data: encoded data of the message
+        :type data: bytes/bytearray/memoryview
+        :returns: False if the message was rejected, because the spool is full
+        :rtype: boolean
+        """
+        length = len(data)
+
+        with self._lock:
+            if self.size + length > self.max_size:
+                if not self.overwrite or length > self.max_size:
+                    self.rejected += 1
+                    return False
+
+                while self.size + length > self.max_size:
+                    self._head += 1
+                    self.overwritten += 1
+
+                if self._head == self._tail:
+                    self._reset()
+
+            if 0 < self._head < self._tail and self._entry(self._head)[0] > max(self.compact_size, self.size):
+                self._compact()
+
+            if self._tail == self._capacity:
+                if self._head > self._capacity // 2:
+                    self._compact()
+                else:
+                    self._grow_index()
+
+            # data first, entries behind the end of the data file are discarded when opening the spool
+            self._dataFile.seek(self._dataEnd)
+            self._dataFile.write(data)
+
+            _INDEX_ENTRY.pack_into(self._index, _ENTRIES_OFFSET + self._tail * _INDEX_ENTRY.size,
+                                   self._dataEnd, length, stream, function)
+
+            self._dataEnd += length
+            self._tail += 1
+            self._total += 1
+
+            self._write_header()
+
+        return True
+
+    def messages(self, limit=None):
+        """
+        Iterate the spooled messages, oldest first.
+
+        The messages are read from the disk one by one and are not removed from the spool,
+        use :func:`pop` after the message was transmitted.
+
+        :param limit: maximum number of messages, None for all
+        :type limit: integer
+        :returns: iterator of the messages
+        :rtype: iterator of :class:`GemSpoolMessage`
+        """
+        position = self._removedEntries + self._head
+        count = 0
+
+        while limit is None or count < limit:
+            with self._lock:
+                # messages removed in the meantime are skipped
+                entry = max(position - self._removedEntries, self._head)
+                if entry >= self._tail:
+                    return
+
+                message = self._read(entry)
+                position = self._removedEntries + entry + 1
+
+            count += 1
+            yield message
+
+    def peek(self):
+        """
+        Get the oldest message without removing it.
+
+        :returns: oldest message, None if the spool is empty
+        :rtype: :class:`GemSpoolMessage`
+        """
+        return next(self.messages(1), None)
+
+    def pop(self, count=1):
+        """
+        Remove the oldest messages, e.g. after they were transmitted.
+
+        :param count: number of messages to remove
+        :type count: integer
+        """
+        with self._lock:
+            self._head = min(self._head + count, self._tail)
+
+            if self._head == self._tail:
+                self._reset()
+            else:
+                self._write_header()
+
+    def purge(self):
+        """
+        Remove all messages.
+
+        :returns: number of removed messages
+        :rtype: integer
+        """
+        with self._lock:
+            count = len(self)
+            self._reset()
+
+        return count
+
+    @property
+    def _capacity(self):
+        return (len(self._index) - _ENTRIES_OFFSET) // _INDEX_ENTRY.size
+
+    def _entry(self, entry):
+        return _INDEX_ENTRY.unpack_from(self._index, _ENTRIES_OFFSET + entry * _INDEX_ENTRY.size)
+
+    def _read(self, entry):
+        (offset, length, stream, function) = self._entry(entry)
+
+        self._dataFile.seek(offset)
+        return GemSpoolMessage(stream, function, self._dataFile.read(length))
+
+    def _write_header(self):
+        _INDEX_HEADER.pack_into(self._index, 0, _MAGIC, _VERSION, self._generation, self._head, self._tail,
+                                self._total)
+
+        if self.sync:
+            os.fsync(self._dataFile.fileno())
+            self._index.flush()
+
+    def _open(self):
+        if not os.path.exists(self.index_path):
+            self._write_index(self.index_path, 0, [], 0)
+
+        self._indexFile = open(self.index_path, "r+b")  # pylint: disable=consider-using-with
+        self._index = mmap.mmap(self._indexFile.fileno(), 0)
+
+        (magic, version, self._generation, head, tail, self._total) = _INDEX_HEADER.unpack_from(self._index)
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            raise ValueError(f"{self.index_path} is not a spool index")
+
+        data_path = self._data_path(self._generation)
+        mode = "r+b" if os.path.exists(data_path) else "w+b"
+        self._dataFile = open(data_path, mode, buffering=0)  # pylint: disable=consider-using-with
+
+        self._recover(head, tail)
+
+        for path in glob.glob(glob.escape(self.path) + ".*.dat"):
+            if path != data_path:
+                os.remove(path)
+
+    def _recover(self, head, tail):
+        data_size = os.fstat(self._dataFile.fileno()).st_size
+
+        self._tail = min(tail, self._capacity)
+        self._head = min(head, self._tail)
+
+        # messages not completely written to the data file
+        while self._tail > self._head:
+            (offset, length, _, _) = self._entry(self._tail - 1)
+            if offset + length <= data_size:
+                break
+
+            self._tail -= 1
+
+        if self._head == self._tail:
+            self._reset()
+            return
+
+        (offset, length, _, _) = self._entry(self._tail - 1)
+        self._dataEnd = offset + length
+        self._dataFile.truncate(self._dataEnd)
+
+        self._write_header()
+
+    def _reset(self):
+        self._removedEntries += self._tail
+        self._head = self._tail = self._total = 0
+        self._dataEnd = 0
+
+        self._write_header()
+        self._dataFile.truncate(0)
+
+    def _grow_index(self):
+        size = len(self._index) + max(self.index_growth, self._capacity) * _INDEX_ENTRY.size
+
+        self._index.close()
+        self._indexFile.truncate(size)
+        self._index = mmap.mmap(self._indexFile.fileno(), 0)
+
+    def _write_index(self, path, generation, entries, total):
+        capacity = max(self.index_growth, len(entries) * 2)
+        index = bytearray(_ENTRIES_OFFSET + capacity * _INDEX_ENTRY.size)
+
+        _INDEX_HEADER.pack_into(index, 0, _MAGIC, _VERSION, generation, 0, len(entries), total)
+        for (number, entry) in enumerate(entries):
+            _INDEX_ENTRY.pack_into(index, _ENTRIES_OFFSET + number * _INDEX_ENTRY.size, *entry)
+
+        with open(path, "wb") as index_file:
+            index_file.write(index)
+
+            if self.sync:
+                index_file.flush()
+                os.fsync(index_file.fileno())
+
+    def _compact(self):
+        """Copy the spooled messages to a new data file with the next generation."""
+        start = self._entry(self._head)[0]
+        generation = self._generation + 1
+
+        with open(self._data_path(generation), "wb") as data_file:
+            self._dataFile.seek(start)
+
+            remaining = self._dataEnd - start
+            while remaining > 0:
+                block = self._dataFile.read(min(self.copy_block_size, remaining))
+                data_file.write(block)
+                remaining -= len(block)
+
+            if self.sync:
+                data_file.flush()
+                os.fsync(data_file.fileno())
+
+        entries = []
+        for entry in range(self._head, self._tail):
+            (offset, length, stream, function) = self._entry(entry)
+            entries.append((offset - start, length, stream, function))
+
+        # replacing the index switches to the new data file, the old one is removed when opening
+        self._write_index(self.index_path + ".tmp", generation, entries, self._total)
+
+        removed = self._removedEntries + self._head
+        self.close()
+        os.replace(self.index_path + ".tmp", self.index_path)
+        self._open()
+        self._removedEntries = removed
@@ -0,0 +1,423 @@
+#####################################################################
+# trace.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+"""Contains the trace data collection of the gem equipment handler."""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+import secsgem.secs.data_items
+import secsgem.secs.variables
+
+from secsgem.secs.codec import encode_item_header
+
+from .spool import GemSpoolMessage
+
+
+def parse_dsper(dsper):
+    """
+    Parse the data sample period of a trace.
+
+    The period is formatted as hhmmss or as hhmmsscc (with hundredths of a second).
+
+    **Example**::
+
+        >>> import secsgem.gem
+        >>>
+        >>> secsgem.gem.trace.parse_dsper("000010")
+        10.0
+        >>> secsgem.gem.trace.parse_dsper("00000001")
+        0.01
+        >>> secsgem.gem.trace.parse_dsper("0099") is None
+        True
+
+    :param dsper: data sample period
+    :type dsper: string
+    :returns: period in seconds, None if the period is invalid
+    :rtype: float
+    """
+    if len(dsper) not in (6, 8) or not dsper.isdigit():
+        return None
+
+    (hours, minutes, seconds, hundredths) = (int(dsper[0:2]), int(dsper[2:4]), int(dsper[4:6]), int(dsper[6:8] or 0))
+
+    if minutes > 59 or seconds > 59:
+        return None
+
+    return hours * 3600 + minutes * 60 + seconds + hundredths / 100
+
+
+class GemTrace:
+    """
+    Trace data collection requested by the host with S2F23.
+
+    The status variables are sampled each period, :attr:`group_size` samples are sent to the host with one S6F1.
+    The trace is done after :attr:`total` samples.
+    """
+
+    def __init__(self, trid, period, total, group_size, svs, trid_type=None):
+        """
+        Initialize a trace.
+
+        :param trid: trace id
+        :type trid: various
+        :param period: seconds between two samples
+        :type period: float
+        :param total: number of samples
+        :type total: integer
+        :param group_size: number of samples sent together
+        :type group_size: integer
+        :param svs: sampled status variables
+        :type svs: list of :class:`secsgem.gem.StatusVariable`
+        :param trid_type: secs type of the trace id in the reports, selected by value if None
+        :type trid_type: :class:`secsgem.secs.variables.Base`
+        """
+        self.trid = trid
+        self.period = period
+        self.total = total
+        self.group_size = group_size
+        self.svs = tuple(svs)
+
+        self.samples = 0
+        """ Number of samples taken ."""
+
+        self.next_sample = None
+        """ Time (:func:`time.monotonic`) the next sample is scheduled for ."""
+
+        self.overruns = 0
+        """ Number of times the trace fell behind by more than one period, the missed samples are taken later ."""
+
+        self.jitter_last = None
+        """ Seconds the last sample was taken after its scheduled time ."""
+
+        self.jitter_max = 0.0
+        """ Maximum seconds a sample was taken after its scheduled time ."""
+
+        self._jitterTotal = 0.0
+        self._jitterCount = 0
+        self._group = []
+        self._groupStart = None
+        self._reportTrid = trid if trid_type is None else trid_type(trid)
+
+    def __repr__(self):
+        """Generate textual representation for an object of this class."""
+        return f"{self.__class__.__name__}({{'trid': {self.trid!r}, 'period': {self.period}, 'total': {self.total}, " \
+               f"'group_size': {self.group_size}, 'samples': {self.samples}}})"
+
+    @property
+    def done(self):
+        """Check if all samples were taken."""
+        return self.samples >= self.total
+
+    @property
+    def jitter_average(self):
+        """Get the average seconds the samples were taken after their scheduled time."""
+        if self._jitterCount == 0:
+            return None
+
+        return self._jitterTotal / self._jitterCount
+
+    def add_sample(self, values, stime):
+        """
+        Add the values of a sample.
+
+        The report of a group contains the values of its samples one after another,
+        with number (SMPLN) and time (STIME) of the first sample in the group.
+
+        :param values: values of the status variables, encoded for :class:`GemTraceReport`
+        :type values: list of :class:`secsgem.secs.variables.Base` or bytes
+        :param stime: time of the sample
+        :type stime: string
+        :returns: data of the S6F1 if the group is complete, None otherwise
+        :rtype: dict
+        """
+        self.samples += 1
+
+        if not self._group:
+            self._groupStart = (self.samples, stime)
+
+        self._group.extend(values)
+
+        if self.samples % self.group_size and not self.done:
+            return None
+
+        (smpln, stime) = self._groupStart
+        (values, self._group) = (self._group, [])
+
+        return {"TRID": self._reportTrid, "SMPLN": secsgem.secs.variables.U4(smpln), "STIME": stime, "SV": values}
+
+    def _record_jitter(self, jitter):
+        self.jitter_last = jitter
+        self.jitter_max = max(self.jitter_max, jitter)
+        self._jitterTotal += jitter
+        self._jitterCount += 1
+
+
+class GemTraceReport(GemSpoolMessage):
+    """
+    Trace report (S6F1) built from the encoded values of the samples.
+
+    Encoding the values when they are sampled keeps building the report of a large group cheap.
+    The report can be sent and spooled like a stream/function.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, report):
+        """
+        Initialize a trace report.
+
+        **Example**::
+
+            >>> import secsgem.gem
+            >>> import secsgem.secs
+            >>>
+            >>> trace = secsgem.gem.GemTrace(5, 0.1, 1, 1, [])
+            >>> report = trace.add_sample([secsgem.secs.variables.U4(10).encode()], "t1")
+            >>> secsgem.gem.GemTraceReport(report).encode() == secsgem.secs.functions.SecsS06F01(
+            ...     {"TRID": 5, "SMPLN": secsgem.secs.variables.U4(1), "STIME": "t1",
+            ...      "SV": [secsgem.secs.variables.U4(10)]}).encode()
+            True
+
+        :param report: data of the S6F1 from :func:`GemTrace.add_sample`, with encoded values
+        :type report: dict
+        """
+        values = report["SV"]
+
+        super().__init__(6, 1, b"".join((
+            encode_item_header(secsgem.secs.variables.List.format_code, 4),
+            secsgem.secs.data_items.TRID(report["TRID"]).encode(),
+            report["SMPLN"].encode(),
+            secsgem.secs.data_items.STIME(report["STIME"]).encode(),
+            encode_item_header(secsgem.secs.variables.List.format_code, len(values)),
+            *values)))
+
+    def __str__(self):
+        """Generate string representation for an object of this class."""
+        return f"S6F1 W <trace report, {len(self.data)} bytes> ."
+
+
+class GemTraceScheduler:
+    """
+    Timer sampling the status variables of all traces from one thread.
+
+    The samples are scheduled relative to the start of the trace, so the period doesn't drift
+    with the time taking a sample takes.
+    If a trace falls behind by more than one period, its schedule restarts at the current time.
+    A trace is stopped if taking a sample raises an exception.
+    The thread is started with the first trace and ends when no traces are left.
+    """
+
+    def __init__(self, sample, name="secsgem_gemTraceScheduler"):
+        """
+        Initialize a trace scheduler.
+
+        :param sample: function taking a sample, called with the trace and the scheduled time of the sample
+        :type sample: callable
+        :param name: name of the sampling thread
+        :type name: string
+        """
+        self.logger = logging.getLogger(self.__module__ + "." + self.__class__.__name__)
+
+        self.name = name
+
+        self._sample = sample
+
+        self._condition = threading.Condition()
+        self._traces = {}
+        self._schedule = []
+        self._sequence = itertools.count()
+        self._thread = None
+
+        self.samples = 0
+        """ Number of samples taken for all traces ."""
+
+        self.jitter_max = 0.0
+        """ Maximum seconds a sample was taken after its scheduled time ."""
+
+        self._jitterTotal = 0.0
+
+    def __len__(self):
+        """Get the number of running traces."""
+        return len(self._traces)
+
+    def __contains__(self, trid):
+        """Check if a trace is running."""
+        return trid in self._traces
+
+    @property
+    def traces(self):
+        """Get the running traces by trace id."""
+        with self._condition:
+            return dict(self._traces)
+
+    @property
+    def jitter_average(self):
+        """Get the average seconds the samples were taken after their scheduled time."""
+        if self.samples == 0:
+            return None
+
+        return self._jitterTotal / self.samples
+
+    @property
+    def statistics(self):
+        """
+        Get the statistics of the traces.
+
+        :returns: number of traces, samples and jitter
+        :rtype: dict
+        """
+        return {
+            "traces": len(self._traces),
+            "samples": self.samples,
+            "jitter_average": self.jitter_average,
+            "jitter_max": self.jitter_max,
+        }
+
+    def start(self, trace):
+        """
+        Start a trace, replacing a running trace with the same trace id.
+
+        The first sample is taken immediately.
+
+        :param trace: trace to start
+        :type trace: :class:`GemTrace`
+        """
+        with self._condition:
+            trace.next_sample = time.monotonic()
+
+            self._traces[trace.trid] = trace
+            heapq.heappush(self._schedule, (trace.next_sample, next(self._sequence), trace))
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._scheduler_thread, name=self.name)
+                self._thread.daemon = True  # kill thread automatically on main program termination
+                self._thread.start()
+
+            self._condition.notify()
+
+    def stop(self, trid):
+        """
+        Stop a trace.
+
+        :param trid: trace id
+        :type trid: various
+        :returns: stopped trace, None if the trace is not running
+        :rtype: :class:`GemTrace`
+        """
+        with self._condition:
+            trace = self._traces.pop(trid, None)
+
+            # removed from the schedule when it is due
+            self._condition.notify()
+
+        return trace
+
+    def clear(self):
+        """Stop all traces."""
+        with self._condition:
+            self._traces.clear()
+            self._schedule.clear()
+            self._condition.notify()
+
+    def wait(self, timeout=None):
+        """
+        Wait until all traces are done or stopped.
+
+        :param timeout: maximum seconds to wait
+        :type timeout: float
+        :returns: True if no traces are left
+        :rtype: boolean
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._condition:
+            while self._thread is not None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+
+                self._condition.wait(remaining)
+
+        return True
+
+    def _next_due(self):
+        # returns the next due trace, None if the thread should end
+        with self._condition:
+            while True:
+                while self._schedule and self._traces.get(self._schedule[0][2].trid) is not self._schedule[0][2]:
+                    heapq.heappop(self._schedule)
+
+                if not self._schedule:
+                    self._thread = None
+                    self._condition.notify_all()
+                    return None
+
+                timeout = self._schedule[0][0] - time.monotonic()
+                if timeout <= 0:
+                    return heapq.heappop(self._schedule)[2]
+
+                self._condition.wait(timeout)
+
+    def _scheduler_thread(self):
+        """
+        Thread sampling the traces when they are due.
+
+        .. warning:: Do not call this directly, used internally.
+        """
+        while True:
+            trace = self._next_due()
+            if trace is None:
+                return
+
+            scheduled = trace.next_sample
+            jitter = time.monotonic() - scheduled
+
+            trace._record_jitter(jitter)  # pylint: disable=protected-access
+            self.samples += 1
+            self.jitter_max = max(self.jitter_max, jitter)
+            self._jitterTotal += jitter
+
+            try:
+                self._sample(trace, scheduled)
+            except Exception:  # pylint: disable=broad-except
+                self.logger.exception("stopping trace %s, exception while sampling", trace.trid)
+                self._remove(trace)
+                continue
+
+            self._reschedule(trace, scheduled)
+
+    def _remove(self, trace):
+        with self._condition:
+            if self._traces.get(trace.trid) is trace:
+                del self._traces[trace.trid]
+
+    def _reschedule(self, trace, scheduled):
+        if trace.done:
+            self._remove(trace)
+            return
+
+        with self._condition:
+            now = time.monotonic()
+
+            trace.next_sample = scheduled + trace.period
+            if trace.next_sample < now - trace.period:
+                trace.overruns += 1
+                trace.next_sample = now
+
+            heapq.heappush(self._schedule, (trace.next_sample, next(self._sequence), trace))
@@ -28,7 +28,17 @@ from .deselect_req_header import HsmsDeselectReqHeader
 from .select_rsp_header import HsmsSelectRspHeader
 from .select_req_header import HsmsSelectReqHeader
 from .header import HsmsHeader
+from .receive_buffer import HsmsReceiveBuffer
+from .send_buffer import HsmsSendBuffer
+from .reactor import HsmsReactor
+from .timer_wheel import HsmsTimerWheel
+from .sender import HsmsSender
+from .router import HsmsRouter, HsmsRoutingRule
+from .async_connection import AsyncHsmsConnection
+from .async_handler import AsyncHsmsHandler
 
 __all__ = ["HsmsConnectionManager", "HsmsHandler", "HsmsPacket", "HsmsStreamFunctionHeader", "HsmsSeparateReqHeader",
            "HsmsRejectReqHeader", "HsmsLinktestRspHeader", "HsmsLinktestReqHeader", "HsmsDeselectRspHeader",
-           "HsmsDeselectReqHeader", "HsmsSelectRspHeader", "HsmsSelectReqHeader", "HsmsHeader"]
+           "HsmsDeselectReqHeader", "HsmsSelectRspHeader", "HsmsSelectReqHeader", "HsmsHeader", "HsmsReceiveBuffer",
+           "HsmsSendBuffer", "HsmsReactor", "HsmsTimerWheel", "HsmsSender", "HsmsRouter", "HsmsRoutingRule",
+           "AsyncHsmsConnection", "AsyncHsmsHandler"]
@@ -17,7 +17,6 @@
 
 import socket
 import threading
-import time
 
 from .connection import HsmsConnection
 
@@ -49,12 +48,9 @@ class HsmsActiveConnection(HsmsConnection):  # pragma: no cover
         # initially not enabled
         self.enabled = False
 
-        # reconnect thread required for active connection
+        # timer waiting T5 before reconnecting, thread connecting to the remote
+        self.connectionTimer = None
         self.connectionThread = None
-        self.stopConnectionThread = False
-
-        # flag if this is the first connection since enable
-        self.firstConnection = True
 
     def _on_hsms_connection_close(self, data):
         """
@@ -63,7 +59,7 @@ class HsmsActiveConnection(HsmsConnection):  # pragma: no cover
         This is required to initiate the reconnect if the connection is still enabled
         """
         if self.enabled:
-            self.__start_connect_thread()
+            self.__start_connect_timer()
 
     def enable(self):
         """
@@ -73,13 +69,10 @@ class HsmsActiveConnection(HsmsConnection):  # pragma: no cover
         """
         # only start if not already enabled
         if not self.enabled:
-            # reset first connection to eliminate reconnection timeout
-            self.firstConnection = True
-
             # mark connection as enabled
             self.enabled = True
 
-            # start the connection thread
+            # start the connection thread, the first connection is tried without waiting
             self.__start_connect_thread()
 
     def disable(self):
@@ -93,37 +86,30 @@ class HsmsActiveConnection(HsmsConnection):  # pragma: no cover
             # mark connection as disabled
             self.enabled = False
 
-            # stop connection thread if it is running
-            if self.connectionThread and self.connectionThread.is_alive():
-                self.stopConnectionThread = True
+            # stop waiting for the next connection attempt
+            if self.connectionTimer is not None:
+                self.connectionTimer.cancel()
+                self.connectionTimer = None
 
-            # wait for connection thread to stop
-            while self.stopConnectionThread:
-                time.sleep(0.2)
+            # wait for a running connection attempt to finish
+            if self.connectionThread and self.connectionThread.is_alive() \
+                    and self.connectionThread is not threading.current_thread():
+                self.connectionThread.join()
 
             # disconnect super class
             self.disconnect()
 
-    def __idle(self, timeout):
-        """
-        Wait until timeout elapsed or connection thread is stopped.
-
-        :param timeout: number of seconds to wait
-        :type timeout: float
-        :returns: False if thread was stopped
-        :rtype: boolean
-        """
-        for _ in range(int(timeout) * 5):
-            time.sleep(0.2)
+    def __start_connect_timer(self):
+        # no thread waits for T5, the timer starts the connection thread
+        self.connectionTimer = self._call_later(self.T5, self.__start_connect_thread)
 
-            # check if connection was disabled
-            if self.stopConnectionThread:
-                self.stopConnectionThread = False
-                return False
+    def __start_connect_thread(self):
+        self.connectionTimer = None
 
-        return True
+        # check if connection was disabled meanwhile
+        if not self.enabled:
+            return
 
-    def __start_connect_thread(self):
         self.connectionThread = threading.Thread(
             target=self.__connect_thread,
             name=f"secsgem_HsmsActiveConnection_connectThread_{self.remoteAddress}")
@@ -131,21 +117,14 @@ class HsmsActiveConnection(HsmsConnection):  # pragma: no cover
 
     def __connect_thread(self):
         """
-        Thread function to (re)connect active connection to remote host.
+        Thread function to connect active connection to remote host.
+
+        If connecting failed, the next attempt is started after T5.
 
         .. warning:: Do not call this directly, for internal use only.
         """
-        # wait for timeout if this is not the first connection
-        if not self.firstConnection:
-            if not self.__idle(self.T5):
-                return
-
-        self.firstConnection = False
-
-        # try to connect to remote
-        while not self.__connect():
-            if not self.__idle(self.T5):
-                return
+        if not self.__connect() and self.enabled:
+            self.__start_connect_timer()
 
     def __connect(self):
         """
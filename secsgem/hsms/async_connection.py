@@ -0,0 +1,313 @@
+#####################################################################
+# async_connection.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+"""Contains the hsms connection running in an asyncio event loop."""
+
+import asyncio
+import socket
+import struct
+
+from .connection import HsmsConnection
+from .packet import HsmsPacket
+
+_LENGTH_STRUCT = struct.Struct(">L")
+
+
+class AsyncHsmsConnection(HsmsConnection):
+    """
+    Connection class for active and passive hsms connections running in an asyncio event loop.
+
+    The connection uses asyncio streams instead of threads.
+    A task of the event loop connects (active) or waits for the remote (passive), receives the data and calls the
+    delegate callbacks, so the callbacks must not block the event loop.
+    Like the threaded connections, the connection is reestablished until it is disabled.
+
+    :func:`enable`, :func:`disable`, :func:`disconnect` and :func:`send_packet` must be called from the event loop.
+    """
+
+    def __init__(self, active, address, port, session_id=0, delegate=None, bind_ip=""):
+        """
+        Initialize an asyncio hsms connection.
+
+        :param active: Is the connection active (*True*) or passive (*False*)
+        :type active: boolean
+        :param address: IP address of remote host
+        :type address: string
+        :param port: TCP port of remote host, the port to listen on for passive connections
+        :type port: integer
+        :param session_id: session / device ID to use for connection
+        :type session_id: integer
+        :param delegate: target for messages
+        :type delegate: inherited from :class:`secsgem.hsms.handler.HsmsHandler`
+        :param bind_ip: IP address to listen on for passive connections, all interfaces if empty
+        :type bind_ip: string
+        """
+        HsmsConnection.__init__(self, active, address, port, session_id, delegate)
+
+        self.bindIP = bind_ip
+
+        # initially not enabled
+        self.enabled = False
+
+        # task connecting and receiving the data
+        self.task = None
+
+        # streams of the established connection
+        self.reader = None
+        self.writer = None
+
+        # flag set while the data of a packet is received
+        self.receivingPacket = False
+
+    def enable(self):
+        """
+        Enable the connection.
+
+        Starts the task connecting to the remote, or waiting for the remote to connect.
+        """
+        if self.enabled:
+            return
+
+        self.enabled = True
+        self.task = asyncio.ensure_future(self._run())
+
+    def disable(self):
+        """
+        Disable the connection.
+
+        Stops all connection attempts and closes the connection.
+        Use :func:`wait_closed` to wait until the connection is closed.
+        """
+        if not self.enabled:
+            return
+
+        self.enabled = False
+        self.task.cancel()
+
+    async def wait_closed(self):
+        """Wait until the task of the connection finished after it was disabled."""
+        if self.task is not None:
+            await asyncio.wait([self.task])
+
+    def disconnect(self):
+        """
+        Close the connection.
+
+        The connection is reestablished if it is still enabled.
+        """
+        if self.reader is None:
+            return
+
+        # set disconnecting flag to avoid another select
+        self.disconnecting = True
+
+        # the receiving task handles the packets received so far and closes the connection
+        self.reader.feed_eof()
+
+    def send_packet(self, packet):
+        """
+        Send the packet to the remote host.
+
+        The packet is passed to the transport of the connection, which sends it in the background.
+        Use :func:`drain` to wait until the transport buffer is below its limit.
+
+        :param packet: packet to be transmitted
+        :type packet: :class:`secsgem.hsms.HsmsPacket`
+        :returns: True if the packet was passed to the transport
+        :rtype: boolean
+        """
+        if self.writer is None or self.writer.transport.is_closing():
+            return False
+
+        self.writer.writelines(packet.encode_buffers())
+
+        return True
+
+    async def drain(self):
+        """Wait until the data to send is below the limit of the transport buffer."""
+        if self.writer is None:
+            return
+
+        try:
+            await self.writer.drain()
+        except ConnectionError:
+            pass
+
+    def _call_later(self, delay, function):
+        """
+        Call a function from the event loop after a delay.
+
+        :param delay: number of seconds to wait
+        :type delay: float
+        :param function: function to call
+        :type function: callable
+        :returns: timer, which can be cancelled
+        :rtype: :class:`asyncio.TimerHandle`
+        """
+        return asyncio.get_event_loop().call_later(delay, function)
+
+    def _receiving_packet(self):
+        """
+        Check if a packet was received partially.
+
+        :returns: True if the rest of a packet is outstanding
+        :rtype: boolean
+        """
+        return self.receivingPacket
+
+    def _on_intercharacter_timeout(self):
+        """
+        Close the connection after a T8 timeout.
+
+        .. warning:: Do not call this directly, will be called from the event loop.
+        """
+        # the receiving task gets the end of the stream and closes the connection
+        self.writer.transport.abort()
+
+    async def _run(self):
+        """
+        Task to (re)connect to the remote and to receive the data.
+
+        .. warning:: Do not call this directly, for internal use only.
+        """
+        first_connection = True
+
+        try:
+            while self.enabled:
+                # wait for timeout if this is not the first connection of an active connection
+                if self.active and not first_connection:
+                    await asyncio.sleep(self.T5)
+
+                first_connection = False
+
+                try:
+                    if self.active:
+                        (reader, writer) = await self._connect()
+                    else:
+                        (reader, writer) = await self._accept()
+                except OSError:
+                    self.logger.debug("connecting to %s:%d failed", self.remoteAddress, self.remotePort)
+
+                    if not self.active:
+                        await asyncio.sleep(self.T5)
+
+                    continue
+
+                await self._receive(reader, writer)
+        except asyncio.CancelledError:
+            pass
+
+    async def _connect(self):
+        self.logger.debug("connecting to %s:%d", self.remoteAddress, self.remotePort)
+
+        (reader, writer) = await asyncio.open_connection(self.remoteAddress, self.remotePort)
+
+        writer.get_extra_info("socket").setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+        return reader, writer
+
+    async def _accept(self):
+        accepted = asyncio.get_event_loop().create_future()
+
+        def on_client_connected(reader, writer):
+            # only one remote is accepted
+            if accepted.done():
+                writer.close()
+                return
+
+            accepted.set_result((reader, writer))
+
+        self.logger.debug("waiting for connection on %s:%d", self.bindIP, self.remotePort)
+
+        server = await asyncio.start_server(on_client_connected, self.bindIP, self.remotePort)
+
+        try:
+            return await accepted
+        finally:
+            # stop listening while connected
+            server.close()
+
+    async def _receive(self, reader, writer):
+        """
+        Receive packets until the connection is closed.
+
+        .. warning:: Do not call this directly, for internal use only.
+        """
+        self.reader = reader
+        self.writer = writer
+        self.connected = True
+
+        self._notify("on_connection_established")
+
+        try:
+            while True:
+                self._notify("on_connection_packet_received", HsmsPacket.decode(await self._read_packet(reader)))
+        except (asyncio.IncompleteReadError, OSError):
+            pass
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # pylint: disable=broad-except
+            # invalid data (e.g. a packet shorter than its header), reconnect like the threaded connection
+            self.logger.exception("closing connection, exception while receiving")
+        finally:
+            self._stop_intercharacter_timer()
+            self.receivingPacket = False
+
+            self._notify("on_connection_before_closed")
+
+            writer.close()
+
+            self.reader = None
+            self.writer = None
+            self.connected = False
+            self.disconnecting = False
+
+            self._notify("on_connection_closed")
+
+    async def _read_packet(self, reader):
+        """
+        Read the next packet, the data of a packet has to arrive without a pause longer than T8.
+
+        .. warning:: Do not call this directly, for internal use only.
+        """
+        # waiting for the next packet isn't limited
+        packet = bytearray(await reader.readexactly(4))
+        length = _LENGTH_STRUCT.unpack(packet)[0] + 4
+
+        self.receivingPacket = True
+        self._on_receive_progress()
+
+        while len(packet) < length:
+            data = await reader.read(length - len(packet))
+            if not data:
+                raise asyncio.IncompleteReadError(bytes(packet), length)
+
+            packet += data
+            self._on_receive_progress()
+
+        self.receivingPacket = False
+
+        return packet
+
+    def _notify(self, name, *args):
+        callback = getattr(self.delegate, name, None)
+
+        if not callable(callback):
+            return
+
+        try:
+            callback(self, *args)
+        except Exception:  # pylint: disable=broad-except
+            self.logger.exception("ignoring exception for %s handler", name)
@@ -0,0 +1,210 @@
+#####################################################################
+# async_handler.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+"""Contains class to create model for hsms endpoints running in an asyncio event loop."""
+
+import asyncio
+
+from .async_connection import AsyncHsmsConnection
+from .handler import HsmsHandler
+from .packet import HsmsPacket
+from .select_req_header import HsmsSelectReqHeader
+from .deselect_req_header import HsmsDeselectReqHeader
+from .linktest_req_header import HsmsLinktestReqHeader
+
+
+class AsyncHsmsHandler(HsmsHandler):
+    """
+    Baseclass for creating Host/Equipment models running in an asyncio event loop.
+
+    Works like :class:`secsgem.hsms.HsmsHandler`, but uses an :class:`secsgem.hsms.AsyncHsmsConnection` and
+    doesn't start threads.
+    The functions waiting for a response are coroutines, timers and the select request run in the event loop.
+    The handler must be enabled and used from the event loop.
+
+    **Example**::
+
+        import asyncio
+        import secsgem.hsms
+
+        async def main():
+            client = secsgem.hsms.AsyncHsmsHandler("10.211.55.33", 5000, True, 0, "test")
+            client.enable()
+
+            await asyncio.sleep(3)
+            await client.send_linktest_req()
+
+            client.disable()
+            await client.connection.wait_closed()
+
+        asyncio.get_event_loop().run_until_complete(main())
+
+    """
+
+    def _create_connection(self, custom_connection_handler):
+        """
+        Create the connection for the handler.
+
+        :param custom_connection_handler: not supported, must be None
+        :type custom_connection_handler: None
+        :returns: connection with the handler as delegate
+        :rtype: :class:`secsgem.hsms.AsyncHsmsConnection`
+        """
+        if custom_connection_handler is not None:
+            raise ValueError("custom connection handlers are not supported by asyncio handlers")
+
+        return AsyncHsmsConnection(self.active, self.address, self.port, self.sessionID, self)
+
+    def _start_timer(self, interval, function):
+        """
+        Start a timer calling a function once from the event loop.
+
+        :param interval: number of seconds to wait
+        :type interval: float
+        :param function: function to call
+        :type function: callable
+        :returns: timer, which can be cancelled
+        :rtype: :class:`asyncio.TimerHandle`
+        """
+        return asyncio.get_event_loop().call_later(interval, function)
+
+    def send_in_background(self, function, *args):
+        """
+        Call a sending function directly, sending doesn't block the event loop.
+
+        :param function: function to call
+        :type function: callable
+        :param args: arguments for the function
+        """
+        function(*args)
+
+    def _close_connection(self):
+        """Close the connection from a timer function, the receiving task closes it."""
+        self.connection.disconnect()
+
+    def _on_state_connect(self):
+        """
+        Handle connection state model got event connect.
+
+        :param data: event attributes
+        :type data: object
+        """
+        # start linktest timer
+        self._start_linktest_timer()
+
+        # the connection must be selected within T7
+        self.notSelectedTimer = self._start_timer(self.connection.T7, self._on_not_selected_timer)
+
+        # start select process if connection is active
+        if self.active:
+            self.selectReqThread = asyncio.ensure_future(self._send_select_req_task())
+
+    async def _send_select_req_task(self):
+        response = await self.send_select_req()
+        if response is None:
+            self.logger.warning("select request failed")
+
+    def _on_linktest_timer(self):
+        """Linktest time timed out, so send linktest request."""
+        asyncio.ensure_future(self._linktest_task())
+
+    async def _linktest_task(self):
+        # send linktest request and wait for response
+        await self.send_linktest_req()
+
+        # restart the timer, if the connection wasn't closed meanwhile
+        if self.connected:
+            self._start_linktest_timer()
+
+    def _get_queue_for_system(self, system_id):
+        """
+        Create a new queue to receive responses for a certain system.
+
+        :param system_id: system id to watch
+        :type system_id: int
+        :returns: queue to receive responses with
+        :rtype: asyncio.Queue
+        """
+        self._systemQueues[system_id] = asyncio.Queue()
+        return self._systemQueues[system_id]
+
+    async def _wait_for_response(self, system_id, timeout):
+        """
+        Wait for the response to a request and remove the queue for its system.
+
+        :param system_id: System of the sent request, None if sending failed
+        :type system_id: integer
+        :param timeout: number of seconds to wait for the response
+        :type timeout: float
+        :returns: received response, None if sending failed or timed out
+        :rtype: :class:`secsgem.hsms.HsmsPacket`
+        """
+        if system_id is None:
+            return None
+
+        try:
+            await self.connection.drain()
+
+            response = await asyncio.wait_for(self._systemQueues[system_id].get(), timeout)
+        except asyncio.TimeoutError:
+            response = None
+        finally:
+            self._remove_queue(system_id)
+
+        return response
+
+    async def send_and_waitfor_response(self, packet):
+        """
+        Send the packet and wait for the response.
+
+        :param packet: packet to be sent
+        :type packet: :class:`secsgem.secs.functionbase.SecsStreamFunction`
+        :returns: Packet that was received
+        :rtype: :class:`secsgem.hsms.HsmsPacket`
+        """
+        return await self._wait_for_response(self._send_stream_function_request(packet), self.connection.T3)
+
+    async def send_select_req(self):
+        """
+        Send a Select Request to the remote host.
+
+        :returns: received Select Response
+        :rtype: :class:`secsgem.hsms.HsmsPacket`
+        """
+        system_id = self._send_request(HsmsPacket(HsmsSelectReqHeader(self.get_next_system_counter())))
+
+        return await self._wait_for_response(system_id, self.connection.T6)
+
+    async def send_linktest_req(self):
+        """
+        Send a Linktest Request to the remote host.
+
+        :returns: received Linktest Response
+        :rtype: :class:`secsgem.hsms.HsmsPacket`
+        """
+        system_id = self._send_request(HsmsPacket(HsmsLinktestReqHeader(self.get_next_system_counter())))
+
+        return await self._wait_for_response(system_id, self.connection.T6)
+
+    async def send_deselect_req(self):
+        """
+        Send a Deselect Request to the remote host.
+
+        :returns: received Deselect Response
+        :rtype: :class:`secsgem.hsms.HsmsPacket`
+        """
+        system_id = self._send_request(HsmsPacket(HsmsDeselectReqHeader(self.get_next_system_counter())))
+
+        return await self._wait_for_response(system_id, self.connection.T6)
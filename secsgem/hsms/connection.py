@@ -17,15 +17,15 @@
 
 import logging
 import select
-import struct
 import time
 import threading
 
 import secsgem.common
 
 from .packet import HsmsPacket
-
-# TODO: timeouts (T7, T8)
+from .receive_buffer import HsmsReceiveBuffer
+from .send_buffer import HsmsSendBuffer
+from .timer_wheel import HsmsTimerWheel
 
 HSMS_STYPES = {
     1: "Select.req",
@@ -47,7 +47,10 @@ class HsmsConnection:  # pragma: no cover
     """ Timeout for select calls ."""
 
     send_block_size = 1024 * 1024
-    """ Block size for outbound data ."""
+    """ Block size for outbound data, maximum number of bytes passed to one send call ."""
+
+    receive_buffer_size = 64 * 1024
+    """ Size of the receive buffer, maximum number of bytes received with one call ."""
 
     T3 = 45.0
     """ Reply Timeout ."""
@@ -58,6 +61,12 @@ class HsmsConnection:  # pragma: no cover
     T6 = 5.0
     """ Control Transaction Timeout ."""
 
+    T7 = 10.0
+    """ Not Selected Timeout ."""
+
+    T8 = 5.0
+    """ Network Intercharacter Timeout ."""
+
     def __init__(self, active, address, port, session_id=0, delegate=None):
         """
         Initialize a hsms connection.
@@ -86,7 +95,25 @@ class HsmsConnection:  # pragma: no cover
         self.sock = None
 
         # buffer for received data
-        self.receiveBuffer = b""
+        self.receiveBuffer = HsmsReceiveBuffer(self.receive_buffer_size)
+
+        # buffer for data to send, the queue lock protects the buffer, the send lock is held while sending
+        self.sendBuffer = HsmsSendBuffer(self.send_block_size)
+        self.sendQueueLock = threading.Lock()
+        self.sendLock = threading.Lock()
+
+        # position of the send buffer up to which data was discarded
+        self.sendFailedPosition = 0
+
+        # reactor receiving the data, if None a receiver thread is started for the connection
+        self.reactor = None
+
+        # timer service for connections without reactor
+        self.timerWheel = HsmsTimerWheel.default()
+
+        # T8 timer running while a packet is received partially, time of the last received data
+        self.interCharacterTimer = None
+        self.lastReceiveTime = 0.0
 
         # receiving thread flags
         self.threadRunning = False
@@ -131,13 +158,18 @@ class HsmsConnection:  # pragma: no cover
         # mark connection as connected
         self.connected = True
 
-        # start data receiving thread
-        threading.Thread(target=self.__receiver_thread, args=(),
-                         name=f"secsgem_hsmsConnection_receiver_{self.remoteAddress}:{self.remotePort}").start()
+        if self.reactor is not None:
+            # let the reactor receive the data
+            self.threadRunning = True
+            self.reactor.add_reader(self.sock, self._on_reactor_readable)
+        else:
+            # start data receiving thread
+            threading.Thread(target=self.__receiver_thread, args=(),
+                             name=f"secsgem_hsmsConnection_receiver_{self.remoteAddress}:{self.remotePort}").start()
 
-        # wait until thread is running
-        while not self.threadRunning:
-            pass
+            # wait until thread is running
+            while not self.threadRunning:
+                pass
 
         # send event
         if self.delegate and hasattr(self.delegate, 'on_connection_established') \
@@ -150,6 +182,78 @@ class HsmsConnection:  # pragma: no cover
     def _on_hsms_connection_close(self, data):
         pass
 
+    def _call_later(self, delay, function):
+        """
+        Call a function after a delay without starting a thread for it.
+
+        The function is called from the reactor thread if the connection has a reactor, otherwise from the timer wheel.
+
+        :param delay: number of seconds to wait
+        :type delay: float
+        :param function: function to call
+        :type function: callable
+        :returns: timer, which can be cancelled
+        :rtype: :class:`secsgem.hsms.reactor.HsmsReactorTimer` or :class:`secsgem.hsms.timer_wheel.HsmsTimerWheelTimer`
+        """
+        if self.reactor is not None:
+            return self.reactor.call_later(delay, function)
+
+        return self.timerWheel.call_later(delay, function)
+
+    def _receiving_packet(self):
+        """
+        Check if a packet was received partially.
+
+        :returns: True if the rest of a packet is outstanding
+        :rtype: boolean
+        """
+        return len(self.receiveBuffer) > 0
+
+    def _on_receive_progress(self):
+        """Start the T8 timer after data was received, if a packet is incomplete."""
+        self.lastReceiveTime = time.monotonic()
+
+        # the timer is started once and restarted by itself for the remaining time while data arrives
+        if self.interCharacterTimer is None and self._receiving_packet():
+            self.interCharacterTimer = self._call_later(self.T8, self._on_intercharacter_timer)
+
+    def _on_intercharacter_timer(self):
+        """Check if the data of an incomplete packet stopped arriving for T8."""
+        self.interCharacterTimer = None
+
+        if not self.connected or not self._receiving_packet():
+            return
+
+        remaining = self.lastReceiveTime + self.T8 - time.monotonic()
+        if remaining > 0:
+            self.interCharacterTimer = self._call_later(remaining, self._on_intercharacter_timer)
+            return
+
+        self.logger.warning("T8 timeout, no data received for incomplete packet from %s:%d",
+                            self.remoteAddress, self.remotePort)
+
+        self._on_intercharacter_timeout()
+
+    def _on_intercharacter_timeout(self):
+        """
+        Close the connection after a T8 timeout.
+
+        .. warning:: Do not call this directly, will be called from the reactor thread or the timer wheel.
+        """
+        self.connected = False
+
+        if self.reactor is not None:
+            self._stop_reactor_receiver()
+        else:
+            # the receiver thread closes the connection
+            self.stopThread = True
+
+    def _stop_intercharacter_timer(self):
+        if self.interCharacterTimer is not None:
+            self.interCharacterTimer.cancel()
+
+        self.interCharacterTimer = None
+
     def disconnect(self):
         """Close connection."""
         # return if thread isn't running
@@ -162,6 +266,13 @@ class HsmsConnection:  # pragma: no cover
         # set flag to stop the thread
         self.stopThread = True
 
+        if self.reactor is not None:
+            # close the connection in the reactor thread
+            if self.reactor.in_reactor_thread():
+                self._stop_reactor_receiver()
+            else:
+                self.reactor.call_soon(self._stop_reactor_receiver)
+
         # wait until thread stopped
         while self.threadRunning:
             pass
@@ -173,37 +284,39 @@ class HsmsConnection:  # pragma: no cover
         """
         Send the ASCII coded packet to the remote host.
 
-        :param packet: encoded data to be transmitted
-        :type packet: string / byte array
-        """
-        # encode the packet
-        data = packet.encode()
-
-        # split data into blocks
-        blocks = [data[i: i + self.send_block_size] for i in range(0, len(data), self.send_block_size)]
-
-        for block in blocks:
-            retry = True
+        The packet is queued in the send buffer and sent by the calling thread.
+        Packets queued by other threads while the connection is busy are sent together with it.
 
-            # not sent yet, retry
-            while retry:
-                # wait until socket is writable
-                while not select.select([], [self.sock], [], self.select_timeout)[1]:
-                    pass
+        :param packet: packet to be transmitted
+        :type packet: :class:`secsgem.hsms.HsmsPacket`
+        :returns: True if the packet was sent
+        :rtype: boolean
+        """
+        with self.sendQueueLock:
+            end = self.sendBuffer.append(packet)
 
+        with self.sendLock:
+            # the packet might already be sent by another thread
+            while self.sendBuffer.position < end:
                 try:
-                    # send packet
-                    self.sock.send(block)
-
-                    # retry will be cleared if send succeeded
-                    retry = False
+                    # send as much of the queued data as possible, continues after partial writes
+                    with self.sendQueueLock:
+                        self.sendBuffer.send_to(self.sock)
                 except OSError as exc:
                     if not secsgem.common.is_errorcode_ewouldblock(exc.errno):
-                        # raise if not EWOULDBLOCK
-                        return False
-                    # it is EWOULDBLOCK, so retry sending
+                        # drop the queued data if not EWOULDBLOCK, it can't be sent any more
+                        self._discard_send_buffer()
+                        break
 
-        return True
+                    # it is EWOULDBLOCK, so wait until socket is writable and retry sending
+                    while not select.select([], [self.sock], [], self.select_timeout)[1]:
+                        pass
+
+        return end > self.sendFailedPosition
+
+    def _discard_send_buffer(self):
+        with self.sendQueueLock:
+            self.sendFailedPosition = self.sendBuffer.discard()
 
     def _process_receive_buffer(self):
         """
@@ -212,21 +325,11 @@ class HsmsConnection:  # pragma: no cover
         .. warning:: Do not call this directly, will be called from
         :func:`secsgem.hsmsConnections.hsmsConnection.__receiver_thread` method.
         """
-        # check if enough data in input buffer
-        if len(self.receiveBuffer) < 4:
+        # get next complete packet from input buffer
+        data = self.receiveBuffer.pop_packet()
+        if data is None:
             return False
 
-        # unpack length from input buffer
-        length = struct.unpack(">L", self.receiveBuffer[0:4])[0] + 4
-
-        # check if enough data in input buffer
-        if len(self.receiveBuffer) < length:
-            return False
-
-        # extract and remove packet from input buffer
-        data = self.receiveBuffer[0:length]
-        self.receiveBuffer = self.receiveBuffer[length:]
-
         # decode received packet
         response = HsmsPacket.decode(data)
 
@@ -238,11 +341,8 @@ class HsmsConnection:  # pragma: no cover
             except Exception:  # pylint: disable=broad-except
                 self.logger.exception('ignoring exception for on_connection_packet_received handler')
 
-        # return True if more data is available
-        if len(self.receiveBuffer) > 0:
-            return True
-
-        return False
+        # return True to check for more packets
+        return True
 
     def __receiver_thread_read_data(self):
         # check if shutdown requested
@@ -257,17 +357,14 @@ class HsmsConnection:  # pragma: no cover
 
             if select_result[0]:
                 try:
-                    # get data from socket
-                    recv_data = self.sock.recv(1024)
+                    # receive data from socket directly into the input buffer
+                    received = self.receiveBuffer.recv_from(self.sock)
 
                     # check if socket was closed
-                    if len(recv_data) == 0:
+                    if received == 0:
                         self.connected = False
                         self.stopThread = True
                         continue
-
-                    # add received data to input buffer
-                    self.receiveBuffer += recv_data
                 except OSError as exc:
                     if not secsgem.common.is_errorcode_ewouldblock(exc.errno):
                         raise exc
@@ -276,6 +373,8 @@ class HsmsConnection:  # pragma: no cover
                 while self._process_receive_buffer():
                     pass
 
+                self._on_receive_progress()
+
     def __receiver_thread(self):
         """
         Thread for receiving incoming data and adding it to the receive buffer.
@@ -290,6 +389,59 @@ class HsmsConnection:  # pragma: no cover
         except Exception:  # pylint: disable=broad-except
             self.logger.exception('exception')
 
+        self._close_receiver()
+
+    def _on_reactor_readable(self, _):
+        """
+        Receive data when the reactor found the socket readable.
+
+        .. warning:: Do not call this directly, will be called from the reactor thread.
+        """
+        # connection might have been closed by a previous event of the same select call
+        if not self.threadRunning or self.stopThread:
+            return
+
+        try:
+            # receive data from socket directly into the input buffer
+            received = self.receiveBuffer.recv_from(self.sock)
+        except OSError as exc:
+            if secsgem.common.is_errorcode_ewouldblock(exc.errno):
+                return
+
+            self.logger.exception('exception')
+            received = 0
+
+        # check if socket was closed
+        if received == 0:
+            self.connected = False
+            self._stop_reactor_receiver()
+            return
+
+        # handle data in input buffer
+        while self._process_receive_buffer():
+            pass
+
+        self._on_receive_progress()
+
+    def _stop_reactor_receiver(self):
+        """
+        Stop receiving with the reactor and close the connection.
+
+        .. warning:: Do not call this directly, will be called from the reactor thread.
+        """
+        if not self.threadRunning:
+            return
+
+        self.reactor.remove_reader(self.sock)
+
+        self._close_receiver()
+
+    def _close_receiver(self):
+        """
+        Close the connection after receiving stopped.
+
+        .. warning:: Do not call this directly, will be called from the receiver thread or the reactor.
+        """
         # notify listeners of disconnection
         if self.delegate and hasattr(self.delegate, 'on_connection_before_closed') \
                 and callable(getattr(self.delegate, 'on_connection_before_closed')):
@@ -315,7 +467,11 @@ class HsmsConnection:  # pragma: no cover
         self.stopThread = False
 
         # clear receive buffer
-        self.receiveBuffer = b""
+        self._stop_intercharacter_timer()
+        self.receiveBuffer = HsmsReceiveBuffer(self.receive_buffer_size)
+
+        # drop data not sent yet
+        self._discard_send_buffer()
 
         # notify inherited classes of disconnection
         self._on_hsms_connection_close({'connection': self})
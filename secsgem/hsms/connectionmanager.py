@@ -26,8 +26,16 @@ from .multi_passive_server import HsmsMultiPassiveServer
 class HsmsConnectionManager:
     """High level class that handles multiple active and passive connections and the model for them."""
 
-    def __init__(self):
-        """Initialize a hsms connection manager."""
+    def __init__(self, reactor=None):
+        """
+        Initialize a hsms connection manager.
+
+        If a reactor is passed, all connections and servers of the manager are served by it
+        instead of threads of their own.
+
+        :param reactor: reactor serving the connections
+        :type reactor: :class:`secsgem.hsms.HsmsReactor`
+        """
         self._eventProducer = secsgem.common.EventProducer()
 
         self.logger = logging.getLogger(self.__module__ + "." + self.__class__.__name__)
@@ -36,6 +44,8 @@ class HsmsConnectionManager:
 
         self.servers = {}
 
+        self.reactor = reactor
+
         self.stopping = False
 
         self._testServerObject = None
@@ -93,16 +103,16 @@ class HsmsConnectionManager:
                 if handler.port not in required_ports:
                     required_ports.append(handler.port)
 
-        for serverPort, server in self.servers.items():
+        for serverPort, server in list(self.servers.items()):
             if serverPort not in required_ports:
                 self.logger.debug("stopping server on port %d", serverPort)
                 server.stop()
-                del self.servers[serverPort]  # pylint: disable=unnecessary-dict-index-lookup
+                del self.servers[serverPort]
 
         for requiredPort in required_ports:
             if requiredPort not in self.servers:
                 self.logger.debug("starting server on port %d", requiredPort)
-                self.servers[requiredPort] = HsmsMultiPassiveServer(requiredPort)
+                self.servers[requiredPort] = HsmsMultiPassiveServer(requiredPort, reactor=self.reactor)
                 self.servers[requiredPort].start()
 
     def add_peer(self, name, address, port, active, session_id, connection_handler=HsmsHandler):
@@ -136,6 +146,7 @@ class HsmsConnectionManager:
         else:  # pragma: no cover
             if active:
                 handler = connection_handler(address, port, active, session_id, name)
+                handler.connection.reactor = self.reactor
             else:
                 handler = connection_handler(address, port, active, session_id, name, self.servers[port])
 
@@ -25,6 +25,8 @@ class HsmsDeselectRspHeader(HsmsHeader):
     Header for message with SType 4.
     """
 
+    __slots__ = ()
+
     def __init__(self, system):
         """
         Initialize a hsms deslelct response.
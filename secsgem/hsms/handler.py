@@ -15,6 +15,9 @@
 #####################################################################
 """Contains class to create model for hsms endpoints."""
 
+import collections
+import concurrent.futures
+import functools
 import random
 import threading
 import logging
@@ -35,7 +38,10 @@ from .linktest_rsp_header import HsmsLinktestRspHeader
 from .reject_req_header import HsmsRejectReqHeader
 from .separate_req_header import HsmsSeparateReqHeader
 from .stream_function_header import HsmsStreamFunctionHeader
-from .connectionstatemachine import ConnectionStateMachine
+from .connectionstatemachine import ConnectionStateMachine, STATE_CONNECTED_NOT_SELECTED
+from .timer_wheel import HsmsTimerWheel
+from .sender import HsmsSender
+from .router import HsmsRouter
 
 
 class HsmsHandler:
@@ -46,6 +52,9 @@ class HsmsHandler:
     Inherit from this class and override required functions.
     """
 
+    send_async_window = 16
+    """ Maximum number of requests sent with :func:`send_async` waiting for their response ."""
+
     def __init__(self, address, port, active, session_id, name, custom_connection_handler=None):
         """
         Initialize hsms handler.
@@ -99,35 +108,60 @@ class HsmsHandler:
 
         # system id counter
         self.systemCounter = random.randint(0, (2 ** 32) - 1)
+        self._systemCounterLock = threading.Lock()
+
+        # timer service for handlers without reactor
+        self.timerWheel = HsmsTimerWheel.default()
+
+        # thread sending for the timers and the receiving thread, which must not block
+        self.sender = HsmsSender("secsgem_hsmsHandler_sender_{}".format(name))
 
         # repeating linktest variables
         self.linktestTimer = None
         self.linktestTimeout = 30
 
+        # T7 timer running until the connection is selected
+        self.notSelectedTimer = None
+
         # select request thread for active connections, to avoid blocking state changes
         self.selectReqThread = None
 
+        # routing of received messages by their header
+        self.router = HsmsRouter()
+
         # response queues
         self._systemQueues = {}
 
+        # futures of requests sent with send_async by system, requests waiting for a free slot of the window
+        self._systemFutures = {}
+        self._asyncPending = collections.deque()
+        self._asyncInFlight = 0
+        self._asyncLock = threading.Lock()
+
         # hsms connection state fsm
         self.connectionState = ConnectionStateMachine({"on_enter_CONNECTED": self._on_state_connect,
                                                        "on_exit_CONNECTED": self._on_state_disconnect,
                                                        "on_enter_CONNECTED_SELECTED": self._on_state_select})
 
         # setup connection
+        self.connection = self._create_connection(custom_connection_handler)
+
+    def _create_connection(self, custom_connection_handler):
+        """
+        Create the connection for the handler.
+
+        :param custom_connection_handler: object for connection handling (ie multi server)
+        :type custom_connection_handler: :class:`secsgem.hsms.HsmsMultiPassiveServer`
+        :returns: connection with the handler as delegate
+        :rtype: :class:`secsgem.hsms.connection.HsmsConnection`
+        """
+        if custom_connection_handler is not None:
+            return custom_connection_handler.create_connection(self.address, self.port, self.sessionID, self)
+
         if self.active:
-            if custom_connection_handler is None:
-                self.connection = HsmsActiveConnection(self.address, self.port, self.sessionID, self)
-            else:
-                self.connection = custom_connection_handler.create_connection(self.address, self.port,
-                                                                              self.sessionID, self)
-        else:
-            if custom_connection_handler is None:
-                self.connection = HsmsPassiveConnection(self.address, self.port, self.sessionID, self)
-            else:
-                self.connection = custom_connection_handler.create_connection(self.address, self.port,
-                                                                              self.sessionID, self)
+            return HsmsActiveConnection(self.address, self.port, self.sessionID, self)
+
+        return HsmsPassiveConnection(self.address, self.port, self.sessionID, self)
 
     @property
     def events(self):
@@ -146,23 +180,69 @@ class HsmsHandler:
         :returns: System for the next command
         :rtype: integer
         """
-        self.systemCounter += 1
+        with self._systemCounterLock:
+            self.systemCounter += 1
 
-        if self.systemCounter > ((2 ** 32) - 1):
-            self.systemCounter = 0
+            if self.systemCounter > ((2 ** 32) - 1):
+                self.systemCounter = 0
 
-        return self.systemCounter
+            return self.systemCounter
 
     def _send_select_req_thread(self):
         response = self.send_select_req()
         if response is None:
             self.logger.warning("select request failed")
 
+    def _start_timer(self, interval, function):
+        """
+        Start a timer calling a function once.
+
+        The function is called from the timer wheel, or from the reactor thread if the connection has a reactor.
+        It must not block, as the other timers wait for it, messages are sent with :func:`send_in_background`.
+
+        :param interval: number of seconds to wait
+        :type interval: float
+        :param function: function to call
+        :type function: callable
+        :returns: timer, which can be cancelled
+        :rtype: :class:`secsgem.hsms.timer_wheel.HsmsTimerWheelTimer`
+        """
+        reactor = getattr(self.connection, "reactor", None)
+
+        if reactor is not None:
+            return reactor.call_later(interval, function)
+
+        return self.timerWheel.call_later(interval, function)
+
+    def send_in_background(self, function, *args):
+        """
+        Call a sending function from the send thread of the handler.
+
+        Used by timer functions and callbacks of the receiving thread, which must not block while sending.
+        The functions are called one after the other in the order they were passed.
+
+        :param function: function to call
+        :type function: callable
+        :param args: arguments for the function
+        """
+        self.sender.call(function, *args)
+
     def _start_linktest_timer(self):
-        self.linktestTimer = threading.Timer(self.linktestTimeout, self._on_linktest_timer)
-        self.linktestTimer.daemon = True  # kill thread automatically on main program termination
-        self.linktestTimer.name = "secsgem_hsmsHandler_linktestTimer"
-        self.linktestTimer.start()
+        self.linktestTimer = self._start_timer(self.linktestTimeout, self._on_linktest_timer)
+
+    def _close_connection(self):
+        """
+        Close the connection from a timer function.
+
+        Closing a threaded connection waits for its receiver thread, so this is done in a thread of its own.
+        """
+        if getattr(self.connection, "reactor", None) is not None:
+            self.connection.disconnect()
+            return
+
+        thread = threading.Thread(target=self.connection.disconnect, name="secsgem_hsmsHandler_disconnectThread")
+        thread.daemon = True  # kill thread automatically on main program termination
+        thread.start()
 
     def _on_state_connect(self):
         """
@@ -174,6 +254,9 @@ class HsmsHandler:
         # start linktest timer
         self._start_linktest_timer()
 
+        # the connection must be selected within T7
+        self.notSelectedTimer = self._start_timer(self.connection.T7, self._on_not_selected_timer)
+
         # start select process if connection is active
         if self.active:
             self.selectReqThread = threading.Thread(target=self._send_select_req_thread,
@@ -194,6 +277,14 @@ class HsmsHandler:
 
         self.linktestTimer = None
 
+        self._stop_not_selected_timer()
+
+    def _stop_not_selected_timer(self):
+        if self.notSelectedTimer:
+            self.notSelectedTimer.cancel()
+
+        self.notSelectedTimer = None
+
     def _on_state_select(self):
         """
         Handle connection state model got event select.
@@ -201,6 +292,8 @@ class HsmsHandler:
         :param data: event attributes
         :type data: object
         """
+        self._stop_not_selected_timer()
+
         # send event
         self.events.fire('hsms_selected', {'connection': self})
 
@@ -210,12 +303,29 @@ class HsmsHandler:
 
     def _on_linktest_timer(self):
         """Linktest time timed out, so send linktest request."""
-        # send linktest request and wait for response
-        self.send_linktest_req()
+        # timer functions must not block, so the request is sent by the send thread
+        self.send_in_background(self._send_linktest_req_in_background)
 
         # restart the timer
         self._start_linktest_timer()
 
+    def _send_linktest_req_in_background(self):
+        """Send the linktest request of the linktest timer without waiting, its queue is removed after T6."""
+        system_id = self._send_request(HsmsPacket(HsmsLinktestReqHeader(self.get_next_system_counter())))
+        if system_id is not None:
+            self._start_timer(self.connection.T6, functools.partial(self._remove_queue, system_id))
+
+    def _on_not_selected_timer(self):
+        """Connection wasn't selected within T7, so close it."""
+        self.notSelectedTimer = None
+
+        if self.connectionState.state != STATE_CONNECTED_NOT_SELECTED:
+            return
+
+        self.logger.warning("T7 timeout, connection not selected")
+
+        self._close_connection()
+
     def on_connection_established(self, _):
         """Handle connection was established event."""
         self.connected = True
@@ -236,6 +346,10 @@ class HsmsHandler:
         self.connected = False
         self.connectionState.disconnect()
 
+        # no responses will arrive for the requests sent with send_async
+        for system_id in list(self._systemFutures):
+            self._resolve_async_request(system_id, None)
+
         self.events.fire("hsms_disconnected", {'connection': self})
 
     def __handle_hsms_requests(self, packet):
@@ -258,9 +372,8 @@ class HsmsHandler:
             # update connection state
             self.connectionState.select()
 
-            if packet.header.system in self._systemQueues:
-                # send packet to request sender
-                self._systemQueues[packet.header.system].put_nowait(packet)
+            # send packet to request sender
+            self._deliver_response(packet)
 
             # what to do if no sender for request waiting?
 
@@ -279,9 +392,8 @@ class HsmsHandler:
             # update connection state
             self.connectionState.deselect()
 
-            if packet.header.system in self._systemQueues:
-                # send packet to request sender
-                self._systemQueues[packet.header.system].put_nowait(packet)
+            # send packet to request sender
+            self._deliver_response(packet)
 
             # what to do if no sender for request waiting?
 
@@ -294,9 +406,8 @@ class HsmsHandler:
                 self.send_linktest_rsp(packet.header.system)
 
         else:
-            if packet.header.system in self._systemQueues:
-                # send packet to request sender
-                self._systemQueues[packet.header.system].put_nowait(packet)
+            # send packet to request sender
+            self._deliver_response(packet)
 
             # what to do if no sender for request waiting?
 
@@ -309,8 +420,11 @@ class HsmsHandler:
         """
         if packet.header.sType > 0:
             self.__handle_hsms_requests(packet)
-        else:
-            if hasattr(self, 'secs_decode') and callable(getattr(self, 'secs_decode')):
+        elif not self._route_packet(packet):
+            # only decode for the log if it is written, the decoded message is cached for the callbacks
+            if not self.communicationLogger.isEnabledFor(logging.INFO):
+                pass
+            elif hasattr(self, 'secs_decode') and callable(getattr(self, 'secs_decode')):
                 message = self.secs_decode(packet)
                 self.communicationLogger.info("< %s\n%s", packet, message, extra=self._get_log_extra())
             else:
@@ -327,9 +441,8 @@ class HsmsHandler:
                 return
 
             # someone is waiting for this message
-            if packet.header.system in self._systemQueues:
-                # send packet to request sender
-                self._systemQueues[packet.header.system].put_nowait(packet)
+            if self._deliver_response(packet):
+                pass
             # redirect packet to hsms handler
             elif hasattr(self, '_on_hsms_packet_received') and callable(getattr(self, '_on_hsms_packet_received')):
                 self._on_hsms_packet_received(packet)
@@ -337,6 +450,37 @@ class HsmsHandler:
             else:
                 self.logger.warning("packet unhandled")
 
+    def _route_packet(self, packet):
+        """
+        Handle a received stream/function by the action of its routing rule, without decoding it.
+
+        :param packet: received data packet
+        :type packet: :class:`secsgem.hsms.HsmsPacket`
+        :returns: False if the packet has to be handled as usual
+        :rtype: boolean
+        """
+        rule = self.router.route(packet.header)
+        if rule.action == HsmsRouter.ACTION_HANDLE:
+            return False
+
+        # responses for the requests of the handler and messages rejected when not selected aren't routed
+        if packet.header.system in self._systemQueues or packet.header.system in self._systemFutures \
+                or not self.connectionState.is_CONNECTED_SELECTED():
+            return False
+
+        if rule.action == HsmsRouter.ACTION_REPLY:
+            if packet.header.requireResponse:
+                self.send_response(rule.reply, packet.header.system)
+        elif rule.action == HsmsRouter.ACTION_RAW:
+            try:
+                result = rule.callback(self, packet)
+                if result is not None:
+                    self.send_response(result, packet.header.system)
+            except Exception:  # pylint: disable=broad-except
+                self.logger.exception('ignoring exception in routing callback')
+
+        return True
+
     def _get_queue_for_system(self, system_id):
         """
         Create a new queue to receive responses for a certain system.
@@ -358,6 +502,109 @@ class HsmsHandler:
         """
         del self._systemQueues[system_id]
 
+    def _deliver_response(self, packet):
+        """
+        Pass a response to the sender of the request waiting for it.
+
+        :param packet: received response
+        :type packet: :class:`secsgem.hsms.HsmsPacket`
+        :returns: True if a sender was waiting for the response
+        :rtype: boolean
+        """
+        response_queue = self._systemQueues.get(packet.header.system)
+        if response_queue is not None:
+            response_queue.put_nowait(packet)
+            return True
+
+        return self._resolve_async_request(packet.header.system, packet)
+
+    def _send_request(self, packet):
+        """
+        Send a control request, the response is put into the queue for the system of the request.
+
+        :param packet: request to send
+        :type packet: :class:`secsgem.hsms.HsmsPacket`
+        :returns: System of the sent request, None if sending failed
+        :rtype: integer
+        """
+        system_id = packet.header.system
+
+        self._get_queue_for_system(system_id)
+
+        self.communicationLogger.info("> %s\n  %s", packet, HSMS_STYPES[packet.header.sType],
+                                      extra=self._get_log_extra())
+
+        if not self.connection.send_packet(packet):
+            self._remove_queue(system_id)
+            return None
+
+        return system_id
+
+    def _send_stream_function_request(self, function):
+        """
+        Send a stream/function, the response is put into the queue for the system of the request.
+
+        :param function: function to be sent
+        :type function: :class:`secsgem.secs.functionbase.SecsStreamFunction`
+        :returns: System of the sent request, None if sending failed
+        :rtype: integer
+        """
+        system_id = self.get_next_system_counter()
+
+        self._get_queue_for_system(system_id)
+
+        if not self._send_stream_function_packet(system_id, function):
+            self._remove_queue(system_id)
+            return None
+
+        return system_id
+
+    def _send_stream_function_packet(self, system_id, function):
+        """
+        Send a stream/function as request.
+
+        :param system_id: System of the request
+        :type system_id: integer
+        :param function: function to be sent
+        :type function: :class:`secsgem.secs.functionbase.SecsStreamFunction`
+        :returns: True if the packet was sent
+        :rtype: boolean
+        """
+        out_packet = HsmsPacket.from_stream_function(
+            HsmsStreamFunctionHeader(system_id, function.stream, function.function, True, self.sessionID),
+            function)
+
+        self.communicationLogger.info("> %s\n%s", out_packet, function, extra=self._get_log_extra())
+
+        if not self.connection.send_packet(out_packet):
+            self.logger.error("Sending packet failed")
+            return False
+
+        return True
+
+    def _wait_for_response(self, system_id, timeout):
+        """
+        Wait for the response to a request and remove the queue for its system.
+
+        :param system_id: System of the sent request, None if sending failed
+        :type system_id: integer
+        :param timeout: number of seconds to wait for the response
+        :type timeout: float
+        :returns: received response, None if sending failed or timed out
+        :rtype: :class:`secsgem.hsms.HsmsPacket`
+        """
+        if system_id is None:
+            return None
+
+        try:
+            response = self._systemQueues[system_id].get(True, timeout)
+        except queue.Empty:
+            response = None
+
+        self._remove_queue(system_id)
+
+        return response
+
     def __repr__(self):
         """Generate textual representation for an object of this class."""
         return f"{self.__class__.__name__} {str(self._serialize_data())}"
@@ -387,10 +634,10 @@ class HsmsHandler:
         :param packet: packet to be sent
         :type packet: :class:`secsgem.secs.functionbase.SecsStreamFunction`
         """
-        out_packet = HsmsPacket(
+        out_packet = HsmsPacket.from_stream_function(
             HsmsStreamFunctionHeader(self.get_next_system_counter(), packet.stream, packet.function,
                                      packet.is_reply_required, self.sessionID),
-            packet.encode())
+            packet)
 
         self.communicationLogger.info("> %s\n%s", out_packet, packet, extra=self._get_log_extra())
 
@@ -405,29 +652,132 @@ class HsmsHandler:
         :returns: Packet that was received
         :rtype: :class:`secsgem.hsms.HsmsPacket`
         """
+        return self._wait_for_response(self._send_stream_function_request(packet), self.connection.T3)
+
+    def send_async(self, function):
+        """
+        Send the packet without waiting for the response.
+
+        The returned future is resolved with the response when it is received,
+        or with None if sending failed, the reply timeout T3 elapsed or the connection was closed.
+        Callbacks added to the future are called from the thread receiving the response,
+        or from the timer thread if T3 elapsed, so they must not block.
+
+        At most :attr:`send_async_window` requests wait for their response at the same time,
+        further requests are queued and sent from the send thread of the handler (:func:`send_in_background`)
+        when a response was received.
+        Queued requests can be cancelled with :func:`concurrent.futures.Future.cancel`.
+
+        **Example**::
+
+            futures = [handler.send_async(secsgem.secs.functions.SecsS01F03([svid])) for svid in svids]
+            responses = [future.result() for future in futures]
+
+        :param function: function to be sent
+        :type function: :class:`secsgem.secs.functionbase.SecsStreamFunction`
+        :returns: future resolved with the response
+        :rtype: :class:`concurrent.futures.Future`
+        """
+        future = concurrent.futures.Future()
+
+        with self._asyncLock:
+            if self._asyncInFlight >= self.send_async_window:
+                # sent when a slot of the window is released
+                self._asyncPending.append((function, future))
+                return future
+
+            self._asyncInFlight += 1
+
+        if not self._start_async_request(function, future):
+            self._release_async_slot()
+
+        return future
+
+    def _start_async_request(self, function, future):
+        """
+        Send a request of :func:`send_async` using a slot of the window.
+
+        :param function: function to be sent
+        :type function: :class:`secsgem.secs.functionbase.SecsStreamFunction`
+        :param future: future resolved with the response
+        :type future: :class:`concurrent.futures.Future`
+        :returns: False if the request didn't keep the slot, because it was cancelled or sending failed
+        :rtype: boolean
+        """
+        if not future.set_running_or_notify_cancel():
+            return False
+
         system_id = self.get_next_system_counter()
 
-        response_queue = self._get_queue_for_system(system_id)
+        # entry contains the future and the timer for T3, which is set after the entry is visible to the receiver
+        entry = [future, None]
+        self._systemFutures[system_id] = entry
+        entry[1] = self._start_timer(self.connection.T3, functools.partial(self._on_async_request_timeout, system_id))
 
-        out_packet = HsmsPacket(HsmsStreamFunctionHeader(system_id, packet.stream, packet.function, True,
-                                                         self.sessionID),
-                                packet.encode())
+        if self._send_stream_function_packet(system_id, function):
+            return True
 
-        self.communicationLogger.info("> %s\n%s", out_packet, packet, extra=self._get_log_extra())
+        if self._systemFutures.pop(system_id, None) is None:
+            # timed out meanwhile, the timeout released the slot
+            return True
 
-        if not self.connection.send_packet(out_packet):
-            self.logger.error("Sending packet failed")
-            self._remove_queue(system_id)
-            return None
+        entry[1].cancel()
+        future.set_result(None)
 
-        try:
-            response = response_queue.get(True, self.connection.T3)
-        except queue.Empty:
-            response = None
+        return False
 
-        self._remove_queue(system_id)
+    def _resolve_async_request(self, system_id, packet):
+        """
+        Resolve the future of a request sent with :func:`send_async`.
 
-        return response
+        :param system_id: System of the request
+        :type system_id: integer
+        :param packet: received response, None if no response was received
+        :type packet: :class:`secsgem.hsms.HsmsPacket`
+        :returns: True if a request was waiting for the response
+        :rtype: boolean
+        """
+        # only one of the response, the timeout and the disconnection takes the entry
+        entry = self._systemFutures.pop(system_id, None)
+        if entry is None:
+            return False
+
+        (future, timer) = entry
+        if timer is not None:
+            timer.cancel()
+
+        future.set_result(packet)
+
+        self._release_async_slot()
+
+        return True
+
+    def _release_async_slot(self):
+        """Release a slot of the window, the next queued request of :func:`send_async` takes it."""
+        with self._asyncLock:
+            if not self._asyncPending:
+                self._asyncInFlight -= 1
+                return
+
+        # the slot is kept for the queued requests, which are sent outside of the receiving and timer threads
+        self.send_in_background(self._send_pending_async_request)
+
+    def _send_pending_async_request(self):
+        """Send the next queued request of :func:`send_async` with the slot kept by :func:`_release_async_slot`."""
+        while True:
+            with self._asyncLock:
+                if not self._asyncPending:
+                    self._asyncInFlight -= 1
+                    return
+
+                (function, future) = self._asyncPending.popleft()
+
+            if self._start_async_request(function, future):
+                return
+
+    def _on_async_request_timeout(self, system_id):
+        if self._resolve_async_request(system_id, None):
+            self.logger.warning("reply timeout for system 0x%08x", system_id)
 
     def send_response(self, function, system):
         """
@@ -438,9 +788,9 @@ class HsmsHandler:
         :param system: system to reply to
         :type system: integer
         """
-        out_packet = HsmsPacket(HsmsStreamFunctionHeader(system, function.stream, function.function, False,
-                                                         self.sessionID),
-                                function.encode())
+        out_packet = HsmsPacket.from_stream_function(
+            HsmsStreamFunctionHeader(system, function.stream, function.function, False, self.sessionID),
+            function)
 
         self.communicationLogger.info("> %s\n%s", out_packet, function, extra=self._get_log_extra())
 
@@ -453,26 +803,9 @@ class HsmsHandler:
         :returns: System of the sent request
         :rtype: integer
         """
-        system_id = self.get_next_system_counter()
-
-        response_queue = self._get_queue_for_system(system_id)
-
-        packet = HsmsPacket(HsmsSelectReqHeader(system_id))
-        self.communicationLogger.info("> %s\n  %s", packet, HSMS_STYPES[packet.header.sType],
-                                      extra=self._get_log_extra())
-
-        if not self.connection.send_packet(packet):
-            self._remove_queue(system_id)
-            return None
+        system_id = self._send_request(HsmsPacket(HsmsSelectReqHeader(self.get_next_system_counter())))
 
-        try:
-            response = response_queue.get(True, self.connection.T6)
-        except queue.Empty:
-            response = None
-
-        self._remove_queue(system_id)
-
-        return response
+        return self._wait_for_response(system_id, self.connection.T6)
 
     def send_select_rsp(self, system_id):
         """
@@ -493,26 +826,9 @@ class HsmsHandler:
         :returns: System of the sent request
         :rtype: integer
         """
-        system_id = self.get_next_system_counter()
-
-        response_queue = self._get_queue_for_system(system_id)
-
-        packet = HsmsPacket(HsmsLinktestReqHeader(system_id))
-        self.communicationLogger.info("> %s\n  %s", packet, HSMS_STYPES[packet.header.sType],
-                                      extra=self._get_log_extra())
-
-        if not self.connection.send_packet(packet):
-            self._remove_queue(system_id)
-            return None
+        system_id = self._send_request(HsmsPacket(HsmsLinktestReqHeader(self.get_next_system_counter())))
 
-        try:
-            response = response_queue.get(True, self.connection.T6)
-        except queue.Empty:
-            response = None
-
-        self._remove_queue(system_id)
-
-        return response
+        return self._wait_for_response(system_id, self.connection.T6)
 
     def send_linktest_rsp(self, system_id):
         """
@@ -533,26 +849,9 @@ class HsmsHandler:
         :returns: System of the sent request
         :rtype: integer
         """
-        system_id = self.get_next_system_counter()
-
-        response_queue = self._get_queue_for_system(system_id)
-
-        packet = HsmsPacket(HsmsDeselectReqHeader(system_id))
-        self.communicationLogger.info("> %s\n  %s", packet, HSMS_STYPES[packet.header.sType],
-                                      extra=self._get_log_extra())
+        system_id = self._send_request(HsmsPacket(HsmsDeselectReqHeader(self.get_next_system_counter())))
 
-        if not self.connection.send_packet(packet):
-            self._remove_queue(system_id)
-            return None
-
-        try:
-            response = response_queue.get(True, self.connection.T6)
-        except queue.Empty:
-            response = None
-
-        self._remove_queue(system_id)
-
-        return response
+        return self._wait_for_response(system_id, self.connection.T6)
 
     def send_deselect_rsp(self, system_id):
         """
@@ -17,6 +17,8 @@
 
 import struct
 
+_HEADER_STRUCT = struct.Struct(">HBBBBL")
+
 
 class HsmsHeader:
     """
@@ -25,6 +27,8 @@ class HsmsHeader:
     Base for different specific headers
     """
 
+    __slots__ = ("sessionID", "requireResponse", "stream", "function", "pType", "sType", "system")
+
     def __init__(self, system, session_id):
         """
         Initialize a hsms header.
@@ -85,4 +89,54 @@ requireResponse:False})
         if self.requireResponse:
             header_stream |= 0b10000000
 
-        return struct.pack(">HBBBBL", self.sessionID, header_stream, self.function, self.pType, self.sType, self.system)
+        return _HEADER_STRUCT.pack(self.sessionID, header_stream, self.function, self.pType, self.sType, self.system)
+
+    def encode_into(self, buffer, offset):
+        """
+        Encode header into a buffer.
+
+        :param buffer: buffer to write the header to
+        :type buffer: bytearray
+        :param offset: position of the header in the buffer
+        :type offset: integer
+        """
+        header_stream = self.stream
+        if self.requireResponse:
+            header_stream |= 0b10000000
+
+        _HEADER_STRUCT.pack_into(buffer, offset, self.sessionID, header_stream, self.function, self.pType, self.sType,
+                                 self.system)
+
+    @staticmethod
+    def decode(data, offset=0):
+        """
+        Decode a header from a buffer.
+
+        :param data: buffer containing the encoded header
+        :type data: bytes/bytearray/memoryview
+        :param offset: position of the header in the buffer
+        :type offset: integer
+        :returns: decoded header
+        :rtype: :class:`secsgem.hsms.HsmsHeader`
+
+        **Example**::
+
+            >>> import secsgem.hsms
+            >>>
+            >>> secsgem.hsms.HsmsHeader.decode(b"\\x00\\x00\\x81\\x01\\x00\\x00\\x00\\x00\\x00\\x02")
+            HsmsHeader({sessionID:0x0000, stream:01, function:01, pType:0x00, sType:0x00, system:0x00000002, \
+requireResponse:True})
+        """
+        (session_id, stream, function, p_type, s_type, system) = _HEADER_STRUCT.unpack_from(data, offset)
+
+        # the fields are set directly, without setting the defaults of the constructor first
+        header = HsmsHeader.__new__(HsmsHeader)
+        header.sessionID = session_id
+        header.requireResponse = stream >= 0b10000000
+        header.stream = stream & 0b01111111
+        header.function = function
+        header.pType = p_type
+        header.sType = s_type
+        header.system = system
+
+        return header
@@ -35,12 +35,22 @@ class HsmsMultiPassiveServer:  # pragma: no cover
     select_timeout = 0.5
     """ Timeout for select calls ."""
 
-    def __init__(self, port=5000, bind_ip=''):
+    listen_backlog = 128
+    """ Number of incoming connections queued until they are accepted ."""
+
+    def __init__(self, port=5000, bind_ip='', reactor=None):
         """
         Initialize a passive hsms server.
 
+        If a reactor is passed, the listening socket and all connections of the server are served by it
+        instead of threads of their own.
+
         :param port: TCP port to listen on
         :type port: integer
+        :param bind_ip: IP address to listen on
+        :type bind_ip: string
+        :param reactor: reactor serving the server and its connections
+        :type reactor: :class:`secsgem.hsms.HsmsReactor`
 
         **Example**::
 
@@ -53,6 +63,7 @@ class HsmsMultiPassiveServer:  # pragma: no cover
 
         self.port = port
         self.bind_ip = bind_ip
+        self.reactor = reactor
 
         self.threadRunning = False
         self.stopThread = False
@@ -76,6 +87,7 @@ class HsmsMultiPassiveServer:  # pragma: no cover
         """
         connection = HsmsMultiPassiveConnection(address, port, session_id, delegate)
         connection.handler = self
+        connection.reactor = self.reactor
 
         self.connections[address] = connection
 
@@ -93,9 +105,16 @@ class HsmsMultiPassiveServer:  # pragma: no cover
             self.listenSock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
 
         self.listenSock.bind((self.bind_ip, self.port))
-        self.listenSock.listen(1)
+        self.listenSock.listen(self.listen_backlog)
         self.listenSock.setblocking(0)
 
+        if self.reactor is not None:
+            self.threadRunning = True
+            self.reactor.add_reader(self.listenSock, self._on_reactor_accept)
+
+            self.logger.debug("listening")
+            return
+
         self.listenThread = threading.Thread(target=self._listen_thread, args=(),
                                              name=f"secsgem_hsmsMultiPassiveServer_listenThread_{self.port}")
         self.listenThread.start()
@@ -113,7 +132,10 @@ class HsmsMultiPassiveServer:  # pragma: no cover
         """
         self.stopThread = True
 
-        if self.listenThread.is_alive():
+        if self.reactor is not None:
+            self.reactor.remove_reader(self.listenSock)
+            self.threadRunning = False
+        elif self.listenThread.is_alive():
             while self.threadRunning:
                 pass
 
@@ -165,6 +187,41 @@ class HsmsMultiPassiveServer:  # pragma: no cover
 
         new_connection.on_connected(sock, source_ip)
 
+    def _accept(self):
+        """
+        Accept an incoming connection.
+
+        .. warning:: Do not call this directly, used internally.
+
+        :returns: result of the accept call, None if no connection was accepted
+        :rtype: tuple
+        """
+        try:
+            accept_result = self.listenSock.accept()
+        except OSError as exc:
+            if not secsgem.common.is_errorcode_ewouldblock(exc.errno):
+                raise exc
+
+            return None
+
+        if self.stopThread:
+            return None
+
+        self.logger.debug("connection from %s:%d", accept_result[1][0], accept_result[1][1])
+
+        return accept_result
+
+    def _on_reactor_accept(self, _):
+        """
+        Accept and set up an incoming connection when the reactor found the listening socket readable.
+
+        .. warning:: Do not call this directly, will be called from the reactor thread.
+        """
+        accept_result = self._accept()
+
+        if accept_result is not None:
+            self._initialize_connection_thread(accept_result)
+
     def _listen_thread(self):
         """
         Thread listening for incoming connections.
@@ -178,22 +235,11 @@ class HsmsMultiPassiveServer:  # pragma: no cover
                 select_result = select.select([self.listenSock], [], [self.listenSock], self.select_timeout)
 
                 if select_result[0]:
-                    accept_result = None
-
-                    try:
-                        accept_result = self.listenSock.accept()
-                    except OSError as exc:
-                        if not secsgem.common.is_errorcode_ewouldblock(exc.errno):
-                            raise exc
+                    accept_result = self._accept()
 
                     if accept_result is None:
                         continue
 
-                    if self.stopThread:
-                        continue
-
-                    self.logger.debug("connection from %s:%d", accept_result[1][0], accept_result[1][1])
-
                     threading.Thread(
                         target=self._initialize_connection_thread, args=(accept_result,),
                         name=f"secsgem_hsmsMultiPassiveServer_InitializeConnectionThread_"
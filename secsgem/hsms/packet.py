@@ -19,6 +19,8 @@ import struct
 
 from .header import HsmsHeader
 
+_LENGTH_STRUCT = struct.Struct(">L")
+
 
 class HsmsPacket:
     """
@@ -27,6 +29,11 @@ class HsmsPacket:
     Contains all required data and functions.
     """
 
+    __slots__ = ("header", "_buffer", "_data", "decoded")
+
+    header_length = 14
+    """Length of the length field and the header in the encoded packet."""
+
     def __init__(self, header=None, data=b""):
         """
         Initialize a hsms packet.
@@ -49,8 +56,55 @@ sType:0x05, system:0x00000002, requireResponse:False}), 'data': ''})
         else:
             self.header = header
 
+        self._buffer = None
         self.data = data
 
+    @classmethod
+    def from_stream_function(cls, header, function):
+        """
+        Create a packet for a stream/function.
+
+        The stream/function is encoded into the buffer of the whole packet behind the length and header fields.
+        :func:`encode` completes this buffer and returns it, so the data is not copied again for sending.
+
+        **Example**::
+
+            >>> import secsgem.hsms
+            >>> import secsgem.secs
+            >>>
+            >>> header = secsgem.hsms.HsmsStreamFunctionHeader(2, 1, 1, True, 0)
+            >>> packet = secsgem.hsms.HsmsPacket.from_stream_function(header, secsgem.secs.functions.SecsS01F01())
+            >>> secsgem.common.format_hex(packet.encode())
+            '00:00:00:0a:00:00:81:01:00:00:00:00:00:02'
+
+        :param header: header used for this packet
+        :type header: :class:`secsgem.hsms.HsmsHeader` and derived
+        :param function: stream/function to send
+        :type function: :class:`secsgem.secs.SecsStreamFunction`
+        :returns: packet with the encoded stream/function as data
+        :rtype: :class:`secsgem.hsms.HsmsPacket`
+        """
+        buffer = bytearray(cls.header_length)
+        function.encode_into(buffer)
+
+        packet = cls(header, memoryview(buffer)[cls.header_length:])
+        packet._buffer = buffer  # pylint: disable=protected-access
+
+        return packet
+
+    @property
+    def data(self):
+        """Data part used for streams and functions."""
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+        self._buffer = None
+
+        # stream/function decoded from the data, cached by :func:`secsgem.secs.SecsHandler.secs_decode`
+        self.decoded = None
+
     def __str__(self):
         """Generate string representation for an object of this class."""
         data = "'header': " + self.header.__str__()
@@ -59,14 +113,14 @@ sType:0x05, system:0x00000002, requireResponse:False}), 'data': ''})
     def __repr__(self):
         """Generate textual representation for an object of this class."""
         return f"{self.__class__.__name__}" \
-               f"({{'header': {self.header.__repr__()}, 'data': '{self.data.decode('utf-8')}'}})"
+               f"({{'header': {self.header.__repr__()}, 'data': '{bytes(self.data).decode('utf-8')}'}})"
 
     def encode(self):
         """
         Encode packet data to hsms packet.
 
         :returns: encoded packet
-        :rtype: string
+        :rtype: bytes
 
         **Example**::
 
@@ -78,17 +132,63 @@ sType:0x05, system:0x00000002, requireResponse:False}), 'data': ''})
             '00:00:00:0a:ff:ff:00:00:00:05:00:00:00:02'
 
         """
-        headerdata = self.header.encode()
+        return bytes(self._encode_buffer())
+
+    def _encode_buffer(self):
+        # length field, header and data in one buffer, for packets created with from_stream_function
+        # the internal buffer already containing the data is used, so it must not be passed to the caller
+        if self._buffer is not None:
+            buffer = self._buffer
+        else:
+            buffer = bytearray(self.header_length)
+            buffer += self.data
+
+        _LENGTH_STRUCT.pack_into(buffer, 0, len(buffer) - 4)
+        self.header.encode_into(buffer, 4)
+
+        return buffer
+
+    def encode_buffers(self):
+        """
+        Encode packet data to a list of buffers, which are sent one after another.
+
+        The data is not copied behind the length and header, it is passed as a buffer of its own.
+        This allows sending the packet with scatter-gather io (e.g. :func:`socket.socket.sendmsg`).
+        For packets created with :func:`from_stream_function` the buffer already containing the data is returned,
+        the buffers must not be modified.
+
+        :returns: encoded packet parts
+        :rtype: list
+
+        **Example**::
+
+            >>> import secsgem.hsms
+            >>> import secsgem.common
+            >>>
+            >>> header = secsgem.hsms.HsmsStreamFunctionHeader(2, 1, 1, True, 0)
+            >>> [secsgem.common.format_hex(part) for part in secsgem.hsms.HsmsPacket(header, b"\\x01").encode_buffers()]
+            ['00:00:00:0b:00:00:81:01:00:00:00:00:00:02', '01']
+
+        """
+        if self._buffer is not None or len(self.data) == 0:
+            return [self._encode_buffer()]
 
-        length = len(headerdata) + len(self.data)
+        buffer = bytearray(self.header_length)
 
-        return struct.pack(">L", length) + headerdata + self.data
+        _LENGTH_STRUCT.pack_into(buffer, 0, len(buffer) + len(self.data) - 4)
+        self.header.encode_into(buffer, 4)
+
+        return [buffer, self.data]
 
     @staticmethod
     def decode(text):
         """
         Decode byte array hsms packet to HsmsPacket object.
 
+        If a :class:`memoryview` is passed, the data of the packet is a slice of it, so it is not copied.
+
+        :param text: encoded packet
+        :type text: bytes/bytearray/memoryview
         :returns: received packet object
         :rtype: :class:`secsgem.hsms.HsmsPacket`
 
@@ -106,17 +206,11 @@ sType:0x05, system:0x00000002, requireResponse:False}), 'data': ''})
             HsmsPacket({'header': HsmsHeader({sessionID:0xffff, stream:00, function:00, pType:0x00, sType:0x05, \
 system:0x00000002, requireResponse:False}), 'data': ''})
         """
-        data_length = len(text) - 14
-        data_length_text = str(data_length) + "s"
-
-        res = struct.unpack(">LHBBBBL" + data_length_text, text)
-
-        result = HsmsPacket(HsmsHeader(res[6], res[1]))
-        result.header.requireResponse = (((res[2] & 0b10000000) >> 7) == 1)
-        result.header.stream = res[2] & 0b01111111
-        result.header.function = res[3]
-        result.header.pType = res[4]
-        result.header.sType = res[5]
-        result.data = res[7]
+        # the fields are set directly, without the checks of the constructor
+        result = HsmsPacket.__new__(HsmsPacket)
+        result.header = HsmsHeader.decode(text, 4)
+        result._buffer = None  # pylint: disable=protected-access
+        result._data = text[HsmsPacket.header_length:]  # pylint: disable=protected-access
+        result.decoded = None
 
         return result
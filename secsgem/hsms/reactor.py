@@ -0,0 +1,264 @@
+#####################################################################
+# reactor.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+"""Contains the io reactor serving many hsms connections from one thread."""
+
+import collections
+import heapq
+import itertools
+import logging
+import selectors
+import socket
+import threading
+import time
+
+
+class HsmsReactorTimer:
+    """
+    Timer started with :func:`HsmsReactor.call_later`.
+
+    Can be cancelled like a :class:`threading.Timer`.
+    """
+
+    def __init__(self, deadline, function, args):
+        """
+        Initialize a reactor timer.
+
+        :param deadline: time the function is called at (:func:`time.monotonic`)
+        :type deadline: float
+        :param function: function to call
+        :type function: callable
+        :param args: arguments for the function
+        :type args: tuple
+        """
+        self.deadline = deadline
+        self.function = function
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        """Stop the timer, the function is not called if it didn't run yet."""
+        self.cancelled = True
+
+
+class HsmsReactor:
+    """
+    Selector based io loop serving the sockets of many hsms connections from one thread.
+
+    Connections and servers using a reactor don't start a thread of their own,
+    the reactor thread receives the data and calls the delegate callbacks of the connections.
+    The callbacks must not block, as all connections of the reactor wait for them.
+
+    Functions are passed to the reactor thread with :func:`call_soon` and :func:`call_later`,
+    these are the only functions that may be called from other threads.
+
+    **Example**::
+
+        import secsgem.hsms
+
+        reactor = secsgem.hsms.HsmsReactor()
+        reactor.start()
+
+        manager = secsgem.hsms.HsmsConnectionManager(reactor)
+        manager.add_peer("tool1", "10.211.55.33", 5000, False, 0)
+    """
+
+    def __init__(self, name="secsgem_hsmsReactor"):
+        """
+        Initialize a reactor.
+
+        :param name: name of the reactor thread
+        :type name: string
+        """
+        self.logger = logging.getLogger(self.__module__ + "." + self.__class__.__name__)
+
+        self.name = name
+
+        self._selector = selectors.DefaultSelector()
+
+        # socket pair waking the selector if functions are passed from other threads
+        (self._wakeupReceiveSock, self._wakeupSendSock) = socket.socketpair()
+        self._wakeupReceiveSock.setblocking(0)
+        self._wakeupSendSock.setblocking(0)
+        self._selector.register(self._wakeupReceiveSock, selectors.EVENT_READ, self._on_wakeup)
+
+        self._calls = collections.deque()
+        self._timers = []
+        self._timerSequence = itertools.count()
+        self._timersLock = threading.Lock()
+
+        self._thread = None
+        self._stopThread = False
+
+    @property
+    def running(self):
+        """Check if the reactor thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def in_reactor_thread(self):
+        """
+        Check if called from the reactor thread.
+
+        :returns: True if called from the reactor thread
+        :rtype: boolean
+        """
+        return threading.current_thread() is self._thread
+
+    def start(self):
+        """Start the reactor thread."""
+        if self.running:
+            return
+
+        self._stopThread = False
+        self._thread = threading.Thread(target=self._reactor_thread, name=self.name)
+        self._thread.daemon = True  # kill thread automatically on main program termination
+        self._thread.start()
+
+    def stop(self):
+        """Stop the reactor thread and wait for it to finish."""
+        if not self.running:
+            return
+
+        self._stopThread = True
+        self._wakeup()
+
+        if not self.in_reactor_thread():
+            self._thread.join()
+
+    def call_soon(self, function, *args):
+        """
+        Call a function in the reactor thread.
+
+        :param function: function to call
+        :type function: callable
+        :param args: arguments for the function
+        """
+        self._calls.append((function, args))
+        self._wakeup()
+
+    def call_later(self, delay, function, *args):
+        """
+        Call a function in the reactor thread after a delay.
+
+        :param delay: number of seconds to wait
+        :type delay: float
+        :param function: function to call
+        :type function: callable
+        :param args: arguments for the function
+        :returns: timer, which can be cancelled
+        :rtype: :class:`HsmsReactorTimer`
+        """
+        timer = HsmsReactorTimer(time.monotonic() + delay, function, args)
+
+        with self._timersLock:
+            heapq.heappush(self._timers, (timer.deadline, next(self._timerSequence), timer))
+
+        self._wakeup()
+
+        return timer
+
+    def add_reader(self, sock, function):
+        """
+        Call a function in the reactor thread when a socket is readable.
+
+        :param sock: socket to watch
+        :type sock: :class:`socket.socket`
+        :param function: function called with the socket as parameter
+        :type function: callable
+        """
+        self._call_in_reactor(self._selector.register, sock, selectors.EVENT_READ, function)
+
+    def remove_reader(self, sock):
+        """
+        Stop watching a socket.
+
+        :param sock: socket to remove
+        :type sock: :class:`socket.socket`
+        """
+        self._call_in_reactor(self._remove_reader, sock)
+
+    def _remove_reader(self, sock):
+        try:
+            self._selector.unregister(sock)
+        except (KeyError, ValueError):
+            pass
+
+    def _call_in_reactor(self, function, *args):
+        if self.running and not self.in_reactor_thread():
+            self.call_soon(function, *args)
+        else:
+            function(*args)
+
+    def _wakeup(self):
+        try:
+            self._wakeupSendSock.send(b"\0")
+        except OSError:
+            # buffer full, selector will wake up anyway
+            pass
+
+    def _on_wakeup(self, sock):
+        try:
+            while sock.recv(4096):
+                pass
+        except OSError:
+            pass
+
+    def _get_timeout(self):
+        if self._calls:
+            return 0
+
+        with self._timersLock:
+            if not self._timers:
+                return None
+
+            return max(0, self._timers[0][0] - time.monotonic())
+
+    def _run_timers(self):
+        now = time.monotonic()
+
+        while True:
+            with self._timersLock:
+                if not self._timers or self._timers[0][0] > now:
+                    return
+
+                timer = heapq.heappop(self._timers)[2]
+
+            if not timer.cancelled:
+                self._run(timer.function, timer.args)
+
+    def _run_calls(self):
+        # only the calls queued before, calls queued while running are handled in the next iteration
+        for _ in range(len(self._calls)):
+            (function, args) = self._calls.popleft()
+            self._run(function, args)
+
+    def _run(self, function, args):
+        try:
+            function(*args)
+        except Exception:  # pylint: disable=broad-except
+            self.logger.exception('ignoring exception in reactor function')
+
+    def _reactor_thread(self):
+        """
+        Thread waiting for socket events and timers.
+
+        .. warning:: Do not call this directly, used internally.
+        """
+        while not self._stopThread:
+            for (key, _) in self._selector.select(self._get_timeout()):
+                self._run(key.data, (key.fileobj, ))
+
+            self._run_timers()
+            self._run_calls()
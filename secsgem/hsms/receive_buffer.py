@@ -0,0 +1,142 @@
+#####################################################################
+# receive_buffer.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+"""Contains the receive buffer for hsms connections."""
+
+import struct
+
+_LENGTH_STRUCT = struct.Struct(">L")
+
+
+class HsmsReceiveBuffer:
+    """
+    Buffer for data received on a hsms connection, split into packets by the length prefix.
+
+    The data is received with `recv_into` directly into the buffer.
+    Complete packets are returned as :class:`memoryview` slices of the buffer, so they are not copied.
+    Data of returned packets is never overwritten, when the buffer is full a new buffer is used and only the
+    incomplete packet at the end is copied into it.
+    Packets larger than the buffer are received into a buffer of their own, which is returned as a whole.
+
+    After each :func:`recv_from` the complete packets must be taken with :func:`pop_packet` until it returns None.
+    """
+
+    def __init__(self, size=65536):
+        """
+        Initialize a receive buffer.
+
+        :param size: size of the buffer, this is the maximum number of bytes received with one call
+        :type size: integer
+        """
+        self.size = size
+
+        # allocated when receiving the first time, connections waiting for the remote don't need it
+        self._buffer = None
+        self._start = 0
+        self._end = 0
+        self._exported = False
+
+        self._packet = None
+        self._packet_end = 0
+
+    def __len__(self):
+        """Get the number of buffered bytes, that are not returned as packet yet."""
+        if self._packet is not None:
+            return self._packet_end
+
+        return self._end - self._start
+
+    def recv_from(self, sock):
+        """
+        Receive data from a socket into the buffer.
+
+        :param sock: socket to receive from
+        :type sock: :class:`socket.socket`
+        :returns: number of bytes received, 0 if the connection was closed
+        :rtype: integer
+        """
+        if self._packet is not None:
+            with memoryview(self._packet) as view:
+                received = sock.recv_into(view[self._packet_end:])
+
+            self._packet_end += received
+            return received
+
+        if self._buffer is None:
+            self._buffer = bytearray(self.size)
+        elif self._end == self.size:
+            self._renew()
+
+        with memoryview(self._buffer) as view:
+            received = sock.recv_into(view[self._end:])
+
+        self._end += received
+        return received
+
+    def pop_packet(self):
+        """
+        Get the next complete packet.
+
+        :returns: complete packet including the length prefix, None if no packet is complete yet
+        :rtype: memoryview
+        """
+        if self._packet is not None:
+            if self._packet_end < len(self._packet):
+                return None
+
+            packet = memoryview(self._packet)
+            self._packet = None
+            return packet
+
+        available = self._end - self._start
+        if available < 4:
+            return None
+
+        length = _LENGTH_STRUCT.unpack_from(self._buffer, self._start)[0] + 4
+
+        if available < length:
+            if self._start + length > self.size:
+                self._make_room(available, length)
+
+            return None
+
+        packet = memoryview(self._buffer)[self._start:self._start + length]
+        self._exported = True
+        self._start += length
+
+        return packet
+
+    def _make_room(self, available, length):
+        if length > self.size:
+            # packet doesn't fit into the buffer, receive the rest directly into a buffer for the packet
+            self._packet = bytearray(length)
+            self._packet[:available] = self._buffer[self._start:self._end]
+            self._packet_end = available
+            self._start = self._end = 0
+        else:
+            # packet doesn't fit behind the other data, continue in a new buffer
+            self._renew()
+
+    def _renew(self):
+        remaining = self._buffer[self._start:self._end]
+
+        # returned packets still point into the buffer, so it may only be reused if none were returned
+        if self._exported:
+            self._buffer = bytearray(self.size)
+            self._exported = False
+
+        self._buffer[:len(remaining)] = remaining
+        self._start = 0
+        self._end = len(remaining)
@@ -0,0 +1,232 @@
+#####################################################################
+# router.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+"""Contains the router selecting how received messages are handled by their header."""
+
+
+class HsmsRoutingRule:
+    """
+    Rule of a :class:`HsmsRouter`, matching received messages by their header.
+
+    Fields set to None match all values.
+    """
+
+    def __init__(self, action, session_id=None, stream=None, function=None, require_response=None, reply=None,
+                 callback=None):
+        """
+        Initialize a routing rule.
+
+        :param action: action for matching messages (see :class:`HsmsRouter`)
+        :type action: string
+        :param session_id: session / device ID to match
+        :type session_id: integer
+        :param stream: stream to match
+        :type stream: integer
+        :param function: function to match
+        :type function: integer
+        :param require_response: W-bit to match
+        :type require_response: boolean
+        :param reply: response sent for ACTION_REPLY
+        :type reply: :class:`secsgem.secs.functionbase.SecsStreamFunction`
+        :param callback: function called with handler and raw packet for ACTION_RAW
+        :type callback: callable
+        """
+        self.action = action
+        self.sessionID = session_id
+        self.stream = stream
+        self.function = function
+        self.requireResponse = require_response
+        self.reply = reply
+        self.callback = callback
+
+    def __repr__(self):
+        """Generate textual representation for an object of this class."""
+        return f"{self.__class__.__name__}({{action:{self.action}, sessionID:{self.sessionID}, " \
+               f"stream:{self.stream}, function:{self.function}, requireResponse:{self.requireResponse}}})"
+
+    def matches(self, header):
+        """
+        Check if the rule matches the header of a message.
+
+        :param header: header of the received message
+        :type header: :class:`secsgem.hsms.HsmsHeader`
+        :returns: True if the rule matches
+        :rtype: boolean
+        """
+        return (self.sessionID is None or self.sessionID == header.sessionID) \
+            and (self.stream is None or self.stream == header.stream) \
+            and (self.function is None or self.function == header.function) \
+            and (self.requireResponse is None or self.requireResponse == header.requireResponse)
+
+
+class HsmsRouter:
+    """
+    Routing of received stream/function messages by their header, before they are decoded.
+
+    The first matching rule selects the action, the default action applies if no rule matches:
+
+    ACTION_HANDLE
+        the message is logged, decoded and passed to the callbacks as usual
+    ACTION_DROP
+        the message is ignored
+    ACTION_REPLY
+        the reply of the rule is sent if the remote expects a response (e.g. S6F12 or S5F2), the message is ignored
+    ACTION_RAW
+        the callback of the rule is called with the handler and the raw packet in the receiving thread,
+        a returned stream/function is sent as response
+
+    Messages routed with ACTION_DROP, ACTION_REPLY or ACTION_RAW are not decoded, not written to the communication log
+    and not passed to the dispatcher.
+    Responses to requests sent by the handler are not routed.
+    The action is cached per header, so matching a message doesn't depend on the number of rules.
+
+    **Example**::
+
+        import secsgem.gem
+        import secsgem.hsms
+        import secsgem.secs
+
+        handler = secsgem.gem.GemHostHandler("10.211.55.33", 5000, False, 0, "test")
+
+        # only handle S1, S5F1, S6F11 and S10F1, acknowledge other events and drop the rest
+        handler.router.default_action = secsgem.hsms.HsmsRouter.ACTION_DROP
+        handler.router.add_rule(secsgem.hsms.HsmsRouter.ACTION_HANDLE, stream=1)
+        handler.router.add_rule(secsgem.hsms.HsmsRouter.ACTION_HANDLE, stream=5, function=1)
+        handler.router.add_rule(secsgem.hsms.HsmsRouter.ACTION_HANDLE, stream=6, function=11, session_id=0)
+        handler.router.add_rule(secsgem.hsms.HsmsRouter.ACTION_HANDLE, stream=10, function=1)
+        handler.router.add_rule(secsgem.hsms.HsmsRouter.ACTION_REPLY, stream=6, function=11,
+                                reply=secsgem.secs.functions.SecsS06F12(0))
+    """
+
+    ACTION_HANDLE = "handle"
+    ACTION_DROP = "drop"
+    ACTION_REPLY = "reply"
+    ACTION_RAW = "raw"
+
+    cache_size = 4096
+    """ Maximum number of cached header actions ."""
+
+    def __init__(self, default_action=ACTION_HANDLE):
+        """
+        Initialize a router.
+
+        :param default_action: action for messages not matching any rule (ACTION_HANDLE or ACTION_DROP)
+        :type default_action: string
+        """
+        self._rules = []
+        self._default = None
+        self._cache = {}
+
+        self.default_action = default_action
+
+    @property
+    def default_action(self):
+        """Action for messages not matching any rule (ACTION_HANDLE or ACTION_DROP)."""
+        return self._default.action
+
+    @default_action.setter
+    def default_action(self, value):
+        if value not in (self.ACTION_HANDLE, self.ACTION_DROP):
+            raise ValueError(f"invalid default action {value}")
+
+        self._default = HsmsRoutingRule(value)
+        self._cache = {}
+
+    @property
+    def rules(self):
+        """Routing rules, in the order they are checked."""
+        return list(self._rules)
+
+    def add_rule(self, action, stream=None, function=None, session_id=None, require_response=None, reply=None,
+                 callback=None):
+        """
+        Add a routing rule, it is checked after the rules added before.
+
+        :param action: action for matching messages (ACTION_HANDLE, ACTION_DROP, ACTION_REPLY or ACTION_RAW)
+        :type action: string
+        :param stream: stream to match, all streams if None
+        :type stream: integer
+        :param function: function to match, all functions if None
+        :type function: integer
+        :param session_id: session / device ID to match, all sessions if None
+        :type session_id: integer
+        :param require_response: W-bit to match, both if None
+        :type require_response: boolean
+        :param reply: response sent for ACTION_REPLY
+        :type reply: :class:`secsgem.secs.functionbase.SecsStreamFunction`
+        :param callback: function called with handler and raw packet for ACTION_RAW
+        :type callback: callable
+        :returns: the added rule
+        :rtype: :class:`secsgem.hsms.router.HsmsRoutingRule`
+        """
+        if action not in (self.ACTION_HANDLE, self.ACTION_DROP, self.ACTION_REPLY, self.ACTION_RAW):
+            raise ValueError(f"unknown action {action}")
+
+        if action == self.ACTION_REPLY and reply is None:
+            raise ValueError("reply required for ACTION_REPLY")
+
+        if action == self.ACTION_RAW and not callable(callback):
+            raise ValueError("callback required for ACTION_RAW")
+
+        rule = HsmsRoutingRule(action, session_id, stream, function, require_response, reply, callback)
+
+        # replaced instead of modified, messages are routed in other threads
+        self._rules = self._rules + [rule]
+        self._cache = {}
+
+        return rule
+
+    def remove_rule(self, rule):
+        """
+        Remove a routing rule.
+
+        :param rule: rule returned by :func:`add_rule`
+        :type rule: :class:`secsgem.hsms.router.HsmsRoutingRule`
+        """
+        self._rules = [item for item in self._rules if item is not rule]
+        self._cache = {}
+
+    def clear(self):
+        """Remove all routing rules."""
+        self._rules = []
+        self._cache = {}
+
+    def route(self, header):
+        """
+        Get the rule for a received message.
+
+        :param header: header of the received message
+        :type header: :class:`secsgem.hsms.HsmsHeader`
+        :returns: first matching rule, or a rule with the default action
+        :rtype: :class:`secsgem.hsms.router.HsmsRoutingRule`
+        """
+        if not self._rules:
+            return self._default
+
+        cache = self._cache
+        key = (header.sessionID, header.stream, header.function, header.requireResponse)
+
+        rule = cache.get(key)
+        if rule is not None:
+            return rule
+
+        rule = next((item for item in self._rules if item.matches(header)), self._default)
+
+        if len(cache) >= self.cache_size:
+            cache.clear()
+
+        cache[key] = rule
+
+        return rule
@@ -0,0 +1,129 @@
+#####################################################################
+# send_buffer.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+"""Contains the send buffer for hsms connections."""
+
+import collections
+
+
+class HsmsSendBuffer:
+    """
+    Buffer for packets queued for sending on a hsms connection.
+
+    The encoded packets are kept as list of buffers and sent without copying them.
+    All queued buffers are passed to one :func:`socket.socket.sendmsg` call, so packets queued while the
+    connection is busy are sent together.
+    If only a part of the data was sent, the next call continues behind the sent bytes.
+
+    The position counts all bytes sent (or discarded) since the buffer was created,
+    :func:`append` returns the position the buffer has to reach until the packet is sent completely.
+    """
+
+    max_buffers = 64
+    """ Maximum number of buffers passed to one send call ."""
+
+    def __init__(self, block_size=1024 * 1024):
+        """
+        Initialize a send buffer.
+
+        :param block_size: maximum number of bytes passed to one send call
+        :type block_size: integer
+        """
+        self.block_size = block_size
+        self.position = 0
+
+        self._buffers = collections.deque()
+        self._pending = 0
+
+    def __len__(self):
+        """Get the number of bytes not sent yet."""
+        return self._pending
+
+    def append(self, packet):
+        """
+        Queue a packet for sending.
+
+        :param packet: packet to send
+        :type packet: :class:`secsgem.hsms.HsmsPacket`
+        :returns: position after the packet
+        :rtype: integer
+        """
+        for buffer in packet.encode_buffers():
+            self._buffers.append(memoryview(buffer))
+            self._pending += len(buffer)
+
+        return self.position + self._pending
+
+    def send_to(self, sock):
+        """
+        Send queued data to a socket.
+
+        Raises the :class:`OSError` of the socket if sending failed, e.g. if the socket would block.
+
+        :param sock: socket to send to
+        :type sock: :class:`socket.socket`
+        :returns: number of bytes sent
+        :rtype: integer
+        """
+        buffers = []
+        size = 0
+
+        for buffer in self._buffers:
+            if len(buffers) == self.max_buffers or size == self.block_size:
+                break
+
+            buffer = buffer[:self.block_size - size]
+            buffers.append(buffer)
+            size += len(buffer)
+
+        if not buffers:
+            return 0
+
+        # sendmsg is not available on all platforms (e.g. windows)
+        if len(buffers) > 1 and hasattr(sock, "sendmsg"):
+            sent = sock.sendmsg(buffers)
+        else:
+            sent = sock.send(buffers[0])
+
+        self._consume(sent)
+
+        return sent
+
+    def discard(self):
+        """
+        Remove all queued data without sending it.
+
+        :returns: position after the discarded data
+        :rtype: integer
+        """
+        self._buffers.clear()
+        self.position += self._pending
+        self._pending = 0
+
+        return self.position
+
+    def _consume(self, count):
+        self.position += count
+        self._pending -= count
+
+        while count > 0:
+            buffer = self._buffers[0]
+
+            if count < len(buffer):
+                self._buffers[0] = buffer[count:]
+                return
+
+            count -= len(buffer)
+            self._buffers.popleft()
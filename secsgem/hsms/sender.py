@@ -0,0 +1,110 @@
+#####################################################################
+# sender.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+"""Contains the thread sending messages for a hsms handler outside of the receiving and timer threads."""
+
+import collections
+import logging
+import threading
+
+
+class HsmsSender:
+    """
+    Calls sending functions of a hsms handler one after the other from a separate thread.
+
+    Sending may block while the remote doesn't read from the socket.
+    Timer functions and the receiving thread hand their sends to the sender, so a blocked send doesn't delay other
+    timers or the processing of received messages.
+
+    The thread is started with the first call and ends as soon as no calls are waiting.
+
+    **Example**::
+
+        import secsgem.hsms
+
+        sender = secsgem.hsms.HsmsSender("example")
+        sender.call(print, "sent from sender thread")
+        sender.wait(1.0)
+    """
+
+    def __init__(self, name="secsgem_hsmsSender"):
+        """
+        Initialize a sender.
+
+        :param name: name of the sender thread
+        :type name: string
+        """
+        self.logger = logging.getLogger(self.__module__ + "." + self.__class__.__name__)
+
+        self.name = name
+
+        self._calls = collections.deque()
+        self._condition = threading.Condition()
+
+        self._thread = None
+
+    def __len__(self):
+        """Get the number of calls waiting for the sender thread."""
+        return len(self._calls)
+
+    def call(self, function, *args):
+        """
+        Call a function in the sender thread, after all previously passed functions.
+
+        :param function: function to call
+        :type function: callable
+        :param args: arguments for the function
+        """
+        with self._condition:
+            self._calls.append((function, args))
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sender_thread, name=self.name)
+                self._thread.daemon = True  # kill thread automatically on main program termination
+                self._thread.start()
+
+    def wait(self, timeout=None):
+        """
+        Wait until all passed functions were called.
+
+        Must not be called from a passed function, as it waits for the sender thread itself.
+
+        :param timeout: maximum number of seconds to wait, None waits forever
+        :type timeout: float
+        :returns: True if all functions were called, False on timeout
+        :rtype: boolean
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._thread is None, timeout)
+
+    def _sender_thread(self):
+        """
+        Thread calling the passed functions.
+
+        .. warning:: Do not call this directly, used internally.
+        """
+        while True:
+            with self._condition:
+                if not self._calls:
+                    self._thread = None
+                    self._condition.notify_all()
+                    return
+
+                function, args = self._calls.popleft()
+
+            try:
+                function(*args)
+            except Exception:  # pylint: disable=broad-except
+                self.logger.exception('ignoring exception in sender function')
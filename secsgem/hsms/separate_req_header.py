@@ -25,6 +25,8 @@ class HsmsSeparateReqHeader(HsmsHeader):
     Header for message with SType 9.
     """
 
+    __slots__ = ()
+
     def __init__(self, system):
         """
         Initialize a hsms separate request header.
@@ -25,6 +25,8 @@ class HsmsStreamFunctionHeader(HsmsHeader):
     Header for message with SType 0.
     """
 
+    __slots__ = ()
+
     def __init__(self, system, stream, function, require_response, session_id):
         """
         Initialize a stream function secs header.
@@ -49,10 +51,7 @@ class HsmsStreamFunctionHeader(HsmsHeader):
 system:0x00000016, requireResponse:True})
         """
         HsmsHeader.__init__(self, system, session_id)
-        self.sessionID = session_id
         self.requireResponse = require_response
         self.stream = stream
         self.function = function
-        self.pType = 0x00
         self.sType = 0x00
-        self.system = system
@@ -0,0 +1,212 @@
+#####################################################################
+# timer_wheel.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+"""Contains the timer wheel running the protocol timers of many hsms handlers and connections."""
+
+import logging
+import math
+import threading
+import time
+
+
+class HsmsTimerWheelTimer:
+    """
+    Timer started with :func:`HsmsTimerWheel.call_later`.
+
+    Can be cancelled like a :class:`threading.Timer`.
+    """
+
+    def __init__(self, expiry, function, args):
+        """
+        Initialize a timer wheel timer.
+
+        :param expiry: tick of the wheel the function is called at
+        :type expiry: integer
+        :param function: function to call
+        :type function: callable
+        :param args: arguments for the function
+        :type args: tuple
+        """
+        self.expiry = expiry
+        self.function = function
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        """Stop the timer, the function is not called if it didn't run yet."""
+        self.cancelled = True
+
+
+class HsmsTimerWheel:
+    """
+    Hashed timer wheel calling the timed functions of many hsms handlers and connections from one thread.
+
+    The time is divided into ticks, each timer is put into the slot of the tick it expires at (modulo the number of
+    slots).
+    Starting and cancelling a timer doesn't depend on the number of running timers,
+    every tick the thread only checks the timers of one slot.
+    Timers are called up to one tick late, but never early.
+
+    The thread is started with the first timer and waits without waking up while no timers are running.
+    The timer functions must not block, as all other timers wait for them.
+
+    Handlers and connections without a reactor share the wheel returned by :func:`default`.
+
+    **Example**::
+
+        import secsgem.hsms
+
+        wheel = secsgem.hsms.HsmsTimerWheel.default()
+        timer = wheel.call_later(5.0, print, "T6 expired")
+        timer.cancel()
+    """
+
+    _default = None
+    _defaultLock = threading.Lock()
+
+    def __init__(self, tick=0.05, slots=512, name="secsgem_hsmsTimerWheel"):
+        """
+        Initialize a timer wheel.
+
+        :param tick: length of a tick in seconds, the resolution of the timers
+        :type tick: float
+        :param slots: number of slots of the wheel
+        :type slots: integer
+        :param name: name of the timer thread
+        :type name: string
+        """
+        self.logger = logging.getLogger(self.__module__ + "." + self.__class__.__name__)
+
+        self.tick = tick
+        self.name = name
+
+        self._slots = [[] for _ in range(slots)]
+        self._count = 0
+        self._condition = threading.Condition()
+
+        # ticks are counted from the creation of the wheel, all slots up to the current tick were checked
+        self._origin = time.monotonic()
+        self._currentTick = 0
+
+        self._thread = None
+
+    @classmethod
+    def default(cls):
+        """
+        Get the timer wheel shared by all handlers and connections without reactor.
+
+        :returns: shared timer wheel
+        :rtype: :class:`secsgem.hsms.HsmsTimerWheel`
+        """
+        with cls._defaultLock:
+            if HsmsTimerWheel._default is None:
+                HsmsTimerWheel._default = HsmsTimerWheel()
+
+            return HsmsTimerWheel._default
+
+    def __len__(self):
+        """Get the number of timers in the wheel, cancelled timers are counted until their slot is checked."""
+        return self._count
+
+    def call_later(self, delay, function, *args):
+        """
+        Call a function in the timer thread after a delay.
+
+        :param delay: number of seconds to wait
+        :type delay: float
+        :param function: function to call
+        :type function: callable
+        :param args: arguments for the function
+        :returns: timer, which can be cancelled
+        :rtype: :class:`HsmsTimerWheelTimer`
+        """
+        with self._condition:
+            expiry = max(self._currentTick + 1, math.ceil((time.monotonic() - self._origin + delay) / self.tick))
+
+            timer = HsmsTimerWheelTimer(expiry, function, args)
+            self._slots[expiry % len(self._slots)].append(timer)
+            self._count += 1
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._timer_thread, name=self.name)
+                self._thread.daemon = True  # kill thread automatically on main program termination
+                self._thread.start()
+            elif self._count == 1:
+                self._condition.notify()
+
+        return timer
+
+    def _get_tick(self):
+        return int((time.monotonic() - self._origin) / self.tick)
+
+    def _collect_due_timers(self, tick):
+        due = []
+        slot_count = len(self._slots)
+
+        # after a long pause (e.g. system suspended) every slot is checked once
+        if tick - self._currentTick >= slot_count:
+            slot_indexes = range(slot_count)
+        else:
+            slot_indexes = (index % slot_count for index in range(self._currentTick + 1, tick + 1))
+
+        for slot_index in slot_indexes:
+            slot = self._slots[slot_index]
+            if not slot:
+                continue
+
+            remaining = []
+            for timer in slot:
+                if timer.cancelled:
+                    self._count -= 1
+                elif timer.expiry <= tick:
+                    self._count -= 1
+                    due.append(timer)
+                else:
+                    # expires in a later round of the wheel
+                    remaining.append(timer)
+
+            self._slots[slot_index] = remaining
+
+        self._currentTick = max(self._currentTick, tick)
+
+        return due
+
+    def _run(self, timer):
+        if timer.cancelled:
+            return
+
+        try:
+            timer.function(*timer.args)
+        except Exception:  # pylint: disable=broad-except
+            self.logger.exception('ignoring exception in timer function')
+
+    def _timer_thread(self):
+        """
+        Thread calling the functions of the expired timers.
+
+        .. warning:: Do not call this directly, used internally.
+        """
+        while True:
+            with self._condition:
+                while not self._count:
+                    self._condition.wait()
+
+                due = self._collect_due_timers(self._get_tick())
+
+            for timer in due:
+                self._run(timer)
+
+            # sleep until the next tick, timers started meanwhile expire at the earliest with it
+            time.sleep(max(0.0, self._origin + (self._currentTick + 1) * self.tick - time.monotonic()))
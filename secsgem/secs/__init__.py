@@ -20,7 +20,11 @@ from . import data_items
 from . import functions
 
 from .functions.base import SecsStreamFunction
+from .dispatcher import SecsDispatcher
 from .handler import SecsHandler
+from .async_handler import AsyncSecsHandler
+from .raw import decode_raw, encode_raw
 
 
-__all__ = ['variables', 'data_items', 'functions', 'SecsStreamFunction', "SecsHandler"]
+__all__ = ['variables', 'data_items', 'functions', 'SecsStreamFunction', "SecsDispatcher", "SecsHandler",
+           "AsyncSecsHandler", "decode_raw", "encode_raw"]
@@ -0,0 +1,207 @@
+#####################################################################
+# async_handler.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+"""Contains class to create model for secs endpoints running in an asyncio event loop."""
+
+import asyncio
+
+import secsgem.hsms
+
+from .handler import SecsHandler
+
+
+class AsyncSecsHandler(SecsHandler, secsgem.hsms.AsyncHsmsHandler):
+    """
+    Baseclass for creating Host/Equipment models running in an asyncio event loop.
+
+    Works like :class:`secsgem.secs.SecsHandler`, the functions waiting for a response are coroutines.
+    Received streams/functions are handled by tasks of the event loop,
+    the callbacks may be coroutine functions, which are awaited before the result is sent as response.
+    """
+
+    def _dispatch_stream_function(self, packet):
+        """
+        Handle a received stream/function in a task of the event loop.
+
+        :param packet: received data packet
+        :type packet: :class:`secsgem.hsms.HsmsPacket`
+        """
+        asyncio.ensure_future(self._handle_stream_function(packet))
+
+    async def _handle_stream_function(self, packet):
+        sf_callback_index = self._generate_sf_callback_name(packet.header.stream, packet.header.function)
+
+        # return S09F05 if no callback present
+        if sf_callback_index not in self._callback_handler:
+            self.logger.warning("unexpected function received %s\n%s", sf_callback_index, packet.header)
+            if packet.header.requireResponse:
+                self.send_response(self.stream_function(9, 5)(packet.header.encode()), packet.header.system)
+
+            return
+
+        try:
+            callback = getattr(self._callback_handler, sf_callback_index)
+            result = callback(self, packet)
+            if asyncio.iscoroutine(result):
+                result = await result
+            if result is not None:
+                self.send_response(result, packet.header.system)
+        except Exception:  # pylint: disable=broad-except
+            self.logger.exception('Callback aborted because of exception, abort sent')
+            self.send_response(self.stream_function(packet.header.stream, 0)(), packet.header.system)
+
+    async def disable_ceids(self):
+        """Disable all Collection Events."""
+        self.logger.info("Disable all collection events")
+
+        return await self.send_and_waitfor_response(self.stream_function(2, 37)({"CEED": False, "CEID": []}))
+
+    async def disable_ceid_reports(self):
+        """Disable all Collection Event Reports."""
+        self.logger.info("Disable all collection event reports")
+
+        return await self.send_and_waitfor_response(self.stream_function(2, 33)({"DATAID": 0, "DATA": []}))
+
+    async def list_svs(self, svs=None):
+        """
+        Get list of available Service Variables.
+
+        :returns: available Service Variables
+        :rtype: list
+        """
+        self.logger.info("Get list of service variables")
+
+        if svs is None:
+            svs = []
+
+        packet = await self.send_and_waitfor_response(self.stream_function(1, 11)(svs))
+
+        return self.secs_decode(packet)
+
+    async def request_svs(self, svs):
+        """
+        Request contents of supplied Service Variables.
+
+        :param svs: Service Variables to request
+        :type svs: list
+        :returns: values of requested Service Variables
+        :rtype: list
+        """
+        self.logger.info("Get value of service variables %s", svs)
+
+        packet = await self.send_and_waitfor_response(self.stream_function(1, 3)(svs))
+
+        return self.secs_decode(packet)
+
+    async def request_sv(self, sv_id):
+        """
+        Request contents of one Service Variable.
+
+        :param sv_id: id of Service Variable
+        :type sv_id: int
+        :returns: value of requested Service Variable
+        :rtype: various
+        """
+        self.logger.info("Get value of service variable %s", sv_id)
+
+        return (await self.request_svs([sv_id]))[0]
+
+    async def list_ecs(self, ecs=None):
+        """
+        Get list of available Equipment Constants.
+
+        :returns: available Equipment Constants
+        :rtype: list
+        """
+        self.logger.info("Get list of equipment constants")
+
+        if ecs is None:
+            ecs = []
+        packet = await self.send_and_waitfor_response(self.stream_function(2, 29)(ecs))
+
+        return self.secs_decode(packet)
+
+    async def request_ecs(self, ecs):
+        """
+        Request contents of supplied Equipment Constants.
+
+        :param ecs: Equipment Constants to request
+        :type ecs: list
+        :returns: values of requested Equipment Constants
+        :rtype: list
+        """
+        self.logger.info("Get value of equipment constants %s", ecs)
+
+        packet = await self.send_and_waitfor_response(self.stream_function(2, 13)(ecs))
+
+        return self.secs_decode(packet)
+
+    async def request_ec(self, ec_id):
+        """
+        Request contents of one Equipment Constant.
+
+        :param ec_id: id of Equipment Constant
+        :type ec_id: int
+        :returns: value of requested Equipment Constant
+        :rtype: various
+        """
+        self.logger.info("Get value of equipment constant %s", ec_id)
+
+        return await self.request_ecs([ec_id])
+
+    async def set_ecs(self, ecs):
+        """
+        Set contents of supplied Equipment Constants.
+
+        :param ecs: list containing list of id / value pairs
+        :type ecs: list
+        """
+        self.logger.info("Set value of equipment constants %s", ecs)
+
+        packet = await self.send_and_waitfor_response(self.stream_function(2, 15)(ecs))
+
+        return self.secs_decode(packet).get()
+
+    async def set_ec(self, ec_id, value):
+        """
+        Set contents of one Equipment Constant.
+
+        :param ec_id: id of Equipment Constant
+        :type ec_id: int
+        :param value: new content of Equipment Constant
+        :type value: various
+        """
+        self.logger.info("Set value of equipment constant %s to %s", ec_id, value)
+
+        return await self.set_ecs([[ec_id, value]])
+
+    async def send_equipment_terminal(self, terminal_id, text):
+        """
+        Set text to equipment terminal.
+
+        :param terminal_id: ID of terminal
+        :type terminal_id: int
+        :param text: text to send
+        :type text: string
+        """
+        self.logger.info("Send text to terminal %s", terminal_id)
+
+        return await self.send_and_waitfor_response(self.stream_function(10, 3)({"TID": terminal_id, "TEXT": text}))
+
+    async def are_you_there(self):
+        """Check if remote is still replying."""
+        self.logger.info("Requesting 'are you there'")
+
+        return await self.send_and_waitfor_response(self.stream_function(1, 1)())
@@ -0,0 +1,1153 @@
+#####################################################################
+# codec.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+"""
+Compiled codecs for data formats.
+
+A data format is compiled once into a tree of codecs, which convert directly between the encoded data and
+plain python values (dict/list/int/float/str/bytes), without creating the variable objects.
+The results are the same as setting/getting the values on the variable objects generated for the format.
+"""
+
+import inspect
+
+from . import variables
+from .variables import functions
+from .variables.base_number import BaseNumber, _get_array_struct, numpy
+from .variables.base_text import BaseText
+from .variables.dynamic import ANYVALUE
+
+
+def encode_item_header(format_code, length):
+    """
+    Encode item header depending on the number of length bytes required.
+
+    :param format_code: format code of the item
+    :type format_code: integer
+    :param length: number of bytes in data
+    :type length: integer
+    :returns: encoded item header bytes
+    :rtype: bytes
+    """
+    if length <= 0xFF:
+        return bytes((format_code << 2 | 1, length))
+    if length <= 0xFFFF:
+        return bytes((format_code << 2 | 2, length >> 8, length & 0xFF))
+    if length <= 0xFFFFFF:
+        return bytes((format_code << 2 | 3, length >> 16, (length >> 8) & 0xFF, length & 0xFF))
+
+    raise ValueError(f"Encoding not possible, data length too big {length}")
+
+
+def decode_item_header(data, start):
+    """
+    Decode item header depending on the number of length bytes required.
+
+    :param data: encoded data
+    :type data: bytes/bytearray/memoryview
+    :param start: start of item header in data
+    :type start: integer
+    :returns: start position for next item, format code, length item of data
+    :rtype: (integer, integer, integer)
+    """
+    format_byte = data[start]
+    length_bytes = format_byte & 0b11
+
+    if length_bytes == 1:
+        return start + 2, format_byte >> 2, data[start + 1]
+    if length_bytes == 2:
+        return start + 3, format_byte >> 2, data[start + 1] << 8 | data[start + 2]
+    if length_bytes == 3:
+        return start + 4, format_byte >> 2, data[start + 1] << 16 | data[start + 2] << 8 | data[start + 3]
+
+    return start + 1, format_byte >> 2, 0
+
+
+class ItemCodec:
+    """
+    Codec for an item using the variable objects.
+
+    This is the fallback for items without specialized codec and values the specialized codecs don't handle.
+    """
+
+    def __init__(self, data_format, count=-1):
+        """
+        Initialize an item codec.
+
+        :param data_format: data format of the item
+        :type data_format: list/Base based class
+        :param count: maximum number of values
+        :type count: integer
+        """
+        self.data_format = data_format
+        self.count = count
+
+        self._prototype = None
+
+    def _get_prototype(self):
+        if self._prototype is None:
+            prototype = functions.generate(self.data_format)
+            if hasattr(prototype, "count"):
+                prototype.count = self.count
+
+            self._prototype = prototype
+
+        return self._prototype
+
+    def supports_value(self, value):
+        """
+        Check if the item supports the provided value.
+
+        :param value: value to test
+        :type value: any
+        """
+        return self._get_prototype().supports_value(value)
+
+    def decode(self, data, start):
+        """
+        Decode an item to its python value.
+
+        :param data: encoded data
+        :type data: bytes/bytearray/memoryview
+        :param start: start of the item in data
+        :type start: integer
+        :returns: python value and start position of the next item
+        :rtype: (various, integer)
+        """
+        item = functions.generate(self.data_format)
+        start = item.decode(data, start)
+        return item.get(), start
+
+    def encode(self, value):
+        """
+        Encode an item from its python value.
+
+        :param value: python value
+        :type value: various
+        :returns: encoded item
+        :rtype: bytes
+        """
+        item = functions.generate(self.data_format)
+        item.set(value)
+        return item.encode()
+
+    def default(self):
+        """
+        Get the python value of an item which was not set.
+
+        :returns: python value
+        :rtype: various
+        """
+        return functions.generate(self.data_format).get()
+
+    def encode_default(self):
+        """
+        Encode an item which was not set.
+
+        :returns: encoded item
+        :rtype: bytes
+        """
+        return functions.generate(self.data_format).encode()
+
+    def _check_format_code(self, format_code, expected):
+        if format_code != expected:
+            name = getattr(self.data_format, "__name__", self.data_format.__class__.__name__)
+            raise ValueError(f"Decoding data for {name} ({expected}) has invalid format {format_code}")
+
+
+class NumberCodec(ItemCodec):
+    """Codec for numeric items."""
+
+    def __init__(self, data_format, count):
+        """
+        Initialize a numeric item codec.
+
+        :param data_format: variable class of the item
+        :type data_format: :class:`secsgem.secs.variables.BaseNumber` based class
+        :param count: maximum number of values
+        :type count: integer
+        """
+        super().__init__(data_format, count)
+
+        # pylint: disable=protected-access
+        self._format_code = data_format.format_code
+        self._bytes = data_format._bytes
+        self._struct_code = data_format._struct_code
+        self._base_type = data_format._base_type
+        self._min = data_format._min
+        self._max = data_format._max
+        self._single_struct = _get_array_struct(data_format._struct_code, 1)
+        self._single_header = encode_item_header(data_format.format_code, data_format._bytes)
+
+    def decode(self, data, start):
+        """
+        Decode an item to its python value.
+
+        :param data: encoded data
+        :type data: bytes/bytearray/memoryview
+        :param start: start of the item in data
+        :type start: integer
+        :returns: python value and start position of the next item
+        :rtype: (various, integer)
+        """
+        if self.data_format.use_numpy and numpy is not None:
+            return super().decode(data, start)
+
+        (text_pos, format_code, length) = decode_item_header(data, start)
+        if format_code != self._format_code:
+            self._check_format_code(format_code, self._format_code)
+
+        count = length // self._bytes
+        end = text_pos + count * self._bytes
+
+        if end > len(data):
+            raise ValueError(
+                f"No enough data found for {self.data_format.__name__} with length {length} at position {start} ")
+
+        if 0 <= self.count < count:
+            raise ValueError(f"Value longer than {self.count} chars")
+
+        if count == 1:
+            return self._single_struct.unpack_from(data, text_pos)[0], end
+
+        return list(_get_array_struct(self._struct_code, count).unpack_from(data, text_pos)), end
+
+    def supports_value(self, value):
+        """
+        Check if the item supports the provided value.
+
+        :param value: value to test
+        :type value: any
+        """
+        value_type = type(value)
+
+        if value_type is int or (value_type is float and self._base_type is float):
+            return self._min <= value <= self._max
+
+        return super().supports_value(value)
+
+    def encode(self, value):
+        """
+        Encode an item from its python value.
+
+        :param value: python value
+        :type value: various
+        :returns: encoded item
+        :rtype: bytes
+        """
+        base_type = self._base_type
+        value_type = type(value)
+
+        if value_type is int or value_type is float:
+            if value_type is float and base_type == int:
+                raise ValueError(f"Invalid value {value}")
+
+            value = base_type(value)
+            if value < self._min or value > self._max:
+                raise ValueError(f"Invalid value {value}")
+
+            return self._single_header + self._single_struct.pack(value)
+
+        if isinstance(value, (list, tuple)):
+            if 0 <= self.count < len(value):
+                raise ValueError(f"Value longer than {self.count} chars")
+
+            values = list(map(base_type, value))
+        elif isinstance(value, (int, float)):
+            if isinstance(value, float) and base_type == int:
+                raise ValueError(f"Invalid value {value}")
+
+            values = [base_type(value)]
+        else:
+            return super().encode(value)
+
+        self._get_prototype()._check_range(values)  # pylint: disable=protected-access
+
+        return encode_item_header(self._format_code, len(values) * self._bytes) + \
+            _get_array_struct(self._struct_code, len(values)).pack(*values)
+
+
+class TextCodec(ItemCodec):
+    """Codec for text items."""
+
+    def __init__(self, data_format, count):
+        """
+        Initialize a text item codec.
+
+        :param data_format: variable class of the item
+        :type data_format: :class:`secsgem.secs.variables.BaseText` based class
+        :param count: maximum number of characters
+        :type count: integer
+        """
+        super().__init__(data_format, count)
+
+    def decode(self, data, start):
+        """
+        Decode an item to its python value.
+
+        :param data: encoded data
+        :type data: bytes/bytearray/memoryview
+        :param start: start of the item in data
+        :type start: integer
+        :returns: python value and start position of the next item
+        :rtype: (various, integer)
+        """
+        (text_pos, format_code, length) = decode_item_header(data, start)
+        self._check_format_code(format_code, self.data_format.format_code)
+
+        value = ""
+        if length > 0:
+            value = str(data[text_pos:text_pos + length], self.data_format.coding)
+
+        if 0 < self.count < len(value):
+            raise ValueError(f"Value longer than {self.count} chars ({len(value)} chars)")
+
+        return value, text_pos + length
+
+    def encode(self, value):
+        """
+        Encode an item from its python value.
+
+        :param value: python value
+        :type value: various
+        :returns: encoded item
+        :rtype: bytes
+        """
+        if not isinstance(value, str):
+            return super().encode(value)
+
+        if 0 < self.count < len(value):
+            raise ValueError(f"Value longer than {self.count} chars ({len(value)} chars)")
+
+        encoded = value.encode(self.data_format.coding)
+
+        return encode_item_header(self.data_format.format_code, len(encoded)) + encoded
+
+
+class BinaryCodec(ItemCodec):
+    """Codec for binary items."""
+
+    def __init__(self, data_format, count):
+        """
+        Initialize a binary item codec.
+
+        :param data_format: variable class of the item
+        :type data_format: :class:`secsgem.secs.variables.Binary` based class
+        :param count: maximum number of bytes
+        :type count: integer
+        """
+        super().__init__(data_format, count)
+
+    def decode(self, data, start):
+        """
+        Decode an item to its python value.
+
+        :param data: encoded data
+        :type data: bytes/bytearray/memoryview
+        :param start: start of the item in data
+        :type start: integer
+        :returns: python value and start position of the next item
+        :rtype: (various, integer)
+        """
+        (text_pos, format_code, length) = decode_item_header(data, start)
+        self._check_format_code(format_code, self.data_format.format_code)
+
+        end = text_pos + length
+
+        if end > len(data):
+            raise ValueError(
+                f"No enough data found for {self.data_format.__name__} with length {length} at position {start} ")
+
+        if 0 < self.count < length:
+            raise ValueError(f"Value longer than {self.count} chars ({length} chars)")
+
+        if length == 1:
+            return data[text_pos], end
+
+        return bytes(data[text_pos:end]), end
+
+    def encode(self, value):
+        """
+        Encode an item from its python value.
+
+        :param value: python value
+        :type value: various
+        :returns: encoded item
+        :rtype: bytes
+        """
+        if isinstance(value, bytes):
+            if 0 < self.count < len(value):
+                raise ValueError(f"Value longer than {self.count} chars ({len(value)} chars)")
+
+            return encode_item_header(self.data_format.format_code, len(value)) + value
+
+        if isinstance(value, int) and 0 <= value <= 255:
+            return encode_item_header(self.data_format.format_code, 1) + bytes((value, ))
+
+        return super().encode(value)
+
+
+class BooleanCodec(ItemCodec):
+    """Codec for boolean items."""
+
+    def __init__(self, data_format, count):
+        """
+        Initialize a boolean item codec.
+
+        :param data_format: variable class of the item
+        :type data_format: :class:`secsgem.secs.variables.Boolean` based class
+        :param count: maximum number of values
+        :type count: integer
+        """
+        super().__init__(data_format, count)
+
+    def decode(self, data, start):
+        """
+        Decode an item to its python value.
+
+        :param data: encoded data
+        :type data: bytes/bytearray/memoryview
+        :param start: start of the item in data
+        :type start: integer
+        :returns: python value and start position of the next item
+        :rtype: (various, integer)
+        """
+        (text_pos, format_code, length) = decode_item_header(data, start)
+        self._check_format_code(format_code, self.data_format.format_code)
+
+        end = text_pos + length
+
+        if end > len(data):
+            raise ValueError(
+                f"No enough data found for {self.data_format.__name__} with length {length} at position {start} ")
+
+        if 0 <= self.count < length:
+            raise ValueError(f"Value longer than {self.count} chars")
+
+        if length == 1:
+            return data[text_pos] != 0, end
+
+        return [byte != 0 for byte in data[text_pos:end]], end
+
+    def encode(self, value):
+        """
+        Encode an item from its python value.
+
+        :param value: python value
+        :type value: various
+        :returns: encoded item
+        :rtype: bytes
+        """
+        if isinstance(value, bool):
+            return encode_item_header(self.data_format.format_code, 1) + (b"\1" if value else b"\0")
+
+        return super().encode(value)
+
+
+class DynamicCodec(ItemCodec):
+    """Codec for items with one of multiple types."""
+
+    _decode_types = [variables.Array, variables.Binary, variables.Boolean, variables.String,
+                     variables.I8, variables.I1, variables.I2, variables.I4, variables.F8, variables.F4,
+                     variables.U8, variables.U1, variables.U2, variables.U4]
+
+    _default_encode_types = [variables.Boolean, variables.U1, variables.U2, variables.U4, variables.U8,
+                             variables.I1, variables.I2, variables.I4, variables.I8, variables.F4, variables.F8,
+                             variables.String, variables.Binary]
+
+    def __init__(self, data_format, types, count):
+        """
+        Initialize a dynamic item codec.
+
+        :param data_format: variable class of the item
+        :type data_format: :class:`secsgem.secs.variables.Dynamic` based class
+        :param types: allowed variable types, empty for all types
+        :type types: list of :class:`secsgem.secs.variables.Base` based classes
+        :param count: maximum number of values
+        :type count: integer
+        """
+        super().__init__(data_format, count)
+
+        self.types = tuple(types) if types else ()
+
+        self._codecs = {}
+        self._format_types = {}
+        self._encode_types = {}
+        self._type_codecs = {}
+
+        # the first type for each format code wins, like in Dynamic.decode
+        for var_type in self._decode_types:
+            if self.types and var_type not in self.types:
+                continue
+
+            self._format_types.setdefault(var_type.format_code, var_type)
+
+    def _get_codec(self, format_code):
+        codec = self._codecs.get(format_code)
+
+        if codec is None:
+            var_type = self._format_types.get(format_code)
+
+            if var_type is None:
+                raise ValueError(
+                    f"Unsupported format {format_code} for this instance of Dynamic, allowed {list(self.types)}")
+
+            codec = self._get_type_codec(var_type)
+            self._codecs[format_code] = codec
+
+        return codec
+
+    def _get_type_codec(self, var_type):
+        codec = self._type_codecs.get(var_type)
+
+        if codec is None:
+            if var_type is variables.Array:
+                codec = ArrayCodec(compile_format(ANYVALUE))
+            else:
+                codec = _compile_variable(var_type, self.count)
+
+            self._type_codecs[var_type] = codec
+
+        return codec
+
+    def decode(self, data, start):
+        """
+        Decode an item to its python value.
+
+        :param data: encoded data
+        :type data: bytes/bytearray/memoryview
+        :param start: start of the item in data
+        :type start: integer
+        :returns: python value and start position of the next item
+        :rtype: (various, integer)
+        """
+        codec = self._codecs.get(data[start] >> 2)
+        if codec is None:
+            codec = self._get_codec(data[start] >> 2)
+
+        return codec.decode(data, start)
+
+    def _get_encode_types(self, value_type):
+        var_types = self._encode_types.get(value_type)
+
+        if var_types is None:
+            var_types = [self._get_type_codec(var_type) for var_type in (self.types or self._default_encode_types)
+                         if issubclass(value_type, tuple(var_type.preferred_types))]
+
+            self._encode_types[value_type] = var_types
+
+        return var_types
+
+    def encode(self, value):
+        """
+        Encode an item from its python value.
+
+        :param value: python value
+        :type value: various
+        :returns: encoded item
+        :rtype: bytes
+        """
+        if isinstance(value, variables.Base):
+            item = value.value if value.is_dynamic else value
+
+            if self.types and not isinstance(item, self.types):
+                raise ValueError(
+                    f"Unsupported type {item.__class__.__name__} "
+                    f"for this instance of Dynamic, allowed {list(self.types)}")
+
+            return item.encode()
+
+        # scalar values are matched to the preferred type like in Dynamic.set, without creating the objects
+        if isinstance(value, (int, float, str, bytes, list)):
+            for codec in self._get_encode_types(type(value)):
+                if codec.supports_value(value):
+                    return codec.encode(value)
+
+        return super().encode(value)
+
+
+class ArrayCodec(ItemCodec):
+    """Codec for arrays of items with the same format."""
+
+    def __init__(self, item_codec):
+        """
+        Initialize an array codec.
+
+        :param item_codec: codec of the array items
+        :type item_codec: :class:`ItemCodec`
+        """
+        super().__init__([item_codec.data_format])
+
+        self.item_codec = item_codec
+
+    def decode(self, data, start):
+        """
+        Decode an item to its python value.
+
+        :param data: encoded data
+        :type data: bytes/bytearray/memoryview
+        :param start: start of the item in data
+        :type start: integer
+        :returns: python value and start position of the next item
+        :rtype: (various, integer)
+        """
+        (text_pos, format_code, length) = decode_item_header(data, start)
+        self._check_format_code(format_code, variables.Array.format_code)
+
+        item_decode = self.item_codec.decode
+        result = []
+
+        for _ in range(length):
+            (value, text_pos) = item_decode(data, text_pos)
+            result.append(value)
+
+        return result, text_pos
+
+    def iter_decode(self, data, start):
+        """
+        Get an iterator decoding the array items one by one.
+
+        The array header is checked immediately, the items are decoded when the iterator is advanced.
+        Only the current item is kept, so the memory used does not depend on the number of items.
+
+        :param data: encoded data
+        :type data: bytes/bytearray/memoryview
+        :param start: start of the array in data
+        :type start: integer
+        :returns: iterator over the python values of the items
+        :rtype: iterator
+        """
+        (text_pos, format_code, length) = decode_item_header(data, start)
+        self._check_format_code(format_code, variables.Array.format_code)
+
+        return self._iter_items(data, text_pos, length)
+
+    def _iter_items(self, data, text_pos, length):
+        item_decode = self.item_codec.decode
+
+        for _ in range(length):
+            (value, text_pos) = item_decode(data, text_pos)
+            yield value
+
+    def encode(self, value):
+        """
+        Encode an item from its python value.
+
+        :param value: python value
+        :type value: various
+        :returns: encoded item
+        :rtype: bytes
+        """
+        if not isinstance(value, list):
+            raise ValueError(f"Invalid value type {type(value).__name__} for Array")
+
+        item_encode = self.item_codec.encode
+
+        return encode_item_header(variables.Array.format_code, len(value)) + \
+            b"".join([item_encode(item) for item in value])
+
+
+class ListCodec(ItemCodec):
+    """Codec for lists of named items with different formats."""
+
+    def __init__(self, data_format, fields):
+        """
+        Initialize a list codec.
+
+        :param data_format: data format of the list
+        :type data_format: list
+        :param fields: names and codecs of the fields
+        :type fields: list of (string, :class:`ItemCodec`)
+        """
+        super().__init__(data_format)
+
+        self.fields = fields
+        self.names = [name for (name, _) in fields]
+
+    def decode(self, data, start):
+        """
+        Decode an item to its python value.
+
+        :param data: encoded data
+        :type data: bytes/bytearray/memoryview
+        :param start: start of the item in data
+        :type start: integer
+        :returns: python value and start position of the next item
+        :rtype: (various, integer)
+        """
+        (text_pos, format_code, length) = decode_item_header(data, start)
+        self._check_format_code(format_code, variables.List.format_code)
+
+        if length > len(self.fields):
+            raise ValueError(f"Value has invalid field count (expected: {len(self.fields)}, actual: {length})")
+
+        result = {}
+
+        for (name, codec) in self.fields[:length]:
+            (result[name], text_pos) = codec.decode(data, text_pos)
+
+        for (name, codec) in self.fields[length:]:
+            result[name] = codec.default()
+
+        return result, text_pos
+
+    def find_field(self, data, start, name):
+        """
+        Get the start of a field without decoding the fields before it.
+
+        :param data: encoded data
+        :type data: bytes/bytearray/memoryview
+        :param start: start of the list in data
+        :type start: integer
+        :param name: name of the field
+        :type name: string
+        :returns: start of the field in data, None if the field is missing in the data
+        :rtype: integer
+        """
+        if name not in self.names:
+            raise KeyError(name)
+
+        (text_pos, format_code, length) = decode_item_header(data, start)
+        self._check_format_code(format_code, variables.List.format_code)
+
+        if length > len(self.fields):
+            raise ValueError(f"Value has invalid field count (expected: {len(self.fields)}, actual: {length})")
+
+        index = self.names.index(name)
+        if index >= length:
+            return None
+
+        for _ in range(index):
+            text_pos = skip_item(data, text_pos)
+
+        return text_pos
+
+    def encode(self, value):
+        """
+        Encode an item from its python value.
+
+        :param value: python value
+        :type value: various
+        :returns: encoded item
+        :rtype: bytes
+        """
+        if isinstance(value, dict):
+            for name in value:
+                if name not in self.names:
+                    raise KeyError(name)
+
+            items = [codec.encode(value[name]) if name in value else codec.encode_default()
+                     for (name, codec) in self.fields]
+        elif isinstance(value, list):
+            if len(value) > len(self.fields):
+                raise ValueError(
+                    f"Value has invalid field count (expected: {len(self.fields)}, actual: {len(value)})")
+
+            items = [codec.encode(item) for ((_, codec), item) in zip(self.fields, value)]
+            items += [codec.encode_default() for (_, codec) in self.fields[len(value):]]
+        else:
+            raise ValueError(f"Invalid value type {type(value).__name__} for List")
+
+        return encode_item_header(variables.List.format_code, len(self.fields)) + b"".join(items)
+
+
+def _uses_methods_of(var_type, base_type):
+    return all(getattr(var_type, method) is getattr(base_type, method)
+               for method in ("set", "get", "encode", "decode"))
+
+
+def _compile_variable(var_type, count):
+    if issubclass(var_type, BaseNumber) and _uses_methods_of(var_type, BaseNumber):
+        return NumberCodec(var_type, count)
+    if issubclass(var_type, BaseText) and _uses_methods_of(var_type, BaseText):
+        return TextCodec(var_type, count)
+    if issubclass(var_type, variables.Binary) and _uses_methods_of(var_type, variables.Binary):
+        return BinaryCodec(var_type, count)
+    if issubclass(var_type, variables.Boolean) and _uses_methods_of(var_type, variables.Boolean):
+        return BooleanCodec(var_type, count)
+
+    return ItemCodec(var_type)
+
+
+_variable_codecs = {}
+
+
+def compile_format(data_format):
+    """
+    Compile a data format to a codec.
+
+    **Example**::
+
+        >>> import secsgem.secs
+        >>>
+        >>> codec = secsgem.secs.codec.compile_format([secsgem.secs.data_items.SVID])
+        >>> codec.encode([1, 2])
+        b'\\x01\\x02\\xa5\\x01\\x01\\xa5\\x01\\x02'
+        >>> codec.decode(codec.encode([1, 2]), 0)
+        ([1, 2], 8)
+
+    :param data_format: data format to compile
+    :type data_format: list/Base based class
+    :returns: codec for the data format
+    :rtype: :class:`ItemCodec`
+    """
+    if data_format is None:
+        return None
+
+    if isinstance(data_format, list):
+        if len(data_format) == 1:
+            return ArrayCodec(compile_format(data_format[0]))
+
+        # the field names are taken from the variable objects, so they are named exactly the same
+        names = list(functions.generate(data_format).data.keys())
+        formats = [item for item in data_format if not isinstance(item, str)]
+
+        if len(names) != len(formats):
+            return ItemCodec(data_format)
+
+        return ListCodec(data_format, [(name, compile_format(item)) for (name, item) in zip(names, formats)])
+
+    if not inspect.isclass(data_format):
+        raise TypeError(f"Can't handle item of class {data_format.__class__.__name__}")
+
+    codec = _variable_codecs.get(data_format)
+    if codec is None:
+        prototype = functions.generate(data_format)
+
+        if prototype.is_dynamic and _uses_methods_of(data_format, variables.Dynamic):
+            codec = DynamicCodec(data_format, prototype.types, prototype.count)
+        else:
+            codec = _compile_variable(data_format, getattr(prototype, "count", -1))
+
+        _variable_codecs[data_format] = codec
+
+    return codec
+
+
+def skip_item(data, start):
+    """
+    Get the end of an item without decoding it.
+
+    Only the item headers are read, nested lists are walked without recursion.
+
+    :param data: encoded data
+    :type data: bytes/bytearray/memoryview
+    :param start: start of the item in data
+    :type start: integer
+    :returns: start position of the next item
+    :rtype: integer
+    """
+    remaining = 1
+
+    while remaining:
+        (start, format_code, length) = decode_item_header(data, start)
+        remaining -= 1
+
+        if format_code == 0:
+            remaining += length
+        else:
+            start += length
+
+    return start
+
+
+def decode_lazy(item_codec, data, start=0, name=None):
+    """
+    Decode an item to a lazy view.
+
+    Lists and arrays are returned as :class:`LazyListView` and :class:`LazyArrayView`,
+    all other items are decoded to their variable objects.
+
+    :param item_codec: codec of the item
+    :type item_codec: :class:`ItemCodec`
+    :param data: encoded data
+    :type data: bytes/bytearray/memoryview
+    :param start: start of the item in data
+    :type start: integer
+    :param name: name of the item
+    :type name: string
+    :returns: view or variable object
+    :rtype: :class:`LazyView`/:class:`secsgem.secs.variables.Base`
+    """
+    if isinstance(item_codec, ListCodec):
+        return LazyListView(item_codec, data, start, name)
+
+    if isinstance(item_codec, ArrayCodec):
+        return LazyArrayView(item_codec, data, start, name)
+
+    item = functions.generate(item_codec.data_format)
+    item.decode(data, start)
+    return item
+
+
+class LazyView:
+    """
+    Base class for lazy views of lists and arrays.
+
+    A view only reads the item headers it needs to find the requested items,
+    the items are decoded when they are accessed.
+    Modifying the view decodes it to the variable objects and all further calls are passed to them,
+    items taken from the view before are not part of these objects.
+    """
+
+    def __init__(self, item_codec, data, start, name):
+        """
+        Initialize a lazy view.
+
+        :param item_codec: codec of the item
+        :type item_codec: :class:`ItemCodec`
+        :param data: encoded data
+        :type data: bytes/bytearray/memoryview
+        :param start: start of the item in data
+        :type start: integer
+        :param name: name of the item
+        :type name: string
+        """
+        self._codec = item_codec
+        self._data = data
+        self._start = start
+        self._end = None
+        self._variable = None
+        self._items = {}
+        self._offsets = []
+
+        (self._next_offset, format_code, self._count) = decode_item_header(data, start)
+        item_codec._check_format_code(format_code, 0)  # pylint: disable=protected-access
+
+        self.name = name
+
+    def _materialize(self):
+        if self._variable is None:
+            self._variable = self._decode_variable()
+
+        return self._variable
+
+    def _decode_variable(self):
+        variable = functions.generate(self._codec.data_format)
+        variable.decode(self._data, self._start)
+        return variable
+
+    def _get_offset(self, index):
+        while len(self._offsets) <= index:
+            self._offsets.append(self._next_offset)
+            self._next_offset = skip_item(self._data, self._next_offset)
+
+        return self._offsets[index]
+
+    def _get_end(self):
+        if self._end is None:
+            if self._count > 0:
+                self._get_offset(self._count - 1)
+            self._end = self._next_offset
+
+        return self._end
+
+    def __repr__(self):
+        """Generate textual representation for an object of this class."""
+        if self._variable is not None:
+            return self._variable.__repr__()
+
+        return self._decode_variable().__repr__()
+
+    def set(self, value):
+        """
+        Set the value, this decodes the view to the variable objects.
+
+        :param value: new value
+        :type value: various
+        """
+        self._materialize().set(value)
+
+    def get(self):
+        """
+        Return the python value.
+
+        :returns: python value
+        :rtype: various
+        """
+        if self._variable is not None:
+            return self._variable.get()
+
+        return self._codec.decode(self._data, self._start)[0]
+
+    def encode(self):
+        """
+        Encode the value to secs data.
+
+        :returns: encoded data bytes
+        :rtype: bytes
+        """
+        if self._variable is not None:
+            return self._variable.encode()
+
+        return bytes(self._data[self._start:self._get_end()])
+
+    def encode_into(self, buffer):
+        """
+        Append the encoded value to a buffer.
+
+        :param buffer: buffer to append the encoded data to
+        :type buffer: bytearray
+        """
+        if self._variable is not None:
+            self._variable.encode_into(buffer)
+        else:
+            buffer += self._data[self._start:self._get_end()]
+
+
+class LazyListView(LazyView):
+    """Lazy view of a list, the fields are accessed like on :class:`secsgem.secs.variables.List`."""
+
+    def __getattr__(self, item):
+        """Get an item as member of the object."""
+        if item.startswith("_"):
+            raise AttributeError(item)
+
+        if self._variable is not None:
+            return getattr(self._variable, item)
+
+        if item == "data":
+            return self._materialize().data
+
+        try:
+            return self._get_field(self._codec.names.index(item))
+        except ValueError:
+            raise AttributeError(item)  # pylint: disable=raise-missing-from
+
+    def __setattr__(self, item, value):
+        """Set an item as member of the object."""
+        if item.startswith("_") or item == "name":
+            object.__setattr__(self, item, value)
+            return
+
+        setattr(self._materialize(), item, value)
+
+    def __getitem__(self, index):
+        """Get an item using the indexer operator."""
+        if self._variable is not None:
+            return self._variable[index]
+
+        if isinstance(index, int):
+            return self._get_field(range(len(self._codec.fields))[index])
+
+        if index not in self._codec.names:
+            raise KeyError(index)
+
+        return self._get_field(self._codec.names.index(index))
+
+    def __setitem__(self, index, value):
+        """Set an item using the indexer operator."""
+        self._materialize()[index] = value
+
+    def __iter__(self):
+        """Get an iterator over the field names."""
+        return iter(list(self._codec.names))
+
+    def __len__(self):
+        """Get the length."""
+        return len(self._codec.fields)
+
+    def _get_field(self, index):
+        if self._variable is not None:
+            return self._variable[index]
+
+        item = self._items.get(index)
+
+        if item is None:
+            (name, field_codec) = self._codec.fields[index]
+
+            if index < self._count:
+                item = decode_lazy(field_codec, self._data, self._get_offset(index), name)
+            else:
+                item = functions.generate(field_codec.data_format)
+
+            self._items[index] = item
+
+        return item
+
+    def encode(self):
+        """
+        Encode the value to secs data.
+
+        :returns: encoded data bytes
+        :rtype: bytes
+        """
+        if self._variable is None and self._count != len(self._codec.fields):
+            # missing fields are encoded with their default value
+            return self._materialize().encode()
+
+        return super().encode()
+
+    def encode_into(self, buffer):
+        """
+        Append the encoded value to a buffer.
+
+        :param buffer: buffer to append the encoded data to
+        :type buffer: bytearray
+        """
+        if self._variable is None and self._count != len(self._codec.fields):
+            self._materialize()
+
+        super().encode_into(buffer)
+
+
+class LazyArrayView(LazyView):
+    """Lazy view of an array, the items are accessed like on :class:`secsgem.secs.variables.Array`."""
+
+    def __getitem__(self, key):
+        """Get an item using the indexer operator."""
+        if self._variable is not None:
+            return self._variable[key]
+
+        if isinstance(key, slice):
+            return [self._get_item(index) for index in range(self._count)[key]]
+
+        return self._get_item(range(self._count)[key])
+
+    def __setitem__(self, key, value):
+        """Set an item using the indexer operator."""
+        self._materialize()[key] = value
+
+    def __iter__(self):
+        """Get an iterator."""
+        if self._variable is not None:
+            return iter(self._variable)
+
+        return (self._get_item(index) for index in range(self._count))
+
+    def __len__(self):
+        """Get the length."""
+        if self._variable is not None:
+            return len(self._variable)
+
+        return self._count
+
+    def append(self, data):
+        """
+        Append data to the array, this decodes the view to the variable objects.
+
+        :param data: new value
+        :type data: various
+        """
+        self._materialize().append(data)
+
+    def _get_item(self, index):
+        item = self._items.get(index)
+
+        if item is None:
+            item = decode_lazy(self._codec.item_codec, self._data, self._get_offset(index), self.name)
+            self._items[index] = item
+
+        return item
@@ -0,0 +1,245 @@
+#####################################################################
+# dispatcher.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+"""Contains the dispatcher handling received streams/functions in a bounded worker pool."""
+
+import collections
+import logging
+import queue
+import threading
+import time
+
+# marker for a worker that waited idle_timeout without getting a lane
+_IDLE = object()
+
+
+class SecsDispatcher:
+    """
+    Worker pool calling the handlers for received streams/functions.
+
+    The number of worker threads is limited, workers are started when required and stop after being idle for
+    :attr:`idle_timeout` seconds.
+    The ordering defines which messages are handled one after another in the order they were received:
+
+    ORDER_CONNECTION
+        all messages of a connection (strict FIFO per connection)
+    ORDER_STREAM_FUNCTION
+        messages of the same stream/function of a connection (FIFO per stream/function)
+    ORDER_PARALLEL
+        no ordering, all messages are handled in parallel
+
+    Messages that have to wait for a previous message don't block a worker,
+    so a busy connection doesn't delay the other connections as long as workers are available.
+    One dispatcher can be shared by the handlers of many connections to limit the total number of threads.
+
+    **Example**::
+
+        import secsgem.gem
+        import secsgem.secs
+
+        dispatcher = secsgem.secs.SecsDispatcher(8, secsgem.secs.SecsDispatcher.ORDER_STREAM_FUNCTION)
+
+        handler = secsgem.gem.GemHostHandler("10.211.55.33", 5000, False, 0, "test")
+        handler.dispatcher = dispatcher
+    """
+
+    ORDER_CONNECTION = "connection"
+    ORDER_STREAM_FUNCTION = "stream_function"
+    ORDER_PARALLEL = "parallel"
+
+    idle_timeout = 5.0
+    """ Seconds after which an idle worker thread stops ."""
+
+    def __init__(self, max_workers=4, ordering=ORDER_CONNECTION, name="secsgem_secsDispatcher"):
+        """
+        Initialize a dispatcher.
+
+        :param max_workers: maximum number of worker threads
+        :type max_workers: integer
+        :param ordering: ordering of the messages (ORDER_CONNECTION, ORDER_STREAM_FUNCTION or ORDER_PARALLEL)
+        :type ordering: string
+        :param name: name of the worker threads
+        :type name: string
+        """
+        if ordering not in (self.ORDER_CONNECTION, self.ORDER_STREAM_FUNCTION, self.ORDER_PARALLEL):
+            raise ValueError(f"unknown ordering {ordering}")
+
+        self.logger = logging.getLogger(self.__module__ + "." + self.__class__.__name__)
+
+        self.max_workers = max_workers
+        self.ordering = ordering
+        self.name = name
+
+        # lanes with messages waiting for a worker, a lane contains the messages handled one after another
+        self._ready = queue.Queue()
+
+        # lanes with waiting or running messages by their ordering key
+        self._lanes = {}
+
+        self._lock = threading.Lock()
+        self._workers = 0
+        self._idleWorkers = 0
+        self._threads = set()
+
+        # stop requests (None) queued in _ready by stop
+        self._stopRequests = 0
+
+    @property
+    def workers(self):
+        """Get the number of running worker threads."""
+        return self._workers
+
+    def stop(self, timeout=None):
+        """
+        Stop the worker threads after they handled the dispatched messages.
+
+        Messages dispatched afterwards start new workers.
+
+        :param timeout: maximum seconds to wait for the workers to stop
+        :type timeout: float
+        :returns: True if all workers stopped
+        :rtype: boolean
+        """
+        with self._lock:
+            threads = list(self._threads)
+
+            for _ in range(self._workers):
+                self._stopRequests += 1
+                self._ready.put(None)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        for thread in threads:
+            # a dispatched function stopping the dispatcher can't wait for itself
+            if thread is threading.current_thread():
+                continue
+
+            thread.join(None if deadline is None else max(deadline - time.monotonic(), 0))
+
+        return not any(thread.is_alive() for thread in threads if thread is not threading.current_thread())
+
+    def dispatch(self, connection, packet, function):
+        """
+        Call a function for a received packet in a worker thread.
+
+        :param connection: object identifying the connection the packet was received on, e.g. the handler
+        :type connection: object
+        :param packet: received packet
+        :type packet: :class:`secsgem.hsms.HsmsPacket`
+        :param function: function called with the packet as parameter
+        :type function: callable
+        """
+        key = self._get_key(connection, packet)
+
+        with self._lock:
+            if key is None:
+                lane = collections.deque()
+            else:
+                lane = self._lanes.get(key)
+
+                if lane is not None:
+                    # previous message of the lane waiting or running, the worker continues with this one
+                    lane.append((function, packet))
+                    return
+
+                lane = self._lanes[key] = collections.deque()
+
+            lane.append((function, packet))
+            self._ready.put((key, lane))
+
+            # start a worker if the idle workers don't suffice for the waiting lanes
+            if self._idleWorkers < self._ready.qsize() and self._workers < self.max_workers:
+                self._start_worker()
+
+    def _get_key(self, connection, packet):
+        if self.ordering == self.ORDER_CONNECTION:
+            return connection
+
+        if self.ordering == self.ORDER_STREAM_FUNCTION:
+            return connection, packet.header.stream, packet.header.function
+
+        return None
+
+    def _start_worker(self):
+        self._workers += 1
+
+        thread = threading.Thread(target=self._worker_thread, name=self.name)
+        thread.daemon = True  # kill thread automatically on main program termination
+        self._threads.add(thread)
+        thread.start()
+
+    def _stop_worker(self):
+        self._workers -= 1
+        self._threads.discard(threading.current_thread())
+
+    def _get_lane(self):
+        while True:
+            with self._lock:
+                self._idleWorkers += 1
+
+            try:
+                lane = self._ready.get(True, self.idle_timeout)
+            except queue.Empty:
+                lane = _IDLE
+
+            with self._lock:
+                self._idleWorkers -= 1
+
+                if lane is None:
+                    self._stopRequests -= 1
+                    self._stop_worker()
+
+                    # lanes dispatched while stopping still need a worker
+                    if self._ready.qsize() > self._stopRequests + self._idleWorkers and \
+                            self._workers < self.max_workers:
+                        self._start_worker()
+
+                    return None
+
+                if lane is not _IDLE:
+                    return lane
+
+                # stop if idle, lanes queued meanwhile are checked under the lock dispatch uses
+                if self._ready.empty():
+                    self._stop_worker()
+                    return None
+
+    def _worker_thread(self):
+        """
+        Thread handling the queued messages.
+
+        .. warning:: Do not call this directly, for internal use only.
+        """
+        while True:
+            item = self._get_lane()
+            if item is None:
+                return
+
+            (key, lane) = item
+            (function, packet) = lane[0]
+
+            try:
+                function(packet)
+            except Exception:  # pylint: disable=broad-except
+                self.logger.exception("ignoring exception in dispatched function")
+
+            with self._lock:
+                lane.popleft()
+
+                if lane:
+                    # continue with the next message of the lane after the other waiting lanes
+                    self._ready.put((key, lane))
+                elif key is not None:
+                    del self._lanes[key]
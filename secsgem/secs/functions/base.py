@@ -17,6 +17,7 @@
 
 import secsgem.common
 from ..variables import functions
+from .. import codec
 
 
 class StructureDisplayingMeta(type):
@@ -81,7 +82,15 @@ class SecsStreamFunction(metaclass=StructureDisplayingMeta):
         :param value: set the value of stream/function parameters
         :type value: various
         """
-        self.data = functions.generate(self._data_format)
+        self._initialize(functions.generate(self._data_format))
+
+        if value is not None and self.data is not None:
+            self.data.set(value)
+
+        self._object_intitialized = True
+
+    def _initialize(self, data):
+        self.data = data
 
         # copy public members from private ones
         self.stream = self._stream
@@ -96,11 +105,6 @@ class SecsStreamFunction(metaclass=StructureDisplayingMeta):
 
         self.is_multi_block = self._is_multi_block
 
-        if value is not None and self.data is not None:
-            self.data.set(value)
-
-        self._object_intitialized = True
-
     def __repr__(self):
         """Generate textual representation for an object of this class."""
         function = f"S{self.stream}F{self.function}"
@@ -161,15 +165,28 @@ class SecsStreamFunction(metaclass=StructureDisplayingMeta):
 
         return self.data.encode()
 
+    def encode_into(self, buffer):
+        """
+        Append the encoded hsms data of the stream/function parameter to a buffer.
+
+        :param buffer: buffer to append the encoded data to
+        :type buffer: bytearray
+        """
+        if self.data is not None:
+            self.data.encode_into(buffer)
+
     def decode(self, data):
         """
         Update stream/function parameter data from the passed data.
 
+        The data is wrapped in a :class:`memoryview`, so the items are decoded in one pass without copying
+        the message body.
+
         :param data: encoded data
-        :type data: string
+        :type data: bytes/bytearray/memoryview
         """
         if self.data is not None:
-            self.data.decode(data)
+            self.data.decode(memoryview(data))
 
     def set(self, value):
         """
@@ -189,6 +206,166 @@ class SecsStreamFunction(metaclass=StructureDisplayingMeta):
         """
         return self.data.get()
 
+    @classmethod
+    def get_codec(cls):
+        """
+        Get the compiled codec for the data format of the function.
+
+        The data format is compiled on first use and the codec is kept for the class.
+
+        :returns: codec for the data format, None if the function has no data
+        :rtype: :class:`secsgem.secs.codec.ItemCodec`
+        """
+        if "_codec" not in cls.__dict__:
+            cls._codec = codec.compile_format(cls._data_format)
+
+        return cls._codec
+
+    @classmethod
+    def decode_value(cls, data):
+        """
+        Decode the passed data directly to the python value of the stream/function parameter.
+
+        This is the same value as returned by :func:`get` after :func:`decode`,
+        but no variable objects are created.
+
+        **Example**::
+
+            >>> import secsgem.secs
+            >>>
+            >>> secsgem.secs.functions.SecsS01F03.decode_value(b'\\x01\\x01\\xa5\\x01\\x01')
+            [1]
+
+        :param data: encoded data
+        :type data: bytes/bytearray/memoryview
+        :returns: parameter value
+        :rtype: various
+        """
+        function_codec = cls.get_codec()
+        if function_codec is None:
+            return None
+
+        if len(data) == 0:
+            raise ValueError(f"Decoding for {cls.__name__} without any text")
+
+        return function_codec.decode(memoryview(data), 0)[0]
+
+    @classmethod
+    def decode_lazy(cls, data):
+        """
+        Decode the passed data to a stream/function object with a lazy view of the parameter.
+
+        Only the item headers required to find an accessed item are read,
+        the items are decoded when they are accessed (e.g. `message.RPT[0].V`).
+        :func:`get` on the object or a list/array item decodes the python value without creating variable objects.
+
+        **Example**::
+
+            >>> import secsgem.secs
+            >>>
+            >>> data = secsgem.secs.functions.SecsS06F11({"DATAID": 1, "CEID": 1337, "RPT": []}).encode()
+            >>> secsgem.secs.functions.SecsS06F11.decode_lazy(data).CEID
+            <U2 1337 >
+
+        :param data: encoded data
+        :type data: bytes/bytearray/memoryview
+        :returns: stream/function object
+        :rtype: :class:`SecsStreamFunction`
+        """
+        function_codec = cls.get_codec()
+
+        function = cls.__new__(cls)
+
+        if function_codec is None:
+            function._initialize(None)  # pylint: disable=protected-access
+        else:
+            if len(data) == 0:
+                raise ValueError(f"Decoding for {cls.__name__} without any text")
+
+            function._initialize(codec.decode_lazy(function_codec, memoryview(data)))  # pylint: disable=W0212
+
+        function._object_intitialized = True  # pylint: disable=protected-access
+
+        return function
+
+    @classmethod
+    def iter_decode(cls, data, field=None):
+        """
+        Get an iterator decoding the items of an array in the passed data one by one.
+
+        The array is the stream/function parameter or, if field is passed, the field of the parameter list.
+        The items are decoded to their python values when the iterator is advanced, only the current item is kept.
+        This allows processing messages with a large number of items (e.g. S12F11 map data) without decoding
+        the whole message.
+
+        **Example**::
+
+            >>> import secsgem.secs
+            >>>
+            >>> data = secsgem.secs.functions.SecsS06F01({"TRID": 1, "SMPLN": 2, "STIME": "", "SV": [10, 20]}).encode()
+            >>> list(secsgem.secs.functions.SecsS06F01.iter_decode(data, "SV"))
+            [10, 20]
+
+        :param data: encoded data
+        :type data: bytes/bytearray/memoryview
+        :param field: name of the array field, None if the parameter is the array
+        :type field: string
+        :returns: iterator over the python values of the array items
+        :rtype: iterator
+        """
+        item_codec = cls.get_codec()
+        start = 0
+
+        if len(data) == 0:
+            raise ValueError(f"Decoding for {cls.__name__} without any text")
+
+        data = memoryview(data)
+
+        if field is not None:
+            if not isinstance(item_codec, codec.ListCodec):
+                raise ValueError(f"{cls.__name__} has no field {field}")
+
+            start = item_codec.find_field(data, 0, field)
+            item_codec = item_codec.fields[item_codec.names.index(field)][1]
+
+            if start is None:
+                # field is missing in the data, its default is an empty array
+                return iter([])
+
+        if not isinstance(item_codec, codec.ArrayCodec):
+            raise ValueError(f"{cls.__name__} has no array {field if field is not None else 'parameter'}")
+
+        return item_codec.iter_decode(data, start)
+
+    @classmethod
+    def encode_value(cls, value):
+        """
+        Encode the python value of the stream/function parameter directly.
+
+        This is the same data as returned by :func:`encode` after :func:`set`,
+        but no variable objects are created for values with a fixed type.
+
+        **Example**::
+
+            >>> import secsgem.secs
+            >>>
+            >>> secsgem.secs.functions.SecsS01F03.encode_value([1])
+            b'\\x01\\x01\\xa5\\x01\\x01'
+
+        :param value: parameter value
+        :type value: various
+        :returns: encoded data
+        :rtype: bytes
+        """
+        function_codec = cls.get_codec()
+        if function_codec is None:
+            return b""
+
+        if value is None:
+            return function_codec.encode_default()
+
+        return function_codec.encode(value)
+
     @classmethod
     def get_format(cls):
         """
@@ -16,12 +16,12 @@
 """Handler for SECS commands. Used in combination with :class:`secsgem.HsmsHandler.HsmsConnectionManager`."""
 
 import logging
-import threading
 import copy
 
 import secsgem.hsms
 
 from . import functions
+from .dispatcher import SecsDispatcher
 
 
 class SecsHandler(secsgem.hsms.HsmsHandler):
@@ -31,6 +31,18 @@ class SecsHandler(secsgem.hsms.HsmsHandler):
     Inherit from this class and override required functions.
     """
 
+    lazy_decode = False
+    """Decode received messages to lazy views (see :func:`secsgem.secs.SecsStreamFunction.decode_lazy`)."""
+
+    dispatch_ordering = SecsDispatcher.ORDER_CONNECTION
+    """Ordering of the received streams/functions in the dispatcher (see :class:`secsgem.secs.SecsDispatcher`)."""
+
+    dispatch_workers = 4
+    """Maximum number of threads handling received streams/functions."""
+
+    inline_stream_functions = frozenset([(1, 1), (1, 13)])
+    """Streams/functions handled in the receiving thread, their callbacks must not block."""
+
     def __init__(self, address, port, active, session_id, name, custom_connection_handler=None):
         """
         Initialize a secs handler.
@@ -59,6 +71,10 @@ class SecsHandler(secsgem.hsms.HsmsHandler):
 
         self.secs_streams_functions = copy.deepcopy(functions.secs_streams_functions)
 
+        # worker pool handling received streams/functions, can be replaced by a dispatcher shared by many handlers
+        self.dispatcher = SecsDispatcher(self.dispatch_workers, self.dispatch_ordering,
+                                         f"secsgem_secsHandler_dispatcher_{name}")
+
     @staticmethod
     def _generate_sf_callback_name(stream, function):
         return f"s{stream:02d}f{function:02d}"
@@ -235,10 +251,20 @@ class SecsHandler(secsgem.hsms.HsmsHandler):
         :param packet: received data packet
         :type packet: :class:`secsgem.hsms.HsmsPacket`
         """
-        # check if callbacks available for this stream and function
-        threading.Thread(
-            target=self._handle_stream_function, args=(packet, ),
-            name=f"secsgem_secsHandler_callback_S{packet.header.stream}F{packet.header.function}").start()
+        self._dispatch_stream_function(packet)
+
+    def _dispatch_stream_function(self, packet):
+        """
+        Handle a received stream/function in the dispatcher, or inline if it is cheap to answer.
+
+        :param packet: received data packet
+        :type packet: :class:`secsgem.hsms.HsmsPacket`
+        """
+        if (packet.header.stream, packet.header.function) in self.inline_stream_functions:
+            self._handle_stream_function(packet)
+            return
+
+        self.dispatcher.dispatch(self, packet, self._handle_stream_function)
 
     def disable_ceids(self):
         """Disable all Collection Events."""
@@ -439,6 +465,11 @@ class SecsHandler(secsgem.hsms.HsmsHandler):
         """
         Get object of decoded stream and function class, or None if no class is available.
 
+        If :attr:`lazy_decode` is enabled, the items are decoded when they are accessed.
+
+        The result is cached in the packet, so the communication log and all callbacks decoding the packet get the same
+        object and the data is decoded only once.
+
         :param packet: packet to get object for
         :type packet: :class:`secsgem.hsms.HsmsPacket`
         :return: matching stream and function object
@@ -455,7 +486,42 @@ class SecsHandler(secsgem.hsms.HsmsHandler):
             self.logger.warning("unknown function S%02dF%02d", packet.header.stream, packet.header.function)
             return None
 
-        function = self.secs_streams_functions[packet.header.stream][packet.header.function]()
-        function.decode(packet.data)
+        function_class = self.secs_streams_functions[packet.header.stream][packet.header.function]
+
+        if packet.decoded is not None and packet.decoded[:2] == (function_class, self.lazy_decode):
+            return packet.decoded[2]
+
+        if self.lazy_decode:
+            function = function_class.decode_lazy(packet.data)
+        else:
+            function = function_class()
+            function.decode(packet.data)
+
+        packet.decoded = (function_class, self.lazy_decode, function)
 
         return function
+
+    def secs_decode_value(self, packet):
+        """
+        Get the python value of the decoded stream and function, or None if no class is available.
+
+        The value is decoded with the compiled codec of the function class, without creating the variable objects.
+        It is the same value as returned by `secs_decode(packet).get()`,
+        which is used if the packet was already decoded (e.g. for the communication log).
+
+        :param packet: packet to get value for
+        :type packet: :class:`secsgem.hsms.HsmsPacket`
+        :return: python value of the stream and function parameter
+        :rtype: various
+        """
+        if packet is None:
+            return None
+
+        function = self.stream_function(packet.header.stream, packet.header.function)
+        if function is None:
+            return None
+
+        if packet.decoded is not None and packet.decoded[0] is function:
+            return packet.decoded[2].get()
+
+        return function.decode_value(packet.data)
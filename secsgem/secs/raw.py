@@ -0,0 +1,198 @@
+#####################################################################
+# raw.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+"""
+Schema-less en-/decoding of SECS data.
+
+Every item is converted to a `(format_code, value)` tuple, without knowing the stream/function:
+
++----------------------------+--------------------------------------+
+| Format                     | Value                                |
++============================+======================================+
+| List                       | list of `(format_code, value)` items |
++----------------------------+--------------------------------------+
+| ASCII, JIS-8               | str                                  |
++----------------------------+--------------------------------------+
+| Boolean                    | list of bool                         |
++----------------------------+--------------------------------------+
+| Integer and floating point | list of int/float                    |
++----------------------------+--------------------------------------+
+| Binary and other formats   | bytes                                |
++----------------------------+--------------------------------------+
+
+The format codes are the ones of the variable types (e.g. :attr:`secsgem.secs.variables.U4.format_code`).
+"""
+
+import struct
+
+from . import variables
+from .codec import encode_item_header
+from .variables.base_number import _get_array_struct
+
+LIST = variables.List.format_code
+BOOLEAN = variables.Boolean.format_code
+
+_NUMBERS = {
+    var_type.format_code: (var_type._struct_code, var_type._bytes)  # pylint: disable=protected-access
+    for var_type in [variables.I1, variables.I2, variables.I4, variables.I8, variables.U1, variables.U2,
+                     variables.U4, variables.U8, variables.F4, variables.F8]
+}
+
+_CODINGS = {
+    variables.String.format_code: variables.String.coding,
+    variables.JIS8.format_code: variables.JIS8.coding,
+}
+
+
+def _decode_item(data, start):
+    format_byte = data[start]
+    format_code = format_byte >> 2
+    length_bytes = format_byte & 0b11
+
+    if length_bytes == 1:
+        length = data[start + 1]
+        text_pos = start + 2
+    elif length_bytes == 2:
+        length = data[start + 1] << 8 | data[start + 2]
+        text_pos = start + 3
+    elif length_bytes == 3:
+        length = data[start + 1] << 16 | data[start + 2] << 8 | data[start + 3]
+        text_pos = start + 4
+    else:
+        length = 0
+        text_pos = start + 1
+
+    if format_code == LIST:
+        items = []
+
+        for _ in range(length):
+            (item, text_pos) = _decode_item(data, text_pos)
+            items.append(item)
+
+        return (LIST, items), text_pos
+
+    end = text_pos + length
+    if end > len(data):
+        raise ValueError(f"No enough data found for format {format_code:o} with length {length} at position {start}")
+
+    number = _NUMBERS.get(format_code)
+    if number is not None:
+        (struct_code, size) = number
+
+        if length % size:
+            raise ValueError(f"Invalid length {length} for format {format_code:o} at position {start}")
+
+        return (format_code, list(_get_array_struct(struct_code, length // size).unpack_from(data, text_pos))), end
+
+    coding = _CODINGS.get(format_code)
+    if coding is not None:
+        return (format_code, str(data[text_pos:end], coding)), end
+
+    if format_code == BOOLEAN:
+        return (format_code, [value != 0 for value in data[text_pos:end]]), end
+
+    return (format_code, bytes(data[text_pos:end])), end
+
+
+def decode_raw(data, start=0):
+    """
+    Decode secs data to `(format_code, value)` tuples without a data format.
+
+    **Example**::
+
+        >>> import secsgem.secs
+        >>>
+        >>> secsgem.secs.decode_raw(secsgem.secs.functions.SecsS01F02(["MDLN", "SOFTREV"]).encode())
+        (0, [(16, 'MDLN'), (16, 'SOFTREV')])
+
+    :param data: encoded data
+    :type data: bytes/bytearray/memoryview
+    :param start: start of the item in data
+    :type start: integer
+    :returns: decoded item, None for empty data (header only message)
+    :rtype: tuple
+    """
+    if len(data) <= start:
+        return None
+
+    return _decode_item(data, start)[0]
+
+
+def _encode_item(item, parts):
+    (format_code, value) = item
+
+    if format_code == LIST:
+        parts.append(encode_item_header(LIST, len(value)))
+
+        for sub_item in value:
+            _encode_item(sub_item, parts)
+
+        return
+
+    number = _NUMBERS.get(format_code)
+    if number is not None:
+        (struct_code, size) = number
+
+        if isinstance(value, (int, float)):
+            value = (value,)
+
+        # struct rejects floats for integer formats and values out of range
+        try:
+            data = _get_array_struct(struct_code, len(value)).pack(*value)
+        except struct.error as exc:
+            raise ValueError(f"Invalid value {value} for format {format_code:o}") from exc
+
+        parts.append(encode_item_header(format_code, len(value) * size))
+        parts.append(data)
+        return
+
+    coding = _CODINGS.get(format_code)
+    if coding is not None and isinstance(value, str):
+        value = value.encode(coding)
+    elif format_code == BOOLEAN and not isinstance(value, (bytes, bytearray, memoryview)):
+        if isinstance(value, bool):
+            value = [value]
+
+        value = bytes([1 if boolean_value else 0 for boolean_value in value])
+
+    parts.append(encode_item_header(format_code, len(value)))
+    parts.append(bytes(value))
+
+
+def encode_raw(item):
+    """
+    Encode `(format_code, value)` tuples to secs data.
+
+    Single numbers and booleans can be passed without list, text and boolean items also take the encoded bytes.
+
+    **Example**::
+
+        >>> import secsgem.secs
+        >>>
+        >>> secsgem.secs.encode_raw((0, [(16, "MDLN"), (0o51, 1)]))
+        b'\\x01\\x02A\\x04MDLN\\xa5\\x01\\x01'
+
+    :param item: item to encode, None for header only message
+    :type item: tuple
+    :returns: encoded data
+    :rtype: bytes
+    """
+    if item is None:
+        return b""
+
+    parts = []
+    _encode_item(item, parts)
+
+    return b"".join(parts)
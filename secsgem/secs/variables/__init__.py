@@ -17,6 +17,7 @@
 
 from .base import Base  # noqa
 from .dynamic import Dynamic  # noqa
+from .base_number import BaseNumber  # noqa
 
 from .array import Array  # noqa
 from .list_type import List  # noqa
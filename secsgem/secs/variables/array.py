@@ -144,6 +144,25 @@ class Array(Base):
         new_object.set(data)
         self.data.append(new_object)
 
+    def supports_value(self, value):
+        """
+        Check if the current instance supports the provided value.
+
+        :param value: value to test
+        :type value: any
+        """
+        if not isinstance(value, list):
+            return False
+
+        if 0 <= self.count != len(value):
+            return False
+
+        item = functions.generate(self.item_decriptor)
+        if not hasattr(item, "supports_value"):
+            return True
+
+        return all(item.supports_value(item_value) for item_value in value)
+
     def set(self, value):
         """
         Set the internal value to the provided value.
@@ -185,12 +204,22 @@ class Array(Base):
         :returns: encoded data bytes
         :rtype: string
         """
-        result = self.encode_item_header(len(self.data))
+        buffer = bytearray()
+        self.encode_into(buffer)
 
-        for item in self.data:
-            result += item.encode()
+        return bytes(buffer)
+
+    def encode_into(self, buffer):
+        """
+        Append the encoded value to a buffer.
 
-        return result
+        :param buffer: buffer to append the encoded data to
+        :type buffer: bytearray
+        """
+        buffer += self.encode_item_header(len(self.data))
+
+        for item in self.data:
+            item.encode_into(buffer)
 
     def decode(self, data, start=0):
         """
@@ -214,3 +243,35 @@ class Array(Base):
             self.data.append(new_object)
 
         return text_pos
+
+    def iter_decode(self, data, start=0):
+        """
+        Get an iterator decoding the items of the secs byte data one by one.
+
+        The array header is checked immediately, each item is decoded to a new variable object when the iterator is
+        advanced. The items are not added to the array, so the memory used does not depend on the number of items.
+
+        **Example**::
+
+            >>> import secsgem.secs
+            >>>
+            >>> data = secsgem.secs.variables.Array(secsgem.secs.variables.U4, [1, 2]).encode()
+            >>> [item.get() for item in secsgem.secs.variables.Array(secsgem.secs.variables.U4).iter_decode(data)]
+            [1, 2]
+
+        :param data: encoded data bytes
+        :type data: bytes/bytearray/memoryview
+        :param start: start position of value the data
+        :type start: integer
+        :returns: iterator over the decoded items
+        :rtype: iterator
+        """
+        (text_pos, _, length) = self.decode_item_header(data, start)
+
+        return self._iter_decode_items(data, text_pos, length)
+
+    def _iter_decode_items(self, data, text_pos, length):
+        for _ in range(length):
+            new_object = functions.generate(self.item_decriptor)
+            text_pos = new_object.decode(data, text_pos)
+            yield new_object
@@ -54,25 +54,36 @@ class Base:
             raise ValueError(f"Encoding {self.__class__.__name__} not possible, data length too big {length}")
 
         if length > 0xFFFF:
-            length_bytes = 3
-            format_byte = (self.format_code << 2) | length_bytes
-            return bytes(bytearray((format_byte, (length & 0xFF0000) >> 16, (length & 0x00FF00) >> 8,
-                                    (length & 0x0000FF))))
+            return bytes(((self.format_code << 2) | 3, (length & 0xFF0000) >> 16, (length & 0x00FF00) >> 8,
+                          (length & 0x0000FF)))
         if length > 0xFF:
-            length_bytes = 2
-            format_byte = (self.format_code << 2) | length_bytes
-            return bytes(bytearray((format_byte, (length & 0x00FF00) >> 8, (length & 0x0000FF))))
+            return bytes(((self.format_code << 2) | 2, (length & 0x00FF00) >> 8, (length & 0x0000FF)))
 
-        length_bytes = 1
-        format_byte = (self.format_code << 2) | length_bytes
-        return bytes(bytearray((format_byte, (length & 0x0000FF))))
+        return bytes(((self.format_code << 2) | 1, length))
+
+    def encode_into(self, buffer):
+        """
+        Append the encoded value to a buffer.
+
+        Lists and arrays write all their items into the same buffer, so a message is encoded in one pass without
+        copying the encoded items again.
+        This default implementation appends the result of :func:`encode`,
+        types overriding :func:`encode` should also override this method.
+
+        :param buffer: buffer to append the encoded data to
+        :type buffer: bytearray
+        """
+        buffer += self.encode()
 
     def decode_item_header(self, data, text_pos=0):
         """
-        Encode item header depending on the number of length bytes required.
+        Decode item header depending on the number of length bytes required.
+
+        The data is indexed directly, so passing a :class:`memoryview` of the message allows walking the whole
+        message without copying it.
 
         :param data: encoded data
-        :type data: string
+        :type data: bytes/bytearray/memoryview
         :param text_pos: start of item header in data
         :type text_pos: integer
         :returns: start position for next item, format code, length item of data
@@ -82,7 +93,7 @@ class Base:
             raise ValueError(f"Decoding for {self.__class__.__name__} without any text")
 
         # parse format byte
-        format_byte = bytearray(data)[text_pos]
+        format_byte = data[text_pos]
 
         format_code = (format_byte & 0b11111100) >> 2
         length_bytes = (format_byte & 0b00000011)
@@ -93,7 +104,7 @@ class Base:
         length = 0
         for _ in range(length_bytes):
             length <<= 8
-            length += bytearray(data)[text_pos]
+            length += data[text_pos]
 
             text_pos += 1
 
@@ -15,13 +15,56 @@
 #####################################################################
 """SECS numeric variable base type."""
 
+import functools
 import struct
 
 from .base import Base
 
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+def is_ndarray(value):
+    """
+    Check if the value is a numpy array.
+
+    :param value: value to check
+    :type value: any
+    :returns: True if numpy is installed and the value is an array
+    :rtype: boolean
+    """
+    return numpy is not None and isinstance(value, numpy.ndarray)
+
+
+@functools.lru_cache(maxsize=1024)
+def _get_array_struct(struct_code, count):
+    """
+    Get the precompiled struct for an array of numbers.
+
+    :param struct_code: struct format character of a single item
+    :type struct_code: string
+    :param count: number of items in the array
+    :type count: integer
+    :returns: struct for encoding/decoding the whole array at once
+    :rtype: :class:`struct.Struct`
+    """
+    return struct.Struct(f">{count}{struct_code}")
+
 
 class BaseNumber(Base):
-    """Secs base type for numeric data."""
+    """
+    Secs base type for numeric data.
+
+    If :attr:`use_numpy` is enabled and numpy is installed, decoded values are stored as read-only numpy arrays,
+    which point into the received data instead of holding one python object per item.
+    numpy arrays passed to :func:`set` are stored and encoded without converting them to lists,
+    independent of :attr:`use_numpy`.
+    """
+
+    use_numpy = False
+    """Decode to numpy arrays, ignored if numpy is not installed."""
 
     format_code = 0
     text_code = ""
@@ -30,6 +73,7 @@ class BaseNumber(Base):
     _max = 0
     _bytes = 0
     _struct_code = ""
+    _numpy_code = ""
 
     def __init__(self, value=None, count=-1):
         """
@@ -69,21 +113,93 @@ class BaseNumber(Base):
 
     def __setitem__(self, key, item):
         """Set an item using the indexer operator."""
+        if is_ndarray(self.value) and not self.value.flags.writeable:
+            # decoded arrays are views into the received data, so they are copied on the first write
+            self.value = self.value.copy()
+
         self.value[key] = item
 
     def __eq__(self, other):
         """Check equality with other object."""
+        value = self._value_list()
+
         if isinstance(other, Base):
             if other.is_dynamic:
-                return other.value.value == self.value
-            return other.value == self.value
+                other = other.value
+
+            if isinstance(other, BaseNumber):
+                return other._value_list() == value  # pylint: disable=protected-access
+            return other.value == value
+        if is_ndarray(other):
+            return other.tolist() == value
         if isinstance(other, list):
-            return other == self.value
-        return [other] == self.value
+            return other == value
+        return [other] == value
 
     def __hash__(self):
         """Get data item for hashing."""
-        return hash(str(self.value))
+        return hash(str(self._value_list()))
+
+    def _value_list(self):
+        """
+        Get the internal value as list.
+
+        :returns: list of values
+        :rtype: list
+        """
+        if is_ndarray(self.value):
+            return self.value.tolist()
+
+        return self.value
+
+    @classmethod
+    def supports_dtype(cls, dtype):
+        """
+        Check if numpy arrays with the provided dtype map to this type without conversion.
+
+        The byte order of the dtype is ignored.
+
+        :param dtype: numpy dtype to test
+        :type dtype: :class:`numpy.dtype`
+        :returns: True if the dtype matches this type
+        :rtype: boolean
+        """
+        if numpy is None or not cls._numpy_code:
+            return False
+
+        own_dtype = numpy.dtype(cls._numpy_code)
+        return own_dtype.kind == dtype.kind and own_dtype.itemsize == dtype.itemsize
+
+    def _check_ndarray(self, value):
+        """
+        Check a numpy array against the count, kind and range of the type.
+
+        :param value: array to check
+        :type value: :class:`numpy.ndarray`
+        :returns: description of the problem or None if the array is supported
+        :rtype: string
+        """
+        if value.ndim != 1:
+            return f"Invalid array with {value.ndim} dimensions"
+
+        if 0 <= self.count < len(value):
+            return f"Value longer than {self.count} chars"
+
+        if value.dtype.kind not in "biuf" or (value.dtype.kind == "f" and self._base_type == int):
+            return f"Invalid array type {value.dtype}"
+
+        if len(value) == 0 or value.dtype.kind == "b":
+            return None
+
+        # nan compares false, so the bounds of arrays containing nan are not checked like in the list path
+        if value.min() >= self._min and value.max() <= self._max:
+            return None
+
+        for item in value.tolist():
+            if item < self._min or item > self._max:
+                return f"Invalid value {item}"
+
+        return None
 
     def __check_single_item_support(self, value):
         if isinstance(value, float) and self._base_type == int:
@@ -114,6 +230,8 @@ class BaseNumber(Base):
         :param value: value to test
         :type value: any
         """
+        if is_ndarray(value) and value.ndim > 0:
+            return self._check_ndarray(value) is None
         if isinstance(value, (list, tuple)):
             if 0 <= self.count < len(value):
                 return False
@@ -130,6 +248,30 @@ class BaseNumber(Base):
             return True
         return self.__check_single_item_support(value)
 
+    def _check_range(self, values):
+        """
+        Check all values against the range of the type.
+
+        The bounds of the whole list are checked at once, the items are only checked one by one if the bounds
+        are exceeded (or not comparable) to find the failing item.
+
+        :param values: values to check
+        :type values: list
+        """
+        if not values:
+            return
+
+        lowest = min(values)
+        highest = max(values)
+
+        # a leading nan makes min/max return nan, which fails this check and falls back to the item check
+        if lowest >= self._min and highest <= self._max:
+            return
+
+        for item in values:
+            if item < self._min or item > self._max:
+                raise ValueError(f"Invalid value {item}")
+
     def set(self, value):
         """
         Set the internal value to the provided value.
@@ -140,27 +282,26 @@ class BaseNumber(Base):
         if isinstance(value, float) and self._base_type == int:
             raise ValueError(f"Invalid value {value}")
 
-        if isinstance(value, (list, tuple)):
+        if is_ndarray(value) and value.ndim > 0:
+            error = self._check_ndarray(value)
+            if error is not None:
+                raise ValueError(error)
+
+            # arrays with a matching dtype are used without copying
+            self.value = numpy.asarray(value, dtype=self._numpy_code)
+        elif isinstance(value, (list, tuple)):
             if 0 <= self.count < len(value):
                 raise ValueError(f"Value longer than {self.count} chars")
 
-            new_list = []
-            for item in value:
-                item = self._base_type(item)
-                if item < self._min or item > self._max:
-                    raise ValueError(f"Invalid value {item}")
-
-                new_list.append(item)
+            new_list = list(map(self._base_type, value))
+            self._check_range(new_list)
             self.value = new_list
         elif isinstance(value, bytearray):
             if 0 <= self.count < len(value):
                 raise ValueError(f"Value longer than {self.count} chars")
 
-            new_list = []
-            for item in value:
-                if item < self._min or item > self._max:
-                    raise ValueError(f"Invalid value {item}")
-                new_list.append(item)
+            new_list = list(value)
+            self._check_range(new_list)
             self.value = new_list
         else:
             new_value = self._base_type(value)
@@ -175,9 +316,11 @@ class BaseNumber(Base):
         Return the internal value.
 
         :returns: internal value
-        :rtype: list/integer/float
+        :rtype: list/integer/float/:class:`numpy.ndarray`
         """
         if len(self.value) == 1:
+            if is_ndarray(self.value):
+                return self.value.item(0)
             return self.value[0]
 
         return self.value
@@ -189,12 +332,26 @@ class BaseNumber(Base):
         :returns: encoded data bytes
         :rtype: string
         """
-        result = self.encode_item_header(len(self.value) * self._bytes)
+        if is_ndarray(self.value):
+            return self.encode_item_header(len(self.value) * self._bytes) + \
+                self.value.astype(self._numpy_code, copy=False).tobytes()
+
+        return self.encode_item_header(len(self.value) * self._bytes) + \
+            _get_array_struct(self._struct_code, len(self.value)).pack(*self.value)
 
-        for value in self.value:
-            result += struct.pack(f">{self._struct_code}", value)
+    def encode_into(self, buffer):
+        """
+        Append the encoded value to a buffer.
 
-        return result
+        :param buffer: buffer to append the encoded data to
+        :type buffer: bytearray
+        """
+        buffer += self.encode_item_header(len(self.value) * self._bytes)
+
+        if is_ndarray(self.value):
+            buffer += self.value.astype(self._numpy_code, copy=False).tobytes()
+        else:
+            buffer += _get_array_struct(self._struct_code, len(self.value)).pack(*self.value)
 
     def decode(self, data, start=0):
         """
@@ -209,19 +366,22 @@ class BaseNumber(Base):
         """
         (text_pos, _, length) = self.decode_item_header(data, start)
 
-        result = []
-
-        for _ in range(length // self._bytes):
-            result_text = data[text_pos:text_pos + self._bytes]
+        count = length // self._bytes
 
-            if len(result_text) != self._bytes:
-                raise ValueError(
-                    f"No enough data found for {self.__class__.__name__} with length {length} at position {start} ")
+        if text_pos + count * self._bytes > len(data):
+            raise ValueError(
+                f"No enough data found for {self.__class__.__name__} with length {length} at position {start} ")
 
-            result.append(struct.unpack(f">{self._struct_code}", result_text)[0])
+        if 0 <= self.count < count:
+            raise ValueError(f"Value longer than {self.count} chars")
 
-            text_pos += self._bytes
+        if self.use_numpy and numpy is not None:
+            # view into the received data, made read-only so the message buffer is never modified
+            self.value = numpy.frombuffer(data, dtype=self._numpy_code, count=count, offset=text_pos)
+            self.value.flags.writeable = False
+            return text_pos + count * self._bytes
 
-        self.set(result)
+        # the struct guarantees the range of the decoded values, so they are not checked again
+        self.value = list(_get_array_struct(self._struct_code, count).unpack_from(data, text_pos))
 
-        return text_pos
+        return text_pos + count * self._bytes
@@ -194,6 +194,16 @@ class BaseText(Base):
 
         return result
 
+    def encode_into(self, buffer):
+        """
+        Append the encoded value to a buffer.
+
+        :param buffer: buffer to append the encoded data to
+        :type buffer: bytearray
+        """
+        buffer += self.encode_item_header(len(self.value))
+        buffer += self.value.encode(self.coding)
+
     def decode(self, data, start=0):
         """
         Decode the secs byte data to the value.
@@ -211,7 +221,7 @@ class BaseText(Base):
         result = ""
 
         if length > 0:
-            result = data[text_pos:text_pos + length].decode(self.coding)
+            result = str(data[text_pos:text_pos + length], self.coding)
 
         self.set(result)
 
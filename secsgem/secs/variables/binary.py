@@ -19,11 +19,18 @@ from .base import Base
 
 
 class Binary(Base):
-    """Secs type for binary data."""
+    """
+    Secs type for binary data.
+
+    The value is stored as immutable :class:`bytes` or as read-only :class:`memoryview` into the decoded data.
+    Writable values (:class:`bytearray`, writable :class:`memoryview`) are copied when they are set,
+    read-only views are referenced, so the data behind them must not change.
+    It is only copied to a :class:`bytearray` when it is modified with the indexer operator.
+    """
 
     format_code = 0o10
     text_code = "B"
-    preferred_types = [bytes, bytearray]
+    preferred_types = [bytes, bytearray, memoryview]
 
     def __init__(self, value=None, count=-1):
         """
@@ -36,7 +43,7 @@ class Binary(Base):
         """
         super().__init__()
 
-        self.value = bytearray()
+        self.value = b""
         self.count = count
         if value is not None:
             self.set(value)
@@ -69,6 +76,9 @@ class Binary(Base):
         if key >= self.count:
             raise IndexError(f"Index {key} out of bounds ({self.count})")
 
+        if not isinstance(self.value, bytearray):
+            self.value = bytearray(self.value)
+
         if key >= len(self.value):
             while key >= len(self.value):
                 self.value.append(0)
@@ -116,7 +126,7 @@ class Binary(Base):
 
             return True
 
-        if isinstance(value, bytearray):
+        if isinstance(value, (bytearray, memoryview)):
             if self.count > 0 and len(value) > self.count:
                 return False
             return True
@@ -149,16 +159,21 @@ class Binary(Base):
             return
 
         if isinstance(value, bytes):
-            value = bytearray(value)
+            pass
+        elif isinstance(value, bytearray):
+            value = bytes(value)
+        elif isinstance(value, memoryview):
+            if not value.readonly:
+                value = bytes(value)
+            elif value.format != "B" or value.ndim != 1:
+                value = value.cast("B")
         elif isinstance(value, str):
-            value = bytearray(value.encode('ascii'))
+            value = value.encode('ascii')
         elif isinstance(value, (list, tuple)):
-            value = bytearray(value)
-        elif isinstance(value, bytearray):
-            pass
+            value = bytes(value)
         elif isinstance(value, int):
             if 0 <= value <= 255:
-                value = bytearray([value])
+                value = bytes([value])
             else:
                 raise ValueError(
                     f"Value {value} of type {type(value).__name__} is out of range for {self.__class__.__name__}")
@@ -180,6 +195,10 @@ class Binary(Base):
         if len(self.value) == 1:
             return self.value[0]
 
+        if isinstance(self.value, memoryview):
+            # copied once, this also releases the decoded data
+            self.value = bytes(self.value)
+
         return bytes(self.value)
 
     def encode(self):
@@ -189,12 +208,24 @@ class Binary(Base):
         :returns: encoded data bytes
         :rtype: string
         """
-        result = self.encode_item_header(len(self.value) if self.value is not None else 0)
+        if self.value is None:
+            return self.encode_item_header(0)
 
-        if self.value is not None:
-            result += bytes(self.value)
+        return self.encode_item_header(len(self.value)) + self.value
 
-        return result
+    def encode_into(self, buffer):
+        """
+        Append the encoded value to a buffer.
+
+        :param buffer: buffer to append the encoded data to
+        :type buffer: bytearray
+        """
+        if self.value is None:
+            buffer += self.encode_item_header(0)
+            return
+
+        buffer += self.encode_item_header(len(self.value))
+        buffer += self.value
 
     def decode(self, data, start=0):
         """
@@ -209,12 +240,16 @@ class Binary(Base):
         """
         (text_pos, _, length) = self.decode_item_header(data, start)
 
-        # string
-        result = None
+        if text_pos + length > len(data):
+            raise ValueError(
+                f"No enough data found for {self.__class__.__name__} with length {length} at position {start} ")
+
+        view = memoryview(data)[text_pos:text_pos + length]
 
-        if length > 0:
-            result = data[text_pos:text_pos + length]
+        # only immutable data is referenced, everything else is copied
+        if not view.readonly:
+            view = bytes(view)
 
-        self.set(result)
+        self.set(view)
 
         return text_pos + length
@@ -18,8 +18,17 @@
 from .base import Base
 
 
+_NORMALIZE_TABLE = bytes([0]) + bytes([1] * 255)
+"""Translation table mapping every non zero byte to 1."""
+
+
 class Boolean(Base):
-    """Secs type for boolean data."""
+    """
+    Secs type for boolean data.
+
+    The value is stored as :class:`bytes` with one byte (0 or 1) per item.
+    It is only copied to a :class:`bytearray` when it is modified with the indexer operator.
+    """
 
     format_code = 0o11
     text_code = "BOOLEAN"
@@ -39,7 +48,7 @@ class Boolean(Base):
         """
         super().__init__()
 
-        self.value = []
+        self.value = b""
         self.count = count
         if value is not None:
             self.set(value)
@@ -52,7 +61,7 @@ class Boolean(Base):
         data = ""
 
         for boolean in self.value:
-            data += f"{boolean} "
+            data += f"{boolean != 0} "
 
         return f"<{self.text_code} {data}>"
 
@@ -62,27 +71,47 @@ class Boolean(Base):
 
     def __getitem__(self, key):
         """Get an item using the indexer operator."""
-        return self.value[key]
+        if isinstance(key, slice):
+            return [byte != 0 for byte in self.value[key]]
+
+        return self.value[key] != 0
 
     def __setitem__(self, key, item):
         """Set an item using the indexer operator."""
-        self.value[key] = item
+        if not isinstance(self.value, bytearray):
+            self.value = bytearray(self.value)
+
+        self.value[key] = self.__convert_single_item(item)
 
     def __eq__(self, other):
         """Check equality with other object."""
+        value = self._value_list()
+
         if isinstance(other, Base):
             if other.is_dynamic:
-                return other.value.value == self.value
-            return other.value == self.value
+                other = other.value
+
+            if isinstance(other, Boolean):
+                return other.value == self.value
+            return other.value == value
 
         if isinstance(other, list):
-            return other == self.value
+            return other == value
 
-        return [other] == self.value
+        return [other] == value
 
     def __hash__(self):
         """Get data item for hashing."""
-        return hash(str(self.value))
+        return hash(str(self._value_list()))
+
+    def _value_list(self):
+        """
+        Get the internal value as list of booleans.
+
+        :returns: list of values
+        :rtype: list
+        """
+        return [byte != 0 for byte in self.value]
 
     def __check_single_item_support(self, value):
         if isinstance(value, bool):
@@ -159,25 +188,18 @@ class Boolean(Base):
             if 0 <= self.count < len(value):
                 raise ValueError(f"Value longer than {self.count} chars")
 
-            new_value = []
-            for item in value:
-                new_value.append(self.__convert_single_item(item))
-
-            self.value = new_value
+            self.value = bytes(map(self.__convert_single_item, value))
         elif isinstance(value, bytearray):
             if 0 <= self.count < len(value):
                 raise ValueError(f"Value longer than {self.count} chars")
 
-            new_value = []
             for char in value:
                 if not 0 <= char <= 1:
                     raise ValueError(f"Value {char} out of bounds")
 
-                new_value.append(char)
-
-            self.value = new_value
+            self.value = bytes(value)
         else:
-            self.value = [self.__convert_single_item(value)]
+            self.value = bytes([self.__convert_single_item(value)])
 
     def get(self):
         """
@@ -187,9 +209,9 @@ class Boolean(Base):
         :rtype: list/boolean
         """
         if len(self.value) == 1:
-            return self.value[0]
+            return self.value[0] != 0
 
-        return self.value
+        return self._value_list()
 
     def encode(self):
         """
@@ -198,15 +220,17 @@ class Boolean(Base):
         :returns: encoded data bytes
         :rtype: string
         """
-        result = self.encode_item_header(len(self.value))
+        return self.encode_item_header(len(self.value)) + self.value
 
-        for value in self.value:
-            if value:
-                result += b"\1"
-            else:
-                result += b"\0"
+    def encode_into(self, buffer):
+        """
+        Append the encoded value to a buffer.
 
-        return result
+        :param buffer: buffer to append the encoded data to
+        :type buffer: bytearray
+        """
+        buffer += self.encode_item_header(len(self.value))
+        buffer += self.value
 
     def decode(self, data, start=0):
         """
@@ -221,16 +245,14 @@ class Boolean(Base):
         """
         (text_pos, _, length) = self.decode_item_header(data, start)
 
-        result = []
-
-        for _ in range(length):
-            if bytearray(data)[text_pos] == 0:
-                result.append(False)
-            else:
-                result.append(True)
+        if text_pos + length > len(data):
+            raise ValueError(
+                f"No enough data found for {self.__class__.__name__} with length {length} at position {start} ")
 
-            text_pos += 1
+        if 0 <= self.count < length:
+            raise ValueError(f"Value longer than {self.count} chars")
 
-        self.set(result)
+        # every non zero byte is true, normalized to 1 to encode the value unchanged
+        self.value = bytes(data[text_pos:text_pos + length]).translate(_NORMALIZE_TABLE)
 
-        return text_pos
+        return text_pos + length
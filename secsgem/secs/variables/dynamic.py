@@ -16,6 +16,7 @@
 """SECS dynamic variable type."""
 
 from .base import Base
+from .base_number import BaseNumber, is_ndarray
 from .array import Array
 from .binary import Binary
 from .boolean import Boolean
@@ -32,6 +33,119 @@ from .f4 import F4
 from .f8 import F8
 
 
+class _TypeTable:
+    """
+    Precomputed type lookups for a set of allowed types and a count.
+
+    The tables are created once for each combination and shared by all :class:`Dynamic` variables using it.
+    """
+
+    decode_order = [Array, Binary, Boolean, String, I8, I1, I2, I4, F8, F4, U8, U1, U2, U4]
+    """Types checked for a format code on decoding, the first allowed type for the format code is used."""
+
+    default_types = [Boolean, U1, U2, U4, U8, I1, I2, I4, I8, F4, F8, String, Binary]
+    """Types matched to a value in this order, if no types are set."""
+
+    _tables = {}
+    _sources = {}
+
+    def __init__(self, types, count):
+        self.types = types
+        self.count = count
+
+        self.format_types = {}
+        for var_type in self.decode_order:
+            if not types or var_type in types:
+                self.format_types.setdefault(var_type.format_code, var_type)
+
+        # one instance per type answers supports_value for all values
+        self.prototypes = [(var_type, self.create(var_type)) for var_type in (types or self.default_types)]
+
+        self._preferred = {}
+
+    @classmethod
+    def get(cls, types, count):
+        """
+        Get the table for the types and count.
+
+        :param types: allowed types, empty for all types
+        :type types: tuple of :class:`secsgem.secs.variables.Base` classes
+        :param count: max number of items in type
+        :type count: integer
+        :returns: type table
+        :rtype: :class:`_TypeTable`
+        """
+        table = cls._tables.get((types, count))
+
+        if table is None:
+            table = cls(types, count)
+            cls._tables[(types, count)] = table
+
+        return table
+
+    @classmethod
+    def get_for(cls, types, count):
+        """
+        Get the table for the types list of a variable.
+
+        Type lists are usually shared by all variables of a data item, so the table is looked up by the identity of
+        the list first, without creating the key from its contents.
+
+        :param types: allowed types, empty for all types
+        :type types: list of :class:`secsgem.secs.variables.Base` classes
+        :param count: max number of items in type
+        :type count: integer
+        :returns: type table
+        :rtype: :class:`_TypeTable`
+        """
+        source = cls._sources.get((id(types), count))
+
+        # the source keeps a reference to the types list, so its id is not reused while it is cached
+        if source is not None and source[0] is types:
+            return source[1]
+
+        table = cls.get(tuple(types) if types else (), count)
+
+        if len(cls._sources) >= 256:
+            cls._sources.clear()
+
+        cls._sources[(id(types), count)] = (types, table)
+
+        return table
+
+    def create(self, var_type):
+        """
+        Create a variable of the type.
+
+        :param var_type: type of the variable
+        :type var_type: :class:`secsgem.secs.variables.Base` class
+        :returns: new variable
+        :rtype: :class:`secsgem.secs.variables.Base`
+        """
+        if var_type is Array:
+            return Array(ANYVALUE)
+
+        return var_type(count=self.count)
+
+    def get_preferred(self, value_type):
+        """
+        Get the types and prototypes with value_type as preferred type.
+
+        :param value_type: type of the value
+        :type value_type: type
+        :returns: types and their prototypes
+        :rtype: list of (type, :class:`secsgem.secs.variables.Base`)
+        """
+        preferred = self._preferred.get(value_type)
+
+        if preferred is None:
+            preferred = [(var_type, prototype) for (var_type, prototype) in self.prototypes
+                         if issubclass(value_type, tuple(var_type.preferred_types))]
+            self._preferred[value_type] = preferred
+
+        return preferred
+
+
 class Dynamic(Base):
     """Variable with interchangable type."""
 
@@ -50,11 +164,39 @@ class Dynamic(Base):
 
         self.value = None
 
-        self.types = types
-        self.count = count
+        self._type_table = None
+        self._types = types
+        self._count = count
+
         if value is not None:
             self.set(value)
 
+    @property
+    def types(self):
+        """Allowed types, empty means all types are supported."""
+        return self._types
+
+    @types.setter
+    def types(self, value):
+        self._types = value
+        self._type_table = None
+
+    @property
+    def count(self):
+        """Max number of items in type."""
+        return self._count
+
+    @count.setter
+    def count(self, value):
+        self._count = value
+        self._type_table = None
+
+    def _get_type_table(self):
+        if self._type_table is None:
+            self._type_table = _TypeTable.get_for(self._types, self._count)
+
+        return self._type_table
+
     def __repr__(self):
         """Generate textual representation for an object of this class."""
         return self.value.__repr__()
@@ -90,14 +232,21 @@ class Dynamic(Base):
             return hash(self.value.value[0])
         return hash(self.value.value)
 
-    def __type_supported(self, typ):
-        if not self.types:
-            return True
+    def supports_value(self, value):
+        """
+        Check if the current instance supports the provided value.
 
-        if typ in self.types:
-            return True
+        :param value: value to test
+        :type value: any
+        """
+        if isinstance(value, Base):
+            if isinstance(value, Dynamic):
+                value = value.value
+
+            types = self._get_type_table().types
+            return not types or isinstance(value, types)
 
-        return False
+        return self._match_type(value) is not None
 
     def set(self, value):
         """
@@ -121,21 +270,18 @@ class Dynamic(Base):
         :param value: new value
         :type value: various
         """
+        table = self._get_type_table()
+
         if isinstance(value, Base):
             if isinstance(value, Dynamic):
-                if not isinstance(value.value, tuple(self.types)) and self.types:
-                    raise ValueError(
-                        f"Unsupported type {value.value.__class__.__name__} "
-                        f"for this instance of Dynamic, allowed {self.types}")
-
-                self.value = value.value
-            else:
-                if not isinstance(value, tuple(self.types)) and self.types:
-                    raise ValueError(
-                        f"Unsupported type {value.__class__.__name__} "
-                        f"for this instance of Dynamic, allowed {self.types}")
-
-                self.value = value
+                value = value.value
+
+            if table.types and not isinstance(value, table.types):
+                raise ValueError(
+                    f"Unsupported type {value.__class__.__name__} "
+                    f"for this instance of Dynamic, allowed {self.types}")
+
+            self.value = value
         else:
             matched_type = self._match_type(value)
 
@@ -143,7 +289,7 @@ class Dynamic(Base):
                 raise ValueError(
                     f'Value "{value}" of type {value.__class__.__name__} not valid for SecsDynamic with {self.types}')
 
-            self.value = matched_type(count=self.count)
+            self.value = table.create(matched_type)
             self.value.set(value)
 
     def get(self):
@@ -167,6 +313,15 @@ class Dynamic(Base):
         """
         return self.value.encode()
 
+    def encode_into(self, buffer):
+        """
+        Append the encoded value to a buffer.
+
+        :param buffer: buffer to append the encoded data to
+        :type buffer: bytearray
+        """
+        self.value.encode_into(buffer)
+
     def decode(self, data, start=0):
         """
         Decode the secs byte data to the value.
@@ -178,58 +333,40 @@ class Dynamic(Base):
         :returns: new start position
         :rtype: integer
         """
-        (_, format_code, _) = self.decode_item_header(data, start)
-
-        if format_code == Array.format_code and self.__type_supported(Array):
-            self.value = Array(ANYVALUE)
-        elif format_code == Binary.format_code and self.__type_supported(Binary):
-            self.value = Binary(count=self.count)
-        elif format_code == Boolean.format_code and self.__type_supported(Boolean):
-            self.value = Boolean(count=self.count)
-        elif format_code == String.format_code and self.__type_supported(String):
-            self.value = String(count=self.count)
-        elif format_code == I8.format_code and self.__type_supported(I8):
-            self.value = I8(count=self.count)
-        elif format_code == I1.format_code and self.__type_supported(I1):
-            self.value = I1(count=self.count)
-        elif format_code == I2.format_code and self.__type_supported(I2):
-            self.value = I2(count=self.count)
-        elif format_code == I4.format_code and self.__type_supported(I4):
-            self.value = I4(count=self.count)
-        elif format_code == F8.format_code and self.__type_supported(F8):
-            self.value = F8(count=self.count)
-        elif format_code == F4.format_code and self.__type_supported(F4):
-            self.value = F4(count=self.count)
-        elif format_code == U8.format_code and self.__type_supported(U8):
-            self.value = U8(count=self.count)
-        elif format_code == U1.format_code and self.__type_supported(U1):
-            self.value = U1(count=self.count)
-        elif format_code == U2.format_code and self.__type_supported(U2):
-            self.value = U2(count=self.count)
-        elif format_code == U4.format_code and self.__type_supported(U4):
-            self.value = U4(count=self.count)
-        else:
+        if len(data) == 0:
+            raise ValueError(f"Decoding for {self.__class__.__name__} without any text")
+
+        format_code = data[start] >> 2
+
+        table = self._get_type_table()
+        var_type = table.format_types.get(format_code)
+
+        if var_type is None:
             raise ValueError(
                 f"Unsupported format {format_code} for this instance of Dynamic, allowed {self.types}")
 
+        self.value = table.create(var_type)
+
         return self.value.decode(data, start)
 
     def _match_type(self, value):
-        var_types = self.types
-        # if no types are set use internal order
-        if not self.types:
-            var_types = [Boolean, U1, U2, U4, U8, I1, I2, I4,
-                         I8, F4, F8, String, Binary]
+        table = self._get_type_table()
+
+        # numpy arrays are mapped to the numeric type with the same dtype
+        if is_ndarray(value):
+            for (var_type, prototype) in table.prototypes:
+                if issubclass(var_type, BaseNumber) and var_type.supports_dtype(value.dtype):
+                    if prototype.supports_value(value):
+                        return var_type
 
         # first try to find the preferred type for the kind of value
-        for var_type in var_types:
-            if isinstance(value, tuple(var_type.preferred_types)):
-                if var_type(count=self.count).supports_value(value):
-                    return var_type
+        for (var_type, prototype) in table.get_preferred(type(value)):
+            if prototype.supports_value(value):
+                return var_type
 
         # when no preferred type was found, then try to match any available type
-        for var_type in var_types:
-            if var_type(count=self.count).supports_value(value):
+        for (var_type, prototype) in table.prototypes:
+            if prototype.supports_value(value):
                 return var_type
 
         return None
@@ -262,6 +399,9 @@ class ANYVALUE(Dynamic):
 
     """
 
+    allowed_types = [Array, Boolean, U1, U2, U4, U8, I1, I2, I4, I8, F4, F8, String, Binary]
+    """Types of the variable, shared by all instances."""
+
     def __init__(self, value=None):
         """
         Initialize an ANYVALUE variable.
@@ -270,4 +410,4 @@ class ANYVALUE(Dynamic):
         """
         self.name = self.__class__.__name__
 
-        super().__init__([Array, Boolean, U1, U2, U4, U8, I1, I2, I4, I8, F4, F8, String, Binary], value=value)
+        super().__init__(self.allowed_types, value=value)
@@ -35,4 +35,5 @@ class F4(BaseNumber):
     _max = 3.40282e+38
     _bytes = 4
     _struct_code = "f"
+    _numpy_code = ">f4"
     preferred_types = [float]
@@ -35,4 +35,5 @@ class F8(BaseNumber):
     _max = 1.79769e+308
     _bytes = 8
     _struct_code = "d"
+    _numpy_code = ">f8"
     preferred_types = [float]
@@ -35,4 +35,5 @@ class I1(BaseNumber):
     _max = 127
     _bytes = 1
     _struct_code = "b"
+    _numpy_code = ">i1"
     preferred_types = [int]
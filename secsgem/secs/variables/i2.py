@@ -35,4 +35,5 @@ class I2(BaseNumber):
     _max = 32767
     _bytes = 2
     _struct_code = "h"
+    _numpy_code = ">i2"
     preferred_types = [int]
@@ -35,4 +35,5 @@ class I4(BaseNumber):
     _max = 2147483647
     _bytes = 4
     _struct_code = "l"
+    _numpy_code = ">i4"
     preferred_types = [int]
@@ -35,4 +35,5 @@ class I8(BaseNumber):
     _max = 9223372036854775807
     _bytes = 8
     _struct_code = "q"
+    _numpy_code = ">i8"
     preferred_types = [int]
@@ -243,12 +243,22 @@ class List(Base):
         :returns: encoded data bytes
         :rtype: string
         """
-        result = self.encode_item_header(len(self.data))
+        buffer = bytearray()
+        self.encode_into(buffer)
 
-        for field_name in self.data:
-            result += self.data[field_name].encode()
+        return bytes(buffer)
+
+    def encode_into(self, buffer):
+        """
+        Append the encoded value to a buffer.
+
+        :param buffer: buffer to append the encoded data to
+        :type buffer: bytearray
+        """
+        buffer += self.encode_item_header(len(self.data))
 
-        return result
+        for item in self.data.values():
+            item.encode_into(buffer)
 
     def decode(self, data, start=0):
         """
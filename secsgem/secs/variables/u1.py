@@ -35,4 +35,5 @@ class U1(BaseNumber):
     _max = 255
     _bytes = 1
     _struct_code = "B"
+    _numpy_code = ">u1"
     preferred_types = [int]
@@ -35,4 +35,5 @@ class U2(BaseNumber):
     _max = 65535
     _bytes = 2
     _struct_code = "H"
+    _numpy_code = ">u2"
     preferred_types = [int]
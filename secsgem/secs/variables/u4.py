@@ -35,4 +35,5 @@ class U4(BaseNumber):
     _max = 4294967295
     _bytes = 4
     _struct_code = "L"
+    _numpy_code = ">u4"
     preferred_types = [int]
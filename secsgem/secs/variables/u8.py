@@ -35,4 +35,5 @@ class U8(BaseNumber):
     _max = 18446744073709551615
     _bytes = 8
     _struct_code = "Q"
+    _numpy_code = ">u8"
     preferred_types = [int]
@@ -0,0 +1,136 @@
+#####################################################################
+# test_gem_async_host_handler.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+import asyncio
+import unittest
+
+import secsgem.gem
+
+from test_hsms_async_handler import get_free_port, wait_for
+
+
+class TestAsyncGemHostHandler(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+        port = get_free_port()
+
+        self.host = secsgem.gem.AsyncGemHostHandler("127.0.0.1", port, False, 0, "host")
+
+        # threaded equipment as remote
+        self.equipment = secsgem.gem.GemEquipmentHandler("127.0.0.1", port, True, 0, "equipment")
+        self.equipment.connection.T5 = 0.1
+
+    def tearDown(self):
+        # stop the threads of the equipment if a test failed
+        if self.equipment.connection.enabled:
+            self.equipment.disable()
+
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(asyncio.wait_for(coroutine, 20))
+
+    async def connect(self):
+        self.host.enable()
+        self.equipment.enable()
+
+        self.assertTrue(await self.host.waitfor_communicating(5))
+
+    async def disconnect(self):
+        # equipment waits for its threads
+        await self.loop.run_in_executor(None, self.equipment.disable)
+
+        self.host.disable()
+        await self.host.connection.wait_closed()
+
+    def testWaitforCommunicating(self):
+        async def test():
+            self.host.enable()
+
+            self.assertFalse(await self.host.waitfor_communicating(0.01))
+            self.assertEqual(self.host.waitEventList, [])
+
+            self.equipment.enable()
+
+            self.assertTrue(await self.host.waitfor_communicating(5))
+            self.assertTrue(await self.host.waitfor_communicating(0))
+            self.assertEqual(self.host.waitEventList, [])
+
+            await self.disconnect()
+
+            self.assertTrue(await wait_for(lambda: not self.host.communicationState.isstate("COMMUNICATING")))
+
+        self.run_async(test())
+
+    def testRequestSvs(self):
+        async def test():
+            await self.connect()
+
+            self.assertEqual((await self.host.request_svs([secsgem.gem.SVID_EVENTS_ENABLED])).get(), [[]])
+
+            svs = (await self.host.list_svs([secsgem.gem.SVID_CLOCK])).get()
+            self.assertEqual(svs[0]["SVNAME"], "Clock")
+
+            await self.disconnect()
+
+        self.run_async(test())
+
+    def testSubscribeCollectionEvent(self):
+        events = []
+
+        async def test():
+            await self.connect()
+
+            self.host.events.collection_event_received += events.append
+
+            await self.host.subscribe_collection_event(secsgem.gem.CEID_CMD_START_DONE,
+                                                       [secsgem.gem.SVID_EVENTS_ENABLED], 10)
+
+            self.assertEqual(self.host.reportSubscriptions, {10: [secsgem.gem.SVID_EVENTS_ENABLED]})
+            self.assertIn(10, self.equipment.registered_reports)
+
+            # equipment queues the report, the future is resolved with the response of the host
+            futures = await self.loop.run_in_executor(None, self.equipment.trigger_collection_events,
+                                                      [secsgem.gem.CEID_CMD_START_DONE])
+            response = await asyncio.wrap_future(futures[0])
+
+            self.assertEqual(response.get(), 0)
+
+            self.assertEqual(len(events), 1)
+            self.assertEqual(events[0]["ceid"], secsgem.gem.CEID_CMD_START_DONE)
+            self.assertEqual(events[0]["rptid"], 10)
+
+            await self.host.clear_report(10)
+
+            self.assertEqual(self.host.reportSubscriptions, {})
+            self.assertNotIn(10, self.equipment.registered_reports)
+
+            await self.disconnect()
+
+        self.run_async(test())
+
+    def testSendRemoteCommand(self):
+        async def test():
+            await self.connect()
+
+            response = await self.host.send_remote_command(secsgem.gem.RCMD_START, [])
+            self.assertEqual(response.HCACK.get(), secsgem.secs.data_items.HCACK.ACK_FINISH_LATER)
+
+            await self.disconnect()
+
+        self.run_async(test())
@@ -15,7 +15,11 @@
 #####################################################################
 
 import datetime
+import os
+import shutil
+import tempfile
 import threading
+import time
 import unittest.mock
 
 from dateutil.tz import tzlocal
@@ -203,6 +207,13 @@ class TestRemoteCommand(unittest.TestCase):
 
 
 class TestGemEquipmentHandler(unittest.TestCase):
+    def testEventQueueInvalidWindow(self):
+        server = HsmsTestServer()
+        client = secsgem.gem.GemEquipmentHandler("127.0.0.1", 5000, False, 0, "test", server)
+
+        with self.assertRaises(ValueError):
+            secsgem.gem.GemEventQueue(client, window=0)
+
     def testControlInitialStateDefault(self):
         server = HsmsTestServer()
         client = secsgem.gem.GemEquipmentHandler("127.0.0.1", 5000, False, 0, "test", server)
@@ -289,6 +300,7 @@ class TestGemEquipmentHandlerPassive(unittest.TestCase, GemHandlerPassiveGroup):
     def tearDown(self):
         self.client.disable()
         self.server.stop()
+        self.client.dispatcher.stop(5)
 
 
 class TestGemEquipmentHandlerPassiveControlState(unittest.TestCase):
@@ -303,6 +315,7 @@ class TestGemEquipmentHandlerPassiveControlState(unittest.TestCase):
     def tearDown(self):
         self.client.disable()
         self.server.stop()
+        self.client.dispatcher.stop(5)
 
     def establishCommunication(self):
         self.server.simulate_connect()
@@ -592,6 +605,68 @@ class TestGemEquipmentHandlerPassiveControlState(unittest.TestCase):
         self.assertIsNotNone(SV10)
         self.assertEqual(SV10.get(), 123)
 
+    def recordValuesRequests(self, name):
+        requests = []
+        request = getattr(self.client, name)
+
+        def record(variables, deadline):
+            requests.append((variables, deadline))
+            return request(variables, deadline)
+
+        setattr(self.client, name, record)
+
+        return requests
+
+    def testStatusVariableBatchRequest(self):
+        self.setupTestStatusVariables(True)
+        self.establishCommunication()
+        requests = self.recordValuesRequests("on_sv_values_request")
+
+        start = time.monotonic()
+        function = self.sendSVRequest(["SV2", 10, "asdfg", secsgem.gem.SVID_CONTROL_STATE, 10])
+
+        self.assertEqual([sv.get() for sv in function],
+                         ["sample sv", 123, [], self.client._get_control_state_id(), 123])
+        self.assertEqual(len(requests), 1)
+        self.assertEqual([sv.svid for sv in requests[0][0]], ["SV2", 10])
+        self.assertGreater(requests[0][1], start)
+        self.assertLessEqual(requests[0][1], time.monotonic() + self.client.connection.T3)
+
+    def testStatusVariableBatchRequestAll(self):
+        self.setupTestStatusVariables(True)
+        self.establishCommunication()
+        requests = self.recordValuesRequests("on_sv_values_request")
+
+        function = self.sendSVRequest()
+
+        self.assertEqual(len(function), len(self.client.status_variables))
+        self.assertEqual([sv.svid for sv in requests[0][0]], [10, "SV2"])
+
+    def testStatusVariableBatchRequestNotAvailable(self):
+        self.setupTestStatusVariables(True)
+        self.establishCommunication()
+        self.client.on_sv_values_request = lambda svs, deadline: [None] * len(svs)
+
+        function = self.sendSVRequest([10])
+
+        self.assertEqual(function[0].get(), [])
+
+    def testStatusVariableBatchRequestWrongCount(self):
+        self.setupTestStatusVariables(True)
+        self.client.on_sv_values_request = lambda svs, deadline: []
+
+        with self.assertRaises(ValueError):
+            self.client._get_sv_values([self.client.status_variables[10]])
+
+    def testStatusVariableBatchRequestDeadline(self):
+        self.setupTestStatusVariables(True)
+        self.client.value_request_deadline = 0
+
+        with self.assertLogs(self.client.logger, "WARNING"):
+            values = self.client._get_sv_values([self.client.status_variables[10]])
+
+        self.assertEqual(values[0].get(), 123)
+
     def testStatusVariableInvalid(self):
         self.setupTestStatusVariables()        
         self.establishCommunication()
@@ -1253,6 +1328,738 @@ class TestGemEquipmentHandlerPassiveControlState(unittest.TestCase):
         self.assertEqual(function.RPT[0].RPTID.get(), 1000)
         self.assertEqual(function.RPT[0].V[0].get(), 31337)
 
+    def prepareCollectionEventTrigger(self):
+        self.setupTestDataValues()
+        self.setupTestCollectionEvents()
+        self.establishCommunication()
+
+        self.sendCEDefineReport()
+        self.sendCELinkReport()
+        self.sendCEEnableReport()
+
+    def acknowledgeCollectionEvent(self, packet, ackc6=0):
+        self.server.simulate_packet(self.server.generate_stream_function_packet(packet.header.system, secsgem.secs.functions.SecsS06F12(ackc6)))
+
+    def testCollectionEventTriggerReturnsFutures(self):
+        self.prepareCollectionEventTrigger()
+
+        futures = self.client.trigger_collection_events([50])
+
+        self.assertEqual(len(futures), 1)
+        self.assertFalse(futures[0].done())
+
+        packet = self.server.expect_packet(stream=6)
+        self.acknowledgeCollectionEvent(packet)
+
+        self.assertEqual(futures[0].result(timeout=1).get(), 0)
+        self.assertEqual(self.client.eventQueue.delivered, 1)
+        self.assertEqual(self.client.eventQueue.dropped, 0)
+        self.assertIsNotNone(self.client.eventQueue.latency_last)
+        self.assertIsNotNone(self.client.eventQueue.latency_average)
+
+    def testCollectionEventTriggerDisabledEvent(self):
+        self.prepareCollectionEventTrigger()
+        self.sendCEEnableReport(enable=False)
+
+        self.assertEqual(self.client.trigger_collection_events([50]), [])
+        self.assertEqual(self.client.eventQueue.depth, 0)
+
+    def testCollectionEventTriggerInOrder(self):
+        self.prepareCollectionEventTrigger()
+
+        first = self.client.trigger_collection_events([50])[0]
+        self.client.data_values[30].value = 4711
+        second = self.client.trigger_collection_events([50])[0]
+
+        # second report waits until the first one is acknowledged
+        self.assertEqual(self.client.eventQueue.in_flight, 1)
+        self.assertEqual(self.client.eventQueue.depth, 1)
+
+        packet = self.server.expect_packet(stream=6)
+        self.assertEqual(self.client.secs_decode(packet).RPT[0].V[0].get(), 31337)
+        self.assertEqual(len([p for p in self.server.connection.packets if p.header.stream == 6]), 0)
+
+        self.acknowledgeCollectionEvent(packet)
+        first.result(timeout=1)
+
+        # values were taken when the event was triggered
+        packet = self.server.expect_packet(stream=6)
+        self.assertEqual(self.client.secs_decode(packet).RPT[0].V[0].get(), 4711)
+
+        self.acknowledgeCollectionEvent(packet)
+
+        self.assertEqual(second.result(timeout=1).get(), 0)
+        self.assertEqual(self.client.eventQueue.delivered, 2)
+        self.assertEqual(self.client.eventQueue.in_flight, 0)
+
+    def testCollectionEventQueuedReportSentFromSender(self):
+        self.prepareCollectionEventTrigger()
+
+        send_packet = self.server.connection.send_packet
+        threads = []
+
+        def record_thread(packet):
+            if packet.header.stream == 6:
+                threads.append(threading.current_thread())
+            return send_packet(packet)
+
+        self.server.connection.send_packet = record_thread
+
+        futures = self.client.trigger_collection_events([50, 50])
+
+        self.acknowledgeCollectionEvent(self.server.expect_packet(stream=6))
+        self.acknowledgeCollectionEvent(self.server.expect_packet(stream=6))
+
+        self.assertEqual([future.result(timeout=1).get() for future in futures], [0, 0])
+
+        # the second report isn't sent by the thread receiving the acknowledge of the first one
+        self.assertEqual(threads[0], threading.current_thread())
+        self.assertEqual(threads[1].name, self.client.sender.name)
+
+    def testAlarmReportAfterQueuedCollectionEvents(self):
+        self.setupTestAlarms()
+        self.prepareCollectionEventTrigger()
+        self.sendAlarmEnable()
+
+        sent = []
+        send_packet = self.server.connection.send_packet
+
+        def record_primary(packet):
+            if packet.header.stream in (5, 6) and packet.header.function % 2 == 1:
+                sent.append((packet.header.stream, packet.header.function))
+            return send_packet(packet)
+
+        self.server.connection.send_packet = record_primary
+
+        self.client.trigger_collection_events([50, 50])
+
+        # the alarm report is queued after the reports, instead of overtaking them
+        alarm_thread = threading.Thread(target=self.client.set_alarm, args=(25, ))
+        alarm_thread.daemon = True  # make thread killable on program termination
+        alarm_thread.start()
+        alarm_thread.join(1)
+
+        self.assertFalse(alarm_thread.is_alive())
+        self.assertEqual(self.client.eventQueue.depth, 2)
+
+        for _ in range(2):
+            self.acknowledgeCollectionEvent(self.server.expect_packet(stream=6))
+
+        packet = self.server.expect_packet(stream=5, function=1)
+        self.server.simulate_packet(self.server.generate_stream_function_packet(
+            packet.header.system, secsgem.secs.functions.SecsS05F02(secsgem.secs.data_items.ACKC5.ACCEPTED)))
+
+        self.assertTrue(self.client.sender.wait(1))
+        self.assertEqual(sent, [(6, 11), (6, 11), (5, 1)])
+        self.assertTrue(self.client.alarms[25].set)
+
+    def testCollectionEventTriggerWindow(self):
+        self.prepareCollectionEventTrigger()
+        self.client.eventQueue.window = 2
+
+        futures = self.client.trigger_collection_events([50, 50, 50])
+
+        self.assertEqual(self.client.eventQueue.in_flight, 2)
+        self.assertEqual(self.client.eventQueue.depth, 1)
+
+        first = self.server.expect_packet(stream=6)
+        second = self.server.expect_packet(stream=6)
+        self.assertLess(first.header.system, second.header.system)
+
+        self.acknowledgeCollectionEvent(second)
+        self.acknowledgeCollectionEvent(first)
+
+        third = self.server.expect_packet(stream=6)
+        self.acknowledgeCollectionEvent(third)
+
+        self.assertEqual([future.result(timeout=1).get() for future in futures], [0, 0, 0])
+        self.assertEqual(self.client.eventQueue.delivered, 3)
+
+    def testCollectionEventTriggerQueueFull(self):
+        self.prepareCollectionEventTrigger()
+        self.client.eventQueue.max_depth = 1
+
+        futures = self.client.trigger_collection_events([50, 50, 50])
+
+        self.assertTrue(futures[2].done())
+        self.assertIsNone(futures[2].result())
+        self.assertEqual(self.client.eventQueue.dropped, 1)
+
+        packet = self.server.expect_packet(stream=6)
+        self.acknowledgeCollectionEvent(packet)
+
+        packet = self.server.expect_packet(stream=6)
+        self.acknowledgeCollectionEvent(packet)
+
+        self.assertIsNotNone(futures[1].result(timeout=1))
+        self.assertEqual(self.client.eventQueue.delivered, 2)
+
+    def testCollectionEventTriggerDisconnect(self):
+        self.prepareCollectionEventTrigger()
+
+        futures = self.client.trigger_collection_events([50, 50])
+
+        self.server.expect_packet(stream=6)
+
+        # the second report is sent on the closed connection
+        self.server.fail_next_send()
+        self.server.simulate_disconnect()
+
+        self.assertIsNone(futures[0].result(timeout=1))
+        self.assertIsNone(futures[1].result(timeout=1))
+        self.assertEqual(self.client.eventQueue.dropped, 2)
+        self.assertEqual(self.client.eventQueue.delivered, 0)
+
+    def testReportPlanReused(self):
+        self.prepareCollectionEventTrigger()
+
+        self.assertEqual(self.client._build_collection_event(50)[0]["V"][0].get(), 31337)
+
+        self.client.data_values[30].value = 1337
+
+        self.assertEqual(self.client._build_collection_event(50)[0]["V"][0].get(), 1337)
+        self.assertEqual(self.client.reportPlans.compiled, 1)
+        self.assertEqual(self.client.reportPlans.hits, 1)
+
+    def testReportPlanDefineAndLinkReport(self):
+        self.prepareCollectionEventTrigger()
+        self.client._build_collection_event(50)
+
+        self.sendCEDefineReport(rptid=1001, vid=[30, 30])
+        self.sendCELinkReport(rptid=[1001])
+
+        reports = self.client._build_collection_event(50)
+
+        self.assertEqual([report["RPTID"] for report in reports], [1000, 1001])
+        self.assertEqual(len(reports[1]["V"]), 2)
+
+        self.sendCEDefineReport(rptid=1001, vid=[])
+
+        self.assertEqual([report["RPTID"] for report in self.client._build_collection_event(50)], [1000])
+        self.assertEqual(self.client.reportPlans.compiled, 3)
+
+    def testReportPlanUnlinkReport(self):
+        self.prepareCollectionEventTrigger()
+        self.client._build_collection_event(50)
+
+        self.sendCELinkReport(rptid=[])
+
+        self.assertIsNone(self.client.reportPlans.get(50))
+        self.assertEqual(len(self.client.reportPlans), 0)
+        self.assertEqual(self.client.trigger_collection_events([50]), [])
+
+    def testReportPlanVariableReplaced(self):
+        self.prepareCollectionEventTrigger()
+        self.client._build_collection_event(50)
+
+        self.client.data_values[30] = secsgem.gem.DataValue(30, "replaced", secsgem.secs.variables.U2, False, value=5)
+
+        value = self.client._build_collection_event(50)[0]["V"][0]
+
+        self.assertIsInstance(value, secsgem.secs.variables.U2)
+        self.assertEqual(value.get(), 5)
+        self.assertEqual(self.client.reportPlans.invalidations, 1)
+
+    def testReportPlanVariableRemoved(self):
+        self.prepareCollectionEventTrigger()
+        self.client._build_collection_event(50)
+
+        del self.client.data_values[30]
+
+        self.assertEqual(self.client._build_collection_event(50), [{"RPTID": 1000, "V": []}])
+
+    def testReportPlanCallback(self):
+        self.setupTestDataValues(True)
+        self.setupTestCollectionEvents()
+        self.setupTestStatusVariables(True)
+        self.establishCommunication()
+
+        self.sendCEDefineReport(vid=[30, 10, secsgem.gem.SVID_CONTROL_STATE])
+        self.sendCELinkReport()
+
+        self.client.on_dv_value_request = lambda dvid, dv: secsgem.secs.variables.U4(dvid.get() + 1)
+
+        self.client.reportPlans.invalidate()
+        values = self.client._build_collection_event(50)[0]["V"]
+
+        self.assertEqual(values[0].get(), 31)
+        self.assertEqual(values[1].get(), 123)
+        self.assertEqual(values[2].get(), self.client._get_control_state_id())
+
+    def testReportPlanBatchRequests(self):
+        self.setupTestDataValues(True)
+        self.setupTestCollectionEvents()
+        self.setupTestStatusVariables(True)
+        self.establishCommunication()
+
+        self.sendCEDefineReport(rptid=1000, vid=[30, 10])
+        self.sendCEDefineReport(rptid=1001, vid=[10, 30, 10])
+        self.sendCELinkReport(rptid=[1000, 1001])
+
+        sv_requests = self.recordValuesRequests("on_sv_values_request")
+        dv_requests = self.recordValuesRequests("on_dv_values_request")
+
+        reports = self.client._build_collection_event(50)
+
+        self.assertEqual([[value.get() for value in report["V"]] for report in reports],
+                         [[31337, 123], [123, 31337, 123]])
+        self.assertEqual([[sv.svid for sv in svs] for (svs, _) in sv_requests], [[10]])
+        self.assertEqual([[dv.dvid for dv in dvs] for (dvs, _) in dv_requests], [[30]])
+        self.assertEqual(self.client.reportPlans.statistics["variables"], 5)
+        self.assertEqual(self.client.reportPlans.statistics["values"], 2)
+
+    def testReportPlanBatchRequestNotAvailable(self):
+        self.setupTestDataValues(True)
+        self.setupTestCollectionEvents()
+        self.establishCommunication()
+
+        self.sendCEDefineReport()
+        self.sendCELinkReport()
+
+        self.client.on_dv_values_request = lambda dvs, deadline: [None] * len(dvs)
+
+        self.assertEqual(self.client._build_collection_event(50)[0]["V"][0].get(), [])
+
+    def testReportPlanStatistics(self):
+        self.prepareCollectionEventTrigger()
+
+        self.client._build_collection_event(50)
+        self.client._build_collection_event(50)
+
+        self.assertEqual(self.client.reportPlans.statistics, {
+            "plans": 1, "reports": 1, "variables": 1, "values": 1, "compiled": 1, "hits": 1, "invalidations": 0})
+
+    def sendTraceInitialize(self, trid=5, dsper="00000001", totsmp=4, repgsz=2, svid=[10]):
+        data = {"TRID": trid, "DSPER": dsper, "TOTSMP": secsgem.secs.variables.U4(totsmp),
+                "REPGSZ": secsgem.secs.variables.U4(repgsz), "SVID": svid}
+
+        system_id = self.server.get_next_system_counter()
+        self.server.simulate_packet(self.server.generate_stream_function_packet(system_id, secsgem.secs.functions.SecsS02F23(data)))
+
+        packet = self.server.expect_packet(system_id=system_id)
+
+        self.assertEqual(packet.header.stream, 2)
+        self.assertEqual(packet.header.function, 24)
+
+        return self.client.secs_decode(packet)
+
+    def acknowledgeTraceReport(self):
+        packet = self.server.expect_packet(stream=6)
+        self.assertEqual(packet.header.function, 1)
+
+        self.server.simulate_packet(self.server.generate_stream_function_packet(packet.header.system, secsgem.secs.functions.SecsS06F02(0)))
+
+        return self.client.secs_decode(packet)
+
+    def testTraceReports(self):
+        self.setupTestStatusVariables()
+        self.establishCommunication()
+
+        function = self.sendTraceInitialize(svid=[10, "SV2"])
+        self.assertEqual(function.get(), secsgem.secs.data_items.TIAACK.ACCEPTED)
+
+        reports = [self.acknowledgeTraceReport() for _ in range(2)]
+
+        self.assertTrue(self.client.traceScheduler.wait(5))
+        self.assertEqual([report.TRID.get() for report in reports], [5, 5])
+        self.assertEqual([report.SMPLN.get() for report in reports], [1, 3])
+        self.assertEqual(reports[0].SV.get(), [123, "sample sv", 123, "sample sv"])
+        self.assertEqual(self.client.traceScheduler.samples, 4)
+
+    def testTracePartialLastGroup(self):
+        self.setupTestStatusVariables()
+        self.establishCommunication()
+
+        function = self.sendTraceInitialize(totsmp=3, repgsz=2)
+        self.assertEqual(function.get(), secsgem.secs.data_items.TIAACK.ACCEPTED)
+
+        reports = [self.acknowledgeTraceReport() for _ in range(2)]
+
+        self.assertTrue(self.client.traceScheduler.wait(5))
+        self.assertEqual([report.SMPLN.get() for report in reports], [1, 3])
+        self.assertEqual([report.SV.get() for report in reports], [[123, 123], [123]])
+
+    def testTraceUsesBatchRequest(self):
+        self.setupTestStatusVariables(True)
+        self.establishCommunication()
+        requests = self.recordValuesRequests("on_sv_values_request")
+
+        self.sendTraceInitialize(totsmp=1, repgsz=1, svid=[10, "SV2", 10])
+
+        report = self.acknowledgeTraceReport()
+
+        self.assertEqual(report.SV.get(), [123, "sample sv", 123])
+        self.assertEqual([[sv.svid for sv in svs] for (svs, _) in requests], [[10, "SV2"]])
+
+    def testTraceStop(self):
+        self.setupTestStatusVariables()
+        self.establishCommunication()
+
+        self.sendTraceInitialize(dsper="000010", totsmp=10, repgsz=5)
+        self.assertIn(5, self.client.traceScheduler)
+
+        function = self.sendTraceInitialize(totsmp=0, svid=[])
+        self.assertEqual(function.get(), secsgem.secs.data_items.TIAACK.ACCEPTED)
+
+        self.assertTrue(self.client.traceScheduler.wait(5))
+        self.assertEqual(len(self.client.traceScheduler), 0)
+
+    def testTraceReplace(self):
+        self.setupTestStatusVariables()
+        self.establishCommunication()
+
+        self.sendTraceInitialize(dsper="000010", totsmp=10, repgsz=5)
+        self.sendTraceInitialize(dsper="000020", totsmp=10, repgsz=5)
+
+        self.assertEqual(len(self.client.traceScheduler), 1)
+        self.assertEqual(self.client.traceScheduler.traces[5].period, 20)
+
+    def testTraceStoppedOnDisable(self):
+        self.setupTestStatusVariables()
+        self.establishCommunication()
+
+        self.sendTraceInitialize(dsper="000010", totsmp=10, repgsz=5)
+        self.client.disable()
+
+        self.assertTrue(self.client.traceScheduler.wait(5))
+
+        self.client.enable()
+
+    def testTraceInvalid(self):
+        self.setupTestStatusVariables()
+        self.establishCommunication()
+
+        self.assertEqual(self.sendTraceInitialize(dsper="0000001").get(), secsgem.secs.data_items.TIAACK.INVALID_PERIOD)
+        self.assertEqual(self.sendTraceInitialize(dsper="00000000").get(), secsgem.secs.data_items.TIAACK.INVALID_PERIOD)
+        self.assertEqual(self.sendTraceInitialize(svid=[10, 11]).get(), secsgem.secs.data_items.TIAACK.UNKNOWN_SVID)
+        self.assertEqual(self.sendTraceInitialize(svid=[]).get(), secsgem.secs.data_items.TIAACK.UNKNOWN_SVID)
+        self.assertEqual(self.sendTraceInitialize(repgsz=0).get(), secsgem.secs.data_items.TIAACK.INVALID_REPGSZ)
+
+        self.client.trace_svid_limit = 1
+        self.assertEqual(self.sendTraceInitialize(svid=[10, 10]).get(), secsgem.secs.data_items.TIAACK.TOO_MANY_SVIDS)
+
+        self.client.trace_limit = 0
+        self.assertEqual(self.sendTraceInitialize().get(), secsgem.secs.data_items.TIAACK.NO_MORE_TRACE_ALLOWED)
+
+        self.assertEqual(len(self.client.traceScheduler), 0)
+
+    def testTraceSpooled(self):
+        self.setupTestStatusVariables()
+        self.prepareSpooling({6: [1]})
+
+        self.client.traceScheduler.start(secsgem.gem.GemTrace(5, 0.01, 2, 1, [self.client.status_variables[10]]))
+
+        self.assertTrue(self.client.traceScheduler.wait(5))
+        self.assertEqual([(message.stream, message.function) for message in self.client.spool.messages()],
+                         [(6, 1), (6, 1)])
+
+    def setupSpool(self, **kwargs):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        self.client.spool = secsgem.gem.GemSpool(os.path.join(directory, "spool"), **kwargs)
+        self.addCleanup(self.client.spool.close)
+        self.addCleanup(self.stopSpoolTransmit)
+
+    def stopSpoolTransmit(self):
+        if self.client._spoolTransmitThread is not None:
+            self.client._spoolTransmitThread.join(5)
+
+    def prepareSpooling(self, streams, **kwargs):
+        self.setupSpool(**kwargs)
+        self.prepareCollectionEventTrigger()
+
+        self.client.spooledStreams = streams
+        self.server.simulate_disconnect()
+
+    def sendSpoolConfiguration(self, streams):
+        system_id = self.server.get_next_system_counter()
+        self.server.simulate_packet(self.server.generate_stream_function_packet(system_id, secsgem.secs.functions.SecsS02F43(streams)))
+
+        packet = self.server.expect_packet(function=44)
+
+        self.assertIsNotNone(packet)
+        self.assertEqual(packet.header.system, system_id)
+
+        return self.client.secs_decode(packet)
+
+    def sendSpoolRequest(self, rsdc):
+        system_id = self.server.get_next_system_counter()
+        self.server.simulate_packet(self.server.generate_stream_function_packet(system_id, secsgem.secs.functions.SecsS06F23(rsdc)))
+
+        packet = self.server.expect_packet(function=24)
+
+        self.assertIsNotNone(packet)
+        self.assertEqual(packet.header.system, system_id)
+
+        return self.client.secs_decode(packet)
+
+    def waitForSpoolTransmit(self):
+        self.client._spoolTransmitThread.join(5)
+        self.assertFalse(self.client._spoolTransmitThread.is_alive())
+
+    def testSpoolConfiguration(self):
+        self.establishCommunication()
+
+        function = self.sendSpoolConfiguration([{"STRID": 6, "FCNID": [11]}, {"STRID": 5, "FCNID": []}])
+
+        self.assertEqual(function.RSPACK.get(), secsgem.secs.data_items.RSPACK.OK)
+        self.assertEqual(function.DATA.get(), [])
+        self.assertEqual(self.client.spooledStreams, {6: [11], 5: []})
+
+        function = self.sendSpoolConfiguration([])
+
+        self.assertEqual(function.RSPACK.get(), secsgem.secs.data_items.RSPACK.OK)
+        self.assertEqual(self.client.spooledStreams, {})
+
+    def testSpoolConfigurationRejected(self):
+        self.establishCommunication()
+        self.client.spooledStreams = {6: [11]}
+
+        function = self.sendSpoolConfiguration([
+            {"STRID": 1, "FCNID": []},
+            {"STRID": 6, "FCNID": [11, 12]},
+            {"STRID": 5, "FCNID": [99]},
+            {"STRID": 99, "FCNID": []},
+        ])
+
+        self.assertEqual(function.RSPACK.get(), secsgem.secs.data_items.RSPACK.REJECTED)
+        self.assertEqual(function.DATA.get(), [
+            {"STRID": 1, "STRACK": secsgem.secs.data_items.STRACK.STREAM_NOT_ALLOWED, "FCNID": []},
+            {"STRID": 6, "STRACK": secsgem.secs.data_items.STRACK.SECONDARY_FUNCTION, "FCNID": [12]},
+            {"STRID": 5, "STRACK": secsgem.secs.data_items.STRACK.UNKNOWN_FUNCTION, "FCNID": [99]},
+            {"STRID": 99, "STRACK": secsgem.secs.data_items.STRACK.UNKNOWN_STREAM, "FCNID": []},
+        ])
+
+        # configuration unchanged
+        self.assertEqual(self.client.spooledStreams, {6: [11]})
+
+    def testSpoolCollectionEvent(self):
+        self.prepareSpooling({6: [11]})
+
+        self.assertEqual(self.client.trigger_collection_events([50]), [])
+        self.assertEqual(len(self.client.spool), 1)
+
+        self.establishCommunication()
+
+        function = self.sendSpoolRequest(secsgem.secs.data_items.RSDC.TRANSMIT)
+        self.assertEqual(function.get(), secsgem.secs.data_items.RSDA.OK)
+
+        packet = self.server.expect_packet(function=11)
+        self.assertEqual(packet.header.stream, 6)
+        self.assertTrue(packet.header.requireResponse)
+
+        function = self.client.secs_decode(packet)
+        self.assertEqual(function.CEID.get(), 50)
+        self.assertEqual(function.RPT[0].V[0].get(), 31337)
+
+        self.acknowledgeCollectionEvent(packet)
+        self.waitForSpoolTransmit()
+
+        self.assertEqual(len(self.client.spool), 0)
+
+    def testSpoolTransmitInOrder(self):
+        self.prepareSpooling({6: []})
+
+        for value in range(5):
+            self.client.data_values[30].value = value
+            self.client.trigger_collection_events([50])
+
+        self.establishCommunication()
+        self.sendSpoolRequest(secsgem.secs.data_items.RSDC.TRANSMIT)
+
+        values = []
+        for _ in range(5):
+            packet = self.server.expect_packet(function=11)
+            values.append(self.client.secs_decode(packet).RPT[0].V[0].get())
+            self.acknowledgeCollectionEvent(packet)
+
+        self.waitForSpoolTransmit()
+
+        self.assertEqual(values, [0, 1, 2, 3, 4])
+        self.assertEqual(len(self.client.spool), 0)
+
+    def testSpoolTransmitFailed(self):
+        self.prepareSpooling({6: []})
+
+        self.client.trigger_collection_events([50, 50])
+
+        self.establishCommunication()
+        self.sendSpoolRequest(secsgem.secs.data_items.RSDC.TRANSMIT)
+
+        packet = self.server.expect_packet(function=11)
+        self.acknowledgeCollectionEvent(packet)
+
+        self.server.expect_packet(function=11)
+        self.server.simulate_disconnect()
+
+        self.waitForSpoolTransmit()
+
+        # the message without reply is kept
+        self.assertEqual(len(self.client.spool), 1)
+
+    def testSpoolMaxSpoolTransmit(self):
+        self.prepareSpooling({6: []})
+
+        self.client.trigger_collection_events([50, 50, 50])
+
+        self.establishCommunication()
+
+        function = self.sendECUpdate([{"ECID": secsgem.gem.ECID_MAX_SPOOL_TRANSMIT, "ECV": secsgem.secs.variables.U4(2)}])
+        self.assertEqual(function.get(), 0)
+        self.assertEqual(self.client.maxSpoolTransmit, 2)
+
+        self.sendSpoolRequest(secsgem.secs.data_items.RSDC.TRANSMIT)
+
+        for _ in range(2):
+            self.acknowledgeCollectionEvent(self.server.expect_packet(function=11))
+
+        self.waitForSpoolTransmit()
+
+        self.assertEqual(len(self.client.spool), 1)
+
+    def testSpoolOverwrite(self):
+        self.setupSpool()
+        self.prepareCollectionEventTrigger()
+        self.client.spooledStreams = {6: []}
+
+        function = self.sendECUpdate([{"ECID": secsgem.gem.ECID_OVERWRITE_SPOOL, "ECV": secsgem.secs.variables.Boolean(True)}])
+        self.assertEqual(function.get(), 0)
+        self.assertTrue(self.client.overwriteSpool)
+
+        self.server.simulate_disconnect()
+
+        # room for two reports
+        reports = self.client._build_collection_event(50)
+        self.client.spool.max_size = 2 * len(secsgem.secs.functions.SecsS06F11({"DATAID": 1, "CEID": 50, "RPT": reports}).encode())
+
+        for value in range(5):
+            self.client.data_values[30].value = value
+            self.client.trigger_collection_events([50])
+
+        self.assertEqual(len(self.client.spool), 2)
+        self.assertEqual(self.client.spool.overwritten, 3)
+
+        values = [secsgem.secs.functions.SecsS06F11() for _ in range(2)]
+        for (function, message) in zip(values, self.client.spool.messages()):
+            function.decode(message.data)
+
+        self.assertEqual([function.RPT[0].V[0].get() for function in values], [3, 4])
+
+    def testSpoolOverwriteFromSpool(self):
+        self.setupSpool(overwrite=True)
+        self.prepareCollectionEventTrigger()
+        self.client.spooledStreams = {6: []}
+
+        self.assertTrue(self.client.overwriteSpool)
+
+        self.server.simulate_disconnect()
+
+        # room for two reports
+        reports = self.client._build_collection_event(50)
+        self.client.spool.max_size = 2 * len(secsgem.secs.functions.SecsS06F11({"DATAID": 1, "CEID": 50, "RPT": reports}).encode())
+
+        for _ in range(3):
+            self.client.trigger_collection_events([50])
+
+        self.assertTrue(self.client.spool.overwrite)
+        self.assertEqual(self.client.spool.overwritten, 1)
+        self.assertEqual(self.client.spool.rejected, 0)
+
+    def testSpoolOverwriteChangesSpool(self):
+        self.setupSpool(overwrite=True)
+        self.prepareCollectionEventTrigger()
+
+        function = self.sendECUpdate([{"ECID": secsgem.gem.ECID_OVERWRITE_SPOOL, "ECV": secsgem.secs.variables.Boolean(False)}])
+        self.assertEqual(function.get(), 0)
+
+        self.assertFalse(self.client.spool.overwrite)
+        self.assertFalse(self.client.overwriteSpool)
+
+    def testSpoolFullRejects(self):
+        self.prepareSpooling({6: []}, max_size=1)
+
+        self.assertEqual(self.client.trigger_collection_events([50]), [])
+        self.assertEqual(len(self.client.spool), 0)
+        self.assertEqual(self.client.spool.rejected, 1)
+
+    def testSpoolingDisabled(self):
+        self.prepareSpooling({6: []})
+        self.client.enableSpooling = False
+
+        self.assertEqual(len(self.client.trigger_collection_events([50])), 1)
+        self.assertEqual(len(self.client.spool), 0)
+
+    def testSpoolStreamNotConfigured(self):
+        self.prepareSpooling({6: [13]})
+
+        self.assertEqual(len(self.client.trigger_collection_events([50])), 1)
+        self.assertEqual(len(self.client.spool), 0)
+
+    def testSpoolNotUsedWhileCommunicating(self):
+        self.setupSpool()
+        self.prepareCollectionEventTrigger()
+        self.client.spooledStreams = {6: []}
+
+        self.assertEqual(len(self.client.trigger_collection_events([50])), 1)
+        self.assertEqual(len(self.client.spool), 0)
+
+    def testSpoolAlarm(self):
+        self.setupSpool()
+        self.setupTestAlarms()
+        self.establishCommunication()
+
+        self.client.alarms[25].enabled = True
+        self.client.spooledStreams = {5: [1]}
+        self.server.simulate_disconnect()
+
+        self.client.set_alarm(25)
+
+        self.assertEqual(len(self.client.spool), 1)
+        self.assertEqual(self.client.spool.peek().stream, 5)
+        self.assertEqual(self.client.spool.peek().function, 1)
+
+    def testSpoolPurge(self):
+        self.prepareSpooling({6: []})
+
+        self.client.trigger_collection_events([50, 50])
+
+        self.establishCommunication()
+
+        function = self.sendSpoolRequest(secsgem.secs.data_items.RSDC.PURGE)
+
+        self.assertEqual(function.get(), secsgem.secs.data_items.RSDA.OK)
+        self.assertEqual(len(self.client.spool), 0)
+
+    def testSpoolNoData(self):
+        self.establishCommunication()
+
+        function = self.sendSpoolRequest(secsgem.secs.data_items.RSDC.TRANSMIT)
+        self.assertEqual(function.get(), secsgem.secs.data_items.RSDA.NO_SPOOL_DATA)
+
+        self.setupSpool()
+
+        function = self.sendSpoolRequest(secsgem.secs.data_items.RSDC.TRANSMIT)
+        self.assertEqual(function.get(), secsgem.secs.data_items.RSDA.NO_SPOOL_DATA)
+
+    def testSpoolCountStatusVariables(self):
+        self.prepareSpooling({6: []})
+
+        self.client.trigger_collection_events([50, 50, 50])
+
+        self.establishCommunication()
+        self.sendSpoolRequest(secsgem.secs.data_items.RSDC.TRANSMIT)
+        self.acknowledgeCollectionEvent(self.server.expect_packet(function=11))
+
+        deadline = time.monotonic() + 5
+        while len(self.client.spool) != 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        function = self.sendSVRequest([secsgem.gem.SVID_SPOOL_COUNT_ACTUAL, secsgem.gem.SVID_SPOOL_COUNT_TOTAL])
+
+        self.assertEqual(function[0].get(), 2)
+        self.assertEqual(function[1].get(), 3)
+
     def setupTestEquipmentConstants(self, use_callback = False):
         self.client.equipment_constants.update({
             20: secsgem.gem.EquipmentConstant(20, "sample1, numeric ECID, I4", 0, 500, 50, "degrees", secsgem.secs.variables.I4, use_callback),
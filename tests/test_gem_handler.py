@@ -278,3 +278,4 @@ class TestGemHandlerPassive(unittest.TestCase, GemHandlerPassiveGroup):
     def tearDown(self):
         self.client.disable()
         self.server.stop()
+        self.client.dispatcher.stop(5)
@@ -40,6 +40,7 @@ class TestGemHostHandlerPassive(unittest.TestCase, GemHandlerPassiveGroup):
     def tearDown(self):
         self.client.disable()
         self.server.stop()
+        self.client.dispatcher.stop(5)
     
     def testClearCollectionEvents(self):
         self.establishCommunication()
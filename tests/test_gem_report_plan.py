@@ -0,0 +1,161 @@
+#####################################################################
+# test_gem_report_plan.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+import unittest
+
+import secsgem.gem
+
+
+class TestGemRegistry(unittest.TestCase):
+    def testIsDict(self):
+        registry = secsgem.gem.GemRegistry({1: "a"}, b=2)
+
+        self.assertEqual(registry, {1: "a", "b": 2})
+        self.assertEqual(registry.version, 0)
+
+    def testModificationsCounted(self):
+        registry = secsgem.gem.GemRegistry()
+
+        registry[1] = "a"
+        registry.update({2: "b", 3: "c"})
+        registry.setdefault(4, "d")
+        del registry[1]
+        registry.pop(2)
+        registry.popitem()
+        registry.clear()
+
+        self.assertEqual(registry.version, 7)
+
+    def testFailedModificationNotCounted(self):
+        registry = secsgem.gem.GemRegistry()
+
+        with self.assertRaises(KeyError):
+            del registry[1]
+
+        with self.assertRaises(KeyError):
+            registry.pop(1)
+
+        self.assertEqual(registry.version, 0)
+
+
+class TestGemReportPlan(unittest.TestCase):
+    def testBuild(self):
+        values = {"a": 1, "b": 2}
+
+        plan = secsgem.gem.GemReportPlan(50, ((1000, (0, 1)), (1001, ())),
+                                         ((values.get, ("a", )), (values.get, ("b", ))))
+
+        self.assertEqual(plan.variable_count, 2)
+        self.assertEqual(plan.value_count, 2)
+        self.assertEqual(plan.build(), [{"RPTID": 1000, "V": [1, 2]}, {"RPTID": 1001, "V": []}])
+
+        values["a"] = 3
+
+        self.assertEqual(plan.build()[0]["V"], [3, 2])
+
+    def testBuildBatches(self):
+        requests = []
+
+        def request(variables, deadline):
+            requests.append((variables, deadline))
+            return [name.upper() for name in variables]
+
+        plan = secsgem.gem.GemReportPlan(50, ((1000, (1, 0, 2)), (1001, (2, 3))),
+                                         ((str, ("single", )), ),
+                                         ((request, ("a", "b")), (request, ("c", ))))
+
+        self.assertEqual(plan.variable_count, 5)
+        self.assertEqual(plan.value_count, 4)
+        self.assertEqual(plan.build(12.5), [{"RPTID": 1000, "V": ["A", "single", "B"]},
+                                            {"RPTID": 1001, "V": ["B", "C"]}])
+        self.assertEqual(requests, [(("a", "b"), 12.5), (("c", ), 12.5)])
+
+    def testImmutable(self):
+        plan = secsgem.gem.GemReportPlan(50, ())
+
+        with self.assertRaises(AttributeError):
+            plan.other = 1
+
+
+class TestGemReportPlans(unittest.TestCase):
+    def setUp(self):
+        self.registry = secsgem.gem.GemRegistry({50: ["a"], 51: []})
+        self.plans = secsgem.gem.GemReportPlans(self.compile, [self.registry])
+
+    def compile(self, ceid):
+        if not self.registry.get(ceid):
+            return None
+
+        names = self.registry[ceid]
+
+        return secsgem.gem.GemReportPlan(ceid, ((1000, tuple(range(len(names)))), ),
+                                         tuple((str, (name, )) for name in names))
+
+    def testCached(self):
+        plan = self.plans.get(50)
+
+        self.assertIs(self.plans.get(50), plan)
+        self.assertEqual(self.plans.compiled, 1)
+        self.assertEqual(self.plans.hits, 1)
+        self.assertEqual(len(self.plans), 1)
+
+    def testNoPlanNotCached(self):
+        self.assertIsNone(self.plans.get(51))
+        self.assertIsNone(self.plans.get(52))
+        self.assertEqual(len(self.plans), 0)
+
+    def testRegistryModified(self):
+        self.plans.get(50)
+
+        self.registry[50] = ["a", "b"]
+
+        self.assertEqual(self.plans.get(50).build(), [{"RPTID": 1000, "V": ["a", "b"]}])
+        self.assertEqual(self.plans.compiled, 2)
+        self.assertEqual(self.plans.invalidations, 1)
+
+    def testInvalidate(self):
+        self.plans.get(50)
+
+        self.registry[50].append("b")
+        self.plans.invalidate()
+
+        self.assertEqual(len(self.plans), 0)
+        self.assertEqual(self.plans.get(50).build(), [{"RPTID": 1000, "V": ["a", "b"]}])
+        self.assertEqual(self.plans.invalidations, 1)
+
+    def testInvalidateWithoutPlans(self):
+        self.plans.invalidate()
+
+        self.assertEqual(self.plans.invalidations, 0)
+
+    def testModifiedWhileCompiling(self):
+        def compile_and_modify(ceid):
+            plan = self.compile(ceid)
+            self.registry[51] = ["c"]
+            return plan
+
+        plans = secsgem.gem.GemReportPlans(compile_and_modify, [self.registry])
+
+        self.assertIsNotNone(plans.get(50))
+        self.assertEqual(len(plans), 0)
+
+    def testStatistics(self):
+        self.registry[51] = ["a", "b"]
+        self.plans.get(50)
+        self.plans.get(51)
+        self.plans.get(51)
+
+        self.assertEqual(self.plans.statistics, {
+            "plans": 2, "reports": 2, "variables": 3, "values": 3, "compiled": 2, "hits": 1, "invalidations": 0})
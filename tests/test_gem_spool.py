@@ -0,0 +1,296 @@
+#####################################################################
+# test_gem_spool.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import secsgem.gem
+import secsgem.secs
+
+CRASHING_WRITER = """
+import os
+import sys
+
+import secsgem.gem
+
+spool = secsgem.gem.GemSpool(sys.argv[1])
+
+for number in range(100):
+    spool.append(6, 11, number.to_bytes(4, "big") * 8)
+
+# message written partly when crashing
+spool._dataFile.write(b"partial")
+
+os._exit(1)
+"""
+
+
+def message_data(number):
+    return number.to_bytes(4, "big") * 8
+
+
+class TestGemSpool(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "spool")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def fill(self, spool, count, start=0):
+        for number in range(start, start + count):
+            self.assertTrue(spool.append(6, 11, message_data(number)))
+
+    def numbers(self, spool, limit=None):
+        return [int.from_bytes(message.data[:4], "big") for message in spool.messages(limit)]
+
+    def testEmpty(self):
+        spool = secsgem.gem.GemSpool(self.path)
+
+        self.assertEqual(len(spool), 0)
+        self.assertEqual(spool.size, 0)
+        self.assertIsNone(spool.peek())
+        self.assertEqual(list(spool.messages()), [])
+
+        spool.close()
+
+    def testAppend(self):
+        spool = secsgem.gem.GemSpool(self.path)
+
+        self.fill(spool, 10)
+
+        self.assertEqual(len(spool), 10)
+        self.assertEqual(spool.size, 10 * 32)
+        self.assertEqual(spool.total, 10)
+        self.assertEqual(self.numbers(spool), list(range(10)))
+
+        message = spool.peek()
+        self.assertEqual(message.stream, 6)
+        self.assertEqual(message.function, 11)
+        self.assertEqual(message.data, message_data(0))
+
+        spool.close()
+
+    def testMessagesLimit(self):
+        spool = secsgem.gem.GemSpool(self.path)
+
+        self.fill(spool, 10)
+
+        self.assertEqual(self.numbers(spool, 3), [0, 1, 2])
+
+        spool.close()
+
+    def testPop(self):
+        spool = secsgem.gem.GemSpool(self.path)
+
+        self.fill(spool, 10)
+        spool.pop(4)
+
+        self.assertEqual(len(spool), 6)
+        self.assertEqual(spool.total, 10)
+        self.assertEqual(self.numbers(spool), list(range(4, 10)))
+
+        spool.close()
+
+    def testPopWhileIterating(self):
+        spool = secsgem.gem.GemSpool(self.path)
+
+        self.fill(spool, 10)
+
+        numbers = []
+        for message in spool.messages():
+            numbers.append(int.from_bytes(message.data[:4], "big"))
+            spool.pop()
+
+        self.assertEqual(numbers, list(range(10)))
+        self.assertEqual(len(spool), 0)
+
+        spool.close()
+
+    def testEmptiedSpoolIsReset(self):
+        spool = secsgem.gem.GemSpool(self.path)
+
+        self.fill(spool, 10)
+        spool.pop(10)
+
+        self.assertEqual(spool.total, 0)
+        self.assertEqual(os.path.getsize(self.path + ".0.dat"), 0)
+
+        self.fill(spool, 2)
+        self.assertEqual(self.numbers(spool), [0, 1])
+
+        spool.close()
+
+    def testPurge(self):
+        spool = secsgem.gem.GemSpool(self.path)
+
+        self.fill(spool, 10)
+
+        self.assertEqual(spool.purge(), 10)
+        self.assertEqual(len(spool), 0)
+        self.assertIsNone(spool.peek())
+
+        spool.close()
+
+    def testFullRejects(self):
+        spool = secsgem.gem.GemSpool(self.path, max_size=10 * 32)
+
+        self.fill(spool, 10)
+
+        self.assertTrue(spool.full)
+        self.assertFalse(spool.append(6, 11, message_data(10)))
+        self.assertEqual(spool.rejected, 1)
+        self.assertEqual(self.numbers(spool), list(range(10)))
+
+        spool.close()
+
+    def testFullOverwrites(self):
+        spool = secsgem.gem.GemSpool(self.path, max_size=10 * 32, overwrite=True)
+
+        self.fill(spool, 15)
+
+        self.assertEqual(spool.overwritten, 5)
+        self.assertEqual(spool.total, 15)
+        self.assertEqual(self.numbers(spool), list(range(5, 15)))
+
+        spool.close()
+
+    def testMessageLargerThanSpool(self):
+        spool = secsgem.gem.GemSpool(self.path, max_size=16, overwrite=True)
+
+        self.assertFalse(spool.append(6, 11, message_data(0)))
+
+        spool.close()
+
+    def testCompact(self):
+        spool = secsgem.gem.GemSpool(self.path, max_size=10 * 32, overwrite=True)
+        spool.compact_size = 64
+
+        self.fill(spool, 100)
+
+        self.assertEqual(self.numbers(spool), list(range(90, 100)))
+
+        # old generations of the data file are removed
+        data_files = [name for name in os.listdir(self.directory) if name.endswith(".dat")]
+        self.assertEqual(len(data_files), 1)
+        self.assertLessEqual(os.path.getsize(os.path.join(self.directory, data_files[0])), 2 * 10 * 32)
+
+        spool.close()
+
+        spool = secsgem.gem.GemSpool(self.path)
+        self.assertEqual(self.numbers(spool), list(range(90, 100)))
+        spool.close()
+
+    def testIteratorSurvivesCompact(self):
+        spool = secsgem.gem.GemSpool(self.path, max_size=10 * 32, overwrite=True)
+        spool.compact_size = 64
+
+        self.fill(spool, 10)
+
+        messages = spool.messages()
+        next(messages)
+
+        self.fill(spool, 20, 10)
+
+        self.assertEqual([int.from_bytes(message.data[:4], "big") for message in messages], list(range(20, 30)))
+
+        spool.close()
+
+    def testGrowIndex(self):
+        spool = secsgem.gem.GemSpool(self.path)
+        spool.index_growth = 16
+
+        self.fill(spool, 100)
+        spool.close()
+
+        spool = secsgem.gem.GemSpool(self.path)
+        self.assertEqual(self.numbers(spool), list(range(100)))
+        spool.close()
+
+    def testReopen(self):
+        spool = secsgem.gem.GemSpool(self.path)
+        self.fill(spool, 10)
+        spool.pop(3)
+        spool.close()
+
+        spool = secsgem.gem.GemSpool(self.path)
+
+        self.assertEqual(len(spool), 7)
+        self.assertEqual(spool.total, 10)
+        self.assertEqual(self.numbers(spool), list(range(3, 10)))
+
+        spool.close()
+
+    def testInvalidIndex(self):
+        with open(self.path + ".idx", "wb") as index_file:
+            index_file.write(b"\0" * 128)
+
+        with self.assertRaises(ValueError):
+            secsgem.gem.GemSpool(self.path)
+
+    def testCrashRecovery(self):
+        environment = dict(os.environ)
+        environment["PYTHONPATH"] = os.pathsep.join([os.getcwd()] + sys.path)
+
+        result = subprocess.run([sys.executable, "-c", CRASHING_WRITER, self.path], env=environment, check=False)
+        self.assertEqual(result.returncode, 1)
+
+        spool = secsgem.gem.GemSpool(self.path)
+
+        self.assertEqual(self.numbers(spool), list(range(100)))
+
+        # the partly written message was removed
+        self.assertEqual(os.path.getsize(self.path + ".0.dat"), 100 * 32)
+
+        self.fill(spool, 1, 100)
+        spool.close()
+
+        spool = secsgem.gem.GemSpool(self.path)
+        self.assertEqual(self.numbers(spool), list(range(101)))
+        spool.close()
+
+    def testRecoveryDiscardsMessagesMissingInDataFile(self):
+        spool = secsgem.gem.GemSpool(self.path)
+        self.fill(spool, 10)
+        spool.close()
+
+        # index entries written, but the data of the last messages not
+        with open(self.path + ".0.dat", "r+b") as data_file:
+            data_file.truncate(8 * 32 + 5)
+
+        spool = secsgem.gem.GemSpool(self.path)
+
+        self.assertEqual(self.numbers(spool), list(range(8)))
+
+        self.fill(spool, 1, 8)
+        self.assertEqual(self.numbers(spool), list(range(9)))
+
+        spool.close()
+
+    def testSpoolMessage(self):
+        function = secsgem.secs.functions.SecsS06F11({"DATAID": 1, "CEID": 50, "RPT": []})
+
+        message = secsgem.gem.GemSpoolMessage(6, 11, function.encode())
+
+        buffer = bytearray(b"header")
+        message.encode_into(buffer)
+
+        self.assertEqual(bytes(buffer), b"header" + function.encode())
+        self.assertEqual(message.encode(), function.encode())
+        self.assertEqual(str(message), f"S6F11 W <spooled, {len(function.encode())} bytes> .")
@@ -0,0 +1,190 @@
+#####################################################################
+# test_gem_trace.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+import threading
+import time
+import unittest
+
+import secsgem.gem
+import secsgem.secs
+
+
+class TestParseDsper(unittest.TestCase):
+    def testSeconds(self):
+        self.assertEqual(secsgem.gem.trace.parse_dsper("010203"), 3723)
+
+    def testHundredths(self):
+        self.assertEqual(secsgem.gem.trace.parse_dsper("00000150"), 1.5)
+
+    def testInvalid(self):
+        for dsper in ["", "0000", "0000001", "000000001", "00a010", "006000", "000060"]:
+            self.assertIsNone(secsgem.gem.trace.parse_dsper(dsper), dsper)
+
+
+class TestGemTrace(unittest.TestCase):
+    def testGroups(self):
+        trace = secsgem.gem.GemTrace(5, 0.1, 4, 2, [])
+
+        self.assertIsNone(trace.add_sample([1, 2], "t1"))
+
+        report = trace.add_sample([3, 4], "t2")
+
+        self.assertEqual(report["TRID"], 5)
+        self.assertEqual(report["SMPLN"].get(), 1)
+        self.assertEqual(report["STIME"], "t1")
+        self.assertEqual(report["SV"], [1, 2, 3, 4])
+        self.assertFalse(trace.done)
+
+        self.assertIsNone(trace.add_sample([5, 6], "t3"))
+        self.assertEqual(trace.add_sample([7, 8], "t4")["SMPLN"].get(), 3)
+        self.assertTrue(trace.done)
+
+    def testTridType(self):
+        trace = secsgem.gem.GemTrace(5, 0.1, 1, 1, [], secsgem.secs.variables.U4)
+
+        function = secsgem.secs.functions.SecsS06F01(trace.add_sample([], "t1"))
+
+        self.assertIsInstance(function.TRID.value, secsgem.secs.variables.U4)
+        self.assertIsInstance(function.SMPLN.value, secsgem.secs.variables.U4)
+
+
+class TestGemTraceReport(unittest.TestCase):
+    def testEncoding(self):
+        trace = secsgem.gem.GemTrace(5, 0.1, 2, 2, [], secsgem.secs.variables.U4)
+        values = [secsgem.secs.variables.F8(1.5), secsgem.secs.variables.String("text")]
+
+        trace.add_sample([value.encode() for value in values], "t1")
+        report = secsgem.gem.GemTraceReport(trace.add_sample([values[0].encode()], "t2"))
+
+        function = secsgem.secs.functions.SecsS06F01()
+        function.decode(report.encode())
+
+        self.assertEqual((report.stream, report.function), (6, 1))
+        self.assertIsInstance(function.TRID.value, secsgem.secs.variables.U4)
+        self.assertEqual(function.get(), {"TRID": 5, "SMPLN": 1, "STIME": "t1", "SV": [1.5, "text", 1.5]})
+        self.assertEqual(str(report), f"S6F1 W <trace report, {len(report.data)} bytes> .")
+
+
+class TestGemTraceScheduler(unittest.TestCase):
+    def setUp(self):
+        self.samples = []
+        self.scheduler = secsgem.gem.GemTraceScheduler(self.sample)
+
+    def tearDown(self):
+        self.scheduler.clear()
+        self.scheduler.wait(5)
+
+    def sample(self, trace, scheduled):
+        self.samples.append((trace.trid, scheduled))
+        trace.add_sample([], "")
+
+    def testSamples(self):
+        trace = secsgem.gem.GemTrace(1, 0.01, 5, 1, [])
+
+        self.scheduler.start(trace)
+
+        self.assertTrue(self.scheduler.wait(5))
+        self.assertEqual(trace.samples, 5)
+        self.assertEqual(self.scheduler.samples, 5)
+        self.assertIsNotNone(trace.jitter_average)
+        self.assertGreaterEqual(trace.jitter_max, 0)
+        self.assertEqual(len(self.scheduler), 0)
+
+    def testNoDrift(self):
+        trace = secsgem.gem.GemTrace(1, 0.01, 5, 1, [])
+
+        self.scheduler.start(trace)
+        self.scheduler.wait(5)
+
+        start = self.samples[0][1]
+        for (number, (_, scheduled)) in enumerate(self.samples):
+            self.assertAlmostEqual(scheduled, start + number * 0.01)
+
+    def testManyTraces(self):
+        traces = [secsgem.gem.GemTrace(trid, 0.01 * (trid % 3 + 1), 3, 1, []) for trid in range(50)]
+
+        for trace in traces:
+            self.scheduler.start(trace)
+
+        self.assertTrue(self.scheduler.wait(5))
+        self.assertEqual(len(self.samples), 150)
+        self.assertEqual(self.scheduler.statistics["samples"], 150)
+
+    def testStop(self):
+        self.scheduler.start(secsgem.gem.GemTrace(1, 10, 5, 1, []))
+
+        self.assertIsNotNone(self.scheduler.stop(1))
+        self.assertIsNone(self.scheduler.stop(1))
+        self.assertTrue(self.scheduler.wait(5))
+        self.assertLessEqual(len(self.samples), 1)
+
+    def testReplace(self):
+        self.scheduler.start(secsgem.gem.GemTrace(1, 10, 5, 1, []))
+        trace = secsgem.gem.GemTrace(1, 0.01, 2, 1, [])
+        self.scheduler.start(trace)
+
+        self.assertTrue(self.scheduler.wait(5))
+        self.assertEqual(trace.samples, 2)
+
+    def testRestartAfterDone(self):
+        self.scheduler.start(secsgem.gem.GemTrace(1, 0.01, 1, 1, []))
+        self.assertTrue(self.scheduler.wait(5))
+
+        self.scheduler.start(secsgem.gem.GemTrace(2, 0.01, 1, 1, []))
+        self.assertTrue(self.scheduler.wait(5))
+
+        self.assertEqual([trid for (trid, _) in self.samples], [1, 2])
+
+    def testWaitTimeout(self):
+        self.scheduler.start(secsgem.gem.GemTrace(1, 10, 5, 1, []))
+
+        self.assertFalse(self.scheduler.wait(0.01))
+
+    def testExceptionStopsTrace(self):
+        def sample(trace, scheduled):
+            raise ValueError("failed")
+
+        scheduler = secsgem.gem.GemTraceScheduler(sample)
+
+        with self.assertLogs(scheduler.logger, "ERROR"):
+            scheduler.start(secsgem.gem.GemTrace(1, 0.01, 5, 1, []))
+            self.assertTrue(scheduler.wait(5))
+
+        self.assertEqual(len(scheduler), 0)
+
+    def testOverrun(self):
+        def sample(trace, scheduled):
+            if trace.samples == 0:
+                time.sleep(0.05)
+            trace.add_sample([], "")
+
+        scheduler = secsgem.gem.GemTraceScheduler(sample)
+        trace = secsgem.gem.GemTrace(1, 0.01, 3, 1, [])
+
+        scheduler.start(trace)
+
+        self.assertTrue(scheduler.wait(5))
+        self.assertEqual(trace.overruns, 1)
+        self.assertEqual(trace.samples, 3)
+
+    def testThreadEnds(self):
+        self.scheduler.start(secsgem.gem.GemTrace(1, 10, 2, 1, []))
+        thread = next(thread for thread in threading.enumerate() if thread.name == self.scheduler.name)
+
+        self.scheduler.stop(1)
+        self.assertTrue(self.scheduler.wait(5))
+
+        thread.join(1)
+        self.assertFalse(thread.is_alive())
@@ -0,0 +1,322 @@
+#####################################################################
+# test_hsms_async_handler.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+import asyncio
+import socket
+import time
+import unittest
+
+import secsgem.hsms
+import secsgem.secs
+
+
+def get_free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for(condition, timeout=5):
+    end = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > end:
+            return False
+        await asyncio.sleep(0.01)
+
+    return True
+
+
+class AsyncHandlerTestCase(unittest.TestCase):
+    handler_class = secsgem.hsms.AsyncHsmsHandler
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+        port = get_free_port()
+
+        self.passive = self.handler_class("127.0.0.1", port, False, 0, "passive")
+        self.active = self.handler_class("127.0.0.1", port, True, 0, "active")
+        self.active.connection.T5 = 0.1
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(asyncio.wait_for(coroutine, 10))
+
+    async def connect(self):
+        self.passive.enable()
+        self.active.enable()
+
+        self.assertTrue(await wait_for(lambda: self.active.connectionState.is_CONNECTED_SELECTED() and
+                                       self.passive.connectionState.is_CONNECTED_SELECTED()))
+
+    async def open_connection(self):
+        while True:
+            try:
+                return await asyncio.open_connection("127.0.0.1", self.passive.port)
+            except OSError:
+                await asyncio.sleep(0.01)
+
+    async def disconnect(self):
+        self.active.disable()
+        self.passive.disable()
+
+        await self.active.connection.wait_closed()
+        await self.passive.connection.wait_closed()
+
+
+class TestAsyncHsmsHandler(AsyncHandlerTestCase):
+    def testSelect(self):
+        async def test():
+            await self.connect()
+
+            self.assertTrue(self.active.connected)
+            self.assertTrue(self.passive.connected)
+
+            await self.disconnect()
+
+            self.assertFalse(self.active.connected)
+            self.assertFalse(self.passive.connected)
+            self.assertFalse(self.passive.connection.connected)
+
+        self.run_async(test())
+
+    def testLinktest(self):
+        async def test():
+            await self.connect()
+
+            response = await self.active.send_linktest_req()
+            self.assertEqual(response.header.sType, 0x06)
+
+            response = await self.passive.send_linktest_req()
+            self.assertEqual(response.header.sType, 0x06)
+
+            self.assertEqual(self.active._systemQueues, {})
+
+            await self.disconnect()
+
+        self.run_async(test())
+
+    def testLinktestTimer(self):
+        async def test():
+            self.active.linktestTimeout = 0.05
+
+            received = []
+            self.passive.send_linktest_rsp = lambda system_id: (received.append(system_id),
+                                                                secsgem.hsms.HsmsHandler.send_linktest_rsp(
+                                                                    self.passive, system_id))
+
+            await self.connect()
+
+            self.assertTrue(await wait_for(lambda: len(received) >= 2))
+
+            await self.disconnect()
+
+        self.run_async(test())
+
+    def testResponseTimeout(self):
+        async def test():
+            await self.connect()
+
+            self.active.connection.T6 = 0.1
+            # no response sent for linktest requests
+            self.passive.send_linktest_rsp = lambda system_id: True
+
+            self.assertIsNone(await self.active.send_linktest_req())
+            self.assertEqual(self.active._systemQueues, {})
+
+            await self.disconnect()
+
+        self.run_async(test())
+
+    def testReconnectAfterDisconnect(self):
+        async def test():
+            await self.connect()
+
+            self.passive.connection.disconnect()
+
+            self.assertTrue(await wait_for(lambda: not self.active.connected))
+            self.assertTrue(await wait_for(lambda: self.active.connectionState.is_CONNECTED_SELECTED() and
+                                           self.passive.connectionState.is_CONNECTED_SELECTED()))
+
+            await self.disconnect()
+
+        self.run_async(test())
+
+    def testNotSelectedTimeout(self):
+        async def test():
+            self.passive.connection.T7 = 0.1
+            self.passive.enable()
+
+            # remote connecting without selecting the connection
+            (reader, writer) = await self.open_connection()
+
+            self.assertTrue(await wait_for(lambda: self.passive.connected))
+
+            # separate request is sent before closing the connection
+            self.assertEqual(secsgem.hsms.HsmsPacket.decode(await reader.read()).header.sType, 9)
+            self.assertTrue(await wait_for(lambda: not self.passive.connected))
+
+            writer.close()
+            await self.disconnect()
+
+        self.run_async(test())
+
+    def testIntercharacterTimeout(self):
+        async def test():
+            self.passive.connection.T8 = 0.1
+            self.passive.enable()
+
+            (reader, writer) = await self.open_connection()
+            self.assertTrue(await wait_for(lambda: self.passive.connected))
+
+            # packet with 10 bytes announced, but only 2 sent
+            writer.write(b"\x00\x00\x00\x0a\xff\xff")
+
+            self.assertEqual(await reader.read(), b"")
+            self.assertTrue(await wait_for(lambda: not self.passive.connected))
+
+            writer.close()
+            await self.disconnect()
+
+        self.run_async(test())
+
+    def testInvalidPacket(self):
+        async def test():
+            self.passive.enable()
+
+            (reader, writer) = await self.open_connection()
+            self.assertTrue(await wait_for(lambda: self.passive.connected))
+
+            # packet with 2 bytes, shorter than the header
+            with self.assertLogs(self.passive.connection.logger, "ERROR"):
+                writer.write(b"\x00\x00\x00\x02\xff\xff")
+
+                await reader.read()
+                self.assertTrue(await wait_for(lambda: not self.passive.connected))
+
+            writer.close()
+
+            # connection accepted again
+            (reader, writer) = await self.open_connection()
+            self.assertTrue(await wait_for(lambda: self.passive.connected))
+
+            writer.close()
+            await self.disconnect()
+
+        self.run_async(test())
+
+    def testSendWhenDisconnected(self):
+        async def test():
+            self.assertIsNone(await self.active.send_linktest_req())
+            self.assertEqual(self.active._systemQueues, {})
+
+        self.run_async(test())
+
+    def testCustomConnectionHandlerNotSupported(self):
+        with self.assertRaises(ValueError):
+            secsgem.secs.AsyncSecsHandler("127.0.0.1", 5000, False, 0, "test", object())
+
+
+class TestAsyncSecsHandler(AsyncHandlerTestCase):
+    handler_class = secsgem.secs.AsyncSecsHandler
+
+    def testRequestResponse(self):
+        async def test():
+            await self.connect()
+
+            self.passive.register_stream_function(1, 3, lambda handler, packet: handler.stream_function(1, 4)(
+                [handler.secs_decode(packet).get()[0] * 2]))
+
+            self.assertEqual((await self.active.request_svs([21])).get(), [42])
+            self.assertEqual(await self.active.request_sv(2), 4)
+
+            await self.disconnect()
+
+        self.run_async(test())
+
+    def testCoroutineCallback(self):
+        async def on_s01f01(handler, packet):
+            del packet  # unused parameter
+
+            await asyncio.sleep(0.01)
+            return handler.stream_function(1, 2)(["MDLN", "SOFTREV"])
+
+        async def test():
+            await self.connect()
+
+            self.passive.register_stream_function(1, 1, on_s01f01)
+
+            response = await self.active.are_you_there()
+            self.assertEqual(self.active.secs_decode(response).get(), ["MDLN", "SOFTREV"])
+
+            await self.disconnect()
+
+        self.run_async(test())
+
+    def testCallbacksRunConcurrently(self):
+        release = []
+
+        async def on_s01f01(handler, packet):
+            del packet  # unused parameter
+
+            await wait_for(lambda: release)
+            return handler.stream_function(1, 2)(["first", ""])
+
+        async def test():
+            await self.connect()
+
+            self.passive.register_stream_function(1, 1, on_s01f01)
+            self.passive.register_stream_function(1, 3, lambda handler, packet: (
+                release.append(True), handler.stream_function(1, 4)([1]))[1])
+
+            results = await asyncio.gather(self.active.are_you_there(), self.active.request_svs([1]))
+
+            self.assertEqual(self.active.secs_decode(results[0]).get(), ["first", ""])
+            self.assertEqual(results[1].get(), [1])
+
+            await self.disconnect()
+
+        self.run_async(test())
+
+    def testCallbackException(self):
+        async def on_s01f01(handler, packet):
+            raise ValueError("failed")
+
+        async def test():
+            await self.connect()
+
+            self.passive.register_stream_function(1, 1, on_s01f01)
+
+            response = await self.active.are_you_there()
+            self.assertEqual((response.header.stream, response.header.function), (1, 0))
+
+            await self.disconnect()
+
+        self.run_async(test())
+
+    def testUnhandledFunction(self):
+        async def test():
+            await self.connect()
+
+            response = await self.active.are_you_there()
+            self.assertEqual((response.header.stream, response.header.function), (9, 5))
+
+            await self.disconnect()
+
+        self.run_async(test())
@@ -15,13 +15,25 @@
 #####################################################################
 
 import threading
+import time
 import unittest
 
 import secsgem.hsms
+import secsgem.secs
 
 from test_connection import HsmsTestServer
 
 
+def wait_for(condition, timeout=5):
+    end = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > end:
+            return False
+        time.sleep(0.01)
+
+    return True
+
+
 class TestHsmsHandlerPassive(unittest.TestCase):
     def setUp(self):
         self.server = HsmsTestServer()
@@ -75,6 +87,32 @@ class TestHsmsHandlerPassive(unittest.TestCase):
         self.assertEqual(packet.header.sessionID, 0xffff)
 
 
+    def testNotSelectedTimeout(self):
+        self.server.connection.T7 = 0.1
+        self.server.simulate_connect()
+
+        self.assertTrue(self.client.connected)
+
+        end = time.monotonic() + 5
+        while self.client.connected and time.monotonic() < end:
+            time.sleep(0.01)
+
+        self.assertFalse(self.client.connected)
+        self.assertFalse(self.server.connection.connected)
+
+    def testSelectedBeforeNotSelectedTimeout(self):
+        self.server.connection.T7 = 0.1
+        self.server.simulate_connect()
+
+        system_id = self.server.get_next_system_counter()
+        self.server.simulate_packet(secsgem.hsms.HsmsPacket(secsgem.hsms.HsmsSelectReqHeader(system_id)))
+
+        time.sleep(0.3)
+
+        self.assertTrue(self.client.connected)
+        self.assertTrue(self.client.connectionState.is_CONNECTED_SELECTED())
+        self.assertIsNone(self.client.notSelectedTimer)
+
     def testSelectWhileDisconnecting(self):
         self.server.simulate_connect()
 
@@ -168,6 +206,79 @@ class TestHsmsHandlerPassive(unittest.TestCase):
         print(self.client)
 
 
+class TestHsmsHandlerSystemCounter(unittest.TestCase):
+    def testConcurrentSystemCounter(self):
+        client = secsgem.hsms.HsmsHandler("127.0.0.1", 5000, False, 0, "test", HsmsTestServer())
+        client.systemCounter = 2 ** 32 - 1000
+
+        results = [[] for _ in range(8)]
+        threads = [threading.Thread(target=lambda result: [result.append(client.get_next_system_counter())
+                                                           for _ in range(2000)], args=(result, ))
+                   for result in results]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        system_ids = [system_id for result in results for system_id in result]
+        self.assertEqual(len(set(system_ids)), len(system_ids))
+        self.assertTrue(all(0 <= system_id < 2 ** 32 for system_id in system_ids))
+
+
+class TestHsmsHandlerBlockingSend(unittest.TestCase):
+    def setUp(self):
+        self.blockedServer = HsmsTestServer()
+        self.blocked = secsgem.hsms.HsmsHandler("127.0.0.1", 5000, False, 0, "blocked", self.blockedServer)
+
+        self.server = HsmsTestServer()
+        self.client = secsgem.hsms.HsmsHandler("127.0.0.1", 5000, False, 0, "test", self.server)
+
+        # sending of the blocked handler waits until the remote reads from the socket again
+        self.unblock = threading.Event()
+        self.blockedSends = []
+        send_packet = self.blockedServer.connection.send_packet
+
+        def blocking_send_packet(packet):
+            self.blockedSends.append(packet)
+            self.unblock.wait(10)
+            return send_packet(packet)
+
+        self.blockedServer.connection.send_packet = blocking_send_packet
+
+        for server, client in ((self.blockedServer, self.blocked), (self.server, self.client)):
+            server.start()
+            client.enable()
+
+    def tearDown(self):
+        self.unblock.set()
+        self.assertTrue(self.blocked.sender.wait(5))
+
+        for server, client in ((self.blockedServer, self.blocked), (self.server, self.client)):
+            server.stop()
+            client.disable()
+
+    def testBlockedLinktestDoesntDelayOtherTimers(self):
+        self.blocked.linktestTimeout = 0.05
+        self.blockedServer.simulate_connect()
+        self.assertTrue(wait_for(lambda: self.blockedSends))
+
+        self.server.simulate_connect()
+        system_id = self.server.get_next_system_counter()
+        self.server.simulate_packet(secsgem.hsms.HsmsPacket(secsgem.hsms.HsmsSelectReqHeader(system_id)))
+        self.server.expect_packet(system_id=system_id)
+
+        # both handlers share the timer wheel, the reply timeout fires while the linktest request is blocked
+        self.client.connection.T3 = 0.1
+        start = time.monotonic()
+        future = self.client.send_async(secsgem.secs.functions.SecsS01F01())
+
+        self.assertIsNone(future.result(2))
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertFalse(self.unblock.is_set())
+        self.assertEqual(self.blocked.timerWheel, self.client.timerWheel)
+
+
 class TestHsmsHandlerActive(unittest.TestCase):
     def setUp(self):
         self.server = HsmsTestServer()
@@ -15,6 +15,7 @@
 #####################################################################
 
 import secsgem.hsms
+import secsgem.secs
 
 import unittest
 
@@ -259,3 +260,82 @@ class TestHsmsPacket(unittest.TestCase):
         packet = secsgem.hsms.HsmsPacket.decode(b"\x00\x00\x00\n\x00d\x81\x01\x00\x00\x00\x00\x00{")
 
         assert str(packet) == "'header': {sessionID:0x0064, stream:01, function:01, pType:0x00, sType:0x00, system:0x0000007b, requireResponse:True}"
+
+    def testEncodeData(self):
+        packet = secsgem.hsms.HsmsPacket(secsgem.hsms.HsmsStreamFunctionHeader(123, 1, 2, False, 100), b"\x01\x00")
+
+        self.assertEqual(packet.encode(), b"\x00\x00\x00\x0c\x00d\x01\x02\x00\x00\x00\x00\x00{\x01\x00")
+
+    def testFromStreamFunction(self):
+        function = secsgem.secs.functions.SecsS01F02(["MDLN", "SOFTREV"])
+
+        packet = secsgem.hsms.HsmsPacket.from_stream_function(
+            secsgem.hsms.HsmsStreamFunctionHeader(123, 1, 2, False, 100), function)
+
+        self.assertEqual(packet.data, function.encode())
+        self.assertEqual(packet.encode(),
+                         secsgem.hsms.HsmsPacket(packet.header, function.encode()).encode())
+
+    def testFromStreamFunctionHeaderChanged(self):
+        packet = secsgem.hsms.HsmsPacket.from_stream_function(
+            secsgem.hsms.HsmsStreamFunctionHeader(123, 1, 1, True, 100), secsgem.secs.functions.SecsS01F01())
+
+        packet.header.system = 124
+
+        self.assertEqual(packet.encode(), b"\x00\x00\x00\n\x00d\x81\x01\x00\x00\x00\x00\x00|")
+
+    def testFromStreamFunctionEncodeReturnsCopy(self):
+        packet = secsgem.hsms.HsmsPacket.from_stream_function(
+            secsgem.hsms.HsmsStreamFunctionHeader(123, 1, 2, False, 100), secsgem.secs.functions.SecsS01F02())
+
+        encoded = packet.encode()
+
+        self.assertIsInstance(encoded, bytes)
+        self.assertEqual(packet.encode_buffers(), [encoded])
+
+    def testFromStreamFunctionDataChanged(self):
+        packet = secsgem.hsms.HsmsPacket.from_stream_function(
+            secsgem.hsms.HsmsStreamFunctionHeader(123, 1, 2, False, 100), secsgem.secs.functions.SecsS01F02())
+
+        packet.data = b"\x01\x00"
+
+        self.assertEqual(packet.encode(), b"\x00\x00\x00\x0c\x00d\x01\x02\x00\x00\x00\x00\x00{\x01\x00")
+
+    def testDecodeDataIsSliceOfMemoryview(self):
+        buffer = bytearray(b"\x00\x00\x00\x0c\x00d\x01\x02\x00\x00\x00\x00\x00{\x01\x00")
+
+        packet = secsgem.hsms.HsmsPacket.decode(memoryview(buffer))
+
+        self.assertIsInstance(packet.data, memoryview)
+        self.assertEqual(bytes(packet.data), b"\x01\x00")
+
+        buffer[14] = 0x02
+        self.assertEqual(bytes(packet.data), b"\x02\x00")
+
+    def testNoInstanceDict(self):
+        packet = secsgem.hsms.HsmsPacket(secsgem.hsms.HsmsStreamFunctionHeader(123, 1, 1, True, 100))
+
+        self.assertFalse(hasattr(packet, "__dict__"))
+        self.assertFalse(hasattr(packet.header, "__dict__"))
+        self.assertFalse(hasattr(secsgem.hsms.HsmsPacket.decode(packet.encode()).header, "__dict__"))
+
+        for header_class in secsgem.hsms.HsmsHeader.__subclasses__():
+            self.assertEqual(header_class.__slots__, (), header_class.__name__)
+
+
+class TestHsmsHeader(unittest.TestCase):
+    def testDecode(self):
+        header = secsgem.hsms.HsmsHeader.decode(b"\xff\x00\x00d\x81\x01\x00\x00\x00\x00\x00{", 2)
+
+        self.assertEqual(header.sessionID, 100)
+        self.assertEqual(header.stream, 1)
+        self.assertEqual(header.function, 1)
+        self.assertEqual(header.pType, 0)
+        self.assertEqual(header.sType, 0)
+        self.assertEqual(header.requireResponse, True)
+        self.assertEqual(header.system, 123)
+
+    def testEncodeDecode(self):
+        header = secsgem.hsms.HsmsStreamFunctionHeader(0xFFFFFFFF, 127, 255, False, 0xFFFF)
+
+        self.assertEqual(str(secsgem.hsms.HsmsHeader.decode(header.encode())), str(header))
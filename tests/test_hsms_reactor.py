@@ -0,0 +1,165 @@
+#####################################################################
+# test_hsms_reactor.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+import socket
+import threading
+import time
+import unittest
+
+import secsgem.hsms
+
+
+def wait_for(condition, timeout=5):
+    end = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > end:
+            return False
+        time.sleep(0.01)
+
+    return True
+
+
+class TestHsmsReactor(unittest.TestCase):
+    def setUp(self):
+        self.reactor = secsgem.hsms.HsmsReactor()
+        self.reactor.start()
+
+    def tearDown(self):
+        self.reactor.stop()
+
+    def testCallSoon(self):
+        done = threading.Event()
+        result = []
+
+        self.reactor.call_soon(lambda value: result.append((value, self.reactor.in_reactor_thread())), 1)
+        self.reactor.call_soon(done.set)
+
+        self.assertTrue(done.wait(5))
+        self.assertEqual(result, [(1, True)])
+        self.assertFalse(self.reactor.in_reactor_thread())
+
+    def testCallLater(self):
+        done = threading.Event()
+        result = []
+
+        self.reactor.call_later(0.1, result.append, 2)
+        self.reactor.call_later(0.05, result.append, 1)
+        self.reactor.call_later(0.15, done.set)
+
+        self.assertTrue(done.wait(5))
+        self.assertEqual(result, [1, 2])
+
+    def testCancelTimer(self):
+        done = threading.Event()
+        result = []
+
+        timer = self.reactor.call_later(0.05, result.append, 1)
+        self.reactor.call_later(0.1, done.set)
+        timer.cancel()
+
+        self.assertTrue(done.wait(5))
+        self.assertEqual(result, [])
+
+    def testExceptionInFunction(self):
+        done = threading.Event()
+
+        self.reactor.call_soon(lambda: 1 / 0)
+        self.reactor.call_soon(done.set)
+
+        self.assertTrue(done.wait(5))
+        self.assertTrue(self.reactor.running)
+
+    def testReader(self):
+        sender, receiver = socket.socketpair()
+        received = []
+
+        self.reactor.add_reader(receiver, lambda sock: received.append(sock.recv(100)))
+
+        sender.send(b"\x01\x02")
+        self.assertTrue(wait_for(lambda: received == [b"\x01\x02"]))
+
+        self.reactor.remove_reader(receiver)
+        done = threading.Event()
+        self.reactor.call_soon(done.set)
+        self.assertTrue(done.wait(5))
+
+        sender.send(b"\x03")
+        time.sleep(0.1)
+        self.assertEqual(received, [b"\x01\x02"])
+
+        sender.close()
+        receiver.close()
+
+    def testStop(self):
+        self.reactor.stop()
+
+        self.assertFalse(self.reactor.running)
+
+
+class TestHsmsReactorConnections(unittest.TestCase):
+    def setUp(self):
+        listen_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listen_sock.bind(("127.0.0.1", 0))
+        self.port = listen_sock.getsockname()[1]
+        listen_sock.close()
+
+        self.reactor = secsgem.hsms.HsmsReactor()
+        self.reactor.start()
+
+        self.manager = secsgem.hsms.HsmsConnectionManager(self.reactor)
+
+        self.active = secsgem.hsms.HsmsHandler("127.0.0.1", self.port, True, 0, "active")
+        self.active.connection.reactor = self.reactor
+
+    def tearDown(self):
+        self.active.disable()
+        self.manager.remove_peer("passive", "127.0.0.1", self.port)
+
+        self.reactor.stop()
+
+    def testConnectAndLinktest(self):
+        threads_before = threading.active_count()
+
+        passive = self.manager.add_peer("passive", "127.0.0.1", self.port, False, 0)
+        active = self.active
+        active.enable()
+
+        self.assertTrue(wait_for(lambda: passive.connectionState.is_CONNECTED_SELECTED()))
+        self.assertTrue(wait_for(lambda: active.connectionState.is_CONNECTED_SELECTED()))
+
+        # no receiver, listen and linktest timer threads
+        self.assertTrue(wait_for(lambda: threading.active_count() == threads_before))
+
+        response = active.send_linktest_req()
+        self.assertIsNotNone(response)
+        self.assertEqual(response.header.sType, 6)
+
+        passive.connection.T6 = 0.5
+        self.reactor.call_soon(passive._on_linktest_timer)
+        self.assertTrue(wait_for(lambda: len(passive._systemQueues) == 1))
+        self.assertTrue(wait_for(lambda: len(passive._systemQueues) == 0))
+
+    def testRemoteDisconnect(self):
+        passive = self.manager.add_peer("passive", "127.0.0.1", self.port, False, 0)
+        active = self.active
+        active.enable()
+
+        self.assertTrue(wait_for(lambda: passive.connectionState.is_CONNECTED_SELECTED()))
+        self.assertTrue(wait_for(lambda: active.connectionState.is_CONNECTED_SELECTED()))
+
+        active.connection.disconnect()
+
+        self.assertTrue(wait_for(lambda: not passive.connected))
+        self.assertFalse(passive.connection.threadRunning)
@@ -0,0 +1,123 @@
+#####################################################################
+# test_hsms_receive_buffer.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+import socket
+import unittest
+
+import secsgem.hsms
+
+
+def encode_packet(system, data=b""):
+    return secsgem.hsms.HsmsPacket(secsgem.hsms.HsmsStreamFunctionHeader(system, 1, 1, False, 0), data).encode()
+
+
+class TestHsmsReceiveBuffer(unittest.TestCase):
+    def setUp(self):
+        self.sender, self.receiver = socket.socketpair()
+
+    def tearDown(self):
+        self.sender.close()
+        self.receiver.close()
+
+    def receive(self, buffer, data):
+        self.sender.sendall(data)
+
+        packets = []
+        received = 0
+
+        while received < len(data):
+            received += buffer.recv_from(self.receiver)
+
+            packet = buffer.pop_packet()
+            while packet is not None:
+                packets.append(packet)
+                packet = buffer.pop_packet()
+
+        return packets
+
+    def testSinglePacket(self):
+        buffer = secsgem.hsms.HsmsReceiveBuffer(64)
+        data = encode_packet(1, b"\x01\x02")
+
+        packets = self.receive(buffer, data)
+
+        self.assertEqual(packets, [data])
+        self.assertIsInstance(packets[0], memoryview)
+        self.assertEqual(len(buffer), 0)
+
+    def testMultiplePacketsInOneCall(self):
+        buffer = secsgem.hsms.HsmsReceiveBuffer(64)
+        data = [encode_packet(system) for system in range(4)]
+
+        self.sender.sendall(b"".join(data))
+        self.assertEqual(buffer.recv_from(self.receiver), 56)
+
+        self.assertEqual([buffer.pop_packet() for _ in range(4)], data)
+        self.assertIsNone(buffer.pop_packet())
+
+    def testPartialPacket(self):
+        buffer = secsgem.hsms.HsmsReceiveBuffer(64)
+        data = encode_packet(1, b"\x01\x02")
+
+        self.assertEqual(self.receive(buffer, data[:3]), [])
+        self.assertEqual(self.receive(buffer, data[3:10]), [])
+        self.assertEqual(len(buffer), 10)
+        self.assertEqual(self.receive(buffer, data[10:]), [data])
+
+    def testPacketsKeptWhenBufferRenewed(self):
+        buffer = secsgem.hsms.HsmsReceiveBuffer(64)
+        data = [encode_packet(system, bytes([system]) * 10) for system in range(20)]
+
+        packets = []
+        for packet_data in data:
+            packets += self.receive(buffer, packet_data)
+
+        self.assertEqual(packets, data)
+
+    def testPacketAcrossBufferEnd(self):
+        buffer = secsgem.hsms.HsmsReceiveBuffer(32)
+        data = [encode_packet(system, b"\xff" * 10) for system in range(5)]
+
+        packets = []
+        for packet_data in data:
+            packets += self.receive(buffer, packet_data[:20])
+            packets += self.receive(buffer, packet_data[20:])
+
+        self.assertEqual(packets, data)
+
+    def testLargePacket(self):
+        buffer = secsgem.hsms.HsmsReceiveBuffer(64)
+        large = encode_packet(1, bytes(range(256)) * 100)
+        small = encode_packet(2)
+
+        packets = self.receive(buffer, small + large + small)
+
+        self.assertEqual(packets, [small, large, small])
+
+    def testConnectionClosed(self):
+        buffer = secsgem.hsms.HsmsReceiveBuffer(64)
+
+        self.sender.close()
+
+        self.assertEqual(buffer.recv_from(self.receiver), 0)
+
+    def testDecodeWithoutCopy(self):
+        buffer = secsgem.hsms.HsmsReceiveBuffer(64)
+
+        packet = secsgem.hsms.HsmsPacket.decode(self.receive(buffer, encode_packet(3, b"\x01\x02"))[0])
+
+        self.assertIsInstance(packet.data, memoryview)
+        self.assertEqual(packet.data, b"\x01\x02")
+        self.assertEqual(packet.header.system, 3)
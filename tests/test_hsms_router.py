@@ -0,0 +1,105 @@
+#####################################################################
+# test_hsms_router.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+import unittest
+
+import secsgem.hsms
+
+
+def header(stream, function, require_response=True, session_id=0):
+    return secsgem.hsms.HsmsStreamFunctionHeader(1, stream, function, require_response, session_id)
+
+
+class TestHsmsRouter(unittest.TestCase):
+    def testDefault(self):
+        router = secsgem.hsms.HsmsRouter()
+
+        self.assertEqual(router.route(header(6, 11)).action, secsgem.hsms.HsmsRouter.ACTION_HANDLE)
+
+        router.default_action = secsgem.hsms.HsmsRouter.ACTION_DROP
+
+        self.assertEqual(router.route(header(6, 11)).action, secsgem.hsms.HsmsRouter.ACTION_DROP)
+
+    def testInvalidDefault(self):
+        with self.assertRaises(ValueError):
+            secsgem.hsms.HsmsRouter(secsgem.hsms.HsmsRouter.ACTION_REPLY)
+
+        with self.assertRaises(ValueError):
+            secsgem.hsms.HsmsRouter("invalid")
+
+    def testInvalidRule(self):
+        router = secsgem.hsms.HsmsRouter()
+
+        with self.assertRaises(ValueError):
+            router.add_rule("invalid")
+
+        with self.assertRaises(ValueError):
+            router.add_rule(secsgem.hsms.HsmsRouter.ACTION_REPLY, stream=6)
+
+        with self.assertRaises(ValueError):
+            router.add_rule(secsgem.hsms.HsmsRouter.ACTION_RAW, stream=6)
+
+        self.assertEqual(router.rules, [])
+
+    def testFirstMatchingRule(self):
+        router = secsgem.hsms.HsmsRouter(secsgem.hsms.HsmsRouter.ACTION_DROP)
+
+        handle = router.add_rule(secsgem.hsms.HsmsRouter.ACTION_HANDLE, stream=6, function=11, session_id=1)
+        reply = router.add_rule(secsgem.hsms.HsmsRouter.ACTION_REPLY, stream=6, reply=object())
+
+        self.assertIs(router.route(header(6, 11, session_id=1)), handle)
+        self.assertIs(router.route(header(6, 11, session_id=2)), reply)
+        self.assertIs(router.route(header(6, 1)), reply)
+        self.assertEqual(router.route(header(5, 1)).action, secsgem.hsms.HsmsRouter.ACTION_DROP)
+        self.assertEqual(router.rules, [handle, reply])
+
+    def testRequireResponse(self):
+        router = secsgem.hsms.HsmsRouter()
+
+        rule = router.add_rule(secsgem.hsms.HsmsRouter.ACTION_DROP, require_response=False)
+
+        self.assertIs(router.route(header(6, 11, require_response=False)), rule)
+        self.assertEqual(router.route(header(6, 11, require_response=True)).action,
+                         secsgem.hsms.HsmsRouter.ACTION_HANDLE)
+
+    def testCacheUpdatedWithRules(self):
+        router = secsgem.hsms.HsmsRouter()
+
+        rule = router.add_rule(secsgem.hsms.HsmsRouter.ACTION_DROP, stream=6, function=11)
+        self.assertIs(router.route(header(6, 11)), rule)
+
+        first = router.add_rule(secsgem.hsms.HsmsRouter.ACTION_HANDLE, stream=6)
+        self.assertIs(router.route(header(6, 11)), rule)
+
+        router.remove_rule(rule)
+        self.assertIs(router.route(header(6, 11)), first)
+
+        router.clear()
+        self.assertEqual(router.route(header(6, 11)).action, secsgem.hsms.HsmsRouter.ACTION_HANDLE)
+
+        router.add_rule(secsgem.hsms.HsmsRouter.ACTION_DROP, stream=6, function=11)
+        router.default_action = secsgem.hsms.HsmsRouter.ACTION_DROP
+        self.assertEqual(router.route(header(6, 12)).action, secsgem.hsms.HsmsRouter.ACTION_DROP)
+
+    def testCacheSize(self):
+        router = secsgem.hsms.HsmsRouter()
+        router.cache_size = 4
+
+        rule = router.add_rule(secsgem.hsms.HsmsRouter.ACTION_DROP, stream=6)
+
+        for function in range(20):
+            self.assertIs(router.route(header(6, function)), rule)
+
+        self.assertLessEqual(len(router._cache), 4)
@@ -0,0 +1,182 @@
+#####################################################################
+# test_hsms_send_buffer.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+import socket
+import threading
+import unittest
+
+import secsgem.hsms
+
+
+def create_packet(system, data=b""):
+    return secsgem.hsms.HsmsPacket(secsgem.hsms.HsmsStreamFunctionHeader(system, 1, 1, False, 0), data)
+
+
+class PartialSocket:
+    """Socket accepting a limited number of bytes per call."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.data = b""
+        self.calls = 0
+
+    def sendmsg(self, buffers):
+        self.calls += 1
+        sent = b"".join(bytes(buffer) for buffer in buffers)[:self.limit]
+        self.data += sent
+        return len(sent)
+
+    def send(self, buffer):
+        self.calls += 1
+        sent = bytes(buffer[:self.limit])
+        self.data += sent
+        return len(sent)
+
+
+class PartialSocketWithoutSendmsg:
+    """Socket without sendmsg, like on windows."""
+
+    def __init__(self, limit):
+        self.socket = PartialSocket(limit)
+
+    def send(self, buffer):
+        return self.socket.send(buffer)
+
+
+class TestHsmsSendBuffer(unittest.TestCase):
+    def testSendPacket(self):
+        sender, receiver = socket.socketpair()
+        buffer = secsgem.hsms.HsmsSendBuffer()
+        packet = create_packet(1, b"\x01\x02")
+
+        self.assertEqual(buffer.append(packet), 16)
+        self.assertEqual(buffer.send_to(sender), 16)
+
+        self.assertEqual(receiver.recv(100), packet.encode())
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(buffer.position, 16)
+
+        sender.close()
+        receiver.close()
+
+    def testDataNotCopied(self):
+        data = bytearray(b"\x01\x02")
+        buffers = create_packet(1, data).encode_buffers()
+
+        self.assertEqual(len(buffers), 2)
+        self.assertIs(buffers[1], data)
+
+    def testCoalescePackets(self):
+        sock = PartialSocket(1000)
+        buffer = secsgem.hsms.HsmsSendBuffer()
+        packets = [create_packet(system, b"\x01" * system) for system in range(5)]
+
+        ends = [buffer.append(packet) for packet in packets]
+
+        self.assertEqual(ends, [14, 29, 45, 62, 80])
+        self.assertEqual(buffer.send_to(sock), 80)
+        self.assertEqual(sock.calls, 1)
+        self.assertEqual(sock.data, b"".join(packet.encode() for packet in packets))
+
+    def testPartialSend(self):
+        sock = PartialSocket(5)
+        buffer = secsgem.hsms.HsmsSendBuffer()
+        packets = [create_packet(system, b"\x01" * system) for system in range(5)]
+
+        for packet in packets:
+            buffer.append(packet)
+
+        while len(buffer) > 0:
+            self.assertEqual(buffer.send_to(sock), 5)
+
+        self.assertEqual(sock.calls, 16)
+        self.assertEqual(sock.data, b"".join(packet.encode() for packet in packets))
+
+    def testPartialSendWithoutSendmsg(self):
+        sock = PartialSocketWithoutSendmsg(6)
+        buffer = secsgem.hsms.HsmsSendBuffer()
+        packets = [create_packet(system, b"\x01" * system) for system in range(5)]
+
+        for packet in packets:
+            buffer.append(packet)
+
+        while len(buffer) > 0:
+            buffer.send_to(sock)
+
+        self.assertEqual(sock.socket.data, b"".join(packet.encode() for packet in packets))
+
+    def testBlockSize(self):
+        sock = PartialSocket(1000)
+        buffer = secsgem.hsms.HsmsSendBuffer(10)
+        packet = create_packet(1, b"\x01" * 20)
+
+        buffer.append(packet)
+
+        self.assertEqual(buffer.send_to(sock), 10)
+        self.assertEqual(buffer.send_to(sock), 10)
+        self.assertEqual(buffer.send_to(sock), 10)
+        self.assertEqual(buffer.send_to(sock), 4)
+        self.assertEqual(buffer.send_to(sock), 0)
+        self.assertEqual(sock.data, packet.encode())
+
+    def testDiscard(self):
+        sock = PartialSocket(20)
+        buffer = secsgem.hsms.HsmsSendBuffer()
+
+        buffer.append(create_packet(1, b"\x01" * 20))
+        buffer.send_to(sock)
+
+        self.assertEqual(buffer.discard(), 34)
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(buffer.append(create_packet(2)), 48)
+
+
+class TestHsmsConnectionSendPacket(unittest.TestCase):
+    def setUp(self):
+        self.sender, self.receiver = socket.socketpair()
+        self.sender.setblocking(0)
+
+        self.connection = secsgem.hsms.connection.HsmsConnection(True, "127.0.0.1", 5000)
+        self.connection.sock = self.sender
+
+    def tearDown(self):
+        self.sender.close()
+        self.receiver.close()
+
+    def receive(self, size):
+        data = bytearray()
+        while len(data) < size:
+            data += self.receiver.recv(size - len(data))
+
+        return data
+
+    def testSendLargePacket(self):
+        packet = create_packet(1, bytes(range(256)) * 16384)
+        result = []
+
+        thread = threading.Thread(target=lambda: result.append(self.connection.send_packet(packet)))
+        thread.start()
+
+        data = self.receive(len(packet.encode()))
+        thread.join()
+
+        self.assertEqual(result, [True])
+        self.assertEqual(data, packet.encode())
+
+    def testSendFailed(self):
+        self.receiver.close()
+
+        self.assertFalse(self.connection.send_packet(create_packet(1, b"\x01" * 20)))
+        self.assertEqual(len(self.connection.sendBuffer), 0)
@@ -0,0 +1,77 @@
+#####################################################################
+# test_hsms_sender.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+import logging
+import threading
+import unittest
+
+import secsgem.hsms
+
+
+class TestHsmsSender(unittest.TestCase):
+    def setUp(self):
+        self.sender = secsgem.hsms.HsmsSender("test_sender")
+
+    def testCallInOrder(self):
+        result = []
+
+        for index in range(10):
+            self.sender.call(result.append, index)
+
+        self.assertTrue(self.sender.wait(5))
+        self.assertEqual(result, list(range(10)))
+        self.assertEqual(len(self.sender), 0)
+
+    def testCallFromSenderThread(self):
+        threads = []
+
+        self.sender.call(lambda: threads.append(threading.current_thread().name))
+
+        self.assertTrue(self.sender.wait(5))
+        self.assertEqual(threads, ["test_sender"])
+
+    def testThreadEndsWhenIdle(self):
+        self.sender.call(lambda: None)
+
+        self.assertTrue(self.sender.wait(5))
+        self.assertIsNone(self.sender._thread)
+
+        # started again for the next call
+        result = []
+        self.sender.call(result.append, 1)
+
+        self.assertTrue(self.sender.wait(5))
+        self.assertEqual(result, [1])
+
+    def testWaitTimeout(self):
+        blocker = threading.Event()
+
+        self.sender.call(blocker.wait, 5)
+
+        self.assertFalse(self.sender.wait(0.05))
+
+        blocker.set()
+        self.assertTrue(self.sender.wait(5))
+
+    def testExceptionIgnored(self):
+        result = []
+
+        self.sender.call(lambda: 1 / 0)
+        self.sender.call(result.append, 1)
+
+        with self.assertLogs("secsgem.hsms.sender.HsmsSender", logging.ERROR):
+            self.assertTrue(self.sender.wait(5))
+
+        self.assertEqual(result, [1])
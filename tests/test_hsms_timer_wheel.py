@@ -0,0 +1,185 @@
+#####################################################################
+# test_hsms_timer_wheel.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+import logging
+import socket
+import struct
+import threading
+import time
+import unittest
+
+import secsgem.hsms
+import secsgem.hsms.connection
+
+
+def wait_for(condition, timeout=5):
+    end = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > end:
+            return False
+        time.sleep(0.01)
+
+    return True
+
+
+class TestHsmsTimerWheel(unittest.TestCase):
+    def setUp(self):
+        self.wheel = secsgem.hsms.HsmsTimerWheel(tick=0.01, slots=8)
+
+    def testCallLater(self):
+        done = threading.Event()
+        result = []
+
+        self.wheel.call_later(0.1, result.append, 2)
+        self.wheel.call_later(0.05, result.append, 1)
+        self.wheel.call_later(0.15, done.set)
+
+        self.assertTrue(done.wait(5))
+        self.assertEqual(result, [1, 2])
+        self.assertEqual(len(self.wheel), 0)
+
+    def testNotCalledEarly(self):
+        done = threading.Event()
+        result = []
+
+        start = time.monotonic()
+        self.wheel.call_later(0.05, lambda: (result.append(time.monotonic() - start), done.set()))
+
+        self.assertTrue(done.wait(5))
+        self.assertGreaterEqual(result[0], 0.05)
+
+    def testDelayLongerThanOneRound(self):
+        done = threading.Event()
+
+        # 8 slots of 10ms are one round of 80ms
+        start = time.monotonic()
+        self.wheel.call_later(0.25, done.set)
+
+        self.assertTrue(done.wait(5))
+        self.assertGreaterEqual(time.monotonic() - start, 0.25)
+
+    def testCancelTimer(self):
+        done = threading.Event()
+        result = []
+
+        timer = self.wheel.call_later(0.05, result.append, 1)
+        self.wheel.call_later(0.1, done.set)
+        timer.cancel()
+
+        self.assertTrue(done.wait(5))
+        self.assertEqual(result, [])
+        self.assertTrue(wait_for(lambda: len(self.wheel) == 0))
+
+    def testExceptionInFunction(self):
+        done = threading.Event()
+
+        logging.disable(logging.ERROR)
+        try:
+            self.wheel.call_later(0.01, lambda: 1 / 0)
+            self.wheel.call_later(0.02, done.set)
+
+            self.assertTrue(done.wait(5))
+        finally:
+            logging.disable(logging.NOTSET)
+
+    def testRestartAfterIdle(self):
+        done = threading.Event()
+
+        self.wheel.call_later(0.01, lambda: None)
+        self.assertTrue(wait_for(lambda: len(self.wheel) == 0))
+
+        self.wheel.call_later(0.01, done.set)
+        self.assertTrue(done.wait(5))
+
+    def testOneThreadForAllTimers(self):
+        done = threading.Event()
+        threads_before = threading.active_count()
+
+        for _ in range(100):
+            self.wheel.call_later(0.05, lambda: None)
+        self.wheel.call_later(0.06, done.set)
+
+        self.assertEqual(threading.active_count(), threads_before + 1)
+        self.assertTrue(done.wait(5))
+
+    def testDefault(self):
+        self.assertIs(secsgem.hsms.HsmsTimerWheel.default(), secsgem.hsms.HsmsTimerWheel.default())
+
+
+class TestHsmsConnectionIntercharacterTimeout(unittest.TestCase):
+    def setUp(self):
+        self.closed = threading.Event()
+        self.received = []
+
+        self.connection = secsgem.hsms.connection.HsmsConnection(False, "127.0.0.1", 0, 0, self)
+        self.connection.T8 = 0.1
+
+        (self.connection.sock, self.remote) = socket.socketpair()
+        self.connection.sock.setblocking(0)
+
+    def tearDown(self):
+        self.connection.disconnect()
+        self.remote.close()
+
+    def on_connection_packet_received(self, _, packet):
+        self.received.append(packet)
+
+    def on_connection_closed(self, _):
+        self.closed.set()
+
+    def testCompletePacketsKeepConnection(self):
+        self.connection._start_receiver()
+
+        self.remote.sendall(secsgem.hsms.HsmsPacket(secsgem.hsms.HsmsLinktestReqHeader(1)).encode())
+
+        self.assertTrue(wait_for(lambda: len(self.received) == 1))
+        self.assertFalse(self.closed.wait(0.3))
+
+    def testSlowPacketKeepsConnection(self):
+        self.connection._start_receiver()
+
+        data = secsgem.hsms.HsmsPacket(secsgem.hsms.HsmsLinktestReqHeader(1)).encode()
+
+        # the whole packet takes longer than T8, but the pauses are shorter
+        for index in range(len(data)):
+            self.remote.sendall(data[index:index + 1])
+            time.sleep(0.02)
+
+        self.assertTrue(wait_for(lambda: len(self.received) == 1))
+        self.assertFalse(self.closed.is_set())
+
+    def testIncompletePacketClosesConnection(self):
+        self.connection._start_receiver()
+
+        self.remote.sendall(struct.pack(">L", 10) + b"\xff\xff")
+
+        self.assertTrue(self.closed.wait(5))
+        self.assertFalse(self.connection.connected)
+        self.assertEqual(self.received, [])
+
+    def testIncompletePacketClosesReactorConnection(self):
+        reactor = secsgem.hsms.HsmsReactor()
+        reactor.start()
+
+        try:
+            self.connection.reactor = reactor
+            self.connection._start_receiver()
+
+            self.remote.sendall(struct.pack(">L", 10) + b"\xff\xff")
+
+            self.assertTrue(self.closed.wait(5))
+            self.assertFalse(self.connection.threadRunning)
+        finally:
+            reactor.stop()
@@ -0,0 +1,352 @@
+#####################################################################
+# test_secs_codec.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+import unittest
+
+from secsgem.secs.codec import compile_format, decode_item_header, encode_item_header, skip_item, ItemCodec, \
+    ListCodec, LazyArrayView, LazyListView
+from secsgem.secs.data_items import CEID, DATAID, MDLN, SOFTREV, SVID
+from secsgem.secs.functions import SecsS01F01, SecsS01F02, SecsS01F03, SecsS01F04, SecsS01F14, SecsS02F33, \
+    SecsS06F01, SecsS06F11, SecsS07F03, SecsS12F11
+from secsgem.secs.variables.dynamic import ANYVALUE
+from secsgem.secs.variables import Array, BaseNumber, Binary, Boolean, F4, F8, I1, List, String, U1, U4
+
+
+class TestItemHeader(unittest.TestCase):
+    def testEncodeMatchesVariables(self):
+        for length in [0, 1, 0xFF, 0x100, 0xFFFF, 0x10000, 0xFFFFFF]:
+            self.assertEqual(encode_item_header(U4.format_code, length), U4().encode_item_header(length))
+
+    def testEncodeTooLong(self):
+        with self.assertRaises(ValueError):
+            encode_item_header(U4.format_code, 0x1000000)
+
+    def testDecodeMatchesVariables(self):
+        for length in [0, 1, 0xFF, 0x100, 0xFFFF, 0x10000, 0xFFFFFF]:
+            data = b"\x00" + U4().encode_item_header(length)
+
+            self.assertEqual(decode_item_header(data, 1), U4().decode_item_header(data, 1))
+
+
+class TestCompileFormat(unittest.TestCase):
+    def testNone(self):
+        self.assertIsNone(compile_format(None))
+
+    def testCachedVariable(self):
+        self.assertIs(compile_format(SVID), compile_format(SVID))
+
+    def testListFieldNames(self):
+        codec = compile_format(["DATA", MDLN, SOFTREV])
+
+        self.assertIsInstance(codec, ListCodec)
+        self.assertEqual(codec.names, ["MDLN", "SOFTREV"])
+
+    def testInvalidFormat(self):
+        with self.assertRaises(TypeError):
+            compile_format(5)
+
+    def testOverriddenDecodeUsesVariables(self):
+        class CustomU4(U4):
+            def decode(self, data, start=0):
+                result = super().decode(data, start)
+                self.value = [value * 2 for value in self.value]
+                return result
+
+        codec = compile_format(CustomU4)
+
+        self.assertIs(type(codec), ItemCodec)
+        self.assertEqual(codec.decode(U4(2).encode(), 0), (4, 6))
+
+
+class TestFunctionCodec(unittest.TestCase):
+    def assertMatchesVariables(self, function, value):
+        encoded = function(value).encode()
+
+        self.assertEqual(function.encode_value(value), encoded)
+
+        decoded = function()
+        decoded.decode(encoded)
+
+        self.assertEqual(function.decode_value(encoded), decoded.get())
+
+    def testCodecCachedPerClass(self):
+        self.assertIs(SecsS06F11.get_codec(), SecsS06F11.get_codec())
+        self.assertIsNot(SecsS06F11.get_codec(), SecsS01F03.get_codec())
+
+    def testS01F02(self):
+        self.assertMatchesVariables(SecsS01F02, ["MDLN", "SOFTREV"])
+
+    def testS01F14(self):
+        self.assertMatchesVariables(SecsS01F14, {"COMMACK": 0, "MDLN": ["MDLN", "SOFTREV"]})
+
+    def testS01F03(self):
+        self.assertMatchesVariables(SecsS01F03, [1, 2, "SV3"])
+
+    def testS01F04(self):
+        self.assertMatchesVariables(SecsS01F04, [U4(1), String("text"), F8([1.5, 2.5]), Boolean(True),
+                                                 Array(ANYVALUE, [U1(1), I1(-1)])])
+
+    def testS01F04PlainValues(self):
+        self.assertMatchesVariables(SecsS01F04, [1, "text", 1.5, -1, True, b"\x01\x02"])
+
+    def testS01F04Lists(self):
+        self.assertMatchesVariables(SecsS01F04, [[1, 2], ["text", [1.5, True]], []])
+
+    def testS02F33(self):
+        self.assertMatchesVariables(SecsS02F33, {"DATAID": 1, "DATA": [{"RPTID": 10, "VID": [1, 2, 3]}]})
+
+    def testS06F11(self):
+        self.assertMatchesVariables(SecsS06F11, {
+            "DATAID": 1,
+            "CEID": 1337,
+            "RPT": [
+                {"RPTID": 1, "V": [U4(1), String("LOT"), Binary(b"\x01\x02"), Boolean([True, False])]},
+                {"RPTID": 2, "V": [F4(1.5), I1(-5), Array(ANYVALUE, [])]},
+            ]})
+
+    def testS07F03Binary(self):
+        self.assertMatchesVariables(SecsS07F03, {"PPID": "recipe", "PPBODY": Binary(b"\x00" * 1000)})
+
+    def testEncodeListPositional(self):
+        self.assertEqual(SecsS02F33.encode_value([1, [{"RPTID": 10, "VID": [1]}]]),
+                         SecsS02F33({"DATAID": 1, "DATA": [{"RPTID": 10, "VID": [1]}]}).encode())
+
+    def testEncodeListMissingField(self):
+        data_format = ["DATA", MDLN, SOFTREV]
+
+        self.assertEqual(compile_format(data_format).encode({"MDLN": "MDLN"}),
+                         List(data_format, {"MDLN": "MDLN"}).encode())
+
+    def testEncodeListUnknownField(self):
+        with self.assertRaises(KeyError):
+            compile_format(["DATA", MDLN, SOFTREV]).encode({"INVALID": "MDLN"})
+
+    def testEncodeListTooManyFields(self):
+        with self.assertRaises(ValueError):
+            SecsS06F11.encode_value([1, 2, [], 4])
+
+    def testEncodeArrayInvalid(self):
+        with self.assertRaises(ValueError):
+            SecsS01F03.encode_value(1)
+
+    def testEncodeOutOfRange(self):
+        with self.assertRaises(ValueError):
+            compile_format(U1).encode([1, 256])
+
+    def testEncodeFloatForInteger(self):
+        with self.assertRaises(ValueError):
+            compile_format(U1).encode(1.5)
+
+    def testEncodeTooLong(self):
+        with self.assertRaises(ValueError):
+            compile_format(MDLN).encode("x" * 21)
+
+    def testEncodeDynamicUnsupportedType(self):
+        with self.assertRaises(ValueError):
+            compile_format(CEID).encode(F8(1.5))
+
+    def testDecodeListMissingField(self):
+        encoded = b"\x01\x01" + String("MDLN").encode()
+
+        self.assertEqual(compile_format(["DATA", MDLN, SOFTREV]).decode(encoded, 0),
+                         ({"MDLN": "MDLN", "SOFTREV": ""}, len(encoded)))
+
+    def testDecodeListTooManyFields(self):
+        encoded = b"\x01\x03" + String("MDLN").encode() * 3
+
+        with self.assertRaises(ValueError):
+            compile_format(["DATA", MDLN, SOFTREV]).decode(encoded, 0)
+
+    def testDecodeInvalidFormat(self):
+        with self.assertRaises(ValueError):
+            compile_format(DATAID).decode(F8(1.5).encode(), 0)
+
+        with self.assertRaises(ValueError):
+            compile_format(U4).decode(U1(1).encode(), 0)
+
+    def testDecodeTooShort(self):
+        with self.assertRaises(ValueError):
+            compile_format(U4).decode(U4([1, 2]).encode()[:-1], 0)
+
+    def testDecodeEmpty(self):
+        with self.assertRaises(ValueError):
+            SecsS01F03.decode_value(b"")
+
+    def testDecodeNumpy(self):
+        BaseNumber.use_numpy = True
+        try:
+            value = SecsS01F04.decode_value(SecsS01F04([U4([1, 2])]).encode())
+        finally:
+            BaseNumber.use_numpy = False
+
+        self.assertEqual(list(value[0]), [1, 2])
+
+
+class TestLazyView(unittest.TestCase):
+    value = {
+        "DATAID": 1,
+        "CEID": 1337,
+        "RPT": [
+            {"RPTID": 10, "V": [U4(1), String("LOT")]},
+            {"RPTID": 11, "V": [F8([1.5, 2.5]), Array(ANYVALUE, [U1(1), I1(-1)])]},
+        ]}
+
+    def setUp(self):
+        self.data = SecsS06F11(self.value).encode()
+        self.message = SecsS06F11.decode_lazy(self.data)
+
+    def testSkipItem(self):
+        self.assertEqual(skip_item(self.data, 0), len(self.data))
+        self.assertEqual(skip_item(U4([1, 2]).encode(), 0), 10)
+
+    def testFieldAccess(self):
+        self.assertIsInstance(self.message.data, LazyListView)
+        self.assertEqual(self.message.DATAID, 1)
+        self.assertEqual(self.message.CEID.get(), 1337)
+        self.assertEqual(self.message["CEID"], 1337)
+        self.assertEqual(self.message[1], 1337)
+
+    def testFieldsCached(self):
+        self.assertIs(self.message.RPT, self.message.RPT)
+        self.assertIs(self.message.RPT[0], self.message.RPT[0])
+
+    def testUnknownField(self):
+        with self.assertRaises(AttributeError):
+            self.message.INVALID
+
+        with self.assertRaises(KeyError):
+            self.message.data["INVALID"]
+
+    def testArrayAccess(self):
+        reports = self.message.RPT
+
+        self.assertIsInstance(reports, LazyArrayView)
+        self.assertEqual(len(reports), 2)
+        self.assertEqual(reports[-1].RPTID, 11)
+        self.assertEqual([report.RPTID.get() for report in reports], [10, 11])
+        self.assertEqual([report.RPTID.get() for report in reports[0:1]], [10])
+        self.assertEqual(reports[1].V[1].get(), [1, -1])
+
+    def testArrayIndexOutOfRange(self):
+        with self.assertRaises(IndexError):
+            self.message.RPT[2]
+
+    def testIterListFieldNames(self):
+        self.assertEqual(list(self.message.data), ["DATAID", "CEID", "RPT"])
+        self.assertEqual(len(self.message), 3)
+
+    def testGet(self):
+        expected = SecsS06F11(self.value).get()
+
+        self.assertEqual(self.message.get(), expected)
+        self.assertEqual(self.message.RPT[1].get(), expected["RPT"][1])
+
+    def testEncodeUnchanged(self):
+        self.assertEqual(self.message.encode(), self.data)
+        self.assertEqual(self.message.RPT[1].encode(), SecsS06F11(self.value).RPT[1].encode())
+
+    def testEncodeEmptyList(self):
+        data = SecsS01F03([]).encode()
+        message = SecsS01F03.decode_lazy(data)
+        buffer = bytearray()
+
+        message.encode_into(buffer)
+
+        self.assertEqual(message.encode(), data)
+        self.assertEqual(buffer, data)
+
+    def testEncodeEmptyArray(self):
+        data = SecsS06F11({"DATAID": 1, "CEID": 1337, "RPT": []}).encode()
+        message = SecsS06F11.decode_lazy(data)
+        buffer = bytearray()
+
+        message.RPT.encode_into(buffer)
+
+        self.assertEqual(message.RPT.encode(), b"\x01\x00")
+        self.assertEqual(buffer, b"\x01\x00")
+        self.assertEqual(message.encode(), data)
+
+    def testRepr(self):
+        self.assertEqual(repr(self.message), repr(SecsS06F11(self.value)))
+
+    def testModifyField(self):
+        self.message.DATAID = 2
+
+        self.assertEqual(self.message.DATAID, 2)
+        self.assertEqual(self.message.encode(), SecsS06F11(dict(self.value, DATAID=2)).encode())
+
+    def testAppendArray(self):
+        self.message.RPT.append({"RPTID": 12, "V": []})
+
+        self.assertEqual(len(self.message.RPT), 3)
+        self.assertEqual(self.message.RPT[2].RPTID, 12)
+
+    def testMissingField(self):
+        message = compile_format(["DATA", MDLN, SOFTREV])
+        data = b"\x01\x01" + String("MDLN").encode()
+
+        view = LazyListView(message, data, 0, "DATA")
+
+        self.assertEqual(view.SOFTREV, "")
+        self.assertEqual(view.encode(), b"\x01\x02" + String("MDLN").encode() + String("").encode())
+
+    def testInvalidFormat(self):
+        with self.assertRaises(ValueError):
+            SecsS06F11.decode_lazy(U4(1).encode())
+
+    def testNoData(self):
+        message = SecsS01F01.decode_lazy(b"")
+
+        self.assertIsNone(message.data)
+
+
+class TestIterDecode(unittest.TestCase):
+    s06f01 = SecsS06F01({"TRID": 1, "SMPLN": 2, "STIME": "", "SV": [1]}).encode()
+
+    def testParameterArray(self):
+        items = SecsS01F03.iter_decode(SecsS01F03([1, 2, "SV3"]).encode())
+
+        self.assertEqual(next(items), 1)
+        self.assertEqual(list(items), [2, "SV3"])
+
+    def testField(self):
+        value = {"MID": "MAP", "IDTYP": 0, "DATA": [{"XYPOS": 1, "BINLT": [1, 2]}, {"XYPOS": 2, "BINLT": [3]}]}
+        data = SecsS12F11(value).encode()
+
+        self.assertEqual(list(SecsS12F11.iter_decode(data, "DATA")), SecsS12F11(value).DATA.get())
+
+    def testMissingField(self):
+        data = b"\x01\x03" + self.s06f01[2:-5]
+
+        self.assertEqual(list(SecsS06F01.iter_decode(data, "SV")), [])
+
+    def testUnknownField(self):
+        with self.assertRaises(KeyError):
+            SecsS06F01.iter_decode(self.s06f01, "INVALID")
+
+    def testNoArray(self):
+        with self.assertRaises(ValueError):
+            SecsS06F01.iter_decode(self.s06f01)
+
+        with self.assertRaises(ValueError):
+            SecsS06F01.iter_decode(self.s06f01, "TRID")
+
+    def testInvalidFormat(self):
+        with self.assertRaises(ValueError):
+            SecsS01F03.iter_decode(U4(1).encode())
+
+    def testEmpty(self):
+        with self.assertRaises(ValueError):
+            SecsS01F03.iter_decode(b"")
@@ -0,0 +1,185 @@
+#####################################################################
+# test_secs_dispatcher.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+import threading
+import time
+import unittest
+
+import secsgem.hsms
+import secsgem.secs
+
+
+def create_packet(stream, function, system=0):
+    return secsgem.hsms.HsmsPacket(secsgem.hsms.HsmsStreamFunctionHeader(system, stream, function, True, 0))
+
+
+def wait_for(condition, timeout=5):
+    end = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > end:
+            return False
+        time.sleep(0.01)
+
+    return True
+
+
+class Recorder:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.calls = []
+        self.running = 0
+        self.maxRunning = 0
+
+    def __call__(self, packet):
+        with self.lock:
+            self.running += 1
+            self.maxRunning = max(self.maxRunning, self.running)
+
+        time.sleep(self.delay)
+
+        with self.lock:
+            self.running -= 1
+            self.calls.append((packet.header.stream, packet.header.function, packet.header.system))
+
+
+class TestSecsDispatcher(unittest.TestCase):
+    def createDispatcher(self, *args):
+        dispatcher = secsgem.secs.SecsDispatcher(*args)
+        self.addCleanup(dispatcher.stop, 5)
+
+        return dispatcher
+
+    def testInvalidOrdering(self):
+        with self.assertRaises(ValueError):
+            secsgem.secs.SecsDispatcher(4, "random")
+
+    def testConnectionOrdering(self):
+        dispatcher = self.createDispatcher(4, secsgem.secs.SecsDispatcher.ORDER_CONNECTION)
+        recorders = [Recorder(0.001), Recorder(0.001)]
+
+        for system in range(20):
+            for connection, recorder in enumerate(recorders):
+                dispatcher.dispatch(connection, create_packet(6, 11 + system % 2, system), recorder)
+
+        for recorder in recorders:
+            self.assertTrue(wait_for(lambda: len(recorder.calls) == 20))
+            self.assertEqual([call[2] for call in recorder.calls], list(range(20)))
+            self.assertEqual(recorder.maxRunning, 1)
+
+    def testConnectionsInParallel(self):
+        dispatcher = self.createDispatcher(2, secsgem.secs.SecsDispatcher.ORDER_CONNECTION)
+        barrier = threading.Barrier(2, timeout=5)
+        results = []
+
+        for connection in range(2):
+            dispatcher.dispatch(connection, create_packet(6, 11), lambda packet: results.append(barrier.wait()))
+
+        self.assertTrue(wait_for(lambda: len(results) == 2))
+
+    def testStreamFunctionOrdering(self):
+        dispatcher = self.createDispatcher(4, secsgem.secs.SecsDispatcher.ORDER_STREAM_FUNCTION)
+        recorder = Recorder(0.002)
+
+        for system in range(30):
+            dispatcher.dispatch("connection", create_packet(6, 11 + 2 * (system % 3), system), recorder)
+
+        self.assertTrue(wait_for(lambda: len(recorder.calls) == 30))
+
+        for function in (11, 13, 15):
+            systems = [call[2] for call in recorder.calls if call[1] == function]
+            self.assertEqual(systems, sorted(systems))
+
+        self.assertGreater(recorder.maxRunning, 1)
+        self.assertLessEqual(recorder.maxRunning, 3)
+
+    def testParallel(self):
+        dispatcher = self.createDispatcher(4, secsgem.secs.SecsDispatcher.ORDER_PARALLEL)
+        barrier = threading.Barrier(4, timeout=5)
+        results = []
+
+        for system in range(4):
+            dispatcher.dispatch("connection", create_packet(6, 11, system), lambda packet: results.append(barrier.wait()))
+
+        self.assertTrue(wait_for(lambda: len(results) == 4))
+
+    def testMaxWorkers(self):
+        dispatcher = self.createDispatcher(3, secsgem.secs.SecsDispatcher.ORDER_PARALLEL)
+        recorder = Recorder(0.01)
+
+        for system in range(30):
+            dispatcher.dispatch("connection", create_packet(6, 11, system), recorder)
+
+        self.assertLessEqual(dispatcher.workers, 3)
+        self.assertTrue(wait_for(lambda: len(recorder.calls) == 30))
+        self.assertEqual(recorder.maxRunning, 3)
+
+    def testIdleWorkersStop(self):
+        dispatcher = self.createDispatcher(2, secsgem.secs.SecsDispatcher.ORDER_PARALLEL)
+        dispatcher.idle_timeout = 0.05
+        recorder = Recorder()
+
+        dispatcher.dispatch("connection", create_packet(6, 11), recorder)
+
+        self.assertTrue(wait_for(lambda: len(recorder.calls) == 1))
+        self.assertTrue(wait_for(lambda: dispatcher.workers == 0))
+
+        # workers are started again
+        dispatcher.dispatch("connection", create_packet(6, 11), recorder)
+
+        self.assertTrue(wait_for(lambda: len(recorder.calls) == 2))
+
+    def testExceptionInFunction(self):
+        dispatcher = self.createDispatcher(1, secsgem.secs.SecsDispatcher.ORDER_CONNECTION)
+        recorder = Recorder()
+
+        def fail(packet):
+            raise ValueError("failed")
+
+        with self.assertLogs("secsgem.secs.dispatcher", "ERROR"):
+            dispatcher.dispatch("connection", create_packet(6, 11, 1), fail)
+            dispatcher.dispatch("connection", create_packet(6, 11, 2), recorder)
+
+            self.assertTrue(wait_for(lambda: len(recorder.calls) == 1))
+
+        self.assertEqual(recorder.calls, [(6, 11, 2)])
+
+    def testStop(self):
+        dispatcher = self.createDispatcher(2, secsgem.secs.SecsDispatcher.ORDER_PARALLEL)
+        recorder = Recorder(0.05)
+
+        for system in range(4):
+            dispatcher.dispatch("connection", create_packet(6, 11, system), recorder)
+
+        threads = [thread for thread in threading.enumerate() if thread.name == dispatcher.name]
+
+        self.assertTrue(dispatcher.stop(5))
+        self.assertEqual(len(recorder.calls), 4)
+        self.assertEqual(dispatcher.workers, 0)
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+
+        # workers are started again
+        dispatcher.dispatch("connection", create_packet(6, 11, 4), recorder)
+
+        self.assertTrue(wait_for(lambda: len(recorder.calls) == 5))
+
+    def testStopFromDispatchedFunction(self):
+        dispatcher = self.createDispatcher(1, secsgem.secs.SecsDispatcher.ORDER_CONNECTION)
+        results = []
+
+        dispatcher.dispatch("connection", create_packet(6, 11), lambda packet: results.append(dispatcher.stop(5)))
+
+        self.assertTrue(wait_for(lambda: results == [True]))
+        self.assertTrue(wait_for(lambda: dispatcher.workers == 0))
@@ -46,6 +46,18 @@ class testSecsFunctionNoData:
         function = self.cls()
         function.decode(b"")
 
+    def testEncodeValue(self):
+        if self.cls is None:
+            return
+
+        self.assertEqual(b"", self.cls.encode_value(None))
+
+    def testDecodeValue(self):
+        if self.cls is None:
+            return
+
+        self.assertIsNone(self.cls.decode_value(b""))
+
 
 class testSecsFunctionSingleVariable(object):
     cls = None
@@ -91,6 +103,18 @@ class testSecsFunctionSingleVariable(object):
 
         self.assertEqual(self.value1, function.get())
 
+    def testEncodeValue(self):
+        if self.cls is None:
+            return
+
+        self.assertEqual(self.encoded1, self.cls.encode_value(self.value1))
+
+    def testDecodeValue(self):
+        if self.cls is None:
+            return
+
+        self.assertEqual(self.value1, self.cls.decode_value(self.encoded1))
+
 
 class testS00E00(unittest.TestCase, testSecsFunctionNoData):
     cls = SecsS00F00
@@ -14,6 +14,7 @@
 # GNU Lesser General Public License for more details.
 #####################################################################
 
+import logging
 import threading
 import unittest.mock
 
@@ -38,6 +39,46 @@ class TestSecsHandler(unittest.TestCase):
         self.assertEqual(function[0], "MDLN")
         self.assertEqual(function[1], "SOFTREV")
 
+    def testSecsDecodeLazy(self):
+        server = HsmsTestServer()
+        client = secsgem.secs.SecsHandler("127.0.0.1", 5000, False, 0, "test", server)
+        client.lazy_decode = True
+
+        packet = server.generate_stream_function_packet(0, secsgem.secs.functions.SecsS06F11(
+            {"DATAID": 1, "CEID": 1337, "RPT": [{"RPTID": 10, "V": ["VAR", secsgem.secs.variables.U4(100)]}]}))
+
+        function = client.secs_decode(packet)
+
+        self.assertIsInstance(function.data, secsgem.secs.codec.LazyListView)
+        self.assertEqual(function.CEID, 1337)
+        self.assertEqual(function.RPT[0].V.get(), ["VAR", 100])
+
+    def testSecsDecodeCached(self):
+        server = HsmsTestServer()
+        client = secsgem.secs.SecsHandler("127.0.0.1", 5000, False, 0, "test", server)
+
+        packet = server.generate_stream_function_packet(0, secsgem.secs.functions.SecsS01F02(["MDLN", "SOFTREV"]))
+
+        function = client.secs_decode(packet)
+        self.assertIs(client.secs_decode(packet), function)
+
+        # lazy decoding creates another object
+        client.lazy_decode = True
+        self.assertIsNot(client.secs_decode(packet), function)
+
+        # new data is decoded again
+        client.lazy_decode = False
+        packet.data = secsgem.secs.functions.SecsS01F02(["MDLN2", "SOFTREV"]).encode()
+        self.assertEqual(client.secs_decode(packet)[0], "MDLN2")
+
+    def testSecsDecodeValue(self):
+        server = HsmsTestServer()
+        client = secsgem.secs.SecsHandler("127.0.0.1", 5000, False, 0, "test", server)
+
+        packet = server.generate_stream_function_packet(0, secsgem.secs.functions.SecsS01F02(["MDLN", "SOFTREV"]))
+
+        self.assertEqual(client.secs_decode_value(packet), ["MDLN", "SOFTREV"])
+
     def testSecsDecodeNone(self):
         server = HsmsTestServer()
         client = secsgem.secs.SecsHandler("127.0.0.1", 5000, False, 0, "test", server)
@@ -103,6 +144,7 @@ class TestSecsHandlerPassive(unittest.TestCase):
     def tearDown(self):
         self.server.stop()
         self.client.disable()
+        self.client.dispatcher.stop(5)
 
     def handleS01F01(self, handler, packet):
         handler.send_response(secsgem.secs.functions.SecsS01F02(), packet.header.system)
@@ -137,6 +179,117 @@ class TestSecsHandlerPassive(unittest.TestCase):
         self.assertEqual(packet.header.stream, 1)
         self.assertEqual(packet.header.function, 2)
 
+    def testStreamFunctionReceivingInline(self):
+        self.server.simulate_connect()
+
+        threads = []
+        self.client.register_stream_function(1, 1, lambda handler, packet: threads.append(threading.current_thread()))
+
+        self.performSelect()
+
+        self.server.simulate_packet(self.server.generate_stream_function_packet(
+            self.server.get_next_system_counter(), secsgem.secs.functions.SecsS01F01()))
+
+        self.assertEqual(threads, [threading.current_thread()])
+
+    def receive_s01f03_counting_decodes(self, callback):
+        decode = secsgem.secs.functions.SecsS01F03.decode
+        decode_value = secsgem.secs.functions.SecsS01F03.decode_value
+        decodes = []
+
+        def counting_decode(function, data):
+            decodes.append(data)
+            return decode(function, data)
+
+        def counting_decode_value(data):
+            decodes.append(data)
+            return decode_value(data)
+
+        self.client.register_stream_function(1, 3, callback)
+
+        self.performSelect()
+
+        with unittest.mock.patch.object(secsgem.secs.functions.SecsS01F03, "decode", counting_decode), \
+                unittest.mock.patch.object(secsgem.secs.functions.SecsS01F03, "decode_value", counting_decode_value):
+            self.server.simulate_packet(self.server.generate_stream_function_packet(
+                self.server.get_next_system_counter(), secsgem.secs.functions.SecsS01F03([1, 2])))
+
+            self.server.expect_packet(stream=1, function=4)
+
+        return decodes
+
+    def testStreamFunctionReceivingDecodedOnce(self):
+        self.server.simulate_connect()
+
+        logger = self.client.communicationLogger
+        level = logger.level
+        logger.setLevel(logging.INFO)
+
+        try:
+            decodes = self.receive_s01f03_counting_decodes(lambda handler, packet: (
+                handler.secs_decode(packet), handler.stream_function(1, 4)(handler.secs_decode(packet).get()))[1])
+        finally:
+            logger.setLevel(level)
+
+        self.assertEqual(len(decodes), 1)
+
+    def testStreamFunctionReceivingDecodedValueOnce(self):
+        self.server.simulate_connect()
+
+        logger = self.client.communicationLogger
+        level = logger.level
+        logger.setLevel(logging.INFO)
+
+        values = []
+
+        try:
+            decodes = self.receive_s01f03_counting_decodes(lambda handler, packet: (
+                values.append(handler.secs_decode_value(packet)), handler.stream_function(1, 4)([]))[1])
+        finally:
+            logger.setLevel(level)
+
+        self.assertEqual(values, [[1, 2]])
+        self.assertEqual(len(decodes), 1)
+
+    def testStreamFunctionReceivingNotDecodedForDisabledLog(self):
+        self.server.simulate_connect()
+
+        logger = self.client.communicationLogger
+        level = logger.level
+        logger.setLevel(logging.WARNING)
+
+        try:
+            decodes = self.receive_s01f03_counting_decodes(
+                lambda handler, packet: handler.stream_function(1, 4)([]))
+        finally:
+            logger.setLevel(level)
+
+        self.assertEqual(decodes, [])
+
+    def testStreamFunctionReceivingOrdered(self):
+        self.server.simulate_connect()
+
+        received = []
+        done = threading.Event()
+
+        def handleS01F03(handler, packet):
+            received.append((packet.header.system, threading.current_thread()))
+            if len(received) == 10:
+                done.set()
+
+        self.client.register_stream_function(1, 3, handleS01F03)
+
+        self.performSelect()
+
+        system_ids = [self.server.get_next_system_counter() for _ in range(10)]
+        for system_id in system_ids:
+            self.server.simulate_packet(self.server.generate_stream_function_packet(
+                system_id, secsgem.secs.functions.SecsS01F03([])))
+
+        self.assertTrue(done.wait(5))
+        self.assertEqual([system_id for system_id, _ in received], system_ids)
+        self.assertNotIn(threading.current_thread(), [thread for _, thread in received])
+
     def testStreamFunctionSending(self):
         self.server.simulate_connect()
 
@@ -704,3 +857,274 @@ class TestSecsHandlerActive(unittest.TestCase):
     def tearDown(self):
         self.server.stop()
         self.client.disable()
+        self.client.dispatcher.stop(5)
+
+
+class TestSecsHandlerSendAsync(unittest.TestCase):
+    def setUp(self):
+        self.server = HsmsTestServer()
+
+        self.client = secsgem.secs.SecsHandler("127.0.0.1", 5000, False, 0, "test", self.server)
+
+        self.server.start()
+        self.client.enable()
+
+        self.server.simulate_connect()
+
+        system_id = self.server.get_next_system_counter()
+        self.server.simulate_packet(secsgem.hsms.HsmsPacket(secsgem.hsms.HsmsSelectReqHeader(system_id)))
+        self.server.expect_packet(system_id=system_id)
+
+    def tearDown(self):
+        self.server.stop()
+        self.client.disable()
+        self.client.dispatcher.stop(5)
+
+    def sentRequests(self):
+        return [packet for packet in self.server.connection.packets if packet.header.function == 3]
+
+    def respond(self, request, value):
+        self.server.connection.packets.remove(request)
+        self.server.simulate_packet(self.server.generate_stream_function_packet(
+            request.header.system, secsgem.secs.functions.SecsS01F04([value])))
+
+        # queued requests are sent by the send thread
+        self.assertTrue(self.client.sender.wait(1))
+
+    def testResponse(self):
+        future = self.client.send_async(secsgem.secs.functions.SecsS01F03([1]))
+
+        self.assertFalse(future.done())
+
+        (request, ) = self.sentRequests()
+        self.respond(request, 10)
+
+        response = future.result(1)
+        self.assertEqual((response.header.stream, response.header.function), (1, 4))
+        self.assertEqual(self.client.secs_decode(response).get(), [10])
+        self.assertEqual(self.client._asyncInFlight, 0)
+
+    def testPipelining(self):
+        self.client.send_async_window = 2
+
+        futures = [self.client.send_async(secsgem.secs.functions.SecsS01F03([index])) for index in range(5)]
+
+        self.assertEqual(len(self.sentRequests()), 2)
+
+        # responses in reverse order
+        requests = self.sentRequests()
+        self.respond(requests[1], 1)
+        self.respond(requests[0], 0)
+
+        self.assertEqual(len(self.sentRequests()), 2)
+
+        while self.sentRequests():
+            request = self.sentRequests()[0]
+            self.respond(request, self.client.secs_decode(request).get()[0])
+
+        self.assertEqual([self.client.secs_decode(future.result(1)).get()[0] for future in futures], list(range(5)))
+        self.assertEqual(self.client._asyncInFlight, 0)
+
+    def testTimeout(self):
+        self.client.connection.T3 = 0.05
+        self.client.send_async_window = 1
+
+        first = self.client.send_async(secsgem.secs.functions.SecsS01F03([1]))
+        second = self.client.send_async(secsgem.secs.functions.SecsS01F03([2]))
+
+        self.assertIsNone(first.result(1))
+        self.assertIsNone(second.result(1))
+        self.assertTrue(self.client.sender.wait(1))
+        self.assertEqual(len(self.sentRequests()), 2)
+        self.assertEqual(self.client._systemFutures, {})
+        self.assertEqual(self.client._asyncInFlight, 0)
+
+    def testQueuedRequestSentFromSender(self):
+        self.client.send_async_window = 1
+
+        send_packet = self.server.connection.send_packet
+        threads = []
+
+        def record_thread(packet):
+            threads.append(threading.current_thread())
+            return send_packet(packet)
+
+        self.server.connection.send_packet = record_thread
+
+        first = self.client.send_async(secsgem.secs.functions.SecsS01F03([1]))
+        second = self.client.send_async(secsgem.secs.functions.SecsS01F03([2]))
+
+        self.respond(self.sentRequests()[0], 1)
+        self.respond(self.sentRequests()[0], 2)
+
+        self.assertIsNotNone(first.result(1))
+        self.assertIsNotNone(second.result(1))
+
+        # the queued request isn't sent by the thread receiving the response of the first one
+        self.assertEqual(threads[0], threading.current_thread())
+        self.assertEqual(threads[1].name, self.client.sender.name)
+
+    def testSendFailed(self):
+        self.server.fail_next_send()
+
+        future = self.client.send_async(secsgem.secs.functions.SecsS01F03([1]))
+
+        self.assertIsNone(future.result(1))
+        self.assertEqual(self.client._asyncInFlight, 0)
+
+    def testCancelQueued(self):
+        self.client.send_async_window = 1
+
+        first = self.client.send_async(secsgem.secs.functions.SecsS01F03([1]))
+        second = self.client.send_async(secsgem.secs.functions.SecsS01F03([2]))
+
+        self.assertFalse(first.cancel())
+        self.assertTrue(second.cancel())
+
+        self.respond(self.sentRequests()[0], 1)
+
+        self.assertIsNotNone(first.result(1))
+        self.assertEqual(self.sentRequests(), [])
+        self.assertEqual(self.client._asyncInFlight, 0)
+
+    def testConnectionClosed(self):
+        self.client.send_async_window = 1
+
+        futures = [self.client.send_async(secsgem.secs.functions.SecsS01F03([index])) for index in range(3)]
+
+        self.server.fail_next_send()
+        self.server.simulate_disconnect()
+
+        self.assertEqual([future.result(1) for future in futures], [None, None, None])
+        self.assertTrue(self.client.sender.wait(1))
+        self.assertEqual(self.client._asyncInFlight, 0)
+
+
+class TestSecsHandlerRouting(unittest.TestCase):
+    def setUp(self):
+        self.server = HsmsTestServer()
+
+        self.client = secsgem.secs.SecsHandler("127.0.0.1", 5000, False, 0, "test", self.server)
+        self.client._dispatch_stream_function = unittest.mock.Mock()
+
+        self.server.start()
+        self.client.enable()
+
+        self.server.simulate_connect()
+
+    def tearDown(self):
+        self.server.stop()
+        self.client.disable()
+        self.client.dispatcher.stop(5)
+
+    def select(self):
+        system_id = self.server.get_next_system_counter()
+        self.server.simulate_packet(secsgem.hsms.HsmsPacket(secsgem.hsms.HsmsSelectReqHeader(system_id)))
+        self.server.expect_packet(system_id=system_id)
+
+    def receive_s06f11(self, require_response=True):
+        packet = secsgem.hsms.HsmsPacket(
+            secsgem.hsms.HsmsStreamFunctionHeader(self.server.get_next_system_counter(), 6, 11, require_response, 0),
+            secsgem.secs.functions.SecsS06F11({"DATAID": 1, "CEID": 1337, "RPT": []}).encode())
+
+        logger = self.client.communicationLogger
+        level = logger.level
+        logger.setLevel(logging.INFO)
+
+        try:
+            self.server.simulate_packet(packet)
+        finally:
+            logger.setLevel(level)
+
+        return packet
+
+    def testDefaultHandle(self):
+        self.select()
+
+        packet = self.receive_s06f11()
+
+        self.client._dispatch_stream_function.assert_called_once_with(packet)
+
+    def testDrop(self):
+        self.client.router.default_action = secsgem.hsms.HsmsRouter.ACTION_DROP
+        self.select()
+
+        packet = self.receive_s06f11()
+
+        self.client._dispatch_stream_function.assert_not_called()
+        self.assertIsNone(packet.decoded)
+        self.assertEqual(self.server.connection.packets, [])
+
+    def testReply(self):
+        self.client.router.add_rule(secsgem.hsms.HsmsRouter.ACTION_REPLY, stream=6, function=11,
+                                    reply=secsgem.secs.functions.SecsS06F12(0))
+        self.select()
+
+        packet = self.receive_s06f11()
+
+        self.client._dispatch_stream_function.assert_not_called()
+        self.assertIsNone(packet.decoded)
+
+        response = self.server.expect_packet(system_id=packet.header.system)
+        self.assertEqual((response.header.stream, response.header.function), (6, 12))
+        self.assertEqual(self.client.secs_decode(response).get(), 0)
+
+    def testReplyWithoutWBit(self):
+        self.client.router.add_rule(secsgem.hsms.HsmsRouter.ACTION_REPLY, stream=6, function=11,
+                                    reply=secsgem.secs.functions.SecsS06F12(0))
+        self.select()
+
+        self.receive_s06f11(require_response=False)
+
+        self.client._dispatch_stream_function.assert_not_called()
+        self.assertEqual(self.server.connection.packets, [])
+
+    def testRaw(self):
+        calls = []
+
+        def on_raw(handler, packet):
+            calls.append((handler, packet, threading.current_thread()))
+            return secsgem.secs.functions.SecsS06F12(0)
+
+        self.client.router.add_rule(secsgem.hsms.HsmsRouter.ACTION_RAW, stream=6, callback=on_raw)
+        self.select()
+
+        packet = self.receive_s06f11()
+
+        self.assertEqual(calls, [(self.client, packet, threading.current_thread())])
+        self.assertIsNone(packet.decoded)
+
+        response = self.server.expect_packet(system_id=packet.header.system)
+        self.assertEqual((response.header.stream, response.header.function), (6, 12))
+
+    def testRawExceptionIgnored(self):
+        self.client.router.add_rule(secsgem.hsms.HsmsRouter.ACTION_RAW, callback=lambda handler, packet: 1 / 0)
+        self.select()
+
+        logging.disable(logging.ERROR)
+        try:
+            self.receive_s06f11()
+        finally:
+            logging.disable(logging.NOTSET)
+
+        self.client._dispatch_stream_function.assert_not_called()
+
+    def testResponseNotRouted(self):
+        self.client.router.default_action = secsgem.hsms.HsmsRouter.ACTION_DROP
+        self.select()
+
+        future = self.client.send_async(secsgem.secs.functions.SecsS01F03([1]))
+
+        request = self.server.expect_packet(function=3)
+        self.server.simulate_packet(self.server.generate_stream_function_packet(
+            request.header.system, secsgem.secs.functions.SecsS01F04([10])))
+
+        self.assertEqual(self.client.secs_decode(future.result(1)).get(), [10])
+
+    def testNotSelectedRejected(self):
+        self.client.router.default_action = secsgem.hsms.HsmsRouter.ACTION_DROP
+
+        packet = self.receive_s06f11()
+
+        response = self.server.expect_packet(system_id=packet.header.system)
+        self.assertEqual(response.header.sType, 0x07)
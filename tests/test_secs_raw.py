@@ -0,0 +1,102 @@
+#####################################################################
+# test_secs_raw.py
+#
+# (c) Copyright 2021, Benjamin Parzella. All rights reserved.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#####################################################################
+import unittest
+
+from secsgem.secs import decode_raw, encode_raw
+from secsgem.secs.data_items import MDLN, SOFTREV
+from secsgem.secs.functions import SecsS01F01, SecsS06F11
+from secsgem.secs.variables import Array, Binary, Boolean, F4, F8, I1, I8, JIS8, List, String, U1, U2, U4, U8
+from secsgem.secs.variables.dynamic import ANYVALUE
+
+
+class TestDecodeRaw(unittest.TestCase):
+    def testVariables(self):
+        for variable in [U1([1, 2]), U2(0xFFFF), U4(1337), U8(2 ** 64 - 1), I1(-1), I8([-2 ** 63, 1]), F4(1.5),
+                         F8([1.5, -2.5])]:
+            self.assertEqual(decode_raw(variable.encode()), (variable.format_code, list(variable.value)))
+
+    def testText(self):
+        self.assertEqual(decode_raw(String("TEXT").encode()), (String.format_code, "TEXT"))
+        self.assertEqual(decode_raw(JIS8("TEXT").encode()), (JIS8.format_code, "TEXT"))
+
+    def testBinary(self):
+        self.assertEqual(decode_raw(Binary(b"\x00\x01").encode()), (Binary.format_code, b"\x00\x01"))
+
+    def testBoolean(self):
+        self.assertEqual(decode_raw(b"\x25\x03\x00\x01\x02"), (Boolean.format_code, [False, True, True]))
+
+    def testUnknownFormat(self):
+        self.assertEqual(decode_raw(b"\x49\x02\x00\x41"), (0o22, b"\x00\x41"))
+
+    def testNested(self):
+        data = SecsS06F11({"DATAID": 1, "CEID": 2, "RPT": [{"RPTID": 3, "V": [String("LOT"), Array(ANYVALUE, [])]}]})
+
+        self.assertEqual(decode_raw(data.encode()),
+                         (0, [(U1.format_code, [1]), (U1.format_code, [2]),
+                              (0, [(0, [(U1.format_code, [3]), (0, [(String.format_code, "LOT"), (0, [])])])])]))
+
+    def testStart(self):
+        self.assertEqual(decode_raw(b"\x00" + U1(5).encode(), 1), (U1.format_code, [5]))
+
+    def testEmpty(self):
+        self.assertIsNone(decode_raw(b""))
+
+    def testLongItem(self):
+        value = b"\x01" * 0x10000
+
+        self.assertEqual(decode_raw(Binary(value).encode()), (Binary.format_code, value))
+
+    def testTooShort(self):
+        with self.assertRaises(ValueError):
+            decode_raw(U4([1, 2]).encode()[:-1])
+
+    def testInvalidNumberLength(self):
+        with self.assertRaises(ValueError):
+            decode_raw(b"\xb1\x03\x00\x00\x01")
+
+
+class TestEncodeRaw(unittest.TestCase):
+    def testVariables(self):
+        for variable in [U1([1, 2]), U2(0xFFFF), U4(1337), U8(2 ** 64 - 1), I1(-1), I8([-2 ** 63, 1]), F4(1.5),
+                         F8([1.5, -2.5]), String("TEXT"), JIS8("TEXT"), Binary(b"\x00\x01"),
+                         Boolean([True, False]), List([MDLN, SOFTREV], ["MDLN", "SOFTREV"])]:
+            self.assertEqual(encode_raw(decode_raw(variable.encode())), variable.encode())
+
+    def testSingleValues(self):
+        self.assertEqual(encode_raw((U4.format_code, 1337)), U4(1337).encode())
+        self.assertEqual(encode_raw((F8.format_code, 1)), F8(1).encode())
+        self.assertEqual(encode_raw((Boolean.format_code, True)), Boolean(True).encode())
+
+    def testBytesValues(self):
+        self.assertEqual(encode_raw((String.format_code, b"TEXT")), String("TEXT").encode())
+        self.assertEqual(encode_raw((Boolean.format_code, b"\x01")), Boolean(True).encode())
+        self.assertEqual(encode_raw((0o22, b"\x00\x41")), b"\x49\x02\x00\x41")
+
+    def testMessage(self):
+        data = SecsS06F11({"DATAID": 1, "CEID": 2, "RPT": [{"RPTID": 3, "V": [String("LOT"), F4([1.5, 2])]}]}).encode()
+
+        self.assertEqual(encode_raw(decode_raw(data)), data)
+
+    def testHeaderOnly(self):
+        self.assertEqual(encode_raw(None), SecsS01F01().encode())
+
+    def testOutOfRange(self):
+        with self.assertRaises(ValueError):
+            encode_raw((U1.format_code, 256))
+
+    def testFloatForInteger(self):
+        with self.assertRaises(ValueError):
+            encode_raw((I1.format_code, 1.5))
@@ -21,9 +21,16 @@ import unittest
 
 import pytest
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import secsgem.secs.variables.base_number
 from secsgem.secs.variables import *
 from secsgem.secs.variables.functions import generate, get_format
 from secsgem.secs.data_items import MDLN, OBJACK, SOFTREV, SVID
+from secsgem.secs.variables.dynamic import ANYVALUE
 
 
 def printable_value(value):
@@ -134,6 +141,63 @@ class TestSecsVar(unittest.TestCase):
             get_format(10)
 
 
+class TestSecsVarDecodeMemoryview(unittest.TestCase):
+    def testDecodeItemHeader(self):
+        secsvar = U4(1337)
+
+        self.assertEqual(secsvar.decode_item_header(memoryview(b"\xB3\x01\x00\x00")), (4, 0o54, 0x10000))
+
+    def testDecodeU4(self):
+        secsvar = U4()
+        data = memoryview(b"\x00\xb1\x08\x00\x00\x00{\x00\x00\x00\xea\x00")
+
+        self.assertEqual(secsvar.decode(data, 1), 11)
+        self.assertEqual(secsvar.get(), [123, 234])
+
+    def testDecodeU4TooShort(self):
+        secsvar = U4()
+
+        with self.assertRaises(ValueError):
+            secsvar.decode(memoryview(b"\xb1\x08\x00\x00\x00{\x00\x00"))
+
+    def testDecodeString(self):
+        secsvar = String()
+
+        self.assertEqual(secsvar.decode(memoryview(b"A\x05HelloA\x01X")), 7)
+        self.assertEqual(secsvar.get(), "Hello")
+
+    def testDecodeJIS8(self):
+        secsvar = JIS8()
+
+        secsvar.decode(memoryview(b"E\x02\xb1\\"))
+        self.assertEqual(secsvar.get(), "\uff71\u00a5")
+
+    def testDecodeBinary(self):
+        secsvar = Binary()
+
+        self.assertEqual(secsvar.decode(memoryview(b"!\x03\x01\x0b\x19!\x00")), 5)
+        self.assertEqual(secsvar.get(), b"\x01\x0b\x19")
+
+    def testDecodeBoolean(self):
+        secsvar = Boolean()
+
+        self.assertEqual(secsvar.decode(memoryview(b"%\x03\x01\x00\x02")), 5)
+        self.assertEqual(secsvar.get(), [True, False, True])
+
+    def testDecodeBooleanTooShort(self):
+        secsvar = Boolean()
+
+        with self.assertRaises(ValueError):
+            secsvar.decode(memoryview(b"%\x03\x01"))
+
+    def testDecodeNested(self):
+        encoded = List([MDLN, SOFTREV, [SVID]], {"MDLN": "MDL", "SOFTREV": "1.0", "SVID": [1, "SV2", 3]}).encode()
+
+        secsvar = List([MDLN, SOFTREV, [SVID]])
+        self.assertEqual(secsvar.decode(memoryview(encoded)), len(encoded))
+        self.assertEqual(secsvar.get(), {"MDLN": "MDL", "SOFTREV": "1.0", "SVID": [1, "SV2", 3]})
+
+
 class TestSecsVarDynamic(unittest.TestCase):
     def testConstructorU4(self):
         secsvar = Dynamic([U4])
@@ -458,6 +522,52 @@ class TestSecsVarDynamic(unittest.TestCase):
         with self.assertRaises(ValueError):
             secsvar.set(SVID("asdfg"))
 
+    def testSetList(self):
+        secsvar = ANYVALUE([1, "TEXT", [True]])
+
+        self.assertIsInstance(secsvar.value, Array)
+        self.assertEqual(secsvar.get(), [1, "TEXT", [True]])
+        self.assertEqual(secsvar.encode(), b"\x01\x03\xa5\x01\x01\x41\x04TEXT\x01\x01\x25\x01\x01")
+
+    def testSetListUnsupportedItem(self):
+        with self.assertRaises(ValueError):
+            ANYVALUE([object()])
+
+    def testSetListWithoutArray(self):
+        secsvar = Dynamic([U1, String], [1, 2])
+
+        self.assertIsInstance(secsvar.value, U1)
+
+    def testSupportsValue(self):
+        secsvar = Dynamic([U1, String])
+
+        self.assertTrue(secsvar.supports_value(1))
+        self.assertTrue(secsvar.supports_value(String("TEXT")))
+        self.assertFalse(secsvar.supports_value(object()))
+        self.assertFalse(secsvar.supports_value(U2(1)))
+
+    def testChangeTypes(self):
+        secsvar = Dynamic([U1], 1)
+
+        secsvar.types = [String]
+        secsvar.set(1)
+
+        self.assertIsInstance(secsvar.value, String)
+
+    def testChangeCount(self):
+        secsvar = Dynamic([U1], [1, 2])
+
+        secsvar.count = 1
+
+        with self.assertRaises(ValueError):
+            secsvar.set([1, 2])
+
+    def testDecodeUnsupportedFormat(self):
+        secsvar = Dynamic([U1, String])
+
+        with self.assertRaises(ValueError):
+            secsvar.decode(U2(1).encode())
+
 
 class TestSecsVarList(unittest.TestCase):
     def testConstructor(self):
@@ -818,6 +928,28 @@ class TestSecsVarArray(unittest.TestCase):
         self.assertEqual(secsvar[1], "SOFTREV1")
         self.assertEqual(len(secsvar), 2)
 
+    def testEncodeInto(self):
+        secsvar = Array(MDLN, ["MDLN1", "SOFTREV1"])
+        buffer = bytearray(b"\x00")
+
+        secsvar.encode_into(buffer)
+
+        self.assertEqual(buffer, b"\x00" + secsvar.encode())
+
+    def testIterDecode(self):
+        secsvar = Array(MDLN)
+
+        items = secsvar.iter_decode(b"\x01\x02A\x05MDLN1A\x08SOFTREV1")
+
+        self.assertEqual([item.get() for item in items], ["MDLN1", "SOFTREV1"])
+        self.assertEqual(len(secsvar), 0)
+
+    def testIterDecodeInvalidHeader(self):
+        secsvar = Array(MDLN)
+
+        with self.assertRaises(ValueError):
+            secsvar.iter_decode(b"A\x05MDLN1")
+
 
 class TestSecsVarBinary(unittest.TestCase):
     def testHash(self):
@@ -897,6 +1029,78 @@ class TestSecsVarBinary(unittest.TestCase):
 
         self.assertEqual(secsvar.get(), b"\x01\x0b\x19")
 
+    def testDecodeReferencesData(self):
+        data = b"!\x03\x01\x0b\x19"
+        secsvar = Binary()
+
+        secsvar.decode(data)
+
+        self.assertIsInstance(secsvar.value, memoryview)
+        self.assertIs(secsvar.value.obj, data)
+        self.assertEqual(secsvar.encode(), data)
+
+    def testDecodeCopiesMutableData(self):
+        data = bytearray(b"!\x03\x01\x0b\x19")
+        secsvar = Binary()
+
+        secsvar.decode(data)
+        data[2] = 0xff
+
+        self.assertEqual(secsvar.get(), b"\x01\x0b\x19")
+
+    def testSetCopiesMutableData(self):
+        data = bytearray(b"\x01\x0b\x19")
+        secsvar = Binary(data)
+
+        data[0] = 0xff
+
+        self.assertEqual(secsvar.get(), b"\x01\x0b\x19")
+
+    def testSetCopiesWritableView(self):
+        data = bytearray(b"\x01\x0b\x19")
+        secsvar = Binary(memoryview(data)[1:])
+
+        data[1] = 0xff
+
+        self.assertEqual(secsvar.get(), b"\x0b\x19")
+
+    def testSetReferencesReadOnlyView(self):
+        data = b"\x01\x0b\x19"
+        secsvar = Binary(memoryview(data))
+
+        self.assertIs(secsvar.value.obj, data)
+
+    def testDecodeTooShort(self):
+        secsvar = Binary()
+
+        with self.assertRaises(ValueError):
+            secsvar.decode(b"!\x03\x01\x0b")
+
+    def testGetAfterDecodeCopiesOnce(self):
+        secsvar = Binary()
+        secsvar.decode(b"!\x03\x01\x0b\x19")
+
+        value = secsvar.get()
+
+        self.assertIsInstance(value, bytes)
+        self.assertIs(secsvar.get(), value)
+
+    def testSetBytesWithoutCopy(self):
+        value = b"\x01\x0b\x19"
+        secsvar = Binary(value)
+
+        self.assertIs(secsvar.get(), value)
+
+    def testSettingItemAfterDecode(self):
+        data = b"!\x03\x01\x0b\x19"
+        secsvar = Binary(count=3)
+        secsvar.decode(data)
+
+        secsvar[0] = 0xff
+
+        self.assertEqual(secsvar.get(), b"\xff\x0b\x19")
+        self.assertEqual(data, b"!\x03\x01\x0b\x19")
+
 
 class TestSecsVarBoolean(unittest.TestCase):
     def testHash(self):
@@ -986,6 +1190,34 @@ class TestSecsVarBoolean(unittest.TestCase):
 
         self.assertEqual(secsvar.get(), [True, True, False])
 
+    def testDecodeNonZeroIsTrue(self):
+        secsvar = Boolean()
+
+        secsvar.decode(b"%\x03\x02\xff\x00")
+
+        self.assertEqual(secsvar.get(), [True, True, False])
+        self.assertEqual(secsvar.encode(), b"%\x03\x01\x01\x00")
+
+    def testDecodeCountExceeded(self):
+        secsvar = Boolean(count=2)
+
+        with self.assertRaises(ValueError):
+            secsvar.decode(b"%\x03\x01\x01\x00")
+
+    def testSettingItemAfterDecode(self):
+        secsvar = Boolean()
+        secsvar.decode(b"%\x03\x01\x01\x00")
+
+        secsvar[2] = "YES"
+
+        self.assertEqual(secsvar.get(), [True, True, True])
+        self.assertEqual(secsvar.encode(), b"%\x03\x01\x01\x01")
+
+    def testGettingSlice(self):
+        secsvar = Boolean([True, False, True])
+
+        self.assertEqual(secsvar[1:], [False, True])
+
     def testLen(self):
         secsvar = Boolean([True, False, True])
 
@@ -1850,6 +2082,183 @@ class TestSecsVarU4(unittest.TestCase):
 
         self.assertEqual(secsvar.get(), [123, 234, 345])
 
+    def testDecodeMultiCountExceeded(self):
+        secsvar = U4(count=2)
+
+        with self.assertRaises(ValueError):
+            secsvar.decode(b"\xb1\x0c\x00\x00\x00{\x00\x00\x00\xea\x00\x00\x01Y")
+
+    def testEncodeDecodeLarge(self):
+        values = list(range(0, 4294967295, 42949))
+        secsvar = U4()
+
+        secsvar.decode(U4(values).encode())
+
+        self.assertEqual(secsvar.get(), values)
+
+    def testSetLargeOutOfRange(self):
+        with self.assertRaisesRegex(ValueError, "Invalid value 4294967296"):
+            U4(list(range(1000)) + [4294967296])
+
+
+class TestSecsVarNumberBulk(unittest.TestCase):
+    def testEncodeMatchesItemEncoding(self):
+        for var_type in [I1, I2, I4, I8, U1, U2, U4, U8, F4, F8]:
+            values = [var_type._base_type(value) for value in range(100)]
+
+            self.assertEqual(var_type(values).encode(),
+                             var_type([]).encode_item_header(100 * var_type._bytes) +
+                             b"".join(var_type(value).encode()[2:] for value in values))
+
+    def testDecodeRoundTrip(self):
+        for var_type in [I1, I2, I4, I8, U1, U2, U4, U8, F4, F8]:
+            values = [var_type._base_type(value) for value in range(100)]
+            secsvar = var_type()
+
+            secsvar.decode(var_type(values).encode())
+
+            self.assertEqual(secsvar.get(), values)
+
+    def testSetNan(self):
+        secsvar = F8([float("nan"), 1.0])
+
+        self.assertEqual(secsvar.get()[1], 1.0)
+
+    def testSetNanOutOfRange(self):
+        with self.assertRaises(ValueError):
+            F4([float("nan"), 1e40])
+
+
+@unittest.skipIf(numpy is None, "numpy not installed")
+class TestSecsVarEncodeInto(unittest.TestCase):
+    def testMatchesEncode(self):
+        for secsvar in [U4([1, 2]), F8(1.5), String("TEXT"), JIS8("TEXT"), Binary(b"\x00\x01"), Binary(),
+                        Boolean([True, False]), Dynamic([U1, String], "TEXT"), List([MDLN, SOFTREV], ["A", "B"]),
+                        Array(MDLN, ["A", "B"])]:
+            buffer = bytearray(b"\xff")
+
+            secsvar.encode_into(buffer)
+
+            self.assertEqual(buffer, b"\xff" + secsvar.encode())
+
+    def testDecodedBinary(self):
+        secsvar = Binary()
+        secsvar.decode(memoryview(Binary(b"\x01\x02").encode()))
+        buffer = bytearray()
+
+        secsvar.encode_into(buffer)
+
+        self.assertEqual(buffer, Binary(b"\x01\x02").encode())
+
+
+class TestSecsVarNumberNumpy(unittest.TestCase):
+    def setUp(self):
+        BaseNumber.use_numpy = True
+
+    def tearDown(self):
+        BaseNumber.use_numpy = False
+
+    def testDecodeView(self):
+        data = memoryview(b"\x00" + U4([1, 2, 3]).encode())
+        secsvar = U4()
+
+        self.assertEqual(secsvar.decode(data, 1), 15)
+
+        self.assertIsInstance(secsvar.value, numpy.ndarray)
+        self.assertEqual(secsvar.value.dtype, numpy.dtype(">u4"))
+        self.assertFalse(secsvar.value.flags.writeable)
+        self.assertTrue(numpy.shares_memory(secsvar.value, numpy.frombuffer(data, dtype="u1")))
+        self.assertEqual(secsvar.get().tolist(), [1, 2, 3])
+
+    def testDecodeSingleItem(self):
+        secsvar = F8()
+        secsvar.decode(F8(1.5).encode())
+
+        self.assertEqual(secsvar.get(), 1.5)
+        self.assertIsInstance(secsvar.get(), float)
+
+    def testDecodeAllTypes(self):
+        for var_type in [I1, I2, I4, I8, U1, U2, U4, U8, F4, F8]:
+            values = [var_type._base_type(value) for value in range(100)]
+            secsvar = var_type()
+
+            secsvar.decode(var_type(values).encode())
+
+            self.assertEqual(secsvar.get().tolist(), values)
+            self.assertEqual(secsvar, values)
+
+    def testDecodeCountExceeded(self):
+        secsvar = U4(count=2)
+
+        with self.assertRaises(ValueError):
+            secsvar.decode(U4([1, 2, 3]).encode())
+
+    def testSetItemCopiesView(self):
+        data = U4([1, 2, 3]).encode()
+        secsvar = U4()
+        secsvar.decode(data)
+
+        secsvar[0] = 5
+
+        self.assertEqual(secsvar.get().tolist(), [5, 2, 3])
+        self.assertEqual(data, U4([1, 2, 3]).encode())
+
+    def testSetArray(self):
+        value = numpy.arange(5, dtype=">u4")
+        secsvar = U4(value)
+
+        self.assertTrue(numpy.shares_memory(secsvar.value, value))
+        self.assertEqual(secsvar.encode(), U4([0, 1, 2, 3, 4]).encode())
+
+    def testSetArrayNativeByteOrder(self):
+        secsvar = I2(numpy.array([-1, 2], dtype="<i2"))
+
+        self.assertEqual(secsvar.encode(), I2([-1, 2]).encode())
+
+    def testSetArrayOutOfRange(self):
+        with self.assertRaises(ValueError):
+            U1(numpy.array([1, 256]))
+
+    def testSetArrayFloatForInteger(self):
+        with self.assertRaises(ValueError):
+            U4(numpy.array([1.0, 2.0]))
+
+    def testSetArrayCountExceeded(self):
+        with self.assertRaises(ValueError):
+            U4(numpy.array([1, 2, 3]), count=2)
+
+    def testSetArrayMultiDimensional(self):
+        with self.assertRaises(ValueError):
+            U4(numpy.zeros((2, 2), dtype=">u4"))
+
+    def testSupportsArray(self):
+        self.assertTrue(U1().supports_value(numpy.array([1, 255])))
+        self.assertFalse(U1().supports_value(numpy.array([1, 256])))
+        self.assertFalse(U1().supports_value(numpy.array([1.5])))
+
+    def testDynamicMatchesDtype(self):
+        secsvar = Dynamic([U4, F4, F8], numpy.array([1.5, 2.5], dtype=numpy.float32))
+
+        self.assertIsInstance(secsvar.value, F4)
+        self.assertEqual(secsvar.encode(), F4([1.5, 2.5]).encode())
+
+    def testEqualsList(self):
+        secsvar = U4(numpy.array([1, 2], dtype=">u4"))
+
+        self.assertEqual(secsvar, U4([1, 2]))
+        self.assertEqual(hash(secsvar), hash(U4([1, 2])))
+
+    def testWithoutNumpy(self):
+        original = secsgem.secs.variables.base_number.numpy
+        secsgem.secs.variables.base_number.numpy = None
+        try:
+            secsvar = U4()
+            secsvar.decode(U4([1, 2, 3]).encode())
+        finally:
+            secsgem.secs.variables.base_number.numpy = original
+
+        self.assertEqual(secsvar.value, [1, 2, 3])
+
 
 class GoodBadLists(object):
     _type = None